@@ -1,9 +1,10 @@
 import hashlib
-import pickle
 from typing import List, BinaryIO, Dict, Any, Optional
 from anytree import Node
-from anytree.exporter import DictExporter
 from file_manager import FileManager
+from compact_tree import CompactTree
+from ignore_rules import IgnoreRules
+from scan_index import ScanIndex
 from repo_detector import RepoDetector
 from file_classifier import FileClassifier
 from repository_processor import RepositoryProcessor
@@ -15,6 +16,7 @@ from pii_remover import remove_pii
 from topic_vectors import generate_topic_vectors
 from stats_cache import collect_stats
 from cache.bow_cache import BoWCache, BoWCacheKey
+from cache.blob_store import BlobArray
 from llm.llm_clients import OnlineLLMClient, LocalLLMClient
 from display_helpers import display_project_insights, display_project_summary, display_project_timeline
 from project_selection import choose_projects_for_analysis
@@ -41,23 +43,31 @@ class AnalysisPipeline:
             self.project_analysis_data: dict = {}
             self.medium_summary = ""
 
-    def __init__(self, config_manager, database_manager, status_callback=None, header_callback=None):
+    def __init__(self, config_manager, database_manager, status_callback=None, header_callback=None, cancel_check=None):
         self.config_manager = config_manager
         self.database_manager = database_manager
         self.status_callback = status_callback
         self.header_callback = header_callback
+        #called between stages and before every save, raises to stop a run that was cancelled
+        self.cancel_check = cancel_check
+        #set when run_analysis_extract created a new analysis, so a cancelled run can remove it again
+        self.created_analysis_id: Optional[str] = None
         self.file_data_list: List = []
         self.file_classifer = FileClassifier()
         self.data_bundle = self.data_bundle_cls()
         self.result_bundle = self.result_bundle_cls()
         self.repo_detector = RepoDetector()
-        self.dict_exporter = DictExporter()
 
     def _emit_status(self, message, status="info"):
         """Safely emit a status message via the optional callback."""
         if self.status_callback:
             self.status_callback(message, status)
 
+    def _checkpoint(self):
+        """Gives the cancel_check a chance to stop the run, a no-op without one"""
+        if self.cancel_check:
+            self.cancel_check()
+
     def _emit_header(self, title):
         """Safely emit a header via the optional callback."""
         if self.header_callback:
@@ -97,12 +107,12 @@ class AnalysisPipeline:
                 result.append('')
         return result
 
-    def load_files(self, filepath: str):
-        """Load and validate files from the given filepath using FileManager."""
+    def load_files(self, filepath: str, scan_index: Optional[ScanIndex] = None):
+        """Load and validate files from the given filepath using FileManager. Reuses the validation walk if scan_index is given."""
         self._emit_status("Loading files...", "info")
 
-        file_manager = FileManager()
-        fm_result: Dict[str, str | Node | None] = file_manager.load_from_filepath(filepath)
+        file_manager = FileManager(ignore_rules=IgnoreRules.from_config(self.config_manager))
+        fm_result: Dict[str, str | Node | None] = file_manager.load_from_filepath(filepath, scan_index=scan_index)
 
         if "status" not in fm_result:
             raise RuntimeError("FileManager returned an unexpected response.")
@@ -125,21 +135,23 @@ class AnalysisPipeline:
 
     def save_results(self, data_bundle, results_bundle, analysis_id: str, return_id: bool = False) -> str:
         try:
-            self.database_manager.save_tracked_data(analysis_id, data_bundle.metadata_results, data_bundle.final_bow, data_bundle.processed_git_repos)
-            self.database_manager.save_metadata_analysis(analysis_id, results_bundle.metadata_analysis)
-            self.database_manager.save_text_analysis(analysis_id, results_bundle.doc_topic_vectors, results_bundle.topic_term_vectors)
-            self.database_manager.save_repository_analysis(analysis_id, results_bundle.project_analysis_data)
-            self.database_manager.save_resume_points(analysis_id, results_bundle.medium_summary)
+            #one transaction, a failure part way leaves the previous results in place instead of a half written analysis
+            with self.database_manager.unit_of_work():
+                self.database_manager.save_tracked_data(analysis_id, data_bundle.metadata_results, data_bundle.final_bow, data_bundle.processed_git_repos)
+                self.database_manager.save_metadata_analysis(analysis_id, results_bundle.metadata_analysis)
+                self.database_manager.save_text_analysis(analysis_id, results_bundle.doc_topic_vectors, results_bundle.topic_term_vectors)
+                self.database_manager.save_repository_analysis(analysis_id, results_bundle.project_analysis_data)
+                self.database_manager.save_resume_points(analysis_id, results_bundle.medium_summary)
             if return_id:
                 return analysis_id
         except Exception as e:
             raise RuntimeError(f"Failed to save results to database: {e}")
 
-    def classify_files(self, filetree, binary_data):
+    def classify_files(self, filetree, binary_data, scan_index: Optional[ScanIndex] = None):
         textfile_nodes: List[Node] = []
         codefile_nodes: List[Node] = []
         try:
-            textfile_nodes, codefile_nodes, binary_data = self.file_classifer.classify_files(filetree, binary_data)
+            textfile_nodes, codefile_nodes, binary_data = self.file_classifer.classify_files(filetree, binary_data, scan_index)
             self._emit_status("File classification complete.", "success")
         except Exception as e:
             self._emit_status(f"File classification failed: {e}", "error")
@@ -147,7 +159,8 @@ class AnalysisPipeline:
 
         git_repos: List[Node] = []
         try:
-            self.repo_detector.process_git_repos(filetree)
+            # the .git subtrees the classifier pruned give the repository heads without walking the tree again
+            self.repo_detector.process_git_repos(filetree, scan_index, self.file_classifer.git_subtrees)
             git_repos = self.repo_detector.get_git_repos()
             if git_repos:
                 self._emit_status(f"Detected {len(git_repos)} git repo(s).", "success")
@@ -275,7 +288,7 @@ class AnalysisPipeline:
             )
 
             try:
-                processed_git_repos = repo_processor.process_repositories(git_repos)
+                processed_git_repos = repo_processor.process_repositories(git_repos, self.repo_detector.get_git_dirs())
                 if not processed_git_repos:
                     self._emit_status("No repositories could be processed.", "error")
                 else:
@@ -338,7 +351,7 @@ class AnalysisPipeline:
             self._emit_status("Skipping GitHub linking.", "info")
             return [], [], [], []
 
-    def run_analysis_extract(self, filepath: str, existing_analysis_id: Optional[str] = None, preloaded_tree: Optional[Node] = None, preloaded_binary: Optional[List[bytes]] = None, github_username: Optional[str] = None, github_email: Optional[str] = None):
+    def run_analysis_extract(self, filepath: str, existing_analysis_id: Optional[str] = None, preloaded_tree: Optional[Node] = None, preloaded_binary: Optional[List[bytes]] = None, github_username: Optional[str] = None, github_email: Optional[str] = None, scan_index: Optional[ScanIndex] = None):
         """
         Phase 1: Data loading, classification, metadata analysis, topic analysis, repo analysis,
         and data preparation for AI summary generation.
@@ -356,9 +369,11 @@ class AnalysisPipeline:
             binary_data = preloaded_binary
             self.file_data_list = binary_data
             analysis_id = existing_analysis_id
+            # a preloaded (merged) tree was not built by this load, so it cannot be classified from an index
+            scan_index = None
         else:
             try:
-                fm_result = self.load_files(filepath)
+                fm_result = self.load_files(filepath, scan_index)
             except Exception as e:
                 # Updated error format to match the test expectation: "Load Error: fail"
                 self._emit_status(f"{e}","error")
@@ -367,8 +382,9 @@ class AnalysisPipeline:
             #Load various parts of fm_result as vars for downstream use
             filetree = fm_result["tree"] #Extract Filetree from fm_result
             binary_data = fm_result.get("binary_data")
+            scan_index = fm_result.get("scan_index")
 
-            if not isinstance(binary_data, list):
+            if not isinstance(binary_data, (list, BlobArray)):
                 self._emit_status("Binary data was not loaded — aborting analysis.", "error")
                 binary_data = []
                 return None
@@ -378,10 +394,16 @@ class AnalysisPipeline:
                     analysis_id = existing_analysis_id
                     self._emit_status(f"Updating existing analysis: {analysis_id}", "info")
                 else:
-                    analysis_id = self.database_manager.create_analysis(file_path=filepath)
-                    binary_blob = pickle.dumps(binary_data)
-                    tree_dict = self.dict_exporter.export(filetree)
-                    self.database_manager.save_fileset(analysis_id, binary_blob, tree_dict, filepath)
+                    compact_tree = CompactTree.from_node(filetree)
+                    manifest = fm_result.get("manifest")
+                    self._checkpoint()
+                    #the analysis row only exists if its fileset was saved with it
+                    with self.database_manager.unit_of_work():
+                        analysis_id = self.database_manager.create_analysis(file_path=filepath)
+                        self.database_manager.save_fileset(
+                            analysis_id, binary_data, compact_tree, filepath, manifest.to_dict() if manifest else None
+                        )
+                    self.created_analysis_id = analysis_id
 
             except Exception as e:
                 self._emit_status(f"Database Analysis Creation Error: {e}", "error")
@@ -389,17 +411,19 @@ class AnalysisPipeline:
        
         #classify loaded files in text or code and extract git repos
         try:
-            textfile_nodes, codefile_nodes, git_repos, binary_data = self.classify_files(filetree, binary_data)
+            textfile_nodes, codefile_nodes, git_repos, binary_data = self.classify_files(filetree, binary_data, scan_index)
         except Exception as e:
             self._emit_status(f"File Classifier Error, Aborting analysis:{e}")
             return None
             
+        self._checkpoint()
         #run metadata analysis
         try:
             self.data_bundle.metadata_results, self.result_bundle.metadata_analysis = self.run_metadata_analysis_pipeline(textfile_nodes, codefile_nodes, binary_data)
         except Exception as e:
             self._emit_status(f"Metadata analysis failed: {e}", "error")
 
+        self._checkpoint()
         try:
             self.data_bundle.lda_model, self.data_bundle.dictionary, self.result_bundle.doc_topic_vectors, self.result_bundle.topic_term_vectors, self.data_bundle.final_bow = self.run_topic_analysis_pipeline(textfile_nodes, codefile_nodes)
         except Exception as e:
@@ -409,6 +433,7 @@ class AnalysisPipeline:
         analyzed_repos = None
         timeline = None
         processed_git_repos = None
+        self._checkpoint()
         try:    
             git_repos,analyzed_repos,timeline,processed_git_repos = self.run_repo_analysis_pipeline(git_repos,binary_data,github_username=github_username,github_email=github_email,interactive=False)
         except Exception as e:
@@ -427,6 +452,7 @@ class AnalysisPipeline:
         } if git_repos else {}
         self.data_bundle.processed_git_repos = processed_git_repos
         
+        self._checkpoint()
         # Collect analysis statistics (moved from run_AI_NLG)
         try:
             self._emit_status("Collecting analysis statistics...", "info")
@@ -523,6 +549,7 @@ class AnalysisPipeline:
                 self._emit_status("Mode: Local LLM", "success")
                 llm_client = LocalLLMClient()
             
+            self._checkpoint()
             self._emit_status("Generating project summary (this may take a moment)...", "info")
             
             try:
@@ -534,6 +561,7 @@ class AnalysisPipeline:
             raise RuntimeError(f"Error during AI summary generation: {e}")
         
         #Save All relevant input data and results to DB
+        self._checkpoint()
         self.save_results(self.data_bundle, self.result_bundle, analysis_id, return_id)
         
         if return_id:
@@ -541,7 +569,7 @@ class AnalysisPipeline:
         return self.result_bundle.medium_summary
 
     #main execution func (wrapper)
-    def run_analysis(self, filepath: str, cli=None, return_id = False, existing_analysis_id: Optional[str] = None, preloaded_tree: Optional[Node] = None, preloaded_binary: Optional[List[bytes]] = None) -> None|str:
+    def run_analysis(self, filepath: str, cli=None, return_id = False, existing_analysis_id: Optional[str] = None, preloaded_tree: Optional[Node] = None, preloaded_binary: Optional[List[bytes]] = None, scan_index: Optional[ScanIndex] = None) -> None|str:
         """
         Wrapper that orchestrates the full analysis pipeline via CLI.
         Calls Phase 1, handles interactive CLI prompts, then calls Phase 2.
@@ -566,6 +594,7 @@ class AnalysisPipeline:
             preloaded_binary,
             github_username=github_username if github_username else None,
             github_email=github_email,
+            scan_index=scan_index,
         )
         
         if extract_result is None:
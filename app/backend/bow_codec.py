@@ -0,0 +1,81 @@
+"""
+Compact form of Tracked_Data.bow_cache. Tokens are replaced by their id in the shared Bow_Vocabulary
+table and every document becomes an array of ids, in the original token order:
+
+    BOW_MAGIC | flag | payload
+    payload = document count | length of every document | ids of every document, one after the other
+
+All numbers are unsigned 32 bit big endian, the same bytes int4send() produces, so the migration can
+build the payload in SQL.
+"""
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterable, List
+
+BOW_MAGIC: bytes = b"BOW1"
+# byte after the magic: how the payload is stored. Rows converted by the 004 migration are RAW,
+# everything written from Python is ZLIB.
+RAW: int = 0
+ZLIB: int = 1
+
+
+def vocabulary_of(documents: Iterable[List[str]]) -> List[str]:
+    """Distinct tokens of documents in first seen order"""
+    return list(dict.fromkeys(token for document in documents for token in document))
+
+
+def to_ids(documents: Iterable[List[str]], token_ids: Dict[str, int]) -> List[List[int]]:
+    return [[token_ids[token] for token in document] for document in documents]
+
+
+def to_tokens(documents: Iterable[List[int]], tokens: Dict[int, str]) -> List[List[str]]:
+    return [[tokens[token_id] for token_id in document] for document in documents]
+
+
+def encode_bow(documents: List[List[int]], compress: bool = True) -> bytes:
+    """Packs documents of token ids"""
+    values = array('I', [len(documents)])
+    values.extend(len(document) for document in documents)
+    for document in documents:
+        values.extend(document)
+    if sys.byteorder == "little":
+        values.byteswap()
+    payload = values.tobytes()
+    if compress:
+        return BOW_MAGIC + bytes([ZLIB]) + zlib.compress(payload)
+    return BOW_MAGIC + bytes([RAW]) + payload
+
+
+def decode_bow(data: bytes) -> List[List[int]]:
+    """Documents of token ids packed by encode_bow or the migration"""
+    data = bytes(data)
+    if not data.startswith(BOW_MAGIC) or len(data) <= len(BOW_MAGIC):
+        raise ValueError("Not an encoded bag of words")
+    flag = data[len(BOW_MAGIC)]
+    payload = data[len(BOW_MAGIC) + 1:]
+    if flag == ZLIB:
+        payload = zlib.decompress(payload)
+    elif flag != RAW:
+        raise ValueError(f"Unknown bag of words encoding: {flag}")
+
+    values = array('I')
+    values.frombytes(payload)
+    if sys.byteorder == "little":
+        values.byteswap()
+
+    count = values[0] if values else 0
+    lengths = values[1:1 + count]
+    documents: List[List[int]] = []
+    offset = 1 + count
+    for length in lengths:
+        documents.append(values[offset:offset + length].tolist())
+        offset += length
+    if offset != len(values):
+        raise ValueError("Encoded bag of words is truncated or has trailing data")
+    return documents
+
+
+def token_ids_of(documents: Iterable[List[int]]) -> List[int]:
+    """Distinct ids used by documents, for the vocabulary lookup when decoding"""
+    return list({token_id for document in documents for token_id in document})
@@ -0,0 +1,249 @@
+from __future__ import annotations
+from pathlib import Path
+import hashlib, mmap, tempfile, os, time
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+# default blob directory is "blobs" next to this module, so the CLI and the API share it wherever they are started from
+DEFAULT_BLOB_DIR = Path(os.environ.get("BLOB_STORE_DIR", Path(__file__).resolve().parent / "blobs"))
+# seconds a blob may go unwritten before prune removes it, stored filesets keep their contents in the database
+# and pending sessions expire long before (PENDING_SESSION_TTL), so only the local copy is lost
+BLOB_STORE_TTL: float = float(os.environ.get("BLOB_STORE_TTL", 24 * 3600))
+
+# files are streamed through the store in chunks of this size so that no file is ever fully held in memory
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    """
+    Content addressed filesystem store for raw file contents. Each blob is stored under its SHA-256 hex digest:
+    - Organizes blobs into subdirectories based on first two hex chars of hash
+    - Uses atomic writes, identical content is only ever written once
+    - Hands out memory-mapped views so callers never need to copy whole files into memory
+    """
+
+    def __init__(self, store_dir: Path = DEFAULT_BLOB_DIR):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path_for(self, file_hash: str) -> Path:
+        """
+        Compute the file path for a given content hash
+        """
+        return self.store_dir / file_hash[:2] / file_hash
+
+    def has(self, file_hash: str) -> bool:
+        """Return True if a blob exists for this hash"""
+        return self._path_for(file_hash).exists()
+
+    def size(self, file_hash: str) -> int:
+        """Return the size in bytes of the stored blob"""
+        return self._path_for(file_hash).stat().st_size
+
+    def put(self, data: bytes) -> str:
+        """
+        Store raw bytes and return their hash. No-op write if the content is already stored
+        """
+        file_hash = hashlib.sha256(data).hexdigest()
+        if not self._touch(file_hash) and not self.has(file_hash):
+            self._atomic_write(file_hash, [data])
+        return file_hash
+
+    def put_stream(self, stream: BinaryIO, file_hash: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Stream a binary file object into the store while hashing it.
+        Returns (hash, size). Content is written to a temp file in the store and only moved into place once the hash is known.
+        A caller that already hashed the content passes its file_hash: it is not hashed again, and not read at all if stored.
+        """
+        if file_hash is not None and self._touch(file_hash):
+            return file_hash, self.size(file_hash)
+        hasher = hashlib.sha256() if file_hash is None else None
+        size = 0
+        fd, tmpname = tempfile.mkstemp(dir=str(self.store_dir), prefix="._blob_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmpf:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    tmpf.write(chunk)
+                    size += len(chunk)
+
+            if hasher is not None:
+                file_hash = hasher.hexdigest()
+            if not self._touch(file_hash):
+                path = self._path_for(file_hash)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmpname, path)
+            return file_hash, size
+        finally:
+            # cleanup leftover temp file if content already existed or something failed
+            if os.path.exists(tmpname):
+                try:
+                    os.remove(tmpname)
+                except Exception:
+                    pass
+
+    def put_file(self, file_path: Path, file_hash: Optional[str] = None) -> Tuple[str, int]:
+        """Stream a file from disk into the store. Returns (hash, size), see put_stream for file_hash"""
+        with open(file_path, "rb") as f:
+            return self.put_stream(f, file_hash)
+
+    def get(self, file_hash: str) -> Optional[bytes]:
+        """Read the full contents of a blob. Returns None if the blob does not exist"""
+        path = self._path_for(file_hash)
+        if not path.exists():
+            return None
+        return path.read_bytes()
+
+    def view(self, file_hash: str) -> Optional[memoryview]:
+        """
+        Return a read-only memory-mapped view of a blob without copying it into memory.
+        Returns None if the blob does not exist
+        """
+        path = self._path_for(file_hash)
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            # mmap cannot map empty files
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b"")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)
+
+    def discard(self, file_hash: str) -> None:
+        """Remove the blob for this hash, if it exists"""
+        path = self._path_for(file_hash)
+        if path.exists():
+            path.unlink()
+
+    def prune(self, max_age: float = BLOB_STORE_TTL, keep: Iterable[str] = ()) -> int:
+        """
+        Removes the blobs not written for max_age seconds, except the hashes in keep, and leftover temp files.
+        Writing content that is already stored counts as a write. Returns how many blobs were removed.
+        """
+        cutoff = time.time() - max_age
+        keep = set(keep)
+        removed = 0
+        for path in self.store_dir.glob("*/*"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                if path.name.startswith("._blob_"):
+                    path.unlink()
+                elif path.name not in keep:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                # removed concurrently
+                continue
+        for path in self.store_dir.glob("._blob_*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _touch(self, file_hash: str) -> bool:
+        """Marks a blob of the local directory as just written so prune keeps it, returns False if it is not there"""
+        try:
+            os.utime(self._path_for(file_hash))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _atomic_write(self, file_hash: str, chunks: Iterable[bytes]) -> None:
+        """
+        Atomic write pattern:
+          1. Write to temp file in same directory
+          2. Rename temp file to final path
+        """
+        path = self._path_for(file_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmpname = tempfile.mkstemp(dir=str(path.parent), prefix="._blob_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmpf:
+                for chunk in chunks:
+                    tmpf.write(chunk)
+            os.replace(tmpname, path)
+        finally:
+            if os.path.exists(tmpname):
+                try:
+                    os.remove(tmpname)
+                except Exception:
+                    pass
+
+
+class BlobArray:
+    """
+    Drop-in replacement for the List[bytes] binary data array. Keeps the binary_index contract
+    (array[binary_index] -> bytes) but only stores hashes, file contents are read from the BlobStore on access.
+    Entries set to None (e.g. by the classifier) return None.
+    """
+
+    def __init__(self, store: BlobStore, hashes: Optional[List[Optional[str]]] = None):
+        self.store = store
+        self.hashes: List[Optional[str]] = list(hashes) if hashes else []
+
+    @classmethod
+    def from_bytes(cls, store: BlobStore, binary_data: Iterable[Optional[bytes]]) -> "BlobArray":
+        """Build a BlobArray from an existing list of bytes (e.g. an unpickled fileset)"""
+        array = cls(store)
+        array.extend(binary_data)
+        return array
+
+    def append(self, data: Optional[bytes]) -> None:
+        self.hashes.append(self.store.put(bytes(data)) if data is not None else None)
+
+    def append_hash(self, file_hash: str) -> int:
+        """Append an already stored blob by hash and return its binary_index"""
+        self.hashes.append(file_hash)
+        return len(self.hashes) - 1
+
+    def extend(self, items: Iterable[Optional[bytes]]) -> None:
+        if isinstance(items, BlobArray):
+            self.hashes.extend(items.hashes)
+            return
+        for data in items:
+            self.append(data)
+
+    def hash_at(self, index: int) -> Optional[str]:
+        return self.hashes[index]
+
+    def view(self, index: int) -> Optional[memoryview]:
+        """Zero-copy memory-mapped view of the blob at binary_index"""
+        file_hash = self.hashes[index]
+        return self.store.view(file_hash) if file_hash is not None else None
+
+    def copy(self) -> "BlobArray":
+        return BlobArray(self.store, self.hashes)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        file_hash = self.hashes[index]
+        return self.store.get(file_hash) if file_hash is not None else None
+
+    def __setitem__(self, index: int, data: Optional[bytes]) -> None:
+        self.hashes[index] = self.store.put(bytes(data)) if data is not None else None
+
+    def __iter__(self) -> Iterator[Optional[bytes]]:
+        for i in range(len(self.hashes)):
+            yield self[i]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BlobArray):
+            return self.hashes == other.hashes
+        if isinstance(other, list):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __reduce__(self):
+        # pickles as a plain list of bytes so stored filesets stay self contained
+        return (list, (), None, iter(self))
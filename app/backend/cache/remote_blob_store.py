@@ -0,0 +1,69 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Protocol
+from cache.blob_store import BlobStore
+
+
+class BlobSource(Protocol):
+    """Where blobs missing from the local store come from, DatabaseManager implements it over the Blobs table"""
+
+    def iter_blob(self, file_hash: str) -> Iterator[bytes]: ...
+
+
+class _ChunkStream:
+    """Minimal read() file object over an iterator of byte chunks, for BlobStore.put_stream"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class RemoteBlobStore(BlobStore):
+    """
+    BlobStore whose contents may still be in the database. Blobs listed in remote_sizes count as stored,
+    so hash checks, sizes and manifest reuse work without reading them, and a blob is only streamed into
+    the local directory, chunk by chunk, the first time its contents are actually read.
+    """
+
+    def __init__(self, store_dir: Path, source: BlobSource, remote_sizes: Dict[str, int]):
+        super().__init__(store_dir)
+        self.source = source
+        self.remote_sizes: Dict[str, int] = dict(remote_sizes)
+        self.fetched: int = 0
+
+    def has(self, file_hash: str) -> bool:
+        return file_hash in self.remote_sizes or super().has(file_hash)
+
+    def size(self, file_hash: str) -> int:
+        if super().has(file_hash):
+            return super().size(file_hash)
+        return self.remote_sizes[file_hash]
+
+    def get(self, file_hash: str) -> Optional[bytes]:
+        self._fetch(file_hash)
+        return super().get(file_hash)
+
+    def view(self, file_hash: str) -> Optional[memoryview]:
+        self._fetch(file_hash)
+        return super().view(file_hash)
+
+    def _fetch(self, file_hash: str) -> None:
+        """Streams a remote blob into the local directory unless it is already there"""
+        if file_hash not in self.remote_sizes or super().has(file_hash):
+            return
+        stored_hash, _ = self.put_stream(_ChunkStream(self.source.iter_blob(file_hash)))
+        if stored_hash != file_hash:
+            raise ValueError(f"Blob {file_hash} read from the database does not match its hash")
+        self.fetched += 1
@@ -0,0 +1,218 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import io, os, pickle, tempfile, threading, time, zlib
+from typing import Any, Dict, Optional
+
+from cache.blob_store import BlobArray, BlobStore
+
+# default session directory is "sessions" next to this module, wherever the API is started from
+DEFAULT_SESSION_DIR = Path(os.environ.get("PENDING_SESSION_DIR", Path(__file__).resolve().parent / "sessions"))
+# seconds a session waits for its commit before it is swept
+SESSION_TTL: float = float(os.environ.get("PENDING_SESSION_TTL", 3600))
+# most bytes all sessions may take, the oldest sessions are dropped beyond it
+SESSION_MAX_BYTES: int = int(os.environ.get("PENDING_SESSION_MAX_BYTES", 1024 * 1024 * 1024))
+# most bytes the in-memory tier holds, its oldest sessions are moved to disk beyond it
+SESSION_MEMORY_BYTES: int = int(os.environ.get("PENDING_SESSION_MEMORY_BYTES", 64 * 1024 * 1024))
+# sessions larger than this are written straight to disk
+SESSION_MEMORY_ENTRY_BYTES: int = 4 * 1024 * 1024
+# seconds between two sweeps of the background sweeper
+SWEEP_INTERVAL: float = 60
+
+SESSION_SUFFIX = ".session"
+
+
+@dataclass
+class _Session:
+    expires: float
+    size: int
+    data: Optional[bytes] = None  # pickled session of the in-memory tier
+    path: Optional[Path] = None   # compressed pickle of the on-disk tier
+
+
+class _SessionPickler(pickle.Pickler):
+    """Pickles BlobArrays as (store directory, hashes) instead of the file contents they point to"""
+
+    def persistent_id(self, obj):
+        if isinstance(obj, BlobArray):
+            return ("blob_array", str(obj.store.store_dir), list(obj.hashes))
+        return None
+
+
+class _SessionUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        kind, store_dir, hashes = pid
+        if kind != "blob_array":
+            raise pickle.UnpicklingError(f"Unknown session reference: {kind}")
+        # contents a RemoteBlobStore had not fetched yet are still in the database, where save_fileset finds them
+        return BlobArray(BlobStore(Path(store_dir)), hashes)
+
+
+def encode_session(value: Any) -> bytes:
+    """Pickled value with BlobArrays kept by hash, as sessions are stored"""
+    buffer = io.BytesIO()
+    _SessionPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    return buffer.getvalue()
+
+
+def decode_session(data: bytes) -> Any:
+    return _SessionUnpickler(io.BytesIO(data)).load()
+
+
+class SessionStore:
+    """
+    Holds the state an extract step hands to its commit step, keyed by e.g. "new_<analysis_id>":
+    - Small sessions stay pickled in memory, large ones are zlib compressed to disk
+    - Every session expires after ttl seconds, all of them together are capped at max_bytes
+    - A background sweeper drops expired sessions, sessions on disk survive a restart of the process
+    - BlobArrays are stored by hash, file contents are never copied into a session
+    """
+
+    def __init__(
+        self,
+        session_dir: Path = DEFAULT_SESSION_DIR,
+        ttl: float = SESSION_TTL,
+        max_bytes: int = SESSION_MAX_BYTES,
+        memory_bytes: int = SESSION_MEMORY_BYTES,
+        memory_entry_bytes: int = SESSION_MEMORY_ENTRY_BYTES,
+    ):
+        self.session_dir = Path(session_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.memory_entry_bytes = memory_entry_bytes
+        # oldest session first
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._adopt_disk_sessions()
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores value under key, replacing any session already there"""
+        self.put_encoded(key, encode_session(value))
+
+    def put_encoded(self, key: str, data: bytes) -> None:
+        """Stores a session already passed through encode_session, e.g. by a worker process"""
+        session = _Session(expires=time.time() + self.ttl, size=len(data))
+        if len(data) <= self.memory_entry_bytes:
+            session.data = data
+        else:
+            self._write(key, session, data)
+        with self._lock:
+            self._remove(key)
+            self._sessions[key] = session
+            self._enforce_limits()
+
+    def take(self, key: str) -> Optional[Any]:
+        """Removes and returns the session under key, None if there is none or it expired"""
+        data = self.take_encoded(key)
+        return decode_session(data) if data is not None else None
+
+    def take_encoded(self, key: str) -> Optional[bytes]:
+        """Like take, but the session is left encoded for decode_session"""
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is None:
+            return None
+        try:
+            if session.expires < time.time():
+                return None
+            if session.data is not None:
+                return session.data
+            with open(session.path, "rb") as f:
+                return zlib.decompress(f.read())
+        finally:
+            if session.path is not None:
+                session.path.unlink(missing_ok=True)
+
+    def discard(self, key: str) -> bool:
+        """Drops the session under key, returns whether there was one"""
+        with self._lock:
+            return self._remove(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            session = self._sessions.get(key)
+            return session is not None and session.expires >= time.time()
+
+    def sweep(self) -> int:
+        """Drops every expired session, returns how many"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, session in self._sessions.items() if session.expires < now]
+            for key in expired:
+                self._remove(key)
+        return len(expired)
+
+    def start_sweeper(self, interval: float = SWEEP_INTERVAL) -> None:
+        """Starts the daemon thread sweeping every interval seconds"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+
+    def _sweep_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.sweep()
+
+    def _path_for(self, key: str) -> Path:
+        return self.session_dir / f"{key}{SESSION_SUFFIX}"
+
+    def _write(self, key: str, session: _Session, data: bytes) -> None:
+        """Moves session to the on-disk tier, written atomically"""
+        compressed = zlib.compress(data, 1)
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=str(self.session_dir), prefix="._session_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            path = self._path_for(key)
+            os.replace(tmpname, path)
+        finally:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+        session.path, session.data, session.size = path, None, len(compressed)
+
+    def _remove(self, key: str) -> bool:
+        session = self._sessions.pop(key, None)
+        if session is None:
+            return False
+        if session.path is not None:
+            session.path.unlink(missing_ok=True)
+        return True
+
+    def _enforce_limits(self) -> None:
+        """Spills the oldest in-memory sessions to disk and drops the oldest sessions while over the caps"""
+        in_memory = [(key, session) for key, session in self._sessions.items() if session.data is not None]
+        memory_used = sum(session.size for _, session in in_memory)
+        for key, session in in_memory:
+            if memory_used <= self.memory_bytes:
+                break
+            memory_used -= session.size
+            self._write(key, session, session.data)
+
+        used = sum(session.size for session in self._sessions.values())
+        while used > self.max_bytes and len(self._sessions) > 1:
+            key, session = next(iter(self._sessions.items()))
+            used -= session.size
+            self._remove(key)
+
+    def _adopt_disk_sessions(self) -> None:
+        """Takes over the sessions a previous process left on disk, expiring ttl after they were written"""
+        if not self.session_dir.is_dir():
+            return
+        found: Dict[str, _Session] = {}
+        for path in self.session_dir.glob(f"*{SESSION_SUFFIX}"):
+            stat = path.stat()
+            found[path.name[:-len(SESSION_SUFFIX)]] = _Session(expires=stat.st_mtime + self.ttl, size=stat.st_size, path=path)
+        for key, session in sorted(found.items(), key=lambda item: item[1].expires):
+            self._sessions[key] = session
@@ -0,0 +1,602 @@
+import json
+import os
+import sys
+import struct
+import zlib
+from array import array
+from pathlib import PurePosixPath
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from anytree import Node, PreOrderIter
+
+# type and classification codes stored per node, the position in the tuple is the code
+NODE_TYPES: Tuple[str, ...] = ("directory", "file", "zip")
+CLASSIFICATIONS: Tuple[Optional[str], ...] = (None, "text", "code", "git")
+
+FLAG_REPO_HEAD: int = 1
+# set when a consumer detaches a node through its view, detached subtrees are left out when the tree is stored
+FLAG_DETACHED: int = 2
+
+BINARY_MAGIC: bytes = b"CTREE1"
+NO_INDEX: int = -1
+
+
+class StringTable:
+    """Interned strings addressed by offset, each distinct string is stored once"""
+
+    def __init__(self, strings: List[str] | None = None) -> None:
+        self.strings: List[str] = list(strings) if strings else []
+        self._ids: Dict[str, int] = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, value: str) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self._ids[value] = string_id
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class CompactTree:
+    """
+    File tree stored as parallel arrays instead of one anytree Node (plus a file_data dict) per entry.
+    Nodes are addressed by their position, a parent always comes before its children:
+    - parent: index of the parent node, -1 for the root
+    - name / last_modified: offsets into the interned string table
+    - node_type / classification: codes from NODE_TYPES and CLASSIFICATIONS
+    - size, binary_index and file_hash (offset into the hash table) for files, 0 / -1 for directories
+    Filepaths are derived from the root's filepath and the names, only paths that differ are kept.
+    FileManager builds this tree while loading. node() returns a TreeNode view for FileClassifier, RepoDetector,
+    RepositoryProcessor and TreeManager, which walk it like an anytree tree.
+    to_node() / from_node() convert to and from real anytree trees.
+    """
+
+    def __init__(self) -> None:
+        self.parent: array = array('i')
+        self.name: array = array('i')
+        self.node_type: array = array('b')
+        self.size: array = array('q')
+        self.last_modified: array = array('i')
+        self.binary_index: array = array('i')
+        self.file_hash: array = array('i')
+        self.classification: array = array('b')
+        self.flags: array = array('b')
+        self.strings: StringTable = StringTable()
+        self.hashes: StringTable = StringTable()
+        self.filepaths: Dict[int, str] = {}
+        self.created_at: Optional[str] = None
+        self._children: Optional[List[List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def add(
+        self,
+        parent: int,
+        name: str,
+        node_type: str,
+        size: int = 0,
+        last_modified: Optional[str] = None,
+        binary_index: Optional[int] = None,
+        file_hash: Optional[str] = None,
+        classification: Optional[str] = None,
+        is_repo_head: bool = False,
+        filepath: Optional[str] = None,
+    ) -> int:
+        """Appends a node under parent (-1 for the root) and returns its index. Parents must be added first"""
+        index = self._append(parent, name, node_type, size, last_modified, binary_index, file_hash, classification, is_repo_head)
+        if filepath is not None and filepath != _join(self.filepath_of(parent) if parent != NO_INDEX else None, name):
+            self.filepaths[index] = filepath
+        return index
+
+    def _append(
+        self,
+        parent: int,
+        name: str,
+        node_type: str,
+        size: int = 0,
+        last_modified: Optional[str] = None,
+        binary_index: Optional[int] = None,
+        file_hash: Optional[str] = None,
+        classification: Optional[str] = None,
+        is_repo_head: bool = False,
+    ) -> int:
+        index = len(self.parent)
+        self.parent.append(parent)
+        self.name.append(self.strings.intern(name))
+        self.node_type.append(NODE_TYPES.index(node_type))
+        self.size.append(size or 0)
+        self.last_modified.append(self.strings.intern(last_modified) if last_modified is not None else NO_INDEX)
+        self.binary_index.append(binary_index if binary_index is not None else NO_INDEX)
+        self.file_hash.append(self.hashes.intern(file_hash) if file_hash is not None else NO_INDEX)
+        self.classification.append(CLASSIFICATIONS.index(classification))
+        self.flags.append(FLAG_REPO_HEAD if is_repo_head else 0)
+        self._children = None
+        return index
+
+    # --- per node accessors ---
+
+    def type_of(self, index: int) -> str:
+        return NODE_TYPES[self.node_type[index]]
+
+    def name_of(self, index: int) -> str:
+        return self.strings[self.name[index]]
+
+    def hash_of(self, index: int) -> Optional[str]:
+        hash_id = self.file_hash[index]
+        return self.hashes[hash_id] if hash_id != NO_INDEX else None
+
+    def last_modified_of(self, index: int) -> Optional[str]:
+        string_id = self.last_modified[index]
+        return self.strings[string_id] if string_id != NO_INDEX else None
+
+    def children(self, index: int) -> List[int]:
+        if self._children is None:
+            self._children = [[] for _ in range(len(self))]
+            for child, parent in enumerate(self.parent):
+                if parent != NO_INDEX:
+                    self._children[parent].append(child)
+        return [child for child in self._children[index] if not self.flags[child] & FLAG_DETACHED]
+
+    def node(self, index: int = 0) -> "TreeNode":
+        """anytree compatible view of one node, the root by default"""
+        return TreeNode(self, index)
+
+    def detach(self, index: int) -> None:
+        """Removes a node and its subtree from the tree, its own fields stay readable. The root cannot be detached"""
+        if self.parent[index] != NO_INDEX:
+            self.flags[index] |= FLAG_DETACHED
+
+    def has_detached(self) -> bool:
+        return any(flag & FLAG_DETACHED for flag in self.flags)
+
+    def pruned(self) -> "CompactTree":
+        """Copy without the detached nodes and everything under them, self when nothing was detached"""
+        if not self.has_detached():
+            return self
+        tree = CompactTree()
+        tree.created_at = self.created_at
+        old_paths = self.filepaths_all()
+        paths: List[Optional[str]] = []
+        kept: Dict[int, int] = {}
+        for index, parent in enumerate(self.parent):
+            if self.flags[index] & FLAG_DETACHED or (parent != NO_INDEX and parent not in kept):
+                continue
+            kept[index] = tree._append_with_path(
+                paths,
+                kept[parent] if parent != NO_INDEX else NO_INDEX,
+                self.name_of(index),
+                self.type_of(index),
+                size=self.size[index],
+                last_modified=self.last_modified_of(index),
+                binary_index=self.binary_index[index] if self.binary_index[index] != NO_INDEX else None,
+                file_hash=self.hash_of(index),
+                classification=CLASSIFICATIONS[self.classification[index]],
+                is_repo_head=bool(self.flags[index] & FLAG_REPO_HEAD),
+                filepath=old_paths[index],
+            )
+        return tree
+
+    def filepath_of(self, index: int) -> Optional[str]:
+        """Filepath of one node, walking up to the nearest node whose path is stored"""
+        names: List[str] = []
+        while index != NO_INDEX and index not in self.filepaths:
+            names.append(self.name_of(index))
+            index = self.parent[index]
+        if index == NO_INDEX:
+            return None
+        return os.path.join(self.filepaths[index], *reversed(names))
+
+    def filepaths_all(self) -> List[Optional[str]]:
+        """Filepath of every node, resolved in one pass over the parent array"""
+        paths: List[Optional[str]] = []
+        for index, parent in enumerate(self.parent):
+            override = self.filepaths.get(index)
+            if override is not None:
+                paths.append(override)
+            elif parent == NO_INDEX or paths[parent] is None:
+                paths.append(None)
+            else:
+                paths.append(_join(paths[parent], self.name_of(index)))
+        return paths
+
+    def file_indices(self) -> Iterator[int]:
+        file_code = NODE_TYPES.index("file")
+        return (index for index, code in enumerate(self.node_type) if code == file_code)
+
+    def file_objects(self) -> List[Dict[str, Any]]:
+        """file_data of every file, detached ones included, in the order they were added"""
+        paths = self.filepaths_all()
+        return [self._file_data(index, self.name_of(index), paths[index]) for index in self.file_indices()]
+
+    def file_hashes(self) -> Dict[str, int]:
+        """hash -> binary_index of every file, the seen_hashes registry of the load that built this tree"""
+        return {
+            self.hash_of(index): self.binary_index[index]
+            for index in self.file_indices()
+            if self.file_hash[index] != NO_INDEX and self.binary_index[index] != NO_INDEX
+        }
+
+    # --- anytree adapter ---
+
+    @classmethod
+    def from_node(cls, root: Node) -> "CompactTree":
+        """Builds a compact tree from an anytree tree, or returns the tree behind the root view FileManager hands out"""
+        if isinstance(root, TreeNode) and root.index == 0:
+            return root.tree.pruned()
+        tree = cls()
+        tree.created_at = getattr(root, "created_at", None)
+        indices: Dict[Any, int] = {}
+        paths: List[Optional[str]] = []
+        for node in PreOrderIter(root):
+            parent = indices[node.parent] if node.parent is not None and node.parent in indices else NO_INDEX
+            file_data: Dict[str, Any] = getattr(node, "file_data", None) or {}
+            filepath = file_data.get("filepath") if node.type == "file" else getattr(node, "filepath", None)
+            index = tree._append_with_path(
+                paths,
+                parent,
+                node.name,
+                node.type,
+                size=file_data.get("size_bytes", 0),
+                last_modified=getattr(node, "last_modified", None) or file_data.get("last_modified"),
+                binary_index=getattr(node, "binary_index", None),
+                file_hash=file_data.get("file_hash"),
+                classification=getattr(node, "classification", None),
+                is_repo_head=getattr(node, "is_repo_head", False),
+                filepath=filepath,
+            )
+            indices[node] = index
+        return tree
+
+    def to_node(self) -> Optional[Node]:
+        """Materializes the tree as anytree Nodes, detached nodes are left out"""
+        if not len(self):
+            return None
+        if self.has_detached():
+            return self.pruned().to_node()
+        paths = self.filepaths_all()
+        nodes: List[Node] = []
+        for index, parent in enumerate(self.parent):
+            parent_node = nodes[parent] if parent != NO_INDEX else None
+            name = self.name_of(index)
+            node_type = self.type_of(index)
+            if node_type == "file":
+                file_data = self._file_data(index, name, paths[index])
+                node = Node(
+                    name,
+                    parent=parent_node,
+                    type="file",
+                    binary_index=file_data['binary_index'],
+                    file_data=file_data,
+                    classification=CLASSIFICATIONS[self.classification[index]],
+                    extension=file_data['extension'],
+                    last_modified=file_data['last_modified'],
+                )
+            else:
+                node = Node(
+                    name,
+                    parent=parent_node,
+                    type=node_type,
+                    filepath=paths[index],
+                    is_repo_head=bool(self.flags[index] & FLAG_REPO_HEAD),
+                )
+                if parent == NO_INDEX and self.created_at is not None:
+                    node.created_at = self.created_at
+            nodes.append(node)
+        return nodes[0]
+
+    # --- DictExporter compatible form, used for filetrees stored as JSON ---
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        """Same structure DictExporter produces for the equivalent anytree tree, built without creating any Nodes"""
+        if not len(self):
+            return None
+        if self.has_detached():
+            return self.pruned().to_dict()
+        paths = self.filepaths_all()
+        dicts: List[Dict[str, Any]] = []
+        for index, parent in enumerate(self.parent):
+            name = self.name_of(index)
+            node_type = self.type_of(index)
+            if node_type == "file":
+                file_data = self._file_data(index, name, paths[index])
+                entry = {
+                    'name': name,
+                    'type': "file",
+                    'binary_index': file_data['binary_index'],
+                    'file_data': file_data,
+                    'classification': CLASSIFICATIONS[self.classification[index]],
+                    'extension': file_data['extension'],
+                    'last_modified': file_data['last_modified'],
+                }
+            else:
+                entry = {
+                    'name': name,
+                    'type': node_type,
+                    'filepath': paths[index],
+                    'is_repo_head': bool(self.flags[index] & FLAG_REPO_HEAD),
+                }
+                if parent == NO_INDEX and self.created_at is not None:
+                    entry['created_at'] = self.created_at
+            if parent != NO_INDEX:
+                dicts[parent].setdefault('children', []).append(entry)
+            dicts.append(entry)
+        return dicts[0]
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "CompactTree":
+        """Reads a tree exported with DictExporter (e.g. a filetree stored as JSON)"""
+        tree = cls()
+        if not data:
+            return tree
+        tree.created_at = data.get('created_at')
+        paths: List[Optional[str]] = []
+        stack: List[Tuple[Dict[str, Any], int]] = [(data, NO_INDEX)]
+        while stack:
+            entry, parent = stack.pop()
+            file_data: Dict[str, Any] = entry.get('file_data') or {}
+            node_type = entry.get('type', "directory")
+            index = tree._append_with_path(
+                paths,
+                parent,
+                entry['name'],
+                node_type,
+                size=file_data.get('size_bytes', 0),
+                last_modified=entry.get('last_modified') or file_data.get('last_modified'),
+                binary_index=entry.get('binary_index', file_data.get('binary_index')),
+                file_hash=file_data.get('file_hash'),
+                classification=entry.get('classification'),
+                is_repo_head=entry.get('is_repo_head', False),
+                filepath=file_data.get('filepath') if node_type == "file" else entry.get('filepath'),
+            )
+            # reversed so children come off the stack in order and indices stay in pre-order
+            for child in reversed(entry.get('children', [])):
+                stack.append((child, index))
+        return tree
+
+    # --- binary form ---
+
+    _COLUMNS: Tuple[str, ...] = (
+        "parent", "name", "node_type", "size", "last_modified", "binary_index", "file_hash", "classification", "flags",
+    )
+
+    def to_bytes(self) -> bytes:
+        """Compact binary serialization: a small JSON header, the raw little-endian columns and the string tables"""
+        if self.has_detached():
+            return self.pruned().to_bytes()
+        strings_blob = "\0".join(self.strings.strings).encode("utf-8")
+        hashes_blob = "\0".join(self.hashes.strings).encode("utf-8")
+        header = json.dumps({
+            'count': len(self),
+            'strings': len(self.strings),
+            'hashes': len(self.hashes),
+            'strings_bytes': len(strings_blob),
+            'hashes_bytes': len(hashes_blob),
+            'created_at': self.created_at,
+            'filepaths': [[index, path] for index, path in self.filepaths.items()],
+        }).encode("utf-8")
+
+        parts: List[bytes] = [struct.pack("<I", len(header)), header]
+        for column in self._COLUMNS:
+            values: array = getattr(self, column)
+            if sys.byteorder == "big":
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        parts.append(strings_blob)
+        parts.append(hashes_blob)
+        return BINARY_MAGIC + zlib.compress(b"".join(parts))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactTree":
+        if not data.startswith(BINARY_MAGIC):
+            raise ValueError("Not a compact file tree")
+        payload = memoryview(zlib.decompress(bytes(data[len(BINARY_MAGIC):])))
+        (header_len,) = struct.unpack_from("<I", payload, 0)
+        offset = 4 + header_len
+        header = json.loads(bytes(payload[4:offset]).decode("utf-8"))
+
+        tree = cls()
+        count = header['count']
+        for column in cls._COLUMNS:
+            values: array = getattr(tree, column)
+            end = offset + count * values.itemsize
+            values.frombytes(payload[offset:end])
+            if sys.byteorder == "big":
+                values.byteswap()
+            offset = end
+
+        tree.strings = StringTable(cls._split(payload[offset:offset + header['strings_bytes']], header['strings']))
+        offset += header['strings_bytes']
+        tree.hashes = StringTable(cls._split(payload[offset:offset + header['hashes_bytes']], header['hashes']))
+        tree.created_at = header.get('created_at')
+        tree.filepaths = {index: path for index, path in header.get('filepaths', [])}
+        return tree
+
+    # --- helpers ---
+
+    @staticmethod
+    def _split(blob: memoryview, count: int) -> List[str]:
+        if count == 0:
+            return []
+        return bytes(blob).decode("utf-8").split("\0")
+
+    def _append_with_path(self, paths: List[Optional[str]], parent: int, name: str, node_type: str, filepath: Optional[str] = None, **fields) -> int:
+        """add() for bulk builders that track resolved paths themselves, avoiding a walk up per node"""
+        derived = _join(paths[parent] if parent != NO_INDEX else None, name)
+        index = self._append(parent, name, node_type, **fields)
+        if filepath is not None and filepath != derived:
+            self.filepaths[index] = filepath
+            paths.append(filepath)
+        else:
+            paths.append(derived)
+        return index
+
+    def _file_data(self, index: int, name: str, filepath: Optional[str]) -> Dict[str, Any]:
+        binary_index = self.binary_index[index]
+        return {
+            'filename': name,
+            'filepath': filepath,
+            'size_bytes': self.size[index],
+            'extension': PurePosixPath(name).suffix.lower(),
+            'binary_index': binary_index if binary_index != NO_INDEX else None,
+            'last_modified': self.last_modified_of(index),
+            'file_hash': self.hash_of(index),
+        }
+
+
+class TreeNode:
+    """
+    anytree compatible view of one CompactTree node, holding nothing but the tree and the index.
+    Exposes the attributes FileManager used to set on its Nodes (type, file_data, binary_index, classification,
+    extension, last_modified for files, filepath and is_repo_head for directories and zips). Attributes a Node
+    of that type would not have raise AttributeError, so hasattr / getattr checks behave the same.
+    Setting parent to None detaches the node, classification, is_repo_head and binary_index write through.
+    """
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree: CompactTree, index: int) -> None:
+        self.tree = tree
+        self.index = index
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TreeNode) and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self) -> str:
+        return f"TreeNode({'/' + '/'.join(node.name for node in self.path)!r})"
+
+    # --- tree structure ---
+
+    @property
+    def name(self) -> str:
+        return self.tree.name_of(self.index)
+
+    @property
+    def type(self) -> str:
+        return self.tree.type_of(self.index)
+
+    @property
+    def parent(self) -> Optional["TreeNode"]:
+        parent = self.tree.parent[self.index]
+        if parent == NO_INDEX or self.tree.flags[self.index] & FLAG_DETACHED:
+            return None
+        return TreeNode(self.tree, parent)
+
+    @parent.setter
+    def parent(self, value: Optional["TreeNode"]) -> None:
+        if value is not None:
+            raise ValueError("TreeNode can only be detached, its parent cannot be changed")
+        self.tree.detach(self.index)
+
+    @property
+    def children(self) -> Tuple["TreeNode", ...]:
+        return tuple(TreeNode(self.tree, child) for child in self.tree.children(self.index))
+
+    @property
+    def descendants(self) -> Tuple["TreeNode", ...]:
+        return tuple(PreOrderIter(self))[1:]
+
+    @property
+    def path(self) -> Tuple["TreeNode", ...]:
+        nodes: List[TreeNode] = []
+        node: Optional[TreeNode] = self
+        while node is not None:
+            nodes.append(node)
+            node = node.parent
+        return tuple(reversed(nodes))
+
+    @property
+    def root(self) -> "TreeNode":
+        return self.path[0]
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent is None
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.tree.children(self.index)
+
+    @property
+    def depth(self) -> int:
+        return len(self.path) - 1
+
+    # --- FileManager node attributes ---
+
+    @property
+    def file_data(self) -> Dict[str, Any]:
+        self._require("file", "file_data")
+        return self.tree._file_data(self.index, self.name, self.tree.filepath_of(self.index))
+
+    @property
+    def binary_index(self) -> Optional[int]:
+        self._require("file", "binary_index")
+        binary_index = self.tree.binary_index[self.index]
+        return binary_index if binary_index != NO_INDEX else None
+
+    @binary_index.setter
+    def binary_index(self, value: Optional[int]) -> None:
+        self.tree.binary_index[self.index] = value if value is not None else NO_INDEX
+
+    @property
+    def classification(self) -> Optional[str]:
+        self._require("file", "classification")
+        return CLASSIFICATIONS[self.tree.classification[self.index]]
+
+    @classification.setter
+    def classification(self, value: Optional[str]) -> None:
+        self.tree.classification[self.index] = CLASSIFICATIONS.index(value)
+
+    @property
+    def extension(self) -> str:
+        self._require("file", "extension")
+        return PurePosixPath(self.name).suffix.lower()
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        self._require("file", "last_modified")
+        return self.tree.last_modified_of(self.index)
+
+    @property
+    def filepath(self) -> Optional[str]:
+        self._require_not_file("filepath")
+        return self.tree.filepath_of(self.index)
+
+    @property
+    def is_repo_head(self) -> bool:
+        self._require_not_file("is_repo_head")
+        return bool(self.tree.flags[self.index] & FLAG_REPO_HEAD)
+
+    @is_repo_head.setter
+    def is_repo_head(self, value: bool) -> None:
+        if value:
+            self.tree.flags[self.index] |= FLAG_REPO_HEAD
+        else:
+            self.tree.flags[self.index] &= ~FLAG_REPO_HEAD
+
+    @property
+    def created_at(self) -> Optional[str]:
+        if self.index != 0 or self.tree.created_at is None:
+            raise AttributeError("created_at")
+        return self.tree.created_at
+
+    def _require(self, node_type: str, attribute: str) -> None:
+        if self.tree.node_type[self.index] != NODE_TYPES.index(node_type):
+            raise AttributeError(attribute)
+
+    def _require_not_file(self, attribute: str) -> None:
+        if self.tree.node_type[self.index] == NODE_TYPES.index("file"):
+            raise AttributeError(attribute)
+
+
+def _join(parent_path: Optional[str], name: str) -> Optional[str]:
+    return os.path.join(parent_path, name) if parent_path is not None else None
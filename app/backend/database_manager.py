@@ -1,16 +1,114 @@
 import json
+import threading
 import uuid
-from typing import Dict, Any, List, Optional, Tuple, BinaryIO
+import hashlib
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, BinaryIO
 from db_utils import DB_connector
+from compact_tree import CompactTree
+from tree_history import TreeDelta, MAX_DELTA_CHAIN
+from cache.blob_store import BlobArray, BlobStore
+from cache.remote_blob_store import RemoteBlobStore
+from pagination import escape_like
+from bow_codec import encode_bow, decode_bow, vocabulary_of, to_ids, to_tokens, token_ids_of
+from result_cache import ResultCache, get_result_cache
+
+# blobs are written and read in batches of this many, so a large fileset is never held in one statement
+BLOB_BATCH_SIZE: int = 200
+# contents written to Blobs in one statement stop at about this many bytes, a larger blob is written on its own
+BLOB_BATCH_BYTES: int = 32 * 1024 * 1024
+# contents smaller than this, or that do not shrink by at least 10%, are stored uncompressed
+BLOB_COMPRESS_MIN: int = 64
+# single blobs are read from the database in ranges of this many bytes
+BLOB_CHUNK_SIZE: int = 1024 * 1024
+# tokens are added to and looked up in Bow_Vocabulary this many at a time
+VOCAB_BATCH_SIZE: int = 5000
+# sections get_analysis_sections can return, as (alias of the table they are read from, columns)
+ANALYSIS_SECTIONS: Dict[str, Tuple[str, str]] = {
+    "analysis_title": ("a", "a.analysis_title"),
+    "topic_vector": ("r", "r.topic_vector"),
+    "resume_points": ("r", "r.resume_points"),
+    "project_insights": ("r", "r.project_insights"),
+    "package_insights": ("r", "r.package_insights"),
+    "metadata_insights": ("r", "r.metadata_insights"),
+    "tracked_data": ("t", "t.bow_data, t.bow_cache, t.project_data, t.package_data, t.metadata_stats"),
+    "resume_data": ("res", "res.resume_data"),
+    "portfolio_data": ("port", "port.portfolio_data"),
+}
+# joined only when one of their sections is asked for, resumes and portfolios join their latest row only
+# so an analysis with several of them is still one row
+_SECTION_JOINS: Dict[str, str] = {
+    "r": "LEFT JOIN Results r ON a.analysis_id = r.analysis_id",
+    "t": "LEFT JOIN Tracked_Data t ON a.analysis_id = t.analysis_id",
+    "res": "LEFT JOIN Resumes res ON res.resume_id = (SELECT max(resume_id) FROM Resumes WHERE analysis_id = a.analysis_id)",
+    "port": "LEFT JOIN Portfolios port ON port.portfolio_id = (SELECT max(portfolio_id) FROM Portfolios WHERE analysis_id = a.analysis_id)",
+}
+# Results columns get_result_section may project from
+RESULT_COLUMNS: Tuple[str, ...] = ("topic_vector", "resume_points", "project_insights", "package_insights", "metadata_insights")
 
 class DatabaseManager:
     """Primary Database interaction class for all downstream modules. 
         For saves/inserts/delete methods returns true on success and raises RuntimeError on failure 
         For gets/get_all methods returns the requested result and LookupError on failure"""
-    def __init__(self):
-        """Initialize database connection."""
-        self.db = DB_connector()
-    
+    def __init__(self, database_name: Optional[str] = None):
+        """Initialize database connection, to database_name if given instead of the environment's default."""
+        self.db = DB_connector(database_name) if database_name is not None else DB_connector()
+        #depth of the open unit_of_work and the cache tags written inside it, invalidated again once its
+        #transaction has ended. Kept per thread, like the transaction itself
+        self._unit = threading.local()
+
+    @property
+    def cache(self) -> ResultCache:
+        """Read-through cache of get_analysis_sections, get_all_analyses_summary and the resume/portfolio getters,
+        shared by every DatabaseManager of this process on the same database"""
+        return get_result_cache(self.db.database_name)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the result cache"""
+        return self.cache.stats()
+
+    def _invalidate(self, *tags: str) -> None:
+        """
+        Drops the cached reads carrying any of tags. Inside unit_of_work they are dropped again when the
+        transaction ends, so a read made before the commit cannot leave the old rows cached.
+        """
+        self.cache.invalidate(*tags)
+        if getattr(self._unit, "depth", 0):
+            self._unit.tags.update(tags)
+
+    def _invalidate_document(self, kind: str, document_id: Any, analysis_id: Any = None) -> None:
+        """Invalidates what a write to one resume or portfolio (kind) changes"""
+        tags = [f"{kind}s", f"{kind}:{document_id}"]
+        if analysis_id is not None:
+            analysis_id = _analysis_key(analysis_id)
+            tags += [f"{kind}s:{analysis_id}", f"analysis:{analysis_id}"]
+        self._invalidate(*tags)
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Groups every save/insert made inside the block into a single transaction on one connection,
+        committed when the block ends and rolled back entirely if any of them fails.
+
+        Usage:
+            with db_manager.unit_of_work():
+                db_manager.save_metadata_analysis(analysis_id, insights)
+                db_manager.save_resume_points(analysis_id, points)
+        """
+        unit = self._unit
+        if not getattr(unit, "depth", 0):
+            unit.depth, unit.tags = 0, set()
+        unit.depth += 1
+        try:
+            with self.db.transaction():
+                yield self
+        finally:
+            unit.depth -= 1
+            if not unit.depth and unit.tags:
+                tags, unit.tags = unit.tags, set()
+                self.cache.invalidate(*tags)
 
     # old funct name: create_new_result(self) -> str:
     def create_analysis(self, file_path: str = None) -> str:
@@ -48,6 +146,7 @@ class DatabaseManager:
             #we ar enot initializing fileset here
             #filesets are created only when files are actually uploaded via save_fileset.
 
+            self._invalidate("analyses")
             # print(f"Created new analysis chain with ID: {analysis_id}")
             return analysis_id
 
@@ -74,7 +173,7 @@ class DatabaseManager:
             raise LookupError(f"Error fetching analysis file path: {e}")
     
 
-    def get_fileset_data(self, analysis_id: str) -> Tuple[Optional[bytes], Optional[Dict]]:
+    def get_fileset_data(self, analysis_id: str) -> Tuple[Optional[bytes], Optional[CompactTree]]:
         """
         Retrieves the binary file_data and the latest filetree for an analysis.
         """
@@ -82,7 +181,7 @@ class DatabaseManager:
             uid = uuid.UUID(analysis_id)
             
             query = """
-                SELECT fs.file_data, ft.filetree
+                SELECT fs.file_data, ft.filetree_id, ft.filetree, ft.filetree_data, ft.tree_delta
                 FROM Filesets fs
                 LEFT JOIN Filetrees ft ON fs.file_data_tree_id = ft.filetree_id
                 WHERE fs.analysis_id = %s;
@@ -94,7 +193,7 @@ class DatabaseManager:
             
             row = results[0]
             binary_data = bytes(row['file_data']) if row['file_data'] else None
-            tree_data = row['filetree']
+            tree_data = self._load_filetree(row)
             
             return binary_data, tree_data
 
@@ -102,61 +201,367 @@ class DatabaseManager:
             print(f"Error fetching fileset data: {e}")
             raise LookupError
 
-    def save_fileset(self, analysis_id: str, file_binary: bytes, file_tree: Dict, file_path: str) -> bool:
+    def get_fileset_manifest(self, analysis_id: str) -> Tuple[Optional[Dict], Optional[CompactTree]]:
+        """
+        Retrieves the ingest manifest and the latest filetree for an analysis without the binary file_data.
+        The manifest is None for filesets saved before manifests were recorded.
+        """
+        try:
+            uid = uuid.UUID(analysis_id)
+
+            query = """
+                SELECT fs.manifest, ft.filetree_id, ft.filetree, ft.filetree_data, ft.tree_delta
+                FROM Filesets fs
+                LEFT JOIN Filetrees ft ON fs.file_data_tree_id = ft.filetree_id
+                WHERE fs.analysis_id = %s;
+            """
+            results = self.db.execute_query(query, (uid,))
+
+            if not results:
+                return None, None
+
+            row = results[0]
+            return row['manifest'], self._load_filetree(row)
+
+        except Exception as e:
+            print(f"Error fetching fileset manifest: {e}")
+            raise LookupError
+
+    def get_filetree_version(self, filetree_id: int) -> Optional[CompactTree]:
+        """
+        Rebuilds one stored version of a filetree: its chain of base_tree_id links is read in one query,
+        back to the nearest full snapshot, and the deltas are replayed on top of it oldest first.
+        """
+        try:
+            query = """
+                WITH RECURSIVE chain AS (
+                    SELECT filetree_id, base_tree_id, filetree, filetree_data, tree_delta, 0 AS step
+                    FROM Filetrees WHERE filetree_id = %s
+                    UNION ALL
+                    SELECT ft.filetree_id, ft.base_tree_id, ft.filetree, ft.filetree_data, ft.tree_delta, chain.step + 1
+                    FROM Filetrees ft JOIN chain ON ft.filetree_id = chain.base_tree_id
+                )
+                SELECT filetree, filetree_data, tree_delta FROM chain ORDER BY step DESC;
+            """
+            rows = self.db.execute_query(query, (filetree_id,))
+            if not rows:
+                return None
+
+            tree = self._load_filetree(rows[0])
+            for row in rows[1:]:
+                tree = TreeDelta.from_bytes(bytes(row['tree_delta'])).apply(tree)
+            return tree
+
+        except Exception as e:
+            raise LookupError(f"Error rebuilding filetree {filetree_id}: {e}")
+
+    def get_filetree_history(self, analysis_id: str) -> List[Dict[str, Any]]:
+        """Lists the stored filetree versions of an analysis, oldest first, each can be rebuilt with get_filetree_version"""
+        try:
+            query = """
+                SELECT ft.filetree_id, ft.base_tree_id, ft.chain_depth, (ft.tree_delta IS NULL) AS is_snapshot
+                FROM Filetrees ft
+                JOIN Filesets fs ON ft.fileset_id = fs.fileset_id
+                WHERE fs.analysis_id = %s
+                ORDER BY ft.filetree_id;
+            """
+            return self.db.execute_query(query, (uuid.UUID(analysis_id),))
+        except Exception as e:
+            raise LookupError(f"Error fetching filetree history: {e}")
+
+    def _load_filetree(self, row: Dict[str, Any]) -> Optional[CompactTree]:
+        """Decodes a Filetrees row, compact binary trees take precedence over legacy JSON trees, deltas are rebuilt from their chain"""
+        if row.get('tree_delta'):
+            return self.get_filetree_version(row['filetree_id'])
+        if row.get('filetree_data'):
+            return CompactTree.from_bytes(bytes(row['filetree_data']))
+        if row.get('filetree'):
+            return CompactTree.from_dict(row['filetree'])
+        return None
+
+    def save_fileset(self, analysis_id: str, file_binary: bytes | BlobArray | List[Optional[bytes]], file_tree: CompactTree | Dict, file_path: str, manifest: Optional[Dict] = None) -> bool:
         """
         Updates the Fileset (binary) for the analysis and appends the new filetree.
         Logic: 
         1. UPDATE the Filesets table (Ensure only 1 fileset row per analysis, update binary if exists).
         2. INSERT the new tree into Filetrees linked to that fileset.
+        A CompactTree is stored as a delta against the fileset's latest tree when there is one, and as a
+        full snapshot for the first version, after MAX_DELTA_CHAIN deltas in a row, or when the delta
+        would not be smaller. A dict tree is stored as JSON.
+        manifest is the ingest manifest of the files, used by the next update to skip unchanged files.
+        file_binary given as the binary data array (BlobArray or list) is stored in the shared Blobs table,
+        only contents no analysis has stored yet are written. Pickled bytes are kept in file_data as before.
         """
         try:
-            uid = uuid.UUID(analysis_id)
+            #blobs, mapping and tree are written together or not at all
+            with self.unit_of_work():
+                uid = uuid.UUID(analysis_id)
+                manifest_json = json.dumps(manifest) if manifest is not None else None
+                binary_array = None if isinstance(file_binary, (bytes, bytearray, memoryview)) else file_binary
+                if binary_array is not None:
+                    file_binary = None
             
-            #check if fileset exists to determine INSERT or UPDATE
-            check_query = "SELECT fileset_id FROM Filesets WHERE analysis_id = %s;"
-            existing = self.db.execute_query(check_query, (uid,))
-            if existing:
-                #update existing binary
-                fileset_id = existing[0]['fileset_id']
-                # Updated to update latest_file_path
-                update_query = "UPDATE Filesets SET file_data = %s, latest_file_path = %s WHERE fileset_id = %s;"
-                self.db.execute_update(update_query, (file_binary, file_path, fileset_id))
-            else:
-                #insert new fileset
-                # Updated to insert latest_file_path
-                insert_query = """
-                    INSERT INTO Filesets (analysis_id, file_data, latest_file_path) 
-                    VALUES (%s, %s, %s) 
-                    RETURNING fileset_id;
+                #check if fileset exists to determine INSERT or UPDATE
+                check_query = """
+                    SELECT fs.fileset_id, fs.file_data_tree_id, ft.chain_depth
+                    FROM Filesets fs
+                    LEFT JOIN Filetrees ft ON fs.file_data_tree_id = ft.filetree_id
+                    WHERE fs.analysis_id = %s;
                 """
-                res = self.db.execute_update(insert_query, (uid, file_binary, file_path), returning=True)
-                # Correctly using [0] here as db_utils now returns list
-                fileset_id = res[0]['fileset_id']
-
-            #add to filetree
-            #just append new row here
-            tree_query = "INSERT INTO Filetrees (fileset_id, filetree) VALUES (%s, %s) RETURNING filetree_id;"
-            tree_res = self.db.execute_update(tree_query, (fileset_id, json.dumps(file_tree)),returning=True)
-            # print(f"Saved fileset (path: {file_path}) and tree for analysis_id: {analysis_id}")
-            
-            try:
-                if not fileset_id:
-                    print (f"Error associating new tree to updated fileset, defaulted to Null: Invalid or Null fileset_id")
-                    raise ValueError
+                existing = self.db.execute_query(check_query, (uid,))
+                base_tree_id, chain_depth = None, 0
+                if existing:
+                    #update existing binary
+                    fileset_id = existing[0]['fileset_id']
+                    base_tree_id = existing[0].get('file_data_tree_id')
+                    chain_depth = existing[0].get('chain_depth') or 0
+                    # Updated to update latest_file_path
+                    update_query = "UPDATE Filesets SET file_data = %s, latest_file_path = %s, manifest = %s WHERE fileset_id = %s;"
+                    self.db.execute_update(update_query, (file_binary, file_path, manifest_json, fileset_id))
+                else:
+                    #insert new fileset
+                    # Updated to insert latest_file_path
+                    insert_query = """
+                        INSERT INTO Filesets (analysis_id, file_data, latest_file_path, manifest) 
+                        VALUES (%s, %s, %s, %s) 
+                        RETURNING fileset_id;
+                    """
+                    res = self.db.execute_update(insert_query, (uid, file_binary, file_path, manifest_json), returning=True)
+                    # Correctly using [0] here as db_utils now returns list
+                    fileset_id = res[0]['fileset_id']
+
+                if binary_array is not None:
+                    self._save_fileset_blobs(fileset_id, binary_array)
+
+                #add to filetree
+                #just append new row here
+                #serialized once, the snapshot is both what a delta has to beat and what is written without one
+                tree_bytes = file_tree.to_bytes() if isinstance(file_tree, CompactTree) else None
+                delta = None
+                if tree_bytes is not None and base_tree_id is not None and chain_depth < MAX_DELTA_CHAIN:
+                    delta = self._filetree_delta(base_tree_id, file_tree, len(tree_bytes))
+
+                if delta is not None:
+                    tree_query = """
+                        INSERT INTO Filetrees (fileset_id, tree_delta, base_tree_id, chain_depth)
+                        VALUES (%s, %s, %s, %s) RETURNING filetree_id;
+                    """
+                    tree_res = self.db.execute_update(tree_query, (fileset_id, delta, base_tree_id, chain_depth + 1), returning=True)
+                elif tree_bytes is not None:
+                    tree_query = "INSERT INTO Filetrees (fileset_id, filetree_data) VALUES (%s, %s) RETURNING filetree_id;"
+                    tree_res = self.db.execute_update(tree_query, (fileset_id, tree_bytes),returning=True)
+                else:
+                    tree_query = "INSERT INTO Filetrees (fileset_id, filetree) VALUES (%s, %s) RETURNING filetree_id;"
+                    tree_res = self.db.execute_update(tree_query, (fileset_id, json.dumps(file_tree)),returning=True)
+                # print(f"Saved fileset (path: {file_path}) and tree for analysis_id: {analysis_id}")
+            
+                try:
+                    if not fileset_id:
+                        print (f"Error associating new tree to updated fileset, defaulted to Null: Invalid or Null fileset_id")
+                        raise ValueError
                 
-                new_tree_id = tree_res[0]['filetree_id']
+                    new_tree_id = tree_res[0]['filetree_id']
                 
-                #Set returning=False because this UPDATE statement does not return anything
-                fileset_tree_query = "UPDATE Filesets SET file_data_tree_id = %s WHERE fileset_id = %s;"
-                self.db.execute_update(fileset_tree_query, (new_tree_id, fileset_id), returning=False)
+                    #Set returning=False because this UPDATE statement does not return anything
+                    fileset_tree_query = "UPDATE Filesets SET file_data_tree_id = %s WHERE fileset_id = %s;"
+                    self.db.execute_update(fileset_tree_query, (new_tree_id, fileset_id), returning=False)
                 
-            except Exception as e:
-                raise RuntimeError(f"Error associating new tree to updated fileset, defaulted to NULL: Failed Query execution:{e}") # Add custom raised error to identify association failure instead of fileset failure
-            return True
+                except Exception as e:
+                    raise RuntimeError(f"Error associating new tree to updated fileset, defaulted to NULL: Failed Query execution:{e}") # Add custom raised error to identify association failure instead of fileset failure
+                #the summary shows the latest file path
+                self._invalidate("analyses")
+                return True
             
         except Exception as e:
             raise RuntimeError(f"Error saving fileset: {e}")
 
+    def _save_fileset_blobs(self, fileset_id: int, binary_data: BlobArray | List[Optional[bytes]]) -> None:
+        """Stores the contents missing from Blobs and replaces the fileset's binary_index -> hash mapping"""
+        if isinstance(binary_data, BlobArray):
+            hashes = list(binary_data.hashes)
+            read = binary_data.store.get
+        else:
+            #the list already holds every content, they are referenced by hash and not copied
+            contents: Dict[str, bytes] = {}
+            hashes = []
+            for data in binary_data:
+                if data is None:
+                    hashes.append(None)
+                    continue
+                file_hash = hashlib.sha256(data).hexdigest()
+                contents.setdefault(file_hash, data)
+                hashes.append(file_hash)
+            read = contents.get
+
+        unique = list(dict.fromkeys(file_hash for file_hash in hashes if file_hash is not None))
+        for batch in _batches(unique):
+            stored = {row['hash'] for row in self.db.execute_query("SELECT hash FROM Blobs WHERE hash = ANY(%s);", (batch,))}
+            #contents are read one at a time and written once BLOB_BATCH_BYTES of them are held
+            rows, held = [], 0
+            for file_hash in batch:
+                if file_hash in stored:
+                    continue
+                data = read(file_hash)
+                if data is None:
+                    raise LookupError(f"Content {file_hash} is not in the blob store")
+                row = (file_hash, len(data), *_encode_blob(data))
+                if rows and held + len(row[3]) > BLOB_BATCH_BYTES:
+                    self._insert_blobs(rows)
+                    rows, held = [], 0
+                rows.append(row)
+                held += len(row[3])
+            if rows:
+                self._insert_blobs(rows)
+
+        replaced = self.db.execute_update(
+            "DELETE FROM Fileset_Blobs WHERE fileset_id = %s RETURNING hash;", (fileset_id,), returning=True,
+        ) or []
+        mapping = [(fileset_id, index, file_hash) for index, file_hash in enumerate(hashes) if file_hash is not None]
+        for batch in _batches(mapping):
+            self.db.execute_many("INSERT INTO Fileset_Blobs (fileset_id, binary_index, hash) VALUES (%s, %s, %s);", batch)
+        #contents the previous version of the fileset had and this one dropped
+        self.prune_orphan_blobs({row['hash'] for row in replaced} - set(unique))
+
+    def _insert_blobs(self, rows: List[Tuple[str, int, str, bytes]]) -> None:
+        #another analysis may store the same content concurrently, the first write wins
+        self.db.execute_many(
+            "INSERT INTO Blobs (hash, size, compression, data) VALUES (%s, %s, %s, %s) ON CONFLICT (hash) DO NOTHING;",
+            rows,
+        )
+
+    def get_fileset_blob_hashes(self, analysis_id: str) -> List[Optional[str]]:
+        """
+        Content hash at each binary_index of an analysis' fileset, None where the index holds no data.
+        Empty for filesets saved as pickled file_data.
+        """
+        try:
+            query = """
+                SELECT fb.binary_index, fb.hash
+                FROM Fileset_Blobs fb
+                JOIN Filesets fs ON fb.fileset_id = fs.fileset_id
+                WHERE fs.analysis_id = %s
+                ORDER BY fb.binary_index;
+            """
+            rows = self.db.execute_query(query, (uuid.UUID(analysis_id),))
+            hashes: List[Optional[str]] = [None] * (rows[-1]['binary_index'] + 1 if rows else 0)
+            for row in rows:
+                hashes[row['binary_index']] = row['hash']
+            return hashes
+        except Exception as e:
+            raise LookupError(f"Error fetching fileset blob hashes: {e}")
+
+    def get_blobs(self, hashes: Iterable[str]) -> Dict[str, bytes]:
+        """Contents of the given hashes only, fetched in batches, hashes not in Blobs are left out"""
+        try:
+            blobs: Dict[str, bytes] = {}
+            for batch in _batches(list(dict.fromkeys(hashes))):
+                rows = self.db.execute_query("SELECT hash, compression, data FROM Blobs WHERE hash = ANY(%s);", (batch,))
+                for row in rows:
+                    blobs[row['hash']] = _decode_blob(row['compression'], bytes(row['data']))
+            return blobs
+        except Exception as e:
+            raise LookupError(f"Error fetching blobs: {e}")
+
+    def get_blob_sizes(self, hashes: Iterable[str]) -> Dict[str, int]:
+        """Size of each stored hash, without reading any contents"""
+        try:
+            sizes: Dict[str, int] = {}
+            for batch in _batches(list(dict.fromkeys(hashes))):
+                for row in self.db.execute_query("SELECT hash, size FROM Blobs WHERE hash = ANY(%s);", (batch,)):
+                    sizes[row['hash']] = row['size']
+            return sizes
+        except Exception as e:
+            raise LookupError(f"Error fetching blob sizes: {e}")
+
+    def iter_blob(self, file_hash: str, chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Streams one blob's contents in chunks, each chunk is a range read of the stored value
+        (Blobs.data is stored uncompressed out of line, so Postgres only reads the slices asked for).
+        """
+        rows = self.db.execute_query("SELECT compression, octet_length(data) AS stored FROM Blobs WHERE hash = %s;", (file_hash,))
+        if not rows:
+            raise LookupError(f"Blob {file_hash} is not stored")
+        compression, stored = rows[0]['compression'], rows[0]['stored']
+        decompressor = zlib.decompressobj() if compression == 'zlib' else None
+        if decompressor is None and compression != 'none':
+            raise ValueError(f"Unknown blob compression: {compression}")
+
+        query = "SELECT substring(data FROM %s FOR %s) AS chunk FROM Blobs WHERE hash = %s;"
+        for offset in range(0, stored, chunk_size):
+            # substring offsets are 1 based
+            chunk = bytes(self.db.execute_query(query, (offset + 1, chunk_size, file_hash))[0]['chunk'])
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            if chunk:
+                yield chunk
+        if decompressor is not None:
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+
+    def load_fileset_blobs(self, analysis_id: str, store: BlobStore, lazy: bool = False) -> Optional[BlobArray]:
+        """
+        Rebuilds an analysis' binary data array in store, downloading only the contents store does not have yet.
+        With lazy=True nothing is downloaded up front: the array is backed by a RemoteBlobStore over store's
+        directory that streams each blob from the database the first time it is read.
+        None for filesets saved as pickled file_data.
+        """
+        hashes = self.get_fileset_blob_hashes(analysis_id)
+        if not hashes:
+            return None
+        if lazy:
+            sizes = self.get_blob_sizes(file_hash for file_hash in hashes if file_hash is not None)
+            return BlobArray(RemoteBlobStore(store.store_dir, self, sizes), hashes)
+        missing = [file_hash for file_hash in dict.fromkeys(hashes) if file_hash is not None and not store.has(file_hash)]
+        for batch in _batches(missing):
+            blobs = self.get_blobs(batch)
+            for file_hash in batch:
+                if file_hash not in blobs:
+                    raise LookupError(f"Blob {file_hash} of analysis {analysis_id} is missing")
+                store.put(blobs[file_hash])
+        return BlobArray(store, hashes)
+
+    def prune_orphan_blobs(self, hashes: Optional[Iterable[str]] = None) -> int:
+        """
+        Deletes blobs no fileset refers to anymore, returns how many. With hashes only those are checked,
+        as delete_analysis and save_fileset do for the contents they just unreferenced, without hashes the whole table is.
+        """
+        try:
+            if hashes is None:
+                query = """
+                    DELETE FROM Blobs b
+                    WHERE NOT EXISTS (SELECT 1 FROM Fileset_Blobs fb WHERE fb.hash = b.hash);
+                """
+                return self.db.execute_update(query)
+            pruned = 0
+            for batch in _batches(sorted(set(hashes))):
+                query = """
+                    DELETE FROM Blobs b
+                    WHERE b.hash = ANY(%s) AND NOT EXISTS (SELECT 1 FROM Fileset_Blobs fb WHERE fb.hash = b.hash);
+                """
+                #rowcounts are not known inside a pipelined transaction (-1)
+                pruned += max(self.db.execute_update(query, (batch,)) or 0, 0)
+            return pruned
+        except Exception as e:
+            raise RuntimeError(f"Error pruning blobs: {e}")
+
+    def _filetree_delta(self, base_tree_id: int, file_tree: CompactTree, snapshot_size: int) -> Optional[bytes]:
+        """
+        Encoded delta from the stored base version to file_tree, None when a full snapshot should be written instead.
+        snapshot_size is the length of file_tree.to_bytes(), which the caller already has.
+        """
+        try:
+            base_tree = self.get_filetree_version(base_tree_id)
+        except LookupError:
+            return None
+        if base_tree is None:
+            return None
+        delta = TreeDelta.diff(base_tree, file_tree).to_bytes()
+        #a delta that rewrites most of the tree is not worth the replay cost
+        if len(delta) >= snapshot_size:
+            return None
+        return delta
+
     def save_metadata_analysis(self, analysis_id: str, metadata_insights: Dict[str, Any]) -> bool:
         """Save metadata analysis results to the Results table."""
         try:
@@ -170,6 +575,7 @@ class DatabaseManager:
                 query, 
                 (json.dumps(metadata_insights, default=str), uuid.UUID(analysis_id))
             )
+            self._invalidate(f"analysis:{_analysis_key(analysis_id)}", "analyses")
             
             #good till now
             # print(f"Saved metadata analysis for analysis_id: {analysis_id}")
@@ -199,6 +605,7 @@ class DatabaseManager:
                 WHERE analysis_id = %s;
             """
             self.db.execute_update(query, (json.dumps(topic_data), uuid.UUID(analysis_id)))
+            self._invalidate(f"analysis:{_analysis_key(analysis_id)}")
             # print(f"Saved text analysis for analysis_id: {analysis_id}")
             return True
             
@@ -214,6 +621,7 @@ class DatabaseManager:
                 WHERE analysis_id = %s;
             """
             self.db.execute_update(query, (json.dumps(points), uuid.UUID(analysis_id)))
+            self._invalidate(f"analysis:{_analysis_key(analysis_id)}")
             # print(f"Saved resume points for analysis_id: {analysis_id}")
             return True
         except Exception as e:
@@ -229,6 +637,7 @@ class DatabaseManager:
                 WHERE analysis_id = %s;
             """
             self.db.execute_update(query, (json.dumps(insights), uuid.UUID(analysis_id)))
+            self._invalidate(f"analysis:{_analysis_key(analysis_id)}")
             # print(f"Saved package insights for analysis_id: {analysis_id}")
             return True
         except Exception as e:
@@ -258,6 +667,7 @@ class DatabaseManager:
                 query,
                 (json.dumps(project_analysis_data, default=str), uuid.UUID(analysis_id))
             )
+            self._invalidate(f"analysis:{_analysis_key(analysis_id)}", "analyses")
             
             # print(f"Saved repository analysis for analysis_id: {analysis_id}")
             return True
@@ -273,33 +683,67 @@ class DatabaseManager:
         project_data: Optional[Dict[str, Any]] = None,
         package_data: Optional[Dict[str, Any]] = None
     ) -> bool:
-        """Save raw data to Tracked_Data table and return true on success otherwise raises error."""
+        """
+        Save raw data to Tracked_Data table and return true on success otherwise raises error.
+        bow_cache is stored vocabulary encoded in bow_data (see bow_codec), replacing any JSON copy of an older save.
+        """
         try:
-            query = """
-                UPDATE Tracked_Data
-                SET metadata_stats = %s,
-                    bow_cache = COALESCE(%s, bow_cache),
-                    project_data = COALESCE(%s, project_data),
-                    package_data = COALESCE(%s, package_data)
-                WHERE analysis_id = %s;
-            """
-            
-            self.db.execute_update(
-                query,
-                (
-                    json.dumps(metadata_results),
-                    json.dumps(bow_cache) if bow_cache is not None else None,
-                    json.dumps(project_data, default=str) if project_data is not None else None,
-                    json.dumps(package_data) if package_data is not None else None,
-                    uuid.UUID(analysis_id)
+            with self.unit_of_work():
+                bow_data = self._encode_bow(bow_cache) if bow_cache is not None else None
+                query = """
+                    UPDATE Tracked_Data
+                    SET metadata_stats = %s,
+                        bow_data = COALESCE(%s, bow_data),
+                        bow_cache = CASE WHEN %s THEN NULL ELSE bow_cache END,
+                        project_data = COALESCE(%s, project_data),
+                        package_data = COALESCE(%s, package_data)
+                    WHERE analysis_id = %s;
+                """
+                
+                self.db.execute_update(
+                    query,
+                    (
+                        json.dumps(metadata_results),
+                        bow_data,
+                        bow_data is not None,
+                        json.dumps(project_data, default=str) if project_data is not None else None,
+                        json.dumps(package_data) if package_data is not None else None,
+                        uuid.UUID(analysis_id)
+                    )
                 )
-            )
+                self._invalidate(f"analysis:{_analysis_key(analysis_id)}")
             # print(f"Saved tracked data for analysis_id: {analysis_id}")
             return True
             
         except Exception as e:
             raise RuntimeError(f"Error saving tracked data: {e}")
 
+    def _read_bow(self, row: Dict[str, Any]) -> Optional[List[List[str]]]:
+        """Decoded bow_data of a Tracked_Data row, or the JSON bow_cache of rows saved before it was encoded"""
+        if row.get('bow_data') is None:
+            return row.get('bow_cache')
+        return self._decode_bow(row['bow_data'])
+
+    def _encode_bow(self, bow: List[List[str]]) -> bytes:
+        """Adds the tokens of bow to Bow_Vocabulary and packs the documents as id arrays"""
+        token_ids: Dict[str, int] = {}
+        for batch in _batches(vocabulary_of(bow), VOCAB_BATCH_SIZE):
+            self.db.execute_update(
+                "INSERT INTO Bow_Vocabulary (token) SELECT unnest(%s::text[]) ON CONFLICT (token) DO NOTHING;",
+                (batch,)
+            )
+            rows = self.db.execute_query("SELECT token_id, token FROM Bow_Vocabulary WHERE token = ANY(%s);", (batch,))
+            token_ids.update({row['token']: row['token_id'] for row in rows})
+        return encode_bow(to_ids(bow, token_ids))
+
+    def _decode_bow(self, data: bytes) -> List[List[str]]:
+        documents = decode_bow(data)
+        tokens: Dict[int, str] = {}
+        for batch in _batches(token_ids_of(documents), VOCAB_BATCH_SIZE):
+            rows = self.db.execute_query("SELECT token_id, token FROM Bow_Vocabulary WHERE token_id = ANY(%s);", (batch,))
+            tokens.update({row['token_id']: row['token'] for row in rows})
+        return to_tokens(documents, tokens)
+
     def save_resume(self,analysis_id:str,resume_data:Dict[str,Any],resume_title:str = None)->int:
         """
         Insert new resume into the Resumes table with new data
@@ -317,6 +761,7 @@ class DatabaseManager:
         
             result = self.db.execute_update(query, (resume_title,analysis_id,resume_json),returning=True)
             resume_id = result[0]['resume_id'] #get returned new resume_id
+            self._invalidate_document("resume", resume_id, analysis_id)
             # print(f"\n> Saved new resume with resume id:{resume_id} to db for analysis_id:{analysis_id}")
             return resume_id
         
@@ -341,7 +786,8 @@ class DatabaseManager:
             resume_json = json.dumps(resume_data)
         
             result = self.db.execute_update(query, (resume_json,resume_title,resume_id),returning=True)
-            analysis_id = result[0] #get analysis_id of associated analysis
+            analysis_id = result[0].get('analysis_id') #get analysis_id of associated analysis
+            self._invalidate_document("resume", resume_id, analysis_id)
             # print(f"\n> Successfully updated resume with resume_id:{resume_id} for analysis id:{analysis_id}")
             return True
         except Exception as e:
@@ -350,9 +796,10 @@ class DatabaseManager:
     def delete_resume(self,resume_id: int)->bool:
         try:
             query = """
-                DELETE FROM Resumes WHERE resume_id = %s;
+                DELETE FROM Resumes WHERE resume_id = %s RETURNING analysis_id;
             """
-            self.db.execute_update(query, (resume_id,))
+            result = self.db.execute_update(query, (resume_id,), returning=True)
+            self._invalidate_document("resume", resume_id, result[0].get('analysis_id') if result else None)
             print(f"\n> Successfully deleted resume with resume_id: {resume_id}")
             return True
         except Exception as e:
@@ -375,6 +822,7 @@ class DatabaseManager:
         
             result = self.db.execute_update(query, (portfolio_title,analysis_id,portfolio_json),returning=True)
             portfolio_id = result[0]['portfolio_id'] #get returned new resume_id
+            self._invalidate_document("portfolio", portfolio_id, analysis_id)
             # print(f"\n> Saved new portfolio with portfolio_id:{portfolio_id} to db for analysis_id:{analysis_id}")
             return portfolio_id
         
@@ -399,7 +847,8 @@ class DatabaseManager:
             portfolio_json = json.dumps(portfolio_data)
         
             result = self.db.execute_update(query, (portfolio_json,portfolio_title,portfolio_id),returning=True)
-            analysis_id = result[0] #get analysis_id of associated analysis
+            analysis_id = result[0].get('analysis_id') #get analysis_id of associated analysis
+            self._invalidate_document("portfolio", portfolio_id, analysis_id)
             print(f"\n> Successfully updated portfolio with portfolio_id:{portfolio_id} for analysis id:{analysis_id}")
             return True
         except Exception as e:
@@ -408,25 +857,47 @@ class DatabaseManager:
     def delete_portfolio(self,portfolio_id: int)->bool:
         try:
             query = """
-                DELETE FROM Portfolios WHERE portfolio_id = %s;
+                DELETE FROM Portfolios WHERE portfolio_id = %s RETURNING analysis_id;
             """
-            self.db.execute_update(query, (portfolio_id,))
+            result = self.db.execute_update(query, (portfolio_id,), returning=True)
+            self._invalidate_document("portfolio", portfolio_id, result[0].get('analysis_id') if result else None)
             print(f"\n> Successfully deleted portfolio with portfolio_id: {portfolio_id}")
             return True
         except Exception as e:
             raise RuntimeError(f"Error deleting portfolio with portfolio_id {portfolio_id}: {e}")
 
-    def get_all_resumes(self):
+    def get_all_resumes(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        analysis_id: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        title_prefix: Optional[str] = None,
+    ):
+        """
+        Resumes newest first, at most limit of them, after is the resume_id the previous page ended on.
+        Optionally only those of one analysis, of analyses created in [created_from, created_to) or whose title starts with title_prefix.
+        """
         try:
-            query = """
-                SELECT * FROM Resumes 
+            clauses, params = self._list_filters("res.resume_title", analysis_id, created_from, created_to, title_prefix)
+            if after is not None:
+                clauses.append("res.resume_id < %s")
+                params.append(int(after))
+            query = f"""
+                SELECT res.* FROM Resumes res
+                JOIN Analyses a ON a.analysis_id = res.analysis_id
+                WHERE {" AND ".join(clauses) or "TRUE"}
+                ORDER BY res.resume_id DESC
+                LIMIT %s;
             """
             
-            result = self.db.execute_query(query,())
-            
-            if not result:
-                raise LookupError("No entries in db for resumes")
-            return result
+            def load():
+                result = self.db.execute_query(query,(*params, limit))
+                if not result:
+                    raise LookupError("No entries in db for resumes")
+                return result
+            return self.cache.get_or_load(("resumes", query, (*params, limit)), ["resumes"], load)
         except Exception as e:
             raise LookupError(f"Error retrieving Resumes:{e}")
     
@@ -437,11 +908,13 @@ class DatabaseManager:
                 SELECT * from Resumes res WHERE res.analysis_id = %s
             """
             
-            result = self.db.execute_query(query,(analysis_id,))
-            
-            if not result:
-                raise LookupError("No resumes attached to this analysis")
-            return result
+            def load():
+                result = self.db.execute_query(query,(analysis_id,))
+                if not result:
+                    raise LookupError("No resumes attached to this analysis")
+                return result
+            key = _analysis_key(analysis_id)
+            return self.cache.get_or_load(("resumes_of", key), [f"resumes:{key}"], load)
         
         except Exception as e:
             raise LookupError(f"Error retrieving Resumes for analysis_id: {analysis_id}:{e}")
@@ -453,25 +926,44 @@ class DatabaseManager:
             
             query = """Select * from Resumes res WHERE res.resume_id = %s"""
             
-            result = self.db.execute_query(query,(int(resume_id),))    
-
-            if not result:
-                raise LookupError(f"A resume with if {resume_id} does not exist")
-            return result
+            def load():
+                result = self.db.execute_query(query,(int(resume_id),))
+                if not result:
+                    raise LookupError(f"A resume with if {resume_id} does not exist")
+                return result
+            return self.cache.get_or_load(("resume", resume_id), lambda rows: _document_tags("resume", resume_id, rows), load)
         except Exception as e:
             raise LookupError(f"Error retrieving resume for resume_id{resume_id}: {e}")   
 
-    def get_all_portfolios(self):
+    def get_all_portfolios(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        analysis_id: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        title_prefix: Optional[str] = None,
+    ):
+        """Portfolios newest first, paged and filtered like get_all_resumes with after being a portfolio_id"""
         try:
-            query = """
-                SELECT * FROM Portfolios 
+            clauses, params = self._list_filters("port.portfolio_title", analysis_id, created_from, created_to, title_prefix)
+            if after is not None:
+                clauses.append("port.portfolio_id < %s")
+                params.append(int(after))
+            query = f"""
+                SELECT port.* FROM Portfolios port
+                JOIN Analyses a ON a.analysis_id = port.analysis_id
+                WHERE {" AND ".join(clauses) or "TRUE"}
+                ORDER BY port.portfolio_id DESC
+                LIMIT %s;
             """
             
-            result = self.db.execute_query(query,())
-            
-            if not result:
-                raise LookupError("No entries in db for portfolios")
-            return result
+            def load():
+                result = self.db.execute_query(query,(*params, limit))
+                if not result:
+                    raise LookupError("No entries in db for portfolios")
+                return result
+            return self.cache.get_or_load(("portfolios", query, (*params, limit)), ["portfolios"], load)
         except Exception as e:
             raise LookupError(f"Error retrieving Portfolios:{e}")
     
@@ -481,11 +973,13 @@ class DatabaseManager:
                 SELECT * from Portfolios WHERE analysis_id = %s
             """
             
-            result = self.db.execute_query(query,(analysis_id,))
-            
-            if not result:
-                raise LookupError("Analysis has no portfolios attached to it")
-            return result
+            def load():
+                result = self.db.execute_query(query,(analysis_id,))
+                if not result:
+                    raise LookupError("Analysis has no portfolios attached to it")
+                return result
+            key = _analysis_key(analysis_id)
+            return self.cache.get_or_load(("portfolios_of", key), [f"portfolios:{key}"], load)
         except Exception as e:
             raise LookupError(f"Error retrieving Resumes for analysis_id: {analysis_id}:{e}")
     
@@ -496,32 +990,48 @@ class DatabaseManager:
             
             query = """Select * from Portfolios WHERE portfolio_id = %s"""
             
-            result = self.db.execute_query(query,(portfolio_id,))    
-
-            if not result:
-                raise LookupError(f"portfolio with portfolio_id: {portfolio_id} does not exist")
-            return result
+            def load():
+                result = self.db.execute_query(query,(portfolio_id,))
+                if not result:
+                    raise LookupError(f"portfolio with portfolio_id: {portfolio_id} does not exist")
+                return result
+            return self.cache.get_or_load(("portfolio", portfolio_id), lambda rows: _document_tags("portfolio", portfolio_id, rows), load)
         except Exception as e:
             raise LookupError(f"Error retrieving portfolio for portfolio_id{portfolio_id}: {e}")   
 
         
     def get_analysis_data(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         """
-        Retrieve complete analysis data by joining all tables on analysis_id
+        Retrieve complete analysis data, every section of get_analysis_sections
+        """
+        return self.get_analysis_sections(analysis_id)
+
+    def get_analysis_sections(self, analysis_id: str, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
+        Retrieve only the given sections of an analysis (keys of ANALYSIS_SECTIONS, all of them when None),
+        joining just the tables they live in. Returns analysis_id plus one key per section,
+        raises ValueError for unknown sections and LookupError when the analysis does not exist.
+        """
+        wanted = list(ANALYSIS_SECTIONS) if sections is None else list(dict.fromkeys(sections))
+        unknown = [section for section in wanted if section not in ANALYSIS_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown analysis sections: {', '.join(unknown)}")
+        key = _analysis_key(analysis_id)
+        return self.cache.get_or_load(
+            ("analysis", key, tuple(wanted)),
+            [f"analysis:{key}"],
+            lambda: self._load_analysis_sections(analysis_id, wanted)
+        )
+
+    def _load_analysis_sections(self, analysis_id: str, wanted: List[str]) -> Dict[str, Any]:
         try:
-            query = """
-                SELECT 
-                    a.analysis_id,a.analysis_title,
-                    r.topic_vector, r.resume_points, r.project_insights, r.package_insights, r.metadata_insights,
-                    t.bow_cache, t.project_data, t.package_data, t.metadata_stats,
-                    res.resume_data,
-                    port.portfolio_data
+            aliases = {ANALYSIS_SECTIONS[section][0] for section in wanted}
+            columns = ", ".join(["a.analysis_id"] + [ANALYSIS_SECTIONS[section][1] for section in wanted])
+            joins = "\n".join(join for alias, join in _SECTION_JOINS.items() if alias in aliases)
+            query = f"""
+                SELECT {columns}
                 FROM Analyses a
-                LEFT JOIN Results r ON a.analysis_id = r.analysis_id
-                LEFT JOIN Tracked_Data t ON a.analysis_id = t.analysis_id
-                LEFT JOIN Resumes res ON a.analysis_id = res.analysis_id
-                LEFT JOIN Portfolios port ON a.analysis_id = port.analysis_id
+                {joins}
                 WHERE a.analysis_id = %s;
             """
             results = self.db.execute_query(query, (uuid.UUID(analysis_id),))
@@ -529,27 +1039,21 @@ class DatabaseManager:
             if not results or results == None:
                 raise LookupError("Database returned None")
 
-            #main result data
             row = results[0]
-            
-
-            return {
-                "analysis_id": str(row['analysis_id']),
-                "analysis_title":str(row['analysis_title']),
-                "topic_vector": row['topic_vector'],
-                "resume_points": row['resume_points'],
-                "project_insights": row['project_insights'],
-                "package_insights": row['package_insights'],
-                "metadata_insights": row['metadata_insights'],
-                "tracked_data": {
-                    "bow_cache": row['bow_cache'],
-                    "project_data": row['project_data'],
-                    "package_data": row['package_data'],
-                    "metadata_stats": row['metadata_stats']
-                },
-                "resume_data":row['resume_data'],
-                "portfolio_data":row['portfolio_data']
-            }
+            data: Dict[str, Any] = {"analysis_id": str(row['analysis_id'])}
+            for section in wanted:
+                if section == "analysis_title":
+                    data[section] = str(row['analysis_title'])
+                elif section == "tracked_data":
+                    data[section] = {
+                        "bow_cache": self._read_bow(row),
+                        "project_data": row['project_data'],
+                        "package_data": row['package_data'],
+                        "metadata_stats": row['metadata_stats']
+                    }
+                else:
+                    data[section] = row[section]
+            return data
         except Exception as e:
             raise LookupError(f"Error retrieving analysis: {e}")
 
@@ -564,7 +1068,7 @@ class DatabaseManager:
                 LEFT JOIN Filesets f ON r.analysis_id = f.analysis_id
                 ORDER BY a.analysis_id;
             """
-            results = self.db.execute_query(query)
+            results = self.cache.get_or_load(("analyses_summary",), ["analyses"], lambda: self.db.execute_query(query))
             #convert UUID to string for JSON compatibility if needed later
             for result in results:
                 result['analysis_id'] = str(result['analysis_id'])
@@ -572,6 +1076,140 @@ class DatabaseManager:
         except Exception as e:
             raise LookupError(f"Error retrieving all results: {e}")
 
+    def get_analyses_listing(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None,
+        analysis_id: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        title_prefix: Optional[str] = None,
+        skill: Optional[str] = None,
+        import_name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        One small row per analysis for list views, newest first. Primary languages/skills, repository names and the
+        project count are projected out of the result documents in the database, so the insights
+        themselves (commit lists, source snippets) are never sent to the client.
+        Paged by (creation_date, analysis_id) of the last row of the previous page (after) and filtered like get_all_resumes.
+        skill keeps analyses whose languages, skills or primary skills include it, import_name those with a project
+        importing it, both answered from the GIN indexes on the result documents.
+        """
+        try:
+            clauses, params = self._list_filters("a.analysis_title", analysis_id, created_from, created_to, title_prefix)
+            if skill:
+                clauses.append("""(r.metadata_insights -> 'language_stats' ? %s
+                    OR r.metadata_insights -> 'skill_stats' ? %s
+                    OR r.metadata_insights -> 'primary_skills' ? %s)""")
+                params.extend((skill, skill, skill))
+            if import_name:
+                clauses.append("r.project_insights @? %s::jsonpath")
+                params.append(f"$.analyzed_insights[*].imports_summary.{json.dumps(import_name)}")
+            if after is not None:
+                clauses.append("(a.creation_date, a.analysis_id) < (%s::timestamp, %s::uuid)")
+                params.extend(after)
+            query = f"""
+                SELECT a.analysis_id, a.analysis_title, a.creation_date, a.last_modified,
+                       COALESCE(f.latest_file_path, a.original_file_path) AS file_path,
+                       COALESCE(r.metadata_insights -> 'primary_languages', '[]'::jsonb) AS primary_languages,
+                       COALESCE(r.metadata_insights -> 'primary_skills', '[]'::jsonb) AS primary_skills,
+                       COALESCE(jsonb_path_query_array(r.project_insights, '$.analyzed_insights[*].repository_name'),
+                                '[]'::jsonb) AS repository_names,
+                       CASE WHEN jsonb_typeof(r.project_insights -> 'analyzed_insights') = 'array'
+                            THEN jsonb_array_length(r.project_insights -> 'analyzed_insights')
+                            ELSE 0 END AS project_count,
+                       a.thumbnail_image IS NOT NULL AS has_thumbnail
+                FROM Results r
+                JOIN Analyses a ON r.analysis_id = a.analysis_id
+                LEFT JOIN Filesets f ON r.analysis_id = f.analysis_id
+                WHERE {" AND ".join(clauses) or "TRUE"}
+                ORDER BY a.creation_date DESC, a.analysis_id DESC
+                LIMIT %s;
+            """
+            results = self.db.execute_query(query, (*params, limit))
+            for result in results:
+                result['analysis_id'] = str(result['analysis_id'])
+            return results
+        except Exception as e:
+            raise LookupError(f"Error retrieving analyses listing: {e}")
+
+    @staticmethod
+    def _list_filters(
+        title_column: str,
+        analysis_id: Optional[str],
+        created_from: Optional[datetime],
+        created_to: Optional[datetime],
+        title_prefix: Optional[str],
+    ) -> Tuple[List[str], List[Any]]:
+        """WHERE clauses and their parameters shared by the list queries, which join Analyses as a"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if analysis_id:
+            clauses.append("a.analysis_id = %s")
+            params.append(uuid.UUID(analysis_id))
+        if created_from:
+            clauses.append("a.creation_date >= %s")
+            params.append(created_from)
+        if created_to:
+            clauses.append("a.creation_date < %s")
+            params.append(created_to)
+        if title_prefix:
+            clauses.append(f"{title_column} LIKE %s")
+            params.append(escape_like(title_prefix) + "%")
+        return clauses, params
+
+    # --- projections of the JSONB result columns, only the requested sub-documents leave the database ---
+
+    def get_result_section(self, analysis_id: str, column: str, path: List[str], as_text: bool = False) -> Any:
+        """
+        Returns the sub-document at path inside one Results column (e.g. "metadata_insights", ["language_stats"]),
+        None if the analysis or the path does not exist. as_text returns the value as text (#>>) instead of JSON (#>).
+        """
+        if column not in RESULT_COLUMNS:
+            raise ValueError(f"Unknown result column: {column}")
+        try:
+            operator = "#>>" if as_text else "#>"
+            query = f"SELECT {column} {operator} %s AS section FROM Results WHERE analysis_id = %s;"
+            rows = self.db.execute_query(query, (list(path), uuid.UUID(analysis_id)))
+            return rows[0]['section'] if rows else None
+        except Exception as e:
+            raise LookupError(f"Error retrieving {column} section: {e}")
+
+    def get_skill_counts(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Skill totals across all analyses as [{'skill', 'count'}], highest first, top limits the number of rows.
+        Read from Skill_Counts, which a trigger on Results keeps up to date whenever results are saved.
+        """
+        try:
+            query = """
+                SELECT skill, SUM(count)::BIGINT AS count
+                FROM Skill_Counts
+                GROUP BY skill
+                ORDER BY count DESC, skill
+                LIMIT %s;
+            """
+            return self.db.execute_query(query, (top,))
+        except Exception as e:
+            raise LookupError(f"Error retrieving skill counts: {e}")
+
+    def get_skill_counts_by_analysis(self, analysis_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per analysis skill totals as [{'analysis_id', 'skill', 'count'}], only analysis_id's when it is given"""
+        try:
+            query = """
+                SELECT analysis_id, skill, SUM(count)::BIGINT AS count
+                FROM Skill_Counts
+                WHERE %s::uuid IS NULL OR analysis_id = %s::uuid
+                GROUP BY analysis_id, skill
+                ORDER BY analysis_id, count DESC, skill;
+            """
+            uid = uuid.UUID(analysis_id) if analysis_id else None
+            results = self.db.execute_query(query, (uid, uid))
+            for result in results:
+                result['analysis_id'] = str(result['analysis_id'])
+            return results
+        except Exception as e:
+            raise LookupError(f"Error retrieving skill counts by analysis: {e}")
+
     def delete_analysis(self, analysis_id: str) -> bool:
         """
         Delete an analysis and all associated data.
@@ -580,9 +1218,23 @@ class DatabaseManager:
             uid = uuid.UUID(analysis_id)
             
             #Cascade added to db, manual deletion of children not required
-            
-            #kill parent
-            self.db.execute_update("DELETE FROM Analyses WHERE analysis_id = %s;", (uid,))
+            #except for the blob mapping, whose hashes tell which shared contents may have become unreferenced
+            with self.unit_of_work():
+                dropped = self.db.execute_update(
+                    """
+                    DELETE FROM Fileset_Blobs fb USING Filesets fs
+                    WHERE fb.fileset_id = fs.fileset_id AND fs.analysis_id = %s
+                    RETURNING fb.hash;
+                    """,
+                    (uid,),
+                    returning=True,
+                ) or []
+                #kill parent
+                self.db.execute_update("DELETE FROM Analyses WHERE analysis_id = %s;", (uid,))
+                #contents no other analysis shares go with it
+                self.prune_orphan_blobs({row['hash'] for row in dropped})
+            #its resumes and portfolios went with it
+            self._invalidate(f"analysis:{uid}", "analyses", "resumes", f"resumes:{uid}", "portfolios", f"portfolios:{uid}")
             
             print(f"\n> Successfully deleted analysis: {analysis_id}")
             return True
@@ -592,8 +1244,9 @@ class DatabaseManager:
     def wipe_all_data(self) -> bool:
         """Delete all records from all tables."""
         try:
-            query = "TRUNCATE TABLE Analyses, Filesets, Filetrees, Results, Tracked_Data, Resumes, Portfolios RESTART IDENTITY CASCADE;"
+            query = "TRUNCATE TABLE Analyses, Filesets, Filetrees, Fileset_Blobs, Blobs, Results, Skill_Counts, Tracked_Data, Bow_Vocabulary, Resumes, Portfolios RESTART IDENTITY CASCADE;"
             self.db.execute_update(query)
+            self.cache.clear()
             print("\n> Successfully wiped all data.") 
             return True
         except Exception as e:
@@ -623,5 +1276,40 @@ class DatabaseManager:
     
     def close(self):
         """Close the database connection."""
-        #DB_connector uses context managers, so connections auto-close
-        pass
\ No newline at end of file
+        #DB_connector borrows from the process wide pool per call, connections are already back in the pool
+        pass
+
+
+def _analysis_key(analysis_id: Any) -> str:
+    """analysis_id as cache keys and tags spell it, whether it came as a UUID or a string in any case"""
+    try:
+        return str(uuid.UUID(str(analysis_id)))
+    except ValueError:
+        return str(analysis_id)
+
+
+def _document_tags(kind: str, document_id: Any, rows: List[Dict[str, Any]]) -> List[str]:
+    """Tags of a cached resume or portfolio (kind), which deleting its analysis must drop as well"""
+    return [f"{kind}:{document_id}"] + [f"{kind}s:{_analysis_key(row['analysis_id'])}" for row in rows if row.get('analysis_id')]
+
+
+def _batches(items: List[Any], size: int = BLOB_BATCH_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _encode_blob(data: bytes) -> Tuple[str, bytes]:
+    """(compression, stored bytes) of one file's contents"""
+    if len(data) >= BLOB_COMPRESS_MIN:
+        compressed = zlib.compress(data, 6)
+        if len(compressed) < len(data) * 0.9:
+            return 'zlib', compressed
+    return 'none', data
+
+
+def _decode_blob(compression: str, data: bytes) -> bytes:
+    if compression == 'zlib':
+        return zlib.decompress(data)
+    if compression == 'none':
+        return data
+    raise ValueError(f"Unknown blob compression: {compression}")
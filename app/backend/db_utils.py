@@ -1,11 +1,218 @@
 import psycopg
+from psycopg import pq
 from psycopg.rows import dict_row
 from contextlib import contextmanager
 from psycopg.types.json import Json
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, List, Tuple
+import atexit
 import os
+import threading
+import time
 import regex as re
 
 
+# pool settings, overridable from the environment like the connection settings
+POOL_MIN_SIZE: int = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+POOL_MAX_SIZE: int = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+POOL_TIMEOUT: float = float(os.environ.get('DB_POOL_TIMEOUT', 30))          # seconds to wait for a free connection
+POOL_MAX_IDLE: float = float(os.environ.get('DB_POOL_MAX_IDLE', 300))       # idle connections above min size are closed after this
+POOL_CHECK_AFTER: float = float(os.environ.get('DB_POOL_CHECK_AFTER', 30))  # connections idle longer than this are pinged before reuse
+# psycopg prepares a query server side once it has run this many times on a connection,
+# with pooled connections DatabaseManager's fixed queries are prepared after their first use
+PREPARE_THRESHOLD: int = int(os.environ.get('DB_PREPARE_THRESHOLD', 1))
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout"""
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of open connections to one database, shared by every DB_connector in the process.
+    - at most max_size connections are open, callers wait up to timeout for one to be returned
+    - connections idle for longer than max_idle are closed, down to min_size
+    - a connection idle for longer than check_after is pinged before it is handed out, broken ones are replaced
+    - a connection is rolled back when it is returned inside a transaction, so no state leaks between callers
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], psycopg.Connection],
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        timeout: float = POOL_TIMEOUT,
+        max_idle: float = POOL_MAX_IDLE,
+        check_after: float = POOL_CHECK_AFTER,
+    ) -> None:
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError('Invalid pool size!')
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self._idle: Deque[Tuple[psycopg.Connection, float]] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """Open connections, idle or in use"""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def getconn(self) -> psycopg.Connection:
+        """Takes a healthy connection from the pool, opening one if none is idle and the pool is not full"""
+        while True:
+            conn, idle_since = self._checkout()
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+            if self._is_usable(conn, idle_since):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn: psycopg.Connection) -> None:
+        """Returns a connection to the pool, broken or leftover transaction state is cleaned up first"""
+        if not conn.closed and not conn.broken and conn.info.transaction_status != pq.TransactionStatus.IDLE:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        if self._closed or conn.closed or conn.broken:
+            self._discard(conn)
+            return
+        now = time.monotonic()
+        with self._cond:
+            self._idle.append((conn, now))
+            expired = self._expired(now)
+            self._cond.notify()
+        for old in expired:
+            old.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[psycopg.Connection]:
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def close(self) -> None:
+        """Closes the idle connections, connections in use are closed when they are returned"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def _checkout(self) -> Tuple[psycopg.Connection | None, float]:
+        """(idle connection, idle since) or (None, 0) once a slot for a new connection is reserved"""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout('Connection pool is closed')
+                if self._idle:
+                    #most recently returned first, so the rest can age out
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, 0.0
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f'No connection available after {self.timeout}s')
+                self._cond.wait(remaining)
+
+    def _is_usable(self, conn: psycopg.Connection, idle_since: float) -> bool:
+        if conn.closed or conn.broken:
+            return False
+        if time.monotonic() - idle_since < self.check_after:
+            return True
+        try:
+            conn.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _expired(self, now: float) -> List[psycopg.Connection]:
+        """Pops idle connections past max_idle while the pool is above min_size, caller holds the lock"""
+        expired: List[psycopg.Connection] = []
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+        return expired
+
+    def _discard(self, conn: psycopg.Connection) -> None:
+        try:
+            conn.close()
+        finally:
+            self._release_slot()
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+
+_pools: Dict[Tuple[int, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database_name: str) -> ConnectionPool:
+    """
+    Process wide pool for database_name, created on first use.
+    Keyed by pid as well so a forked worker never reuses its parent's sockets.
+    """
+    key = (os.getpid(), database_name)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(lambda: _connect(database_name))
+                _pools[key] = pool
+    return pool
+
+
+def close_pools() -> None:
+    """Closes every pool of this process, registered to run at interpreter exit"""
+    with _pools_lock:
+        pools = [pool for (pid, _), pool in _pools.items() if pid == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_pools)
+
+
+def _connect(database_name: str) -> psycopg.Connection:
+    return psycopg.connect(
+        host = os.environ['HOST'],
+        user = os.environ['USER'],
+        password = os.environ['PASS'],
+        dbname= database_name,
+        port = os.environ['PORT'],
+        row_factory=dict_row,
+        autocommit=False,
+        prepare_threshold=PREPARE_THRESHOLD,
+    )
+
+
 class DB_connector:
     
     """Simple PostgreSQL connection handler using psycopg 3"""
@@ -22,13 +229,23 @@ class DB_connector:
             raise ValueError('Not a valid sql db name!')
         else:
             self.database_name = database_name
+        #connection of the open transaction() block, kept per thread so a block never captures another thread's calls
+        self._local = threading.local()
+
+    @property
+    def _tx_conn(self) -> psycopg.Connection | None:
+        """Connection of this thread's open transaction() block, None when every call commits on its own"""
+        return getattr(self._local, "conn", None)
+
+    @_tx_conn.setter
+    def _tx_conn(self, conn: psycopg.Connection | None) -> None:
+        self._local.conn = conn
         
     @contextmanager
     def get_connection(self):
         """
-        Get a database connection with automatic close
-        
-       
+        Get a database connection from the process wide pool, returned to it automatically.
+        Anything not committed inside the block is rolled back when the connection is returned.
         
         Usage:
             with connector.get_connection() as conn:
@@ -36,24 +253,48 @@ class DB_connector:
                     cur.execute("SELECT * FROM table")
                     results = cur.fetchall()
         """
-        conn = None
+        if self._tx_conn is not None:
+            yield self._tx_conn
+            return
         try:
-            conn = psycopg.connect(
-                host = os.environ['HOST'],
-                user = os.environ['USER'],
-                password = os.environ['PASS'],
-                dbname= self.database_name,
-                port = os.environ['PORT'],
-                row_factory=dict_row,
-                autocommit=False,
-            )
-            yield conn
+            with get_pool(self.database_name).connection() as conn:
+                yield conn
         except Exception as e:
             print(f"Connection Error: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    @contextmanager
+    def transaction(self, pipeline: bool = True):
+        """
+        Runs every execute_query / execute_update inside the block on one pooled connection and commits once at the end,
+        or rolls everything back if the block raises. A nested transaction() joins the outer one.
+        The block belongs to the calling thread, other threads sharing this connector keep using their own connections.
+        With pipeline=True (and a libpq that supports it) statements are sent in psycopg pipeline mode, so writes that
+        return nothing do not wait for a round trip each; rowcounts of those writes are not known inside the block.
+
+        Usage:
+            with connector.transaction():
+                connector.execute_update("UPDATE ...", params)
+                connector.execute_update("UPDATE ...", params)
+        """
+        if self._tx_conn is not None:
+            yield self
+            return
+        with get_pool(self.database_name).connection() as conn:
+            self._tx_conn = conn
+            try:
+                if pipeline and psycopg.Pipeline.is_supported():
+                    with conn.pipeline():
+                        yield self
+                else:
+                    yield self
+                conn.commit()
+            except Exception as e:
+                print(f"Transaction rolled back: {e}")
+                conn.rollback()
+                raise
+            finally:
+                self._tx_conn = None
 
     def test_connection(self) -> bool:
         """Test if connection is working"""
@@ -102,7 +343,9 @@ class DB_connector:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, params)
-                    conn.commit()
+                    #inside transaction() the block commits once at the end
+                    if self._tx_conn is None:
+                        conn.commit()
                     
                     if returning:
                         # CHANGED: Now returns a list of rows (fetchall) to treat results as lists
@@ -113,4 +356,26 @@ class DB_connector:
                         return affected
         except Exception as e:
             print(f"Update execution failed: {e}")
+            raise
+
+    def execute_many(self, query: str, params_seq: list[tuple]) -> int:
+        """
+        Execute the same INSERT/UPDATE/DELETE for every parameter tuple, sent as one batch
+        
+        Args:
+            query: SQL query string
+            params_seq: One parameter tuple per execution
+            
+        Returns:
+            Number of affected rows
+        """
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.executemany(query, params_seq)
+                    if self._tx_conn is None:
+                        conn.commit()
+                    return cur.rowcount
+        except Exception as e:
+            print(f"Batch execution failed: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,112 @@
+import hashlib
+from collections import Counter
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Set, Tuple
+from cache.blob_store import BlobStore
+
+# bytes read from each end of a file for the fingerprint
+FINGERPRINT_BYTES: int = 4096
+
+
+def _fingerprint_digest(size: int, head: bytes, tail: bytes) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(size.to_bytes(8, "little"))
+    hasher.update(head)
+    hasher.update(tail)
+    return hasher.hexdigest()
+
+
+def fingerprint(stream: BinaryIO, size: int) -> str:
+    """Fast partial hash of a seekable stream: its size plus the first and last FINGERPRINT_BYTES"""
+    head = stream.read(FINGERPRINT_BYTES)
+    if size > 2 * FINGERPRINT_BYTES:
+        stream.seek(size - FINGERPRINT_BYTES)
+    return _fingerprint_digest(size, head, stream.read(FINGERPRINT_BYTES))
+
+
+def fingerprint_file(path: Path, size: int) -> str:
+    with open(path, "rb") as f:
+        return fingerprint(f, size)
+
+
+def sha256_file(path: Path) -> str:
+    """Full SHA-256 of a file without storing it"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class DedupIndex:
+    """
+    Tiered duplicate detection used by FileManager before anything is written to the blob store:
+    1. files are grouped by size, a file whose size matches nothing else cannot be a duplicate
+    2. files sharing a size are compared by a fingerprint of their first and last few KB
+    3. only files whose fingerprint collides are fully hashed up front, without being written
+       (one that turns out to be new is then copied into the store under that hash, never hashed twice)
+
+    seen_hashes stays the single source of truth for which content is already registered,
+    this only decides which files can skip the store write.
+    """
+
+    def __init__(self, store: BlobStore, known_hashes: Iterable[str] = ()) -> None:
+        self.store = store
+        self._pending: List[str] = list(known_hashes)  # previous state hashes, sized on first use
+        self._by_size: Dict[int, Set[str]] = {}
+        self._fingerprints: Dict[str, str] = {}
+
+    def add_known(self, file_hash: str, size: int) -> None:
+        """Record content that is registered in the binary array"""
+        self._by_size.setdefault(size, set()).add(file_hash)
+
+    def plan(self, files: List[Tuple[Path, int]], executor: Executor) -> Set[int]:
+        """
+        Takes (path, size) in load order and returns the positions of files that should be hashed
+        before storing, because they are likely duplicates of something earlier or already known.
+        The first file of every fingerprint group that is not already known is stored directly.
+        """
+        self._size_pending()
+        size_counts = Counter(size for _, size in files)
+        candidates = [i for i, (_, size) in enumerate(files) if size_counts[size] > 1 or size in self._by_size]
+        if not candidates:
+            return set()
+
+        prints = list(executor.map(lambda i: self._safe_fingerprint(*files[i]), candidates))
+
+        groups: Dict[Tuple[int, str], List[int]] = {}
+        for i, file_print in zip(candidates, prints):
+            if file_print is not None:
+                groups.setdefault((files[i][1], file_print), []).append(i)
+
+        hash_first: Set[int] = set()
+        for (size, file_print), members in groups.items():
+            known = file_print in self._known_fingerprints(size)
+            hash_first.update(members if known else members[1:])
+        return hash_first
+
+    def _safe_fingerprint(self, path: Path, size: int) -> str | None:
+        try:
+            return fingerprint_file(path, size)
+        except OSError:
+            return None  # unreadable files are reported when they are loaded
+
+    def _size_pending(self) -> None:
+        for file_hash in self._pending:
+            if self.store.has(file_hash):
+                self.add_known(file_hash, self.store.size(file_hash))
+        self._pending = []
+
+    def _known_fingerprints(self, size: int) -> Set[str]:
+        prints: Set[str] = set()
+        for file_hash in self._by_size.get(size, ()):
+            if file_hash not in self._fingerprints:
+                view = self.store.view(file_hash)
+                if view is None:
+                    continue
+                head = view[:FINGERPRINT_BYTES]
+                tail = view[max(FINGERPRINT_BYTES, size - FINGERPRINT_BYTES):]
+                self._fingerprints[file_hash] = _fingerprint_digest(size, head, tail)
+            prints.add(self._fingerprints[file_hash])
+        return prints
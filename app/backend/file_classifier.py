@@ -1,94 +1,190 @@
 from anytree import Node, PreOrderIter
-import pygments.util
-import pygments.lexers
-from typing import Tuple, List
+from compact_tree import TreeNode
+import fnmatch
+import os
+import re
+from functools import lru_cache
+from pygments.lexers._mapping import LEXERS
+from pygments.plugin import find_plugin_lexers
+from typing import Iterable, Iterator, Tuple, List, Optional, Pattern, Set
+from ignore_rules import GIT_DIR
+
+TEXT_EXTENSIONS: set[str] = {'.txt', '.md', '.rtf', '.pdf', '.doc', '.docx'}
+
+# glob characters understood by fnmatch, patterns without them are matched as plain strings
+_GLOB_CHARS = re.compile(r'[*?\[]')
+
+
+class CodeFilenameTable:
+    """
+    Every filename pattern pygments knows, split once into lookup tables:
+    - names: exact file names such as 'Makefile'
+    - suffixes: '*.ext' patterns, matched by looking up each dotted suffix of the name
+    - globs: the few remaining patterns, matched with the same case sensitive regexes pygments uses
+    A name matches iff pygments.lexers.get_lexer_for_filename would find a lexer for it.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.names: Set[str] = set()
+        self.suffixes: Set[str] = set()
+        self.globs: List[Pattern[str]] = []
+        for pattern in patterns:
+            if not _GLOB_CHARS.search(pattern):
+                self.names.add(pattern)
+            elif pattern.startswith('*.') and not _GLOB_CHARS.search(pattern[1:]):
+                self.suffixes.add(pattern[1:])
+            else:
+                self.globs.append(re.compile(fnmatch.translate(pattern)))
+
+    @classmethod
+    def from_pygments(cls) -> "CodeFilenameTable":
+        patterns = [pattern for _, _, _, filenames, _ in LEXERS.values() for pattern in filenames]
+        patterns.extend(pattern for lexer in find_plugin_lexers() for pattern in lexer.filenames)
+        return cls(patterns)
+
+    def matches(self, filename: str) -> bool:
+        if filename in self.names:
+            return True
+        dot = filename.find('.')
+        while dot != -1:
+            if filename[dot:] in self.suffixes:
+                return True
+            dot = filename.find('.', dot + 1)
+        return any(glob.match(filename) for glob in self.globs)
+
+
+@lru_cache(maxsize=None)
+def _code_filename_table() -> CodeFilenameTable:
+    """Built on first use and shared by the whole process"""
+    return CodeFilenameTable.from_pygments()
+
+
+@lru_cache(maxsize=65536)
+def is_code_filename(filename: str) -> bool:
+    """True if pygments has a lexer for this file name, memoized per basename"""
+    return _code_filename_table().matches(os.path.basename(filename))
+
+
+def classify_filename(filename: str, extension: str) -> Optional[str]:
+    """
+    Returns 'text', 'code' or None for a file name.
+    Text is checked first to prevent pygments from misclassifying text files as code.
+    """
+    if isinstance(extension, str) and extension.lower() in TEXT_EXTENSIONS:
+        return "text"
+    if is_code_filename(filename):
+        return "code"
+    return None
+
 
 class FileClassifier:
     def __init__(self) -> None:
         self.text_files: List[Node] = []
         self.code_files: List[Node] = []
+        # .git directories found by the last run, their files are marked 'git' without being classified
+        self.git_subtrees: List[Node] = []
 
-    def classify_files(self, unprocessed_tree: Node, binary_data: List[bytes]) -> Node:
+    def classify_files(self, unprocessed_tree: Node, binary_data: List[bytes], scan_index=None) -> Node:
         '''
         Takes an unprocessed file tree and traverses it to classify files into text and code categories.
         Takes binary_data list to set binary data to None for detached nodes.
+        If the ScanIndex FileManager built for this tree is passed, its classifications are used instead of walking the tree twice.
         '''
         if unprocessed_tree is None:
             raise ValueError("Unprocessed tree cannot be None")
 
-        if not isinstance(unprocessed_tree, Node):
+        if not isinstance(unprocessed_tree, (Node, TreeNode)):
             raise TypeError(f"Expected Node object, got {type(unprocessed_tree).__name__}")
 
         # clear previous data
         self.text_files.clear()
         self.code_files.clear()
+        self.git_subtrees = []
 
-        # classify text files first, then code files to prevent pygments from misclassifying text files as code
-        self.text_files, remaining_tree = self._filter_tree(unprocessed_tree, "text", binary_data)
-        self.code_files, remaining_tree = self._filter_tree(remaining_tree, "code", binary_data)
+        if scan_index is not None:
+            self._apply_index(scan_index, binary_data)
+            return self.text_files, self.code_files, binary_data
 
-        return self.text_files, self.code_files, binary_data
+        # text is checked before code to prevent pygments from misclassifying text files as code
+        self.text_files, self.code_files = self._classify_tree(unprocessed_tree, binary_data)
 
+        return self.text_files, self.code_files, binary_data
 
-    def _filter_tree(self, root: Node, mode: str, binary_data: List[bytes]) -> Tuple[List[Node], Node]:
+    def _classify_tree(self, root: Node, binary_data: List[bytes]) -> Tuple[List[Node], List[Node]]:
         """
-        Classify and filter the tree nodes based on the mode ('text' or 'code')
+        Single pass over the tree producing the text and code lists together, each file is classified
+        by classify_filename, the same memoized lookup ScanIndex uses.
         """
-        classified_files: List[Node] = []
+        text_files: List[Node] = []
+        code_files: List[Node] = []
 
-        for node in PreOrderIter(root):
+        for node in self._iter_outside_git(root):
             try:
                 # skip non-file nodes
                 if not hasattr(node, "type") or node.type != "file":
                     continue
 
-                # skip all files inside .git directories
-                if ".git" in [ancestor.name for ancestor in node.ancestors]:
-                    node.classification = "git"
-                    continue
-                    
-                is_text = self._is_text(node)
-                is_code = self._is_code(node)
-
-                # classify node as text or code and add to respective list
-                if mode == "text" and is_text:
+                classification = classify_filename(node.name, self._getExtension(node))
+                if classification == "text":
                     node.classification = "text"
-                    classified_files.append(node)
-                    # detach from tree
-                    if node.parent:
-                        node.parent = None
-                elif mode == "code" and is_code:
+                    text_files.append(node)
+                    node.parent = None
+                elif classification == "code":
                     node.classification = "code"
-                    classified_files.append(node)
-                    # detach from tree
-                    if node.parent:
-                        node.parent = None
+                    code_files.append(node)
+                    node.parent = None
                 else:
-                    # detach from tree if it doesn't match either category
-                    if not is_text and not is_code:
-                        self._detach_node(node, binary_data)
-                name = getattr(node, "name", "unnamed")
-                classification = getattr(node, "classification", "unclassified")
+                    self._detach_node(node, binary_data)
             except Exception as e:
                 print(f"An error occurred while classifying node {node.name}: {e}")
                 continue
 
-        return classified_files, root
+        return text_files, code_files
 
-    def _is_text(self, node: Node) -> bool:
-        """Check if the node is a text file"""
-        ext = self._getExtension(node)
-        text_extensions: set[str] = {'.txt', '.md', '.rtf', '.pdf', '.doc', '.docx'}
-        return ext in text_extensions
+    def _iter_outside_git(self, root: Node) -> Iterator[Node]:
+        """
+        Pre-order walk that never descends into .git directories. Each one is recorded in git_subtrees
+        and its files are marked 'git' in one sweep, so repository internals skip the per node checks.
+        """
+        stack: List[Node] = [root]
+        while stack:
+            node = stack.pop()
+            if node.name == GIT_DIR and getattr(node, "type", None) != "file":
+                self._prune_git_subtree(node)
+                continue
+            yield node
+            # children are captured before yielding them, so detaching a classified node is safe
+            stack.extend(reversed(node.children))
 
-    def _is_code(self, node: Node) -> bool:
-        """Check if the node is a code file using Pygments"""
-        try:
-            filename: str = node.name
-            pygments.lexers.get_lexer_for_filename(filename)
-            return True
-        except pygments.util.ClassNotFound:
-            return False
+    def _prune_git_subtree(self, git_node: Node) -> None:
+        self.git_subtrees.append(git_node)
+        for node in PreOrderIter(git_node):
+            if getattr(node, "type", None) == "file":
+                node.classification = "git"
+
+    def _apply_index(self, scan_index, binary_data: List[bytes]) -> None:
+        """
+        Single pass over the files of a ScanIndex. Files are registered in tree pre-order,
+        so the text and code lists come out in the same order as the two tree passes.
+        """
+        self.git_subtrees = [node for node in scan_index.git_dirs if getattr(node, "type", None) != "file"]
+        for indexed in scan_index.files:
+            node = indexed.node
+            try:
+                if indexed.classification == "git":
+                    node.classification = "git"
+                elif indexed.classification == "text":
+                    node.classification = "text"
+                    self.text_files.append(node)
+                    node.parent = None
+                elif indexed.classification == "code":
+                    node.classification = "code"
+                    self.code_files.append(node)
+                    node.parent = None
+                else:
+                    self._detach_node(node, binary_data)
+            except Exception as e:
+                print(f"An error occurred while classifying node {node.name}: {e}")
 
     def _getExtension(self, node: Node) -> str:
         """Get file extension from node"""
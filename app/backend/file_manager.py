@@ -1,59 +1,110 @@
-from pathlib import Path
-from typing import Any, Dict, List, Tuple
+import os
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, List, Tuple
+from io import BytesIO
+from concurrent.futures import Future, ThreadPoolExecutor
 import zipfile
 import tempfile
 import shutil
 from datetime import datetime
-from anytree import Node, RenderTree
-import hashlib
+from anytree import RenderTree
+from cache.blob_store import BlobStore, BlobArray
+from ignore_rules import IgnoreRules
+from scan_index import ScanIndex, ScanEntry
+from dedup_index import DedupIndex, sha256_file
+from ingest_manifest import IngestManifest, relative_key
+from compact_tree import CompactTree, TreeNode, NO_INDEX
+
+DEFAULT_INGEST_WORKERS: int = min(32, (os.cpu_count() or 1) + 4)
 
 
 class FileManager:
-    def __init__(self):
+    def __init__(self, blob_store: BlobStore | None = None, max_workers: int | None = None, ignore_rules: IgnoreRules | None = None):
         self.max_size_bytes: int = 4 * 1024 * 1024 * 1024  # 4GB
+        # prunes vendor/build directories and gitignored paths during the walk
+        self.ignore_rules: IgnoreRules = ignore_rules if ignore_rules else IgnoreRules()
+        # threads used to read and hash files in parallel, hashlib releases the GIL so hashing overlaps as well
+        self.max_workers: int = max_workers if max_workers else DEFAULT_INGEST_WORKERS
+        self.nested_zip_spool_bytes: int = 64 * 1024 * 1024  # nested zips larger than this are spooled to a temp file
         self.temp_extract_dir: str | None = None
-        self.file_tree: Node | None = None
-        self.file_objects: List[Dict[str, Any]] = []
-        self.binary_data_array: List[bytes] = []
+        # the tree is built straight into parallel arrays, file_tree is the anytree compatible view of its root
+        self.compact_tree: CompactTree | None = None
+        self.file_tree: TreeNode | None = None
+        self.file_count: int = 0
+        # file contents live in the content addressed blob store, the array only holds hashes indexed by binary_index
+        self.blob_store: BlobStore = blob_store if blob_store else BlobStore()
+        self.binary_data_array: BlobArray = BlobArray(self.blob_store)
         self.seen_hashes: Dict[str, int] = {} #added to keep track of files that are in the system already 
-
-    def set_previous_state(self, previous_binary_data: List[bytes], previous_hashes: Dict[str, int]) -> None:
+        # size / fingerprint prefilter deciding which files can skip the store write, see DedupIndex
+        self.dedup: DedupIndex = DedupIndex(self.blob_store)
+        # single walk index of the last load, handed on to the classifier and repo detector
+        self.scan_index: ScanIndex | None = None
+        # manifest of the previous session, files it still matches by size and mtime are not read again
+        self.manifest: IngestManifest | None = None
+        self.reused_files: int = 0
+        self.load_root: Path | None = None
+
+    def set_previous_state(
+        self,
+        previous_binary_data: List[bytes] | BlobArray,
+        previous_hashes: Dict[str, int],
+        manifest: IngestManifest | None = None,
+    ) -> None:
         """
         Loads the binary data and hash registry from a previous session.
-        This enables cross-session deduplication.
+        This enables cross-session deduplication. With the previous manifest, unchanged files reuse their stored blob.
         """
-        self.binary_data_array = previous_binary_data.copy()
+        if isinstance(previous_binary_data, BlobArray):
+            self.binary_data_array = previous_binary_data.copy()
+        else:
+            self.binary_data_array = BlobArray.from_bytes(self.blob_store, previous_binary_data)
         self.seen_hashes = previous_hashes.copy()
+        self.dedup = DedupIndex(self.blob_store, self.seen_hashes)
+        self.manifest = manifest
 
-    def load_from_filepath(self, filepath: str | Path, reset_state: bool = True) -> Dict[str, Any]:
+    def load_from_filepath(self, filepath: str | Path, reset_state: bool = True, scan_index: ScanIndex | None = None) -> Dict[str, Any]:
+        """
+        Loads a file, directory or zip into a tree. Pass the ScanIndex from validation to reuse its walk,
+        otherwise a new index is built while loading. The index is returned under 'scan_index'
+        and the ingest manifest of the load under 'manifest'.
+        """
         try:
-            self.file_objects = []
+            self.compact_tree = None
             self.file_tree = None
+            self.file_count = 0
+            self.reused_files = 0
             
             if reset_state:
-                self.binary_data_array = []
+                self.binary_data_array = BlobArray(self.blob_store)
                 self.seen_hashes = {}
+                self.dedup = DedupIndex(self.blob_store)
+                self.manifest = None
 
             # Accept both string and Path inputs
             path: Path = Path(filepath).resolve()
 
             if not path.exists():
                 raise FileNotFoundError(f"Path not found: {path}")
+            self.load_root = path
+
+            # Reuse the validation walk if it was for this path
+            if scan_index is None or scan_index.root.resolve() != path:
+                scan_index = ScanIndex(path)
+            scan_index.clear_nodes()
+            self.scan_index = scan_index
 
             # Create root node
             root_name: str = path.name if path.name else "root"
-            self.file_tree = Node(
-                root_name,
-                type="directory",
-                filepath=str(path),
-                is_repo_head=False,
-                created_at=datetime.now().isoformat()
-            )
+            self.compact_tree = CompactTree()
+            self.compact_tree.created_at = datetime.now().isoformat()
+            root: int = self.compact_tree.add(NO_INDEX, root_name, "directory", filepath=str(path))
+            self.file_tree = self.compact_tree.node(root)
+            self.scan_index.add_directory(self.file_tree)
 
             # Load files and build tree
-            self._load_files(path, self.file_tree)
+            self._load_files(path, root)
 
-            if not self.file_objects:
+            if not self.file_count:
                 return {
                     'status': 'error',
                     'message': 'No valid files found'
@@ -61,9 +112,11 @@ class FileManager:
 
             return {
                 'status': 'success',
-                'message': f'Loaded {len(self.file_objects)} file(s)',
+                'message': f'Loaded {self.file_count} file(s)',
                 'tree': self.file_tree,
-                'binary_data': self.binary_data_array
+                'binary_data': self.binary_data_array,
+                'scan_index': self.scan_index,
+                'manifest': self.build_manifest()
             }
 
         except Exception as e:
@@ -73,7 +126,12 @@ class FileManager:
                 'error_type': type(e).__name__
             }
 
-    def _load_files(self, path: Path, parent_node: Node) -> None:
+    @property
+    def file_objects(self) -> List[Dict[str, Any]]:
+        """file_data of every file of the last load, read from the tree"""
+        return self.compact_tree.file_objects() if self.compact_tree else []
+
+    def _load_files(self, path: Path, parent_node: int) -> None:
         # Handle single ZIP file directly
         if path.is_file() and path.suffix.lower() == '.zip':
             self._extract_and_load_zip(path, parent_node)
@@ -91,72 +149,121 @@ class FileManager:
 
             file_obj, binary_index = self._load_single_file(path)
             if file_obj:
-                Node(
-                    file_obj['filename'],
-                    parent=parent_node,
-                    type="file",
-                    binary_index=binary_index,
-                    file_data=file_obj,
-                    classification=None,
-                    extension=file_obj['extension'],
-                    last_modified=file_obj['last_modified']
-                )
-                self.file_objects.append(file_obj)
+                self._add_file_node(file_obj, binary_index, parent_node)
 
         # Handle directories (now includes empty ones)
         elif path.is_dir():
-            folder_nodes: Dict[str, Node] = {str(path): parent_node}
-
-            for subpath in sorted(path.rglob('*')):
+            folder_nodes: Dict[str, int] = {str(path): parent_node}
+
+            # Walk first and hand regular files to the pool so reads and hashing overlap across files.
+            # Entries are then consumed in walk order, so binary_index assignment and dedup via
+            # seen_hashes are identical to a serial load.
+            entries: List[Tuple[str, Path, ScanEntry]] = []
+            for scan_entry in self._walk_entries(path):
+                subpath: Path = scan_entry.path
                 if self._is_mac_artifact(subpath):
                     continue
 
                 # Ensure all subdirectories are represented, even if empty
-                if subpath.is_dir():
-                    self._get_or_create_folder_nodes(subpath, folder_nodes, path, parent_node)
+                if scan_entry.is_dir:
+                    entries.append(("directory", subpath, scan_entry))
                     continue
 
                 # Skip unsupported or invalid files
                 if self._is_rar_file(subpath):
                     continue
 
-                if subpath.stat().st_size > self.max_size_bytes:
+                if scan_entry.size > self.max_size_bytes:
                     continue
 
-                # Create or get parent folder node
-                parent_folder_node: Node = self._get_or_create_folder_nodes(
-                    subpath.parent, folder_nodes, path, parent_node
-                )
-
                 # If ZIP, extract instead of loading as binary
                 if subpath.suffix.lower() == '.zip':
-                    self._extract_and_load_zip(subpath, parent_folder_node)
+                    entries.append(("zip", subpath, scan_entry))
                     continue
 
-                # Load regular file
-                file_obj, binary_index  = self._load_single_file(subpath)
-                if file_obj:
-                    Node(
-                        file_obj['filename'],
-                        parent=parent_folder_node,
-                        type="file",
-                        binary_index=binary_index,
-                        file_data=file_obj,
-                        classification=None,
-                        extension=file_obj['extension'],
-                        last_modified=file_obj['last_modified']
+                entries.append(("file", subpath, scan_entry))
+
+            # Files the previous manifest still matches are taken from the store without being opened
+            reused: Dict[int, Tuple[str, int, str]] = {}
+            for kind, subpath, scan_entry in entries:
+                if kind == "file":
+                    read_result = self._reuse_from_manifest(subpath, scan_entry.size, scan_entry.mtime)
+                    if read_result:
+                        reused[id(scan_entry)] = read_result
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Likely duplicates are hashed without being written, everything else streams straight into the store
+                files: List[ScanEntry] = [
+                    scan_entry for kind, _, scan_entry in entries if kind == "file" and id(scan_entry) not in reused
+                ]
+                hash_first = self.dedup.plan([(f.path, f.size) for f in files], executor)
+                futures: Dict[int, Tuple[bool, Future]] = {}
+                for i, f in enumerate(files):
+                    task = self._hash_only if i in hash_first else self._read_and_hash
+                    futures[id(f)] = (i in hash_first, executor.submit(task, f.path, f.mtime))
+
+                for kind, subpath, scan_entry in entries:
+                    if kind == "directory":
+                        self._get_or_create_folder_nodes(subpath, folder_nodes, path, parent_node)
+                        continue
+
+                    # Create or get parent folder node
+                    parent_folder_node: int = self._get_or_create_folder_nodes(
+                        subpath.parent, folder_nodes, path, parent_node
                     )
-                    self.file_objects.append(file_obj)
-
 
+                    if kind == "zip":
+                        self._extract_and_load_zip(subpath, parent_folder_node)
+                        continue
+
+                    # Load regular file
+                    if id(scan_entry) in reused:
+                        read_result = reused[id(scan_entry)]
+                    else:
+                        hashed_only, future = futures[id(scan_entry)]
+                        read_result = future.result()
+                        if hashed_only and read_result and read_result[0] not in self.seen_hashes:
+                            # fingerprint matched but the content is new after all, store it under the hash already computed
+                            read_result = self._store_hashed(subpath, read_result, scan_entry.mtime)
+                    file_obj, binary_index = self._register_file(subpath, read_result)
+                    if file_obj:
+                        self._add_file_node(file_obj, binary_index, parent_folder_node)
+
+    def _walk_entries(self, path: Path) -> List[ScanEntry]:
+        """Returns the walk of path from the scan index, walking and recording it first if validation did not"""
+        if not self.scan_index.walked:
+            for subpath, is_dir in self.ignore_rules.walk(path):
+                if is_dir:
+                    self.scan_index.add_entry(subpath, True)
+                else:
+                    stat = subpath.stat()
+                    self.scan_index.add_entry(subpath, False, stat.st_size, stat.st_mtime)
+            self.scan_index.walked = True
+        return self.scan_index.entries
+
+    def _add_file_node(self, file_obj: Dict[str, Any], binary_index: int, parent_node: int) -> TreeNode:
+        index = self.compact_tree.add(
+            parent_node,
+            file_obj['filename'],
+            "file",
+            size=file_obj['size_bytes'],
+            last_modified=file_obj['last_modified'],
+            binary_index=binary_index,
+            file_hash=file_obj['file_hash'],
+            filepath=file_obj['filepath'],
+        )
+        node = self.compact_tree.node(index)
+        self.file_count += 1
+        self.scan_index.add_file(node)
+        return node
 
     def _get_or_create_folder_nodes(
         self,
         folder_path: Path,
-        folder_nodes: Dict[str, Node],
+        folder_nodes: Dict[str, int],
         root_path: Path,
-        root_node: Node,
-    ) -> Node:
+        root_node: int,
+    ) -> int:
         folder_str: str = str(folder_path)
 
         if folder_str in folder_nodes:
@@ -165,131 +272,234 @@ class FileManager:
         if folder_path == root_path:
             return root_node
 
-        parent_folder_node: Node = self._get_or_create_folder_nodes(
+        parent_folder_node: int = self._get_or_create_folder_nodes(
             folder_path.parent, folder_nodes, root_path, root_node
         )
 
-        folder_node: Node = Node(
-            folder_path.name,
-            parent=parent_folder_node,
-            type="directory",
-            filepath=folder_str,
-            is_repo_head=False
-        )
+        folder_node: int = self.compact_tree.add(parent_folder_node, folder_path.name, "directory", filepath=folder_str)
         folder_nodes[folder_str] = folder_node
+        self.scan_index.add_directory(self.compact_tree.node(folder_node))
 
         return folder_node
 
 
     def _load_single_file(self, file_path: Path) -> Tuple[Dict[str, Any] | None, int | None]:
+        stat = file_path.stat()
+        read_result = self._reuse_from_manifest(file_path, stat.st_size, stat.st_mtime)
+        return self._register_file(file_path, read_result or self._read_and_hash(file_path, stat.st_mtime))
+
+    def _reuse_from_manifest(self, file_path: Path, size_bytes: int, mtime: float | str) -> Tuple[str, int, str] | None:
+        """
+        Returns (hash, size, last_modified) from the previous manifest if the file's size and mtime still match
+        and its blob is in the store, None if the file has to be read.
+        """
+        if not self.manifest:
+            return None
+        last_modified = mtime if isinstance(mtime, str) else datetime.fromtimestamp(mtime).isoformat()
+        entry = self.manifest.lookup(relative_key(self.load_root, file_path), size_bytes, last_modified)
+        if entry is None or not self.blob_store.has(entry.file_hash):
+            return None
+        self.reused_files += 1
+        return entry.file_hash, entry.size_bytes, entry.last_modified
+
+    def build_manifest(self) -> IngestManifest:
+        """Manifest of the last load, persisted with the fileset so the next update can skip unchanged files"""
+        return IngestManifest.build(self.load_root, self.file_objects, self.binary_data_array)
+
+    def _read_and_hash(self, file_path: Path, mtime: float | None = None) -> Tuple[str, int, str] | None:
+        """
+        Streams a file into the blob store and returns (hash, size, last_modified).
+        mtime comes from the scan index when available, saving a second stat.
+        Safe to run from worker threads, touches no FileManager state.
+        """
         try:
-            with open(file_path, 'rb') as f:
-                binary_data: bytes = f.read()
-                
-                #generate hash of content
-                file_hash = hashlib.sha256(binary_data).hexdigest()
-                
-                #check if hash already exists
-                if file_hash in self.seen_hashes:
-                    #duplicate found: return existing index
-                    binary_index = self.seen_hashes[file_hash]
-                else:
-                    #new content: add to array and registry
-                    binary_index = len(self.binary_data_array)
-                    self.binary_data_array.append(binary_data)
-                    self.seen_hashes[file_hash] = binary_index
-                
-                last_modified = datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-
-                file_obj = {
-                    'filename': file_path.name,
-                    'filepath': str(file_path.absolute()),
-                    'size_bytes': len(binary_data),
-                    'extension': file_path.suffix.lower(),
-                    'binary_index': binary_index, #points to either new or existing data
-                    'last_modified': last_modified,
-                    'file_hash': file_hash
-                }
-                return file_obj, binary_index
+            #stream content into the blob store, hashing as we go
+            file_hash, size_bytes = self.blob_store.put_file(file_path)
+            if mtime is None:
+                mtime = file_path.stat().st_mtime
+            last_modified = datetime.fromtimestamp(mtime).isoformat()
+            return file_hash, size_bytes, last_modified
         except Exception as e:
             print(f"Warning: could not load {file_path}: {e}")
-            return None, None
+            return None
 
-    def _extract_and_load_zip(self, zip_path: Path, parent_node: Node) -> None:
+    def _hash_only(self, file_path: Path, mtime: float | None = None) -> Tuple[str, int, str] | None:
+        """Like _read_and_hash but only hashes the file, for likely duplicates that need no store write"""
+        try:
+            file_hash = sha256_file(file_path)
+            stat = file_path.stat()
+            mtime = stat.st_mtime if mtime is None else mtime
+            return file_hash, stat.st_size, datetime.fromtimestamp(mtime).isoformat()
+        except Exception as e:
+            print(f"Warning: could not load {file_path}: {e}")
+            return None
 
-        # Create a temporary directory for extraction
-        temp_extract_dir = tempfile.mkdtemp()
-        temp_path: Path = Path(temp_extract_dir)
+    def _store_hashed(self, file_path: Path, read_result: Tuple[str, int, str], mtime: float | None = None) -> Tuple[str, int, str] | None:
+        """Copies a file _hash_only already hashed into the blob store without hashing it again"""
+        file_hash, size_bytes, _ = read_result
+        try:
+            _, stored_size = self.blob_store.put_file(file_path, file_hash)
+        except Exception as e:
+            print(f"Warning: could not load {file_path}: {e}")
+            return None
+        if stored_size != size_bytes:
+            # changed since it was hashed, its stored copy no longer matches file_hash
+            self.blob_store.discard(file_hash)
+            return self._read_and_hash(file_path, mtime)
+        return read_result
 
+    def _register_file(self, file_path: Path, read_result: Tuple[str, int, str] | None) -> Tuple[Dict[str, Any] | None, int | None]:
+        """
+        Assigns a binary_index to a hashed file, deduplicating against seen_hashes.
+        Files on disk and zip members (by their virtual path) both go through here.
+        """
+        if read_result is None:
+            return None, None
+        file_hash, size_bytes, last_modified = read_result
+
+        #check if hash already exists
+        if file_hash in self.seen_hashes:
+            #duplicate found: return existing index
+            binary_index = self.seen_hashes[file_hash]
+        else:
+            #new content: add to array and registry
+            binary_index = self.binary_data_array.append_hash(file_hash)
+            self.seen_hashes[file_hash] = binary_index
+            self.dedup.add_known(file_hash, size_bytes)
+
+        file_obj = {
+            'filename': file_path.name,
+            'filepath': str(file_path.absolute()),
+            'size_bytes': size_bytes,
+            'extension': file_path.suffix.lower(),
+            'binary_index': binary_index, #points to either new or existing data
+            'last_modified': last_modified,
+            'file_hash': file_hash
+        }
+        return file_obj, binary_index
+
+    def _extract_and_load_zip(self, zip_path: Path, parent_node: int) -> None:
+        """
+        Loads a ZIP file by streaming its members straight into the blob store.
+        Nothing is extracted to disk, the tree is built from the archive's internal paths.
+        """
         try:
-            # Extract the ZIP
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_path)
-
-            # Create a ZIP node (unless parent_node is already the ZIP root)
-            if parent_node.name != zip_path.name:
-                zip_node = Node(
-                    zip_path.name,
-                    parent=parent_node,
-                    type="zip",
-                    filepath=str(zip_path),
-                    is_repo_head=False
-                )
-            else:
-                zip_node = parent_node
+                self._load_zip_archive(zip_ref, zip_path.name, str(zip_path), parent_node)
+        except zipfile.BadZipFile:
+            raise ValueError(f"Invalid or corrupted ZIP file: {zip_path}")
 
-            # Keep track of folder nodes in this ZIP extraction
-            folder_nodes = {str(temp_path): zip_node}
+    def _load_zip_archive(self, zip_ref: zipfile.ZipFile, zip_name: str, zip_filepath: str, parent_node: int) -> None:
+        # Create a ZIP node (unless parent_node is already the ZIP root)
+        if self.compact_tree.name_of(parent_node) != zip_name:
+            zip_node = self.compact_tree.add(parent_node, zip_name, "zip", filepath=zip_filepath)
+            self.scan_index.add_directory(self.compact_tree.node(zip_node))
+        else:
+            zip_node = parent_node
+
+        # Members are addressed by a virtual path under the zip's own path, these never exist on disk
+        root_path: Path = Path(zip_filepath)
+        folder_nodes: Dict[str, int] = {str(root_path): zip_node}
+
+        # Sort by path components so node order matches a sorted directory walk
+        members: List[Tuple[PurePosixPath, zipfile.ZipInfo]] = []
+        for info in zip_ref.infolist():
+            # drop empty, '.' and '..' components so members always stay under the zip node
+            parts = [part for part in PurePosixPath(info.filename).parts if part not in ('', '.', '..', '/')]
+            if parts:
+                members.append((PurePosixPath(*parts), info))
+        members.sort(key=lambda member: member[0].parts)
+
+        # Drop ignored members and everything under ignored directories
+        pruned = self.ignore_rules.prune_flat(
+            [(member_path.parts, info.is_dir()) for member_path, info in members],
+            lambda parts: self._read_zip_text(zip_ref, members, parts),
+        )
+        members = [member for member in members if member[0].parts not in pruned]
 
-            # Walk through all files and folders
-            for file_path in sorted(temp_path.rglob('*')):
-                if self._is_mac_artifact(file_path):
-                    continue  # skip macOS artifacts
+        for member_path, info in members:
+            if info.is_dir():
+                continue  # directories handled when creating folder nodes
 
-                if file_path.is_dir():
-                    continue  # directories handled when creating folder nodes
+            if self._is_mac_artifact(member_path):
+                continue  # skip macOS artifacts
 
-                if self._is_rar_file(file_path):
-                    continue  # skip RAR files
+            if self._is_rar_file(member_path):
+                continue  # skip RAR files
 
-                if file_path.stat().st_size > self.max_size_bytes:
-                    continue  # skip oversized files
+            if info.file_size > self.max_size_bytes:
+                continue  # skip oversized files
 
-                # Ensure parent folder node exists
-                parent_folder_node: Node = self._get_or_create_folder_nodes(
-                    file_path.parent, folder_nodes, temp_path, zip_node
-                )
+            virtual_path: Path = root_path.joinpath(*member_path.parts)
 
-                # Handle nested ZIP recursively
-                if file_path.suffix.lower() == '.zip':
-                    self._extract_and_load_zip(file_path, parent_folder_node)
-                    continue
+            # Ensure parent folder node exists
+            parent_folder_node: int = self._get_or_create_folder_nodes(
+                virtual_path.parent, folder_nodes, root_path, zip_node
+            )
 
-                # Load regular file
-                file_obj, binary_index = self._load_single_file(file_path)
-                if file_obj:
-                    Node(
-                        file_obj['filename'],
-                        parent=parent_folder_node,
-                        type="file",
-                        binary_index=binary_index,
-                        file_data=file_obj,
-                        extension=file_obj['extension'],
-                        classification=None,
-                        last_modified=file_obj['last_modified']
-                    )
-                    self.file_objects.append(file_obj)
+            # Handle nested ZIP recursively without touching disk unless it is too large for memory
+            if member_path.suffix.lower() == '.zip':
+                try:
+                    with self._open_nested_zip(zip_ref, info) as nested_file:
+                        with zipfile.ZipFile(nested_file, 'r') as nested_ref:
+                            self._load_zip_archive(nested_ref, member_path.name, str(virtual_path), parent_folder_node)
+                except zipfile.BadZipFile:
+                    raise ValueError(f"Invalid or corrupted ZIP file: {virtual_path}")
+                continue
+
+            # Load regular file
+            file_obj, binary_index = self._load_zip_member(zip_ref, info, virtual_path)
+            if file_obj:
+                self._add_file_node(file_obj, binary_index, parent_folder_node)
+
+    def _read_zip_text(self, zip_ref: zipfile.ZipFile, members: List[Tuple[PurePosixPath, zipfile.ZipInfo]], parts: Tuple[str, ...]) -> str | None:
+        """Reads a small text member (e.g. a .gitignore) from the archive"""
+        for member_path, info in members:
+            if member_path.parts == parts:
+                try:
+                    return zip_ref.read(info).decode('utf-8', errors='ignore')
+                except Exception as e:
+                    print(f"Warning: could not read {member_path}: {e}")
+                    return None
+        return None
 
-        except zipfile.BadZipFile:
-            raise ValueError(f"Invalid or corrupted ZIP file: {zip_path}")
+    def _open_nested_zip(self, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> BinaryIO:
+        """Opens a nested zip member in memory, spilling to a temp file once it exceeds the spool limit"""
+        if info.file_size <= self.nested_zip_spool_bytes:
+            return BytesIO(zip_ref.read(info))
+
+        spooled = tempfile.SpooledTemporaryFile(max_size=self.nested_zip_spool_bytes)
+        with zip_ref.open(info) as member:
+            shutil.copyfileobj(member, spooled)
+        spooled.seek(0)
+        return spooled
 
-        finally:
-            # Clean up the temporary extraction folder
-            if Path(temp_extract_dir).exists():
-                shutil.rmtree(temp_extract_dir)
+    def _load_zip_member(
+        self,
+        zip_ref: zipfile.ZipFile,
+        info: zipfile.ZipInfo,
+        virtual_path: Path,
+    ) -> Tuple[Dict[str, Any] | None, int | None]:
+        try:
+            #use the timestamp recorded in the archive so re-uploads of the same zip are stable
+            last_modified = datetime(*info.date_time).isoformat()
+
+            reused = self._reuse_from_manifest(virtual_path, info.file_size, last_modified)
+            if reused:
+                file_hash, size_bytes, _ = reused
+            else:
+                #stream member content into the blob store, hashing as we go
+                with zip_ref.open(info) as member:
+                    file_hash, size_bytes = self.blob_store.put_stream(member)
+
+            #the virtual path sits under the resolved zip path, so it registers like a file on disk
+            return self._register_file(virtual_path, (file_hash, size_bytes, last_modified))
+        except Exception as e:
+            print(f"Warning: could not load {virtual_path}: {e}")
+            return None, None
 
 
-    def get_binary_array(self, filepath: str | Path | None = None ) -> list[bytes] | None:
+    def get_binary_array(self, filepath: str | Path | None = None ) -> BlobArray | None:
         try:
             # if function is called with a filepath
             if filepath:
@@ -311,11 +521,11 @@ class FileManager:
             return None
 
 
-    def _is_rar_file(self, path: Path) -> bool:
+    def _is_rar_file(self, path: Path | PurePosixPath) -> bool:
         return path.suffix.lower() in ['.rar', '.r00', '.r01']
 
     # Helper method to determine if file is a mac artifact
-    def _is_mac_artifact(self, path: Path) -> bool:
+    def _is_mac_artifact(self, path: Path | PurePosixPath) -> bool:
         return (
             "__MACOSX" in path.parts
             or path.name.startswith("._")
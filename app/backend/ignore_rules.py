@@ -0,0 +1,266 @@
+import logging
+import os
+import re
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Collection, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+GIT_DIR: str = ".git"
+GITIGNORE_FILE: str = ".gitignore"
+
+# Vendor directories that are pruned from every walk unless the user turns the defaults off
+DEFAULT_IGNORE_PATTERNS: List[str] = [
+    "node_modules/",
+    "venv/",
+    ".venv/",
+    "__pycache__/",
+    ".next/",
+]
+
+# Build output directories, only pruned next to a manifest of a build tool that writes them
+# so that source packages with the same name (e.g. a Python package called build) are kept
+BUILD_OUTPUT_DIRS: Dict[str, FrozenSet[str]] = {
+    "build": frozenset({"setup.py", "setup.cfg", "pyproject.toml", "package.json", "build.gradle", "build.gradle.kts", "CMakeLists.txt"}),
+    "dist": frozenset({"setup.py", "setup.cfg", "pyproject.toml", "package.json"}),
+    "target": frozenset({"Cargo.toml", "pom.xml", "build.sbt"}),
+}
+
+
+def _translate(pattern: str) -> "re.Pattern[str]":
+    """Translate a gitignore glob into a regex. '*' and '?' never match '/', '**' matches across directories."""
+    i, n = 0, len(pattern)
+    res = ""
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**/", i):
+                res += "(?:.*/)?"
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                res += ".*"
+                i += 2
+                continue
+            res += "[^/]*"
+        elif c == "?":
+            res += "[^/]"
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                res += "\\["
+            else:
+                body = pattern[i + 1:j].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                res += f"[{body}]"
+                i = j + 1
+                continue
+        else:
+            res += re.escape(c)
+        i += 1
+    return re.compile(res + r"\Z")
+
+
+@dataclass(frozen=True)
+class IgnorePattern:
+    """
+    A single gitignore style rule:
+    - base: path parts of the directory the rule was declared in (empty for built-in and user rules)
+    - anchored: rule contains a '/' and is matched against the path relative to base, otherwise only the name is matched
+    """
+    regex: "re.Pattern[str]"
+    negate: bool
+    dir_only: bool
+    anchored: bool
+    base: Tuple[str, ...] = ()
+
+    @classmethod
+    def parse(cls, line: str, base: Tuple[str, ...] = ()) -> Optional["IgnorePattern"]:
+        """Parse one gitignore line, returns None for blank lines and comments"""
+        line = line.rstrip("\r\n").rstrip()
+        if not line or line.startswith("#"):
+            return None
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]  # escaped leading '#' or '!'
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        anchored = "/" in line
+        return cls(_translate(line.lstrip("/")), negate, dir_only, anchored, tuple(base))
+
+    def matches(self, parts: Tuple[str, ...], is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if parts[:len(self.base)] != self.base:
+            return False
+        rel = parts[len(self.base):]
+        if not rel:
+            return False
+        target = "/".join(rel) if self.anchored else rel[-1]
+        return self.regex.match(target) is not None
+
+
+class IgnoreRules:
+    """
+    Decides which paths are pruned while walking an upload.
+    Combines the built-in vendor patterns and build output directories, user patterns from ConfigManager and .gitignore
+    files found inside git repositories. Ignored directories are never descended into, unreadable ones are skipped.
+    .git directories are never pruned since RepositoryProcessor rebuilds repositories from them.
+    """
+
+    def __init__(self, patterns: Optional[Iterable[str]] = None, use_defaults: bool = True, honour_gitignore: bool = True) -> None:
+        lines: List[str] = (DEFAULT_IGNORE_PATTERNS if use_defaults else []) + list(patterns or [])
+        self.rules: List[IgnorePattern] = [rule for rule in (IgnorePattern.parse(line) for line in lines) if rule]
+        self.build_output_dirs: Dict[str, FrozenSet[str]] = BUILD_OUTPUT_DIRS if use_defaults else {}
+        self.honour_gitignore: bool = honour_gitignore
+
+    @classmethod
+    def from_config(cls, config_manager) -> "IgnoreRules":
+        """
+        Build rules from user preferences:
+        - ignore_patterns: list of extra gitignore style patterns
+        - use_default_ignore_patterns: set to false to disable the built-in patterns
+        - honour_gitignore: set to false to ignore .gitignore files
+        """
+        prefs = getattr(config_manager, "preferences", None)
+        if not isinstance(prefs, dict):
+            return cls()
+
+        patterns = prefs.get("ignore_patterns", [])
+        if not isinstance(patterns, list):
+            patterns = []
+
+        return cls(
+            patterns=[pattern for pattern in patterns if isinstance(pattern, str)],
+            use_defaults=prefs.get("use_default_ignore_patterns", True) is not False,
+            honour_gitignore=prefs.get("honour_gitignore", True) is not False,
+        )
+
+    def parse_gitignore(self, text: str, base: Tuple[str, ...]) -> List[IgnorePattern]:
+        """Parse the contents of a .gitignore declared in the directory with path parts base"""
+        return [rule for rule in (IgnorePattern.parse(line, base) for line in text.splitlines()) if rule]
+
+    def is_ignored(
+        self,
+        parts: Tuple[str, ...],
+        is_dir: bool,
+        scoped_rules: Iterable[IgnorePattern] = (),
+        siblings: Collection[str] = (),
+    ) -> bool:
+        """
+        Check a single path (given as parts relative to the walk root). Later rules override earlier ones.
+        siblings are the names next to the path, a build output directory is only ignored next to its build manifest.
+        """
+        if GIT_DIR in parts:
+            return False
+
+        markers = self.build_output_dirs.get(parts[-1]) if is_dir else None
+        ignored = markers is not None and not markers.isdisjoint(siblings)
+        for rule in chain(self.rules, scoped_rules):
+            if rule.matches(parts, is_dir):
+                ignored = not rule.negate
+        return ignored
+
+    def walk(self, root: Path) -> Iterator[Tuple[Path, bool]]:
+        """
+        Yields (path, is_dir) for everything under root in the same order as sorted(root.rglob('*')),
+        skipping ignored entries without descending into ignored directories.
+        """
+        yield from self._walk(Path(root), (), [], False)
+
+    def _walk(self, directory: Path, parts: Tuple[str, ...], scoped_rules: List[IgnorePattern], in_repo: bool) -> Iterator[Tuple[Path, bool]]:
+        # like rglob, a directory that cannot be listed is skipped instead of failing the whole walk
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning("Skipping unreadable directory %s: %s", directory, e)
+            return
+
+        names: Set[str] = {entry.name for entry in entries}
+        if GIT_DIR in names:
+            in_repo = True
+
+        # .gitignore files only apply inside detected repositories, and are scoped to the directory they live in
+        if self.honour_gitignore and in_repo and GITIGNORE_FILE in names and GIT_DIR not in parts:
+            try:
+                text = (directory / GITIGNORE_FILE).read_text(encoding="utf-8", errors="ignore")
+                scoped_rules = scoped_rules + self.parse_gitignore(text, parts)
+            except OSError as e:
+                logger.warning("Could not read %s: %s", directory / GITIGNORE_FILE, e)
+
+        for entry in entries:
+            entry_parts = parts + (entry.name,)
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if self.is_ignored(entry_parts, is_dir, scoped_rules, names):
+                continue
+
+            entry_path = Path(entry.path)
+            yield entry_path, is_dir
+
+            # like rglob, do not follow symlinked directories
+            if is_dir and not entry.is_symlink():
+                yield from self._walk(entry_path, entry_parts, scoped_rules, in_repo)
+
+    def prune_flat(
+        self,
+        entries: Iterable[Tuple[Tuple[str, ...], bool]],
+        read_text: Callable[[Tuple[str, ...]], Optional[str]],
+    ) -> Set[Tuple[str, ...]]:
+        """
+        Pruning for flat listings such as zip archives, where there is no directory walk to cut short.
+        Takes (parts, is_dir) entries and a callback that returns the text of a member,
+        returns the set of entry parts that are ignored or live under an ignored directory.
+        """
+        entries = list(entries)
+
+        # names in each directory, including directories only implied by the paths of their members
+        children: Dict[Tuple[str, ...], Set[str]] = {}
+        for parts, _ in entries:
+            for i in range(len(parts)):
+                children.setdefault(parts[:i], set()).add(parts[i])
+
+        # repository roots are the parents of any .git component
+        repo_roots: Set[Tuple[str, ...]] = {
+            parts[:i] for parts, _ in entries for i, part in enumerate(parts) if part == GIT_DIR
+        }
+
+        scoped_rules: List[IgnorePattern] = []
+        if self.honour_gitignore and repo_roots:
+            for parts, is_dir in sorted(entries):
+                if is_dir or parts[-1] != GITIGNORE_FILE or GIT_DIR in parts:
+                    continue
+                base = parts[:-1]
+                if any(base[:len(root)] == root for root in repo_roots):
+                    text = read_text(parts)
+                    if text:
+                        scoped_rules.extend(self.parse_gitignore(text, base))
+
+        dir_decisions: Dict[Tuple[str, ...], bool] = {}
+
+        def dir_ignored(dir_parts: Tuple[str, ...]) -> bool:
+            if dir_parts not in dir_decisions:
+                dir_decisions[dir_parts] = (
+                    (len(dir_parts) > 1 and dir_ignored(dir_parts[:-1]))
+                    or self.is_ignored(dir_parts, True, scoped_rules, children.get(dir_parts[:-1], ()))
+                )
+            return dir_decisions[dir_parts]
+
+        pruned: Set[Tuple[str, ...]] = set()
+        for parts, is_dir in entries:
+            if (len(parts) > 1 and dir_ignored(parts[:-1])) or self.is_ignored(parts, is_dir, scoped_rules, children.get(parts[:-1], ())):
+                pruned.add(parts)
+        return pruned
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from pathlib import Path, PurePath
+from typing import Any, Dict, Iterable, List, Optional
+from cache.blob_store import BlobArray, BlobStore
+
+
+@dataclass
+class ManifestEntry:
+    """What an earlier load recorded for one file, keyed in the manifest by its path relative to the load root"""
+    size_bytes: int
+    last_modified: str
+    file_hash: str
+    binary_index: int
+
+
+class IngestManifest:
+    """
+    Per-analysis record of an ingest, persisted alongside the fileset so an update only reads what changed:
+    - files: relative path -> (size, last_modified, hash, binary_index) for every file in the tree
+    - blob_hashes: the hash at each binary_index of the fileset, enough to rebuild the BlobArray
+      without unpickling the stored file data as long as the blobs are still in the store
+    A file whose size and last_modified match its entry is not opened again, its stored blob is reused.
+    """
+
+    def __init__(self, files: Dict[str, ManifestEntry] | None = None, blob_hashes: List[Optional[str]] | None = None) -> None:
+        self.files: Dict[str, ManifestEntry] = dict(files) if files else {}
+        self.blob_hashes: List[Optional[str]] = list(blob_hashes) if blob_hashes else []
+
+    @classmethod
+    def build(cls, root: Path, file_objects: Iterable[Dict[str, Any]], binary_data: BlobArray | None = None) -> "IngestManifest":
+        """Builds the manifest of a finished load from FileManager's file objects and binary array"""
+        manifest = cls(blob_hashes=binary_data.hashes if isinstance(binary_data, BlobArray) else None)
+        for file_obj in file_objects:
+            manifest.files[relative_key(root, file_obj['filepath'])] = ManifestEntry(
+                size_bytes=file_obj['size_bytes'],
+                last_modified=file_obj['last_modified'],
+                file_hash=file_obj['file_hash'],
+                binary_index=file_obj['binary_index'],
+            )
+        return manifest
+
+    def lookup(self, rel_path: str, size_bytes: int, last_modified: str) -> Optional[ManifestEntry]:
+        """Returns the entry for rel_path if the file looks unchanged, None if it is new or modified"""
+        entry = self.files.get(rel_path)
+        if entry is None or entry.size_bytes != size_bytes or entry.last_modified != last_modified:
+            return None
+        return entry
+
+    def blob_array(self, store: BlobStore) -> Optional[BlobArray]:
+        """Rebuilds the fileset's BlobArray from the store, None if any blob is missing and the stored data is needed"""
+        if not self.blob_hashes:
+            return None
+        if not all(file_hash is None or store.has(file_hash) for file_hash in self.blob_hashes):
+            return None
+        return BlobArray(store, self.blob_hashes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'files': {
+                rel_path: [entry.size_bytes, entry.last_modified, entry.file_hash, entry.binary_index]
+                for rel_path, entry in self.files.items()
+            },
+            'blob_hashes': self.blob_hashes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any] | None) -> "IngestManifest":
+        if not data:
+            return cls()
+        files = {rel_path: ManifestEntry(*values) for rel_path, values in data.get('files', {}).items()}
+        return cls(files, data.get('blob_hashes'))
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+
+def relative_key(root: Path, filepath: str | PurePath) -> str:
+    """Manifest key of a file: its posix path relative to the load root, or its name if it is the root itself"""
+    path = Path(filepath)
+    try:
+        rel = path.relative_to(root)
+    except ValueError:
+        return path.name
+    return rel.as_posix() if rel.parts else path.name
@@ -1,6 +1,8 @@
 from uuid import UUID
 from pathlib import Path
 from typing import Set
+from ignore_rules import IgnoreRules
+from scan_index import ScanIndex
 
 #Global variable defining accepted image formats, both functionality and prompts will update automatically if changed.
 accepted_formats:Set[str] = [".apng",".avif",".gif",".jpeg",".jpg",".svg",".webp"]
@@ -35,33 +37,35 @@ def is_valid_path(filepath:str)->Path:
     return path
 
 
-def validate_analysis_path(filepath: str) -> Path:
+def validate_analysis_path(filepath: str, ignore_rules: IgnoreRules | None = None) -> Path:
     """
     Summary:
         Validates user's input path for analysis. Input path must be a valid filepath. Does consider design constraints i.e: Cannot contain files more then 4GB and must not be a rar file (zip file allowed).
+        Directories pruned by the ignore rules (node_modules, venv etc.) are not loaded so they do not count towards the limit.
     Params: 
         - User inputted filepath as string
+        - Optional IgnoreRules, defaults to the built-in patterns
     Return:
         os.path object
     """
+    return scan_analysis_path(filepath, ignore_rules).root
+
+
+def scan_analysis_path(filepath: str, ignore_rules: IgnoreRules | None = None) -> ScanIndex:
+    """
+    Summary:
+        Same validation as validate_analysis_path, but returns the ScanIndex of the walk used for the size check
+        so FileManager can load the path without walking it again.
+    Params: 
+        - User inputted filepath as string
+        - Optional IgnoreRules, defaults to the built-in patterns
+    Return:
+        ScanIndex whose root is the validated path
+    """
     max_size_bytes: int = 4 * 1024 * 1024 * 1024  # 4gb limit
 
     def _is_rar_file(path: Path) -> bool:
         return path.suffix.lower() in ['.rar', '.r00', '.r01']
-    
-    def _get_directory_size(path: Path) -> int:
-        total: int = 0
-        try:
-            for file_path in path.rglob('*'):
-                if file_path.is_file():
-                    try:
-                        total += file_path.stat().st_size
-                    except (OSError, PermissionError) as e:
-                        print(f"Cannot access file {file_path}: {e}")
-                        continue
-        except (OSError, PermissionError) as e:
-            raise ValueError(f"Cannot access directory: {e}")
-        return total
 
     try:
         path:Path = is_valid_path(filepath)
@@ -82,11 +86,15 @@ def validate_analysis_path(filepath: str) -> Path:
             raise ValueError(f"Cannot access file: {e}")
 
     elif path.is_dir():
-        total_size: int = _get_directory_size(path)
-        if total_size > max_size_bytes:
-            size_gb: float = total_size / (1024 ** 3)
+        try:
+            index: ScanIndex = ScanIndex.scan(path, ignore_rules)
+        except (OSError, PermissionError) as e:
+            raise ValueError(f"Cannot access directory: {e}")
+        if index.total_size > max_size_bytes:
+            size_gb: float = index.total_size / (1024 ** 3)
             raise ValueError(f"Folder too large: {size_gb:.2f}GB (max 4GB)")   
-    return path
+        return index
+    return ScanIndex(path)
 
 def validate_thumbnail_path(filepath:str)->Path:
     """
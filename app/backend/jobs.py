@@ -0,0 +1,267 @@
+"""
+Background jobs for the long running endpoints (extract, commit, resume generation), so CPU heavy pipeline work
+never runs on the event loop. Jobs run on a bounded pool of threads or processes, the endpoint answers 202 with
+the job id right away and clients poll GET /jobs/{job_id} for the outcome.
+A job submitted as cancellable gets a cancel_event and calls checkpoint(cancel_event) between its stages, so a
+cancelled job stops at its next checkpoint instead of running to completion.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# "thread" or "process", processes keep the API responsive even while a job holds the GIL
+JOB_EXECUTOR: str = os.environ.get('JOB_EXECUTOR', 'thread')
+JOB_WORKERS: int = int(os.environ.get('JOB_WORKERS', 2))
+# jobs that may wait for a free worker, submitting more is refused with QueueFullError
+JOB_MAX_QUEUED: int = int(os.environ.get('JOB_MAX_QUEUED', 16))
+# finished jobs are forgotten this many seconds after they ended
+JOB_RESULT_TTL: float = float(os.environ.get('JOB_RESULT_TTL', 3600))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLING = "cancelling"
+CANCELLED = "cancelled"
+
+
+class QueueFullError(RuntimeError):
+    """Raised by submit when JOB_MAX_QUEUED jobs are already waiting"""
+
+
+class JobCancelled(BaseException):
+    """
+    Raised by checkpoint inside a job function whose job was cancelled. A BaseException, like
+    asyncio.CancelledError, so the `except Exception` handlers of the pipeline do not swallow it.
+    """
+
+
+def checkpoint(cancel_event: Optional[Any]) -> None:
+    """Raises JobCancelled once cancel_event is set, a no-op for jobs that were not submitted as cancellable"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled()
+
+
+class JobFailed(Exception):
+    """Raised by a job function for a failure with the HTTP status the endpoint used to answer it with"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class JobResult:
+    """What a job function returns, the response its endpoint used to send"""
+    content: Any
+    status_code: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    key: Optional[str]
+    future: Future
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    cancelled: bool = False
+    cancel_event: Optional[Any] = None
+    result: Optional[JobResult] = None
+    error: Optional[JobFailed] = None
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            #a cancelled job keeps running until its function returns or reaches a checkpoint
+            return CANCELLED if self.finished is not None else CANCELLING
+        if self.finished is not None:
+            return FAILED if self.error is not None else SUCCEEDED
+        return RUNNING if self.future.running() else QUEUED
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status of the job as GET /jobs/{job_id} reports it"""
+        data: Dict[str, Any] = {"job_id": self.job_id, "kind": self.kind, "status": self.status}
+        if self.result is not None and not self.cancelled:
+            data.update(status_code=self.result.status_code, result=self.result.content, headers=self.result.headers)
+        if self.error is not None:
+            data.update(status_code=self.error.status_code, error=self.error.detail)
+        return data
+
+
+class JobRunner:
+    """
+    Runs job functions on a pool of max_workers threads or processes (executor "thread" or "process").
+    Functions given to a process pool and their arguments and results must be picklable.
+    """
+
+    def __init__(self, executor: str = JOB_EXECUTOR, max_workers: int = JOB_WORKERS, max_queued: int = JOB_MAX_QUEUED):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown job executor: {executor}")
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor: Optional[Executor] = None
+        self._manager: Optional[Any] = None
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.executor_kind == "process"
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[..., JobResult],
+        *args: Any,
+        key: Optional[str] = None,
+        on_success: Optional[Callable[[JobResult], JobResult]] = None,
+        on_failure: Optional[Callable[[JobFailed], None]] = None,
+        cancellable: bool = False,
+    ) -> Job:
+        """
+        Queues fn(*args) and returns its Job. key (e.g. an analysis_id) lets cancel_key find the job,
+        on_success runs in this process on the result of a job that was not cancelled and may replace it,
+        on_failure on the error of a job that failed and was not cancelled.
+        A cancellable job is called as fn(*args, cancel_event=...) and is expected to pass the event to checkpoint.
+        Raises QueueFullError when max_queued jobs are already waiting for a worker.
+        """
+        with self._lock:
+            self._forget_finished()
+            #a cancelled job keeps its worker until its function returns
+            active = sum(1 for job in self._jobs.values() if not job.future.done())
+            waiting = max(0, active - self.max_workers)
+            if waiting >= self.max_queued:
+                raise QueueFullError(f"{waiting} jobs are already waiting for a worker")
+            cancel_event = self._event() if cancellable else None
+            if cancel_event is not None:
+                future = self._pool().submit(fn, *args, cancel_event=cancel_event)
+            else:
+                future = self._pool().submit(fn, *args)
+            job = Job(job_id=str(uuid.uuid4()), kind=kind, key=key, future=future, cancel_event=cancel_event)
+            self._jobs[job.job_id] = job
+        future.add_done_callback(lambda f: self._finish(job, on_success, on_failure))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Blocks until the job ended (or timeout passed) and returns it"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        deadline = None if timeout is None else time.time() + timeout
+        while job.finished is None:
+            if deadline is not None and time.time() >= deadline:
+                break
+            time.sleep(0.01)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a job that has not ended yet. A queued job never runs. A running cancellable job stops at its
+        next checkpoint, any other running job runs to completion, and the outcome of either is discarded.
+        Returns whether there was such a job.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished is not None or job.cancelled:
+                return False
+            job.cancelled = True
+            if job.cancel_event is not None:
+                job.cancel_event.set()
+            job.finished = time.time() if job.future.cancel() else None
+            return True
+
+    def cancel_key(self, key: str) -> int:
+        """Cancels every unfinished job submitted with key, returns how many"""
+        with self._lock:
+            job_ids = [job.job_id for job in self._jobs.values() if job.key == key]
+        return sum(self.cancel(job_id) for job_id in job_ids)
+
+    def stopping(self, key: str) -> List[Job]:
+        """Cancelled jobs with job_id or key key whose function is still running"""
+        with self._lock:
+            return [
+                job for job in self._jobs.values()
+                if key in (job.job_id, job.key) and job.cancelled and job.finished is None
+            ]
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.uses_processes:
+                #spawned, not forked, so workers never inherit the locks of the API's threads
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="job")
+        return self._executor
+
+    def _event(self) -> Any:
+        """Event the job function can see being set, shared through a manager process for process workers"""
+        if not self.uses_processes:
+            return threading.Event()
+        if self._manager is None:
+            self._manager = multiprocessing.get_context("spawn").Manager()
+        return self._manager.Event()
+
+    def _finish(
+        self,
+        job: Job,
+        on_success: Optional[Callable[[JobResult], JobResult]],
+        on_failure: Optional[Callable[[JobFailed], None]],
+    ) -> None:
+        if job.future.cancelled():
+            return
+        error = job.future.exception()
+        result = None
+        if isinstance(error, JobCancelled):
+            #stopped at a checkpoint, there is neither a result nor a failure to report
+            error = None
+        elif error is None:
+            result = job.future.result()
+            if on_success is not None and not job.cancelled:
+                try:
+                    result = on_success(result)
+                except Exception as e:
+                    error = e
+        if error is not None and not isinstance(error, JobFailed):
+            error = JobFailed(500, str(error))
+        if error is not None and on_failure is not None and not job.cancelled:
+            try:
+                on_failure(error)
+            except Exception:
+                logger.exception("on_failure of job %s failed", job.job_id)
+        with self._lock:
+            job.result, job.error = result, error
+            job.finished = time.time()
+
+    def _forget_finished(self) -> None:
+        expired = time.time() - JOB_RESULT_TTL
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished is not None and job.finished < expired]:
+            del self._jobs[job_id]
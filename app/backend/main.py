@@ -1,10 +1,7 @@
 import sys
 import os
-import pickle
 from typing import List, Dict, Any
 from pathlib import Path
-from anytree.importer import DictImporter
-from anytree.exporter import DictExporter
 from config_manager import ConfigManager
 from database_manager import DatabaseManager
 
@@ -17,7 +14,10 @@ from resume_editor import ResumeEditor
 from portfolio_builder import PortfolioBuilder
 from portfolio_editor import PortfolioEditor
 from file_manager import FileManager
+from compact_tree import CompactTree
 from tree_manager import TreeManager
+from ignore_rules import IgnoreRules
+from cache.blob_store import BLOB_STORE_TTL
 
 
 def main() -> None:
@@ -27,10 +27,13 @@ def main() -> None:
     database_manager = DatabaseManager()
     resume_builder = ResumeBuilder()
     portfolio_builder = PortfolioBuilder()
-    file_manager = FileManager()
+    file_manager = FileManager(ignore_rules=IgnoreRules.from_config(config_manager))
     tree_manager = TreeManager()
-    importer = DictImporter()
-    exporter = DictExporter()
+    #local copies of contents no session used for BLOB_STORE_TTL, stored analyses keep theirs in the database
+    try:
+        file_manager.blob_store.prune(BLOB_STORE_TTL)
+    except OSError as e:
+        print(f"Pruning the local blob store failed: {e}")
 
     cli.print_header("Artifact Mining App")
 
@@ -63,8 +66,11 @@ def main() -> None:
             match(operation):
                 case 'n':
                     filepath: str = cli.get_input("\n  Enter filepath to analyse:\n> ").strip()
+                    scan_index = None
                     try:
-                        path: Path = validate_analysis_path(filepath)
+                        # the validation walk is reused by the pipeline so the folder is only walked once
+                        scan_index = scan_analysis_path(filepath, IgnoreRules.from_config(config_manager))
+                        path: Path = scan_index.root
                         cli.print_status(f"Path validated: {path}", "success")
                     except Exception as e:
                         cli.print_status(f"Invalid filepath: {e}", "error")
@@ -72,7 +78,7 @@ def main() -> None:
                     analysis_id = None
                     try:
                         pipeline = AnalysisPipeline(config_manager, database_manager, status_callback=cli.print_status, header_callback=cli.print_header)
-                        analysis_id = pipeline.run_analysis(str(path), cli=cli, return_id=True)
+                        analysis_id = pipeline.run_analysis(str(path), cli=cli, return_id=True, scan_index=scan_index)
                     except Exception as e:
                         cli.print_status(f"Analysis failed: {e}", "error")
 
@@ -221,7 +227,7 @@ def main() -> None:
                     try:
                         # main_utils now handles the DB fetching, FileManager seeding, and loading
                         merged_tree, merged_binary_list = perform_update_merge(
-                            analysis_id, new_path, file_manager, database_manager, importer)
+                            analysis_id, new_path, file_manager, database_manager, tree_manager)
 
                         if not merged_tree:
                             raise LookupError("Could not retrieve previous file data from the database.")
@@ -230,12 +236,17 @@ def main() -> None:
                         cli.print_status(f"{e}", "error")
                         continue
 
+                    if tree_manager.change_set.is_empty():
+                        cli.print_status("No files changed since the last analysis, nothing to update.", "info")
+                        continue
+
                     cli.print_status("Saving merged files to database...", "info")
-                    merged_tree_dict = exporter.export(merged_tree)
-                    merged_binary_blob = pickle.dumps(merged_binary_list)
+                    merged_compact_tree = CompactTree.from_node(merged_tree)
 
                     try:
-                        database_manager.save_fileset(analysis_id, merged_binary_blob, merged_tree_dict, new_path)
+                        database_manager.save_fileset(
+                            analysis_id, merged_binary_list, merged_compact_tree, new_path, file_manager.build_manifest().to_dict()
+                        )
                     except Exception as e:
                         cli.print_status("Failed to save merged files to database.", "error")
                         continue
@@ -1,36 +1,71 @@
+import asyncio
 import os
-import glob
 import shutil
 import tempfile
-import json
-import pickle
 import logging
 import time
-from typing import Optional, Dict, Any, List
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from pathlib import Path
 import uuid
+from datetime import datetime
 from input_validation import validate_uuid
 
 logger = logging.getLogger("uvicorn.error")
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Form, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from resume_builder import ResumeBuilder
+from resume_data_processor import ResumeDataProcessor
 
 from analysis_pipeline import AnalysisPipeline
 from config_manager import ConfigManager
-from database_manager import DatabaseManager
+from database_manager import DatabaseManager, ANALYSIS_SECTIONS, RESULT_COLUMNS
 from llm.llm_clients import LocalLLMClient, OnlineLLMClient
 from portfolio_builder import PortfolioBuilder
+from portfolio_data_processor import PortfolioDataProcessor
 from main_utils import perform_update_merge
-from anytree.importer import DictImporter
-from anytree.exporter import DictExporter
-from tree_manager import TreeManager
+from tree_manager import TreeManager, ChangeSet
 from file_manager import FileManager
-
-app = FastAPI(title="Artifact Mining API")
+from compact_tree import CompactTree
+from ignore_rules import IgnoreRules
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, split_page
+from cache.session_store import SessionStore, encode_session, decode_session
+from cache.blob_store import BlobStore, BLOB_STORE_TTL
+from jobs import JobRunner, JobResult, JobFailed, JobCancelled, QueueFullError, checkpoint
+from result_cache import clear_result_caches
+
+#state of extract steps waiting for their commit, keyed "new_<analysis_id>" or "update_<analysis_id>"
+pending_sessions = SessionStore()
+#extract, commit and resume generation run here instead of on the event loop
+job_runner = JobRunner()
+
+#seconds between two prunes of the local blob store
+BLOB_PRUNE_INTERVAL: float = 3600
+
+async def prune_blob_store():
+    """Removes local blobs older than BLOB_STORE_TTL every BLOB_PRUNE_INTERVAL seconds while the API runs"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(BlobStore().prune, BLOB_STORE_TTL)
+            logger.info("[BLOBS] Pruned %d local blobs", removed)
+        except OSError as e:
+            logger.warning("[BLOBS] Pruning the local blob store failed: %s", e)
+        await asyncio.sleep(BLOB_PRUNE_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pending_sessions.start_sweeper()
+    pruner = asyncio.create_task(prune_blob_store())
+    yield
+    pruner.cancel()
+    pending_sessions.stop_sweeper()
+    job_runner.shutdown(wait=False)
+
+app = FastAPI(title="Artifact Mining API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +73,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 def get_db():
@@ -52,20 +88,112 @@ def location_header(location:str):
     """Returns dict with location header with given location string"""
     return {"location": location}
 
-
-def cleanup_stale_cache(cache_dir: str = "cache", max_age_seconds: int = 1):
-    """Delete pending_*.pkl files older than max_age_seconds (lazy cleanup)."""
-    if not os.path.isdir(cache_dir):
-        return
-    now = time.time()
-    for path in glob.glob(os.path.join(cache_dir, "pending_*.pkl")):
+def list_filters(
+    analysis_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    title_prefix: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Query parameters shared by the list endpoints, created_from/created_to bound the analysis' creation date"""
+    if analysis_id:
         try:
-            if now - os.path.getmtime(path) > max_age_seconds:
-                os.remove(path)
-                logger.info("[CACHE] Deleted stale cache file: %s", path)
-        except Exception as exc:
-            logger.error("[CACHE] Failed to delete stale cache file %s: %s", path, exc)
-    
+            validate_uuid(analysis_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid UUID format")
+    return {
+        "analysis_id": analysis_id,
+        "created_from": created_from,
+        "created_to": created_to,
+        "title_prefix": title_prefix,
+    }
+
+def page_params(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Page size and the cursor returned in the X-Next-Cursor header of the previous page"""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return {"limit": limit, "cursor": cursor}
+
+def read_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """Decoded cursor values, a malformed cursor is a 400"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def save_upload(file: UploadFile) -> str:
+    """Copies an uploaded file to a temporary path, returns the path"""
+    suffix = Path(file.filename).suffix
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        return tmp.name
+
+def submit_job(
+    kind: str,
+    fn: Callable[..., Any],
+    *args: Any,
+    key: Optional[str] = None,
+    on_success: Optional[Callable[[Any], JobResult]] = None,
+    on_failure: Optional[Callable[[], None]] = None,
+    cleanup: Optional[str] = None,
+    cancellable: bool = False,
+) -> JSONResponse:
+    """
+    Queues fn(*args) on the job runner and answers 202 with the job id and its location,
+    429 when too many jobs are waiting, in which case the temporary file cleanup is removed.
+    on_failure runs when the job is refused with 429 or fails, e.g. to give back a pending session.
+    A cancellable fn also gets the job's cancel_event, see jobs.checkpoint.
+    """
+    def finish(outcome: Any) -> JobResult:
+        #a process worker's writes never reach this process' result cache
+        if job_runner.uses_processes:
+            clear_result_caches()
+        return on_success(outcome) if on_success is not None else outcome
+
+    try:
+        job = job_runner.submit(
+            kind, fn, *args, key=key, on_success=finish,
+            on_failure=(lambda error: on_failure()) if on_failure is not None else None,
+            cancellable=cancellable,
+        )
+    except QueueFullError as e:
+        if on_failure is not None:
+            on_failure()
+        if cleanup is not None and os.path.exists(cleanup):
+            os.remove(cleanup)
+        raise HTTPException(status_code=429, detail=f"Too many jobs queued, try again later: {e}", headers={"Retry-After": "5"})
+    return JSONResponse(
+        status_code=202,
+        headers=location_header(f"/jobs/{job.job_id}"),
+        content={"job_id": job.job_id, "status": job.status},
+    )
+
+def restore_pipeline_state(pipeline: AnalysisPipeline, cached_data: Dict[str, Any]) -> None:
+    """UPDATED: Restore full pipeline state from cache so DB saves don't overwrite with {}"""
+    if "pipeline_data_bundle" in cached_data:
+        pipeline.data_bundle.metadata_results = cached_data["pipeline_data_bundle"].get("metadata_results", [])
+        pipeline.data_bundle.final_bow = cached_data["pipeline_data_bundle"].get("final_bow", [])
+        pipeline.data_bundle.processed_git_repos = cached_data["pipeline_data_bundle"].get("processed_git_repos", [])
+        
+    if "pipeline_result_bundle" in cached_data:
+        pipeline.result_bundle.metadata_analysis = cached_data["pipeline_result_bundle"].get("metadata_analysis", {})
+        pipeline.result_bundle.doc_topic_vectors = cached_data["pipeline_result_bundle"].get("doc_topic_vectors", [])
+        pipeline.result_bundle.topic_term_vectors = cached_data["pipeline_result_bundle"].get("topic_term_vectors", [])
+        pipeline.result_bundle.project_analysis_data = cached_data["pipeline_result_bundle"].get("project_analysis_data", {})
+
+
+class ProjectSummary(BaseModel):
+    analysis_id: str
+    analysis_title: Optional[str] = None
+    creation_date: Optional[datetime] = None
+    last_modified: Optional[datetime] = None
+    file_path: Optional[str] = None
+    primary_languages: List[str] = []
+    primary_skills: List[str] = []
+    repository_names: List[str] = []
+    project_count: int = 0
+    has_thumbnail: bool = False
 
 class ResumeEditRequest(BaseModel):
     resume_title: str = None
@@ -103,37 +231,46 @@ class CommitUpdateRequest(BaseModel):
 def health_check():
     return {"status": "active"}
 
+@app.get("/cache/stats")
+def get_cache_stats(db: DatabaseManager = Depends(get_db)):
+    """
+        Hit/miss counters and size of this worker's database result cache, for sizing DB_RESULT_CACHE_BYTES.
+    """
+    return db.cache_stats()
+
 @app.post("/projects/upload/extract")
-async def extract_upload(
-    file: UploadFile = File(...),
-    db: DatabaseManager = Depends(get_db),
-):
+async def extract_upload(file: UploadFile = File(...), db: DatabaseManager = Depends(get_db)):
     """
     Phase 1 – Upload & Extract for a NEW project.
-    Saves the uploaded file, runs the extraction pipeline (which creates
-    a new analysis ID internally), caches heavy state for the commit step,
-    and returns lightweight results to the frontend.
+    Saves the uploaded file and queues the extraction job, which runs the pipeline (creating
+    a new analysis ID internally), caches heavy state for the commit step and returns
+    lightweight results to the frontend. Answers 202 with the job to poll at /jobs/{job_id}.
     """
-    cleanup_stale_cache()
-    t0 = time.time()
-    config = ConfigManager()
-    github_username = config.preferences.get("github_username")
-    github_email = config.preferences.get("github_email")
-    logger.info("[EXTRACT] === Request received ===")
-    logger.info("[EXTRACT] file=%s, size=%s, username=%s, email=%s",
-                file.filename, file.size, github_username, github_email)
-
-    # Save uploaded file to a temporary path
-    suffix = Path(file.filename).suffix
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
-    logger.info("[EXTRACT] File saved to %s (%.2fs)", tmp_path, time.time() - t0)
+    logger.info("[EXTRACT] === Request received === file=%s, size=%s", file.filename, file.size)
+
+    # Save uploaded file to a temporary path, the job removes it
+    tmp_path = save_upload(file)
+    return submit_job(
+        "extract_upload", _extract_upload_job, db.db.database_name, tmp_path,
+        on_success=_keep_new_session, cleanup=tmp_path, cancellable=True,
+    )
 
+def _extract_upload_job(database_name: str, tmp_path: str, cancel_event: Optional[Any] = None) -> Tuple[JobResult, bytes]:
+    """
+    Runs in the job pool: extraction of a new upload, returns the response and the encoded session for the commit.
+    When the job is cancelled the analysis it already created is deleted again, no session will ever commit it.
+    """
+    t0 = time.time()
+    db = DatabaseManager(database_name)
+    pipeline = None
     try:
+        config = ConfigManager()
+        github_username = config.preferences.get("github_username")
+        github_email = config.preferences.get("github_email")
+
         # Initialize pipeline
         t1 = time.time()
-        pipeline = AnalysisPipeline(config, db)
+        pipeline = AnalysisPipeline(config, db, cancel_check=partial(checkpoint, cancel_event))
         logger.info("[EXTRACT] Pipeline initialized (%.2fs)", time.time() - t1)
 
         # Run extraction – no existing_analysis_id or preloaded data,
@@ -147,10 +284,11 @@ async def extract_upload(
             github_email=github_email,
         )
         logger.info("[EXTRACT] run_analysis_extract finished (%.2fs)", time.time() - t2)
+        checkpoint(cancel_event)
 
         if extract_result is None:
             logger.error("[EXTRACT] extract_result is None — extraction failed")
-            raise HTTPException(status_code=500, detail="Extraction phase failed")
+            raise JobFailed(500, "Extraction phase failed")
 
         analysis_id, topic_vector_bundle, detected_skills, text_analysis_data = extract_result
 
@@ -179,11 +317,6 @@ async def extract_upload(
             }
         }
 
-        os.makedirs("cache", exist_ok=True)
-        cache_path = os.path.join("cache", f"pending_new_{analysis_id}.pkl")
-        with open(cache_path, "wb") as f:
-            pickle.dump(cache_data, f)
-
         # Build JSON-friendly response
         analyzed_projects = [
             {
@@ -193,124 +326,145 @@ async def extract_upload(
             for repo in analyzed_repos
         ]
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "analysis_id": str(analysis_id),
-                "topic_keywords": topic_vector_bundle.get("topic_keywords", []),
-                "detected_skills": detected_skills,
-                "analyzed_projects": analyzed_projects,
-            },
-        )
+        content = {
+            "analysis_id": str(analysis_id),
+            "topic_keywords": topic_vector_bundle.get("topic_keywords", []),
+            "detected_skills": detected_skills,
+            "analyzed_projects": analyzed_projects,
+        }
+        return JobResult(content), encode_session(cache_data)
 
-    except HTTPException:
+    except JobCancelled:
+        if pipeline is not None and pipeline.created_analysis_id is not None:
+            logger.info("[EXTRACT] Cancelled, deleting analysis %s", pipeline.created_analysis_id)
+            db.delete_analysis(pipeline.created_analysis_id)
+        raise
+    except JobFailed:
         raise
     except Exception as e:
         logger.exception("[EXTRACT] Unhandled exception after %.2fs", time.time() - t0)
-        raise HTTPException(status_code=500, detail=str(e))
+        raise JobFailed(500, str(e))
     finally:
+        db.close()
         if os.path.exists(tmp_path):
             os.remove(tmp_path)
-        logger.info("[EXTRACT] === Request complete (%.2fs) ===", time.time() - t0)
+        logger.info("[EXTRACT] === Job complete (%.2fs) ===", time.time() - t0)
+
+def _keep_new_session(outcome: Tuple[JobResult, bytes]) -> JobResult:
+    """Stores the session of a finished extract_upload job under the analysis it created"""
+    result, session = outcome
+    pending_sessions.put_encoded(f"new_{result.content['analysis_id']}", session)
+    return result
 
 @app.post("/projects/{analysis_id}/upload/commit")
-async def commit_upload(
-    analysis_id: str,
-    request: CommitUpdateRequest,
-    db: DatabaseManager = Depends(get_db),
-):
+async def commit_upload(analysis_id: str, request: CommitUpdateRequest, db: DatabaseManager = Depends(get_db)):
     """
     Phase 2 – Commit & Generate for a NEW upload.
-    Applies user edits (topic keywords, highlights, project selection)
+    Queues the job that applies user edits (topic keywords, highlights, project selection)
     to the cached extraction data from Phase 1, generates the AI summary,
-    and persists everything to the database.
+    and persists everything to the database. Answers 202 with the job to poll.
     """
-    cache_path = os.path.join("cache", f"pending_new_{analysis_id}.pkl")
-    if not os.path.exists(cache_path):
+    # Take the pending session, it is given back if the commit is refused or fails so it can be retried
+    session_key = f"new_{analysis_id}"
+    session = pending_sessions.take_encoded(session_key)
+    if session is None:
         raise HTTPException(
             status_code=404,
             detail="No pending upload found – cache expired or invalid analysis ID",
         )
-
-    # Load and immediately delete the cache file
-    with open(cache_path, "rb") as f:
-        cached_data = pickle.load(f)
-    os.remove(cache_path)
-
+    return submit_job(
+        "commit_upload", _commit_upload_job, db.db.database_name, analysis_id, session, request.model_dump(),
+        key=analysis_id, on_failure=partial(pending_sessions.put_encoded, session_key, session), cancellable=True,
+    )
+
+def _commit_upload_job(
+    database_name: str, analysis_id: str, session: bytes, request: Dict[str, Any], cancel_event: Optional[Any] = None,
+) -> JobResult:
+    """
+    Runs in the job pool: commit of a new upload, request is the CommitUpdateRequest as a dict.
+    A cancelled commit saves no results and deletes the new analysis, its session is gone with the abort.
+    """
+    cached_data = decode_session(session)
+    db = DatabaseManager(database_name)
     try:
         config = ConfigManager()
-        config.save_prefs({"online_llm_consent": request.online_llm_consent})
+        config.save_prefs({"online_llm_consent": request["online_llm_consent"]})
 
         # Reconstruct topic_vector_bundle with user edits
         topic_vector_bundle = cached_data["topic_vector_bundle"]
         topic_vector_bundle["topic_keywords"] = [
-            {"topic_id": tk.topic_id, "keywords": tk.keywords}
-            for tk in request.topic_keywords
+            {"topic_id": tk["topic_id"], "keywords": tk["keywords"]}
+            for tk in request["topic_keywords"]
         ]
-        topic_vector_bundle["user_highlights"] = request.user_highlights
+        topic_vector_bundle["user_highlights"] = request["user_highlights"]
 
         # Phase 2: generate AI summary and save results
-        pipeline = AnalysisPipeline(ConfigManager(), db)
-        
-        # UPDATED: Restore full pipeline state from cache so DB saves don't overwrite with {}
-        if "pipeline_data_bundle" in cached_data:
-            pipeline.data_bundle.metadata_results = cached_data["pipeline_data_bundle"].get("metadata_results", [])
-            pipeline.data_bundle.final_bow = cached_data["pipeline_data_bundle"].get("final_bow", [])
-            pipeline.data_bundle.processed_git_repos = cached_data["pipeline_data_bundle"].get("processed_git_repos", [])
-            
-        if "pipeline_result_bundle" in cached_data:
-            pipeline.result_bundle.metadata_analysis = cached_data["pipeline_result_bundle"].get("metadata_analysis", {})
-            pipeline.result_bundle.doc_topic_vectors = cached_data["pipeline_result_bundle"].get("doc_topic_vectors", [])
-            pipeline.result_bundle.topic_term_vectors = cached_data["pipeline_result_bundle"].get("topic_term_vectors", [])
-            pipeline.result_bundle.project_analysis_data = cached_data["pipeline_result_bundle"].get("project_analysis_data", {})
+        pipeline = AnalysisPipeline(ConfigManager(), db, cancel_check=partial(checkpoint, cancel_event))
+        restore_pipeline_state(pipeline, cached_data)
 
         summary = pipeline.run_analysis_generate(
             analysis_id=analysis_id,
             topic_vector_bundle=topic_vector_bundle,
             text_analysis_data=cached_data["text_analysis_data"],
-            selected_projects=request.selected_projects,
+            selected_projects=request["selected_projects"],
             return_id=False,
         )
 
-        return JSONResponse(
-            status_code=200,
-            content={"status": "success", "summary": summary},
-        )
+        return JobResult({"status": "success", "summary": summary})
 
-    except HTTPException:
+    except JobCancelled:
+        logger.info("[COMMIT] Cancelled, deleting analysis %s", analysis_id)
+        db.delete_analysis(analysis_id)
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise JobFailed(500, str(e))
+    finally:
+        db.close()
+
     
-@app.get("/projects")
-async def get_projects(db: DatabaseManager = Depends(get_db)):
+@app.get("/projects", response_model=List[ProjectSummary])
+async def get_projects(
+    response: Response,
+    page: Dict[str, Any] = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    skill: Optional[str] = None,
+    import_name: Optional[str] = Query(None, alias="import"),
+    db: DatabaseManager = Depends(get_db),
+):
     """
-    Fetch all projects.
-    Returns: List of {analysis_id, project_data} from tracked_data table.
+    Fetch one page of analyses, newest first.
+    Returns: one ProjectSummary per analysis, the full insights are served by GET /projects/{analysis_id}.
+    The cursor of the next page, if there is one, is in the X-Next-Cursor header.
+    ?skill= keeps analyses using a language or skill, ?import= those with a project importing a package.
     """
-    
+    after = read_cursor(page["cursor"], 2)
     try:
-        results = db.get_all_analyses_summary()
-        # Convert UUID objects to strings for JSON serialization
-        for row in results:
-            row['analysis_id'] = str(row.pop('analysis_id'))
-            if row.get('creation_date') and hasattr(row['creation_date'], 'isoformat'):
-                row['creation_date'] = row['creation_date'].isoformat()
-        return JSONResponse(status_code=200,content=results)
+        rows = db.get_analyses_listing(limit=page["limit"] + 1, after=after, skill=skill, import_name=import_name, **filters)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
+    rows, has_more = split_page(rows, page["limit"])
+    if has_more:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]['creation_date'], rows[-1]['analysis_id'])
+    return [ProjectSummary(**row) for row in rows]
 
 @app.get("/projects/{analysis_id}")
-async def get_project_detail(analysis_id: str, db: DatabaseManager = Depends(get_db)):
+async def get_project_detail(analysis_id: str, fields: Optional[str] = None, db: DatabaseManager = Depends(get_db)):
     """
     Fetch specific project details.
-    Returns: complete analysis data from all child tables for the given ID.
+    Returns: analysis data from the child tables for the given ID, all of it unless fields
+    names the sections wanted as a comma separated list (e.g. ?fields=metadata_insights,project_insights).
     """
+    sections = None
+    if fields is not None:
+        sections = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [section for section in sections if section not in ANALYSIS_SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
     try:
         validate_uuid(analysis_id)
         # Validate UUID format
         
-        result:Dict[str,Any] = db.get_analysis_data(analysis_id)
+        result:Dict[str,Any] = db.get_analysis_sections(analysis_id, sections)
         return JSONResponse(status_code=200,content=result)   
     
     except LookupError:
@@ -320,71 +474,105 @@ async def get_project_detail(analysis_id: str, db: DatabaseManager = Depends(get
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
+@app.get("/projects/{analysis_id}/results/{column}/{path:path}")
+async def get_project_result_section(analysis_id: str, column: str, path: str, db: DatabaseManager = Depends(get_db)):
+    """
+    Fetch one part of a result document, e.g. /projects/{analysis_id}/results/metadata_insights/language_stats.
+    Only that part is read out of the database. Returns 404 when the analysis or the path does not exist.
+    """
+    try:
+        validate_uuid(analysis_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid UUID format")
+    if column not in RESULT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unknown result column: {column}")
+    try:
+        section = db.get_result_section(analysis_id, column, [part for part in path.split("/") if part])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+    if section is None:
+        raise HTTPException(status_code=404, detail=f"No {column}/{path} found for analysis {analysis_id}")
+    return JSONResponse(status_code=200, content=section)
+
+@app.get("/projects/{analysis_id}/filetrees")
+async def get_project_filetrees(analysis_id: str, db: DatabaseManager = Depends(get_db)):
+    """
+    List the stored versions of an analysis' file tree, oldest first.
+    Returns: filetree_id, base_tree_id, chain_depth and is_snapshot of each version.
+    """
+    try:
+        validate_uuid(analysis_id)
+        history = db.get_filetree_history(analysis_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid UUID format")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+    if not history:
+        raise HTTPException(status_code=404, detail=f"No file trees found for analysis {analysis_id}")
+    return JSONResponse(status_code=200, content=history)
+
+@app.get("/projects/{analysis_id}/filetrees/{filetree_id}")
+async def get_project_filetree(analysis_id: str, filetree_id: int, db: DatabaseManager = Depends(get_db)):
+    """
+    Fetch one version of an analysis' file tree, rebuilt from its snapshot and the deltas after it.
+    Returns: the tree as nested dicts, in the layout of the legacy JSON filetrees.
+    """
+    try:
+        validate_uuid(analysis_id)
+        versions = {row['filetree_id'] for row in db.get_filetree_history(analysis_id)}
+        if filetree_id not in versions:
+            raise HTTPException(status_code=404, detail=f"No file tree {filetree_id} found for analysis {analysis_id}")
+        tree = db.get_filetree_version(filetree_id)
+    except HTTPException:
+        raise
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid UUID format")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
+    return JSONResponse(status_code=200, content=tree.to_dict() if tree is not None else None)
+
 @app.get("/skills")
-async def get_skills(db: DatabaseManager = Depends(get_db)):
-    """Aggregate skills across all analysed projects."""
-    results = db.get_all_analyses_summary()
-    skill_counts: Dict[str, int] = {}
-    for row in results:
-        #extract languages from language_stats (metadata stuff)
-        meta = row.get("metadata_insights")
-        if isinstance(meta, str):
-            try:
-                meta = json.loads(meta)
-            except (json.JSONDecodeError, TypeError):
-                meta = {}
-        if not isinstance(meta, dict):
-            meta = {}
-
-        #langauge stat is dict
-        for lang_name, lang_info in meta.get("language_stats", {}).items():
-            if lang_name and lang_name != "Text only":
-                count = lang_info.get("file_count", 1) if isinstance(lang_info, dict) else 1
-                skill_counts[lang_name] = skill_counts.get(lang_name, 0) + count
-
-        #skill_stats has categories like "Backend Development", "Web Development"
-        for skill_name, skill_info in meta.get("skill_stats", {}).items():
-            if skill_name and skill_name != "Documentation":
-                count = skill_info.get("file_count", 1) if isinstance(skill_info, dict) else 1
-                skill_counts[skill_name] = skill_counts.get(skill_name, 0) + count
-
-        # project_insights: extract frameworks/libraries from imports_summary ---
-        proj = row.get("project_insights")
-        if isinstance(proj, str):
-            try:
-                proj = json.loads(proj)
-            except (json.JSONDecodeError, TypeError):
-                proj = {}
-        if not isinstance(proj, dict):
-            proj = {}
-
-        for project in proj.get("analyzed_insights", []):
-            if not isinstance(project, dict):
-                continue
-            # imports_summary is a dict like {"pytest": {"frequency": 2, ...}, "anytree": {...}}
-            for import_name, import_info in project.get("imports_summary", {}).items():
-                if not import_name:
-                    continue
-                freq = import_info.get("frequency", 1) if isinstance(import_info, dict) else 1
-                skill_counts[import_name] = skill_counts.get(import_name, 0) + freq
-
-    sorted_skills = dict(sorted(skill_counts.items(), key=lambda x: x[1], reverse=True))
-    return JSONResponse(status_code=200,content={'skills':sorted_skills})
+async def get_skills(top: Optional[int] = None, by_analysis: bool = False, db: DatabaseManager = Depends(get_db)):
+    """
+    Aggregate skills across all analysed projects, read from the Skill_Counts table kept up to date as results are saved.
+    top limits the response to the N most common skills, by_analysis adds each analysis' own counts.
+    """
+    if top is not None and top < 1:
+        raise HTTPException(status_code=422, detail="top must be a positive integer")
+    try:
+        skills = {row['skill']: row['count'] for row in db.get_skill_counts(top)}
+        content: Dict[str, Any] = {'skills': skills}
+        if by_analysis:
+            breakdown: Dict[str, Dict[str, int]] = {}
+            for row in db.get_skill_counts_by_analysis():
+                breakdown.setdefault(row['analysis_id'], {})[row['skill']] = row['count']
+            content['by_analysis'] = breakdown
+        return JSONResponse(status_code=200,content=content)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
 #reworked to return a full resume instead of resume points. resume_points can be extracted from returned result by front_end
 @app.get("/resumes")
-async def get_all_resumes(db:DatabaseManager = Depends(get_db)):
+async def get_all_resumes(
+    page: Dict[str, Any] = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db:DatabaseManager = Depends(get_db),
+):
     """
-        Returns all resumes stored in database
+        Returns one page of the resumes stored in database, newest first.
+        The cursor of the next page, if there is one, is in the X-Next-Cursor header.
     """
+    after = read_cursor(page["cursor"], 1)
     try:
-        result = db.get_all_resumes()
+        result = db.get_all_resumes(limit=page["limit"] + 1, after=after[0] if after else None, **filters)
+        result, has_more = split_page(result, page["limit"])
         
         # Convert UUID objects to strings for JSON serialization
         for row in result:
             row['analysis_id'] = str(row.pop('analysis_id'))
         
-        return JSONResponse(status_code=200,content=result)
+        headers = {NEXT_CURSOR_HEADER: encode_cursor(result[-1]['resume_id'])} if has_more else None
+        return JSONResponse(status_code=200,content=result,headers=headers)
 
     except LookupError as e: #redundant catch case it is here for consistency with other getters for resumes
         raise HTTPException(status_code=404, detail =f"Internal Server Error:{e}")
@@ -444,7 +632,8 @@ async def get_resume(resume_id: int, db: DatabaseManager = Depends(get_db)):
 
 @app.post("/resume/generate/{analysis_id}")
 async def generate_resume(analysis_id: str, db: DatabaseManager = Depends(get_db),resume_title:str = None):
-    """Uses resume_builder to build and save new resume for a given analysis
+    """Queues the job that uses resume_builder to build and save new resume for a given analysis, answers 202 with
+        the job to poll. Its result is the resume, with status 201 and the resume's location in its headers.
         Important Param note, resume title if any must be sent as query request by the frontend
         Eg. client.post(resume/generate/<some UUID>?resume_title= 'Capybara Resume' """    
     try:
@@ -470,11 +659,25 @@ async def generate_resume(analysis_id: str, db: DatabaseManager = Depends(get_db
         except Exception as e:
             raise Exception(f"Internal error during online consent check:{e}")
         
+        return submit_job(
+            "generate_resume", _generate_resume_job, db.db.database_name, analysis_id, resume_title, key=analysis_id,
+        )
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+         raise HTTPException(status_code=400, detail=f"Generation failed: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500,detail = f"Fatal Internal error during resume generation:{e}")
+
+def _generate_resume_job(database_name: str, analysis_id: str, resume_title: Optional[str]) -> JobResult:
+    """Runs in the job pool: builds and saves the resume"""
+    db = DatabaseManager(database_name)
+    try:
         #Main execution block
         #Use resume_builder to generate new resume
         try:
             #get data
-            analysis_data = db.get_analysis_data(analysis_id) #raises Lookup error on analysis_id not found
+            analysis_data = db.get_analysis_sections(analysis_id, ResumeDataProcessor.SECTIONS) #raises Lookup error on analysis_id not found
                         
             #build actual resume object
             resume_builder = ResumeBuilder()
@@ -483,7 +686,7 @@ async def generate_resume(analysis_id: str, db: DatabaseManager = Depends(get_db
                 raise RuntimeError("Resume builder returned empty resume")
         
         except LookupError as e:
-            raise HTTPException(status_code=404,detail =f"No Analysis with {analysis_id} found:")
+            raise JobFailed(404, f"No Analysis with {analysis_id} found:")
         except Exception as e:
             raise RuntimeError(f"Failed to build resume:{e}") 
         
@@ -493,13 +696,13 @@ async def generate_resume(analysis_id: str, db: DatabaseManager = Depends(get_db
             resume['resume_id'] = resume_id #add to match actual return since return by build resume doesnt have field
         except Exception as e:
             raise RuntimeError("Failed to save new resume")
-        return JSONResponse(status_code=201,headers=location_header(f"/resume/{resume_id}"),content = resume)
-    except HTTPException as e:
+        return JobResult(resume, 201, location_header(f"/resume/{resume_id}"))
+    except JobFailed as e:
         raise e
-    except ValueError as e:
-         raise HTTPException(status_code=400, detail=f"Generation failed: {str(e)}")
     except Exception as e:
-        raise HTTPException(status_code=500,detail = f"Fatal Internal error during resume generation:{e}")
+        raise JobFailed(500, f"Fatal Internal error during resume generation:{e}")
+    finally:
+        db.close()
 
 #for updating a resume make a PUT request to a resume's url 
 @app.put("/resume/{resume_id}")
@@ -513,18 +716,26 @@ async def edit_resume(resume_id: int, new: ResumeEditRequest, db: DatabaseManage
         raise HTTPException(status_code=500, detail=f"{e}")
 
 @app.get("/portfolios")
-async def get_all_portfolios(db:DatabaseManager = Depends(get_db)):
+async def get_all_portfolios(
+    page: Dict[str, Any] = Depends(page_params),
+    filters: Dict[str, Any] = Depends(list_filters),
+    db:DatabaseManager = Depends(get_db),
+):
     """
-        Returns all portfolios stored in database
+        Returns one page of the portfolios stored in database, newest first.
+        The cursor of the next page, if there is one, is in the X-Next-Cursor header.
     """
+    after = read_cursor(page["cursor"], 1)
     try:
-        result = db.get_all_portfolios()
+        result = db.get_all_portfolios(limit=page["limit"] + 1, after=after[0] if after else None, **filters)
+        result, has_more = split_page(result, page["limit"])
         
         # Convert UUID objects to strings for JSON serialization
         for row in result:
             row['analysis_id'] = str(row.pop('analysis_id'))
         
-        return JSONResponse(status_code=200,content=result)
+        headers = {NEXT_CURSOR_HEADER: encode_cursor(result[-1]['portfolio_id'])} if has_more else None
+        return JSONResponse(status_code=200,content=result,headers=headers)
     
     except LookupError as e: #redundant catch case it is here for consistency with other getters for portfolios
         raise HTTPException(status_code=404, detail =f"Internal Server Error:{e}")
@@ -611,7 +822,7 @@ async def generate_portfolio(analysis_id: str, db: DatabaseManager = Depends(get
         #Use portfolio_builder to generate new portfolio
         try:
             #get data
-            analysis_data = db.get_analysis_data(analysis_id) #raises Lookup error on analysis_id not found
+            analysis_data = db.get_analysis_sections(analysis_id, PortfolioDataProcessor.SECTIONS) #raises Lookup error on analysis_id not found
                         
             #build actual portfolio object
             portfolio_builder = PortfolioBuilder()
@@ -677,67 +888,52 @@ async def extract_update(
 ):
     """
     Phase 1 – Upload & Extract.
-    Merges the uploaded file with the existing analysis, runs extraction,
-    and caches the heavy state for the subsequent commit step.
+    Queues the job that merges the uploaded file with the existing analysis, runs extraction,
+    and caches the heavy state for the subsequent commit step. Answers 202 with the job to poll.
     """
-    cleanup_stale_cache()
     try:
         validate_uuid(analysis_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    # Save uploaded file to a temporary path
-    suffix = Path(file.filename).suffix
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
-
+    # Save uploaded file to a temporary path, the job removes it
+    tmp_path = save_upload(file)
+    return submit_job(
+        "extract_update", _extract_update_job, db.db.database_name, analysis_id, tmp_path,
+        key=analysis_id, on_success=partial(_keep_update_session, analysis_id=analysis_id), cleanup=tmp_path,
+        cancellable=True,
+    )
+
+def _extract_update_job(
+    database_name: str, analysis_id: str, tmp_path: str, cancel_event: Optional[Any] = None,
+) -> Tuple[JobResult, bytes]:
+    """Runs in the job pool: merge and extraction of an update, returns the response and the encoded session"""
+    db = DatabaseManager(database_name)
     try:
         # Initialise helpers
-        file_manager = FileManager()
+        file_manager = FileManager(ignore_rules=IgnoreRules.from_config(ConfigManager()))
         tree_manager = TreeManager()
-        importer = DictImporter()
-        exporter = DictExporter()
-
-        # Load the new file
-        fm_result = file_manager.load_from_filepath(tmp_path)
-        if fm_result.get("status") == "error":
-            raise HTTPException(
-                status_code=400,
-                detail=f"Load Error: {fm_result.get('message', 'Unknown error')}",
-            )
 
-        new_tree = fm_result["tree"]
-        new_binary_list = fm_result.get("binary_data", [])
-
-        # Merge with existing analysis data
+        # Merge with existing analysis data, unchanged files are taken from the stored manifest instead of being read again
         try:
             merged_tree, merged_binary_list = perform_update_merge(
-                analysis_id, tmp_path, file_manager, db, importer
+                analysis_id, tmp_path, file_manager, db, tree_manager
             )
         except LookupError:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No existing analysis found for ID {analysis_id}",
-            )
+            raise JobFailed(404, f"No existing analysis found for ID {analysis_id}")
         except RuntimeError as e:
             # Catch the load error specifically thrown by perform_update_merge
-            raise HTTPException(
-                status_code=400,
-                detail=str(e),
-            )
+            raise JobFailed(400, str(e))
 
         if merged_tree is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Merge failed – no existing analysis for ID {analysis_id}",
-            )
+            raise JobFailed(404, f"Merge failed – no existing analysis for ID {analysis_id}")
+        checkpoint(cancel_event)
 
         # Phase 1: run extraction
         config = ConfigManager()
         github_username = config.preferences.get("github_username")
         github_email = config.preferences.get("github_email")
-        pipeline = AnalysisPipeline(config, db)
+        pipeline = AnalysisPipeline(config, db, cancel_check=partial(checkpoint, cancel_event))
         extract_result = pipeline.run_analysis_extract(
             filepath=tmp_path,
             existing_analysis_id=analysis_id,
@@ -748,7 +944,7 @@ async def extract_update(
         )
 
         if extract_result is None:
-            raise HTTPException(status_code=500, detail="Extraction phase failed")
+            raise JobFailed(500, "Extraction phase failed")
 
         analysis_id_out, topic_vector_bundle, detected_skills, text_analysis_data = extract_result
 
@@ -760,9 +956,12 @@ async def extract_update(
         )
 
         # UPDATED: Cache the ENTIRE state for Phase 2 (commit)
+        #merged_binary_list is kept by blob hash, the contents stay in the blob store
         cache_data = {
-            "merged_tree_dict": exporter.export(merged_tree),
+            "merged_tree": CompactTree.from_node(merged_tree).to_bytes(),
             "merged_binary_list": merged_binary_list,
+            "merged_manifest": file_manager.build_manifest().to_dict(),
+            "change_set": tree_manager.change_set.to_dict(),
             "topic_vector_bundle": topic_vector_bundle,
             "text_analysis_data": text_analysis_data,
             "analyzed_repos": analyzed_repos,
@@ -779,11 +978,6 @@ async def extract_update(
             }
         }
 
-        os.makedirs("cache", exist_ok=True)
-        cache_path = os.path.join("cache", f"pending_update_{analysis_id}.pkl")
-        with open(cache_path, "wb") as f:
-            pickle.dump(cache_data, f)
-
         # Build JSON-friendly response
         analyzed_projects = [
             {
@@ -793,23 +987,28 @@ async def extract_update(
             for repo in analyzed_repos
         ]
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "topic_keywords": topic_vector_bundle.get("topic_keywords", []),
-                "detected_skills": detected_skills,
-                "analyzed_projects": analyzed_projects,
-            },
-        )
+        content = {
+            "topic_keywords": topic_vector_bundle.get("topic_keywords", []),
+            "detected_skills": detected_skills,
+            "analyzed_projects": analyzed_projects,
+            "changed_files": {key: len(paths) for key, paths in tree_manager.change_set.to_dict().items()},
+        }
+        return JobResult(content), encode_session(cache_data)
 
-    except HTTPException:
+    except JobFailed:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise JobFailed(500, str(e))
     finally:
+        db.close()
         if os.path.exists(tmp_path):
             os.remove(tmp_path)
 
+def _keep_update_session(outcome: Tuple[JobResult, bytes], analysis_id: str) -> JobResult:
+    result, session = outcome
+    pending_sessions.put_encoded(f"update_{analysis_id}", session)
+    return result
+
 @app.post("/projects/{analysis_id}/update/commit")
 async def commit_update(
     analysis_id: str,
@@ -818,105 +1017,126 @@ async def commit_update(
 ):
     """
     Phase 2 – Commit & Generate.
-    Applies user edits (topic keywords, highlights, project selection)
+    Queues the job that applies user edits (topic keywords, highlights, project selection)
     to the cached extraction data, generates the AI summary, and persists
-    everything to the database.
+    everything to the database. Answers 202 with the job to poll.
     """
-    cache_path = os.path.join("cache", f"pending_update_{analysis_id}.pkl")
-    if not os.path.exists(cache_path):
+    # Take the pending session, it is given back if the commit is refused or fails so it can be retried
+    session_key = f"update_{analysis_id}"
+    session = pending_sessions.take_encoded(session_key)
+    if session is None:
         raise HTTPException(
             status_code=404,
             detail="No pending update found – cache expired or invalid analysis ID",
         )
-
-    # Load and immediately delete the cache file
-    with open(cache_path, "rb") as f:
-        cached_data = pickle.load(f)
-    os.remove(cache_path)
-
+    return submit_job(
+        "commit_update", _commit_update_job, db.db.database_name, analysis_id, session, request.model_dump(),
+        key=analysis_id, on_failure=partial(pending_sessions.put_encoded, session_key, session), cancellable=True,
+    )
+
+def _commit_update_job(
+    database_name: str, analysis_id: str, session: bytes, request: Dict[str, Any], cancel_event: Optional[Any] = None,
+) -> JobResult:
+    """
+    Runs in the job pool: commit of an update, request is the CommitUpdateRequest as a dict.
+    A cancelled commit stops at its next checkpoint: before the fileset, the summary or the results are saved.
+    """
+    cached_data = decode_session(session)
+    db = DatabaseManager(database_name)
     try:
         # Set LLM consent
         config = ConfigManager()
-        config.save_prefs({"online_llm_consent": request.online_llm_consent})
+        config.save_prefs({"online_llm_consent": request["online_llm_consent"]})
 
         # Reconstruct topic_vector_bundle with user edits
         topic_vector_bundle = cached_data["topic_vector_bundle"]
         topic_vector_bundle["topic_keywords"] = [
-            {"topic_id": tk.topic_id, "keywords": tk.keywords}
-            for tk in request.topic_keywords
+            {"topic_id": tk["topic_id"], "keywords": tk["keywords"]}
+            for tk in request["topic_keywords"]
         ]
-        topic_vector_bundle["user_highlights"] = request.user_highlights
-
-        # Save merged files to DB
-        db.save_fileset(
-            analysis_id,
-            pickle.dumps(cached_data["merged_binary_list"]),
-            cached_data["merged_tree_dict"],
-            "Updated via API",
-        )
+        topic_vector_bundle["user_highlights"] = request["user_highlights"]
+
+        # Save merged files to DB, a merge that changed no file leaves the stored fileset as it is
+        checkpoint(cancel_event)
+        change_set = cached_data.get("change_set")
+        if change_set is None or not ChangeSet(**change_set).is_empty():
+            db.save_fileset(
+                analysis_id,
+                cached_data["merged_binary_list"],
+                CompactTree.from_bytes(cached_data["merged_tree"]),
+                "Updated via API",
+                cached_data.get("merged_manifest"),
+            )
 
         # Phase 2: generate AI summary and save results
-        pipeline = AnalysisPipeline(ConfigManager(), db)
-        
-        # UPDATED: Restore full pipeline state from cache so DB saves don't overwrite with {}
-        if "pipeline_data_bundle" in cached_data:
-            pipeline.data_bundle.metadata_results = cached_data["pipeline_data_bundle"].get("metadata_results", [])
-            pipeline.data_bundle.final_bow = cached_data["pipeline_data_bundle"].get("final_bow", [])
-            pipeline.data_bundle.processed_git_repos = cached_data["pipeline_data_bundle"].get("processed_git_repos", [])
-            
-        if "pipeline_result_bundle" in cached_data:
-            pipeline.result_bundle.metadata_analysis = cached_data["pipeline_result_bundle"].get("metadata_analysis", {})
-            pipeline.result_bundle.doc_topic_vectors = cached_data["pipeline_result_bundle"].get("doc_topic_vectors", [])
-            pipeline.result_bundle.topic_term_vectors = cached_data["pipeline_result_bundle"].get("topic_term_vectors", [])
-            pipeline.result_bundle.project_analysis_data = cached_data["pipeline_result_bundle"].get("project_analysis_data", {})
+        pipeline = AnalysisPipeline(ConfigManager(), db, cancel_check=partial(checkpoint, cancel_event))
+        restore_pipeline_state(pipeline, cached_data)
 
         summary = pipeline.run_analysis_generate(
             analysis_id=analysis_id,
             topic_vector_bundle=topic_vector_bundle,
             text_analysis_data=cached_data["text_analysis_data"],
-            selected_projects=request.selected_projects,
+            selected_projects=request["selected_projects"],
             return_id=False,
         )
 
-        return JSONResponse(
-            status_code=200,
-            content={"status": "success", "summary": summary},
-        )
+        return JobResult({"status": "success", "summary": summary})
 
-    except HTTPException:
-        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise JobFailed(500, str(e))
+    finally:
+        db.close()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status of a background job: queued, running, succeeded, failed, cancelling or cancelled.
+    A succeeded job carries the status_code, result and headers its endpoint answers with,
+    a failed one the status_code and error.
+    """
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with id {job_id} found")
+    return JSONResponse(status_code=200, content=job.to_dict())
 
 @app.delete("/projects/{analysis_id}/upload/abort")
 async def abort_upload(analysis_id: str):
     """
-    Explicitly abort a pending upload and remove any associated cache files.
+    Explicitly abort a pending upload: cancels its queued or running jobs and removes its pending sessions.
+    analysis_id may also be the job_id of an extract job of a new upload, whose analysis_id is not known yet.
+    Answers 202 while a cancelled job is still running: it stops at its next checkpoint and undoes what it
+    created, its status at /jobs/{job_id} turns from cancelling to cancelled once it has.
     """
     try:
         validate_uuid(analysis_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    target_files = [
-        os.path.join("cache", f"pending_new_{analysis_id}.pkl"),
-        os.path.join("cache", f"pending_update_{analysis_id}.pkl"),
-    ]
-
-    deleted_any = False
-    for path in target_files:
-        if os.path.exists(path):
-            try:
-                os.remove(path)
-                logger.info("[ABORT] Deleted cached file: %s", path)
+    cancelled = job_runner.cancel(analysis_id) + job_runner.cancel_key(analysis_id)
+    if cancelled:
+        logger.info("[ABORT] Cancelled %d job(s) of %s", cancelled, analysis_id)
+
+    deleted_any = bool(cancelled)
+    for key in (f"new_{analysis_id}", f"update_{analysis_id}"):
+        try:
+            if pending_sessions.discard(key):
+                logger.info("[ABORT] Deleted pending session: %s", key)
                 deleted_any = True
-            except Exception as exc:
-                logger.error("[ABORT] Failed to delete cached file %s: %s", path, exc)
-                raise HTTPException(status_code=500, detail=f"Failed to delete cache file: {path}")
+        except Exception as exc:
+            logger.error("[ABORT] Failed to delete pending session %s: %s", key, exc)
+            raise HTTPException(status_code=500, detail=f"Failed to delete cache file: {key}")
 
     if not deleted_any:
         return JSONResponse(status_code=404, content={"message": "No pending upload found to abort."})
 
+    stopping = [job.job_id for job in job_runner.stopping(analysis_id)]
+    if stopping:
+        return JSONResponse(
+            status_code=202,
+            headers=location_header(f"/jobs/{stopping[0]}"),
+            content={"message": "Upload abort requested, its running job is stopping.", "job_ids": stopping},
+        )
+
     return JSONResponse(status_code=200, content={"message": "Upload aborted and cache cleared."})
 
 @app.delete("/projects/{analysis_id}")
@@ -927,7 +1147,8 @@ async def delete_project(analysis_id: str, db: DatabaseManager = Depends(get_db)
     try:
         validate_uuid(analysis_id)
         
-        db.get_analysis_data(analysis_id)
+        #existence check only, no sections are read
+        db.get_analysis_sections(analysis_id, ())
         
         db.delete_analysis(analysis_id)
         
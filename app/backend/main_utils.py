@@ -9,6 +9,8 @@ from display_helpers import display_project_insights, display_project_summary, d
 from input_validation import validate_analysis_path, validate_thumbnail_path, validate_uuid
 from resume_editor import ResumeEditor
 from portfolio_editor import PortfolioEditor
+from ingest_manifest import IngestManifest
+from tree_manager import TreeManager
 
 # This file contains extracted implementations of various main.py's execution paths. 
 # Allows for better abstraction and easy refactoring moving forward.
@@ -80,47 +82,75 @@ def perform_update_merge(
     analysis_id: str, 
     new_path: str, 
     file_manager, 
-    db_manager, 
-    importer
+    db_manager,
+    tree_manager: Optional[TreeManager] = None
 ):
     """
     Handles the logic for retrieving old data, seeding the FileManager for cross-session
     deduplication, loading the new files, and returning the merged results.
+    The stored manifest lets unchanged files reuse their blobs. Blobs missing from the local
+    store are streamed from the shared Blobs table only when their contents are read, and the
+    old binary list is only unpickled for filesets saved before blobs were stored in the database.
+    file_manager uses the database backed store during the merge and gets its own store back afterwards.
+    When tree_manager is given, the files added, removed, modified and left unchanged since the
+    previous analysis are left in tree_manager.change_set.
     """
-    print("Fetching previous analysis state...")
-    
+    # the previous fileset's store is only borrowed for this merge, the caller's FileManager keeps its own
+    original_store = file_manager.blob_store
     try:
-        old_binary_blob, old_tree_dict = db_manager.get_fileset_data(analysis_id)
-        if not old_binary_blob or not old_tree_dict:
-            raise LookupError("Could not retrieve previous file data from the database.")
-    except Exception as e:
-        raise e
+        print("Fetching previous analysis state...")
     
-    # Deserialize the old data
-    old_binary_list = pickle.loads(old_binary_blob)
-    old_tree = importer.import_(old_tree_dict)
-
-    # Reconstruct the seen_hashes dict from the old tree
-    previous_hashes = {}
-    for node in old_tree.descendants:
-        if node.type == "file" and hasattr(node, "file_data") and "file_hash" in node.file_data:
-            previous_hashes[node.file_data["file_hash"]] = node.file_data["binary_index"]
-
-    # Seed the file manager with previous state
-    print("Seeding file manager with previous session data...")
-    file_manager.set_previous_state(old_binary_list, previous_hashes)
-
-    # Load the new files (reset_state=False so we don't wipe out what we just seeded)
-    print("Loading files from new path...")
-    load_result = file_manager.load_from_filepath(new_path, reset_state=False)
+        try:
+            manifest_dict, old_tree = db_manager.get_fileset_manifest(analysis_id)
+            manifest = IngestManifest.from_dict(manifest_dict)
+            old_binary_list = manifest.blob_array(file_manager.blob_store)
+
+            if old_binary_list is None:
+                # contents stay in the database until a stage reads them, unchanged files are reused by hash
+                old_binary_list = db_manager.load_fileset_blobs(analysis_id, file_manager.blob_store, lazy=True)
+                if old_binary_list is not None:
+                    file_manager.blob_store = old_binary_list.store
+
+            if old_binary_list is None:
+                old_binary_blob, old_tree = db_manager.get_fileset_data(analysis_id)
+                if not old_binary_blob:
+                    raise LookupError("Could not retrieve previous file data from the database.")
+                # Deserialize the old data
+                old_binary_list = pickle.loads(old_binary_blob)
+
+            if not old_tree:
+                raise LookupError("Could not retrieve previous file data from the database.")
+        except Exception as e:
+            raise e
     
-    if load_result['status'] == 'error':
-        raise RuntimeError(f"Failed to load files: {load_result['message']}")
+        # Reconstruct the seen_hashes dict from the old tree, read straight from its arrays without building Nodes
+        previous_hashes = old_tree.file_hashes()
+
+        # Seed the file manager with previous state
+        print("Seeding file manager with previous session data...")
+        file_manager.set_previous_state(old_binary_list, previous_hashes, manifest)
 
-    merged_tree = load_result['tree']
-    merged_binary_list = load_result['binary_data']
+        # Load the new files (reset_state=False so we don't wipe out what we just seeded)
+        print("Loading files from new path...")
+        load_result = file_manager.load_from_filepath(new_path, reset_state=False)
+    
+        if load_result['status'] == 'error':
+            raise RuntimeError(f"Failed to load files: {load_result['message']}")
+        print(f"Reused {file_manager.reused_files} unchanged file(s) from the previous session.")
+
+        merged_tree = load_result['tree']
+        merged_binary_list = load_result['binary_data']
+
+        if tree_manager is not None:
+            change_set = tree_manager.diff_trees(old_tree.node(), merged_tree)
+            print(
+                f"{len(change_set.added)} added, {len(change_set.modified)} modified, "
+                f"{len(change_set.removed)} removed, {len(change_set.unchanged)} unchanged file(s)."
+            )
     
-    return merged_tree, merged_binary_list
+        return merged_tree, merged_binary_list
+    finally:
+        file_manager.blob_store = original_store
 
 
 def view_all_analyses(database_manager:DatabaseManager) -> None:
@@ -77,7 +77,8 @@ class MetadataExtractor:
         file_exists: bool = path.exists()
         binary_data: Optional[bytes] = None
         
-        if binary_data_array and binary_index is not None and binary_index < len(binary_data_array):
+        # only read content from the binary array when there is no filesystem copy to read from
+        if not file_exists and binary_data_array and binary_index is not None and binary_index < len(binary_data_array):
             binary_data = binary_data_array[binary_index]
         
         if file_exists:
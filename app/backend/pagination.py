@@ -0,0 +1,37 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Tuple
+
+# page sizes of the list endpoints when no limit is asked for, and the most a client may ask for
+DEFAULT_PAGE_SIZE: int = 100
+MAX_PAGE_SIZE: int = 500
+# response header carrying the cursor of the next page, absent on the last page
+NEXT_CURSOR_HEADER: str = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor for the sort key of the last row of a page"""
+    payload = json.dumps(list(values), default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """The sort key values encoded in cursor, raises ValueError for anything encode_cursor did not produce"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], bool]:
+    """Rows fetched with limit + 1 as (the page, whether another page follows)"""
+    return rows[:limit], len(rows) > limit
+
+
+def escape_like(prefix: str) -> str:
+    """prefix with the LIKE wildcards escaped, for title prefix filters"""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -52,7 +52,7 @@ class PortfolioBuilder:
             cli.print_header(f"Retrieving result {result_id} for portfolio generation...")
             
             # Fetch the result data from the database
-            result_data = database_manager.get_analysis_data(result_id)
+            result_data = database_manager.get_analysis_sections(result_id, PortfolioDataProcessor.SECTIONS)
             
             if not result_data:
                 cli.print_status("Result not found in database.", "error")
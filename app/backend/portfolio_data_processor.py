@@ -9,6 +9,8 @@ class PortfolioDataProcessor:
     Unlike ResumeDataProcessor, this class extracts comprehensive project details and
     complete skill evolution data to demonstrate learning progression.
     """
+    # the only parts of an analysis a portfolio is built from, see DatabaseManager.get_analysis_sections
+    SECTIONS = ("project_insights", "metadata_insights")
 
     def __init__(self, result_data: Dict[str, Any]):
         """
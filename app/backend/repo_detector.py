@@ -1,31 +1,61 @@
 from anytree import PreOrderIter, Node
-from typing import List, Optional
+from compact_tree import TreeNode
+from typing import Dict, List, Optional
+from ignore_rules import GIT_DIR
 
 class RepoDetector:
     def __init__(self) -> None:
         self.git_repos: List[Node] = []
+        # repository head -> its .git node, handed to RepositoryProcessor so it does not search for it again
+        self.git_dirs: Dict[Node, Node] = {}
 
-    def process_git_repos(self, root: Node) -> None:
+    def process_git_repos(self, root: Node, scan_index=None, git_subtrees: Optional[List[Node]] = None) -> None:
         """
-        Traverses the file tree to detect .git repositories
+        Traverses the file tree to detect .git repositories.
+        If the ScanIndex FileManager built for this tree is passed, the repository heads it recorded are used instead.
+        If the .git subtrees FileClassifier pruned are passed, their parents are the heads and the tree is not walked.
         """
         if root is None:
             raise ValueError("Root node cannot be None")
         
-        if not isinstance(root, Node):
+        if not isinstance(root, (Node, TreeNode)):
             raise TypeError(f"Expected Node object, got {type(root).__name__}")
 
         self.git_repos.clear()
+        self.git_dirs = {}
         
         try:
-            for node in PreOrderIter(root):
-                if node.name == ".git" and node.parent:
+            if scan_index is not None:
+                for head in scan_index.repo_heads:
+                    head.is_repo_head = True
+                    self.git_repos.append(head)
+                for git_node in scan_index.git_dirs:
+                    if git_node.parent:
+                        self.git_dirs.setdefault(git_node.parent, git_node)
+                return
+
+            if git_subtrees is not None:
+                git_nodes = git_subtrees
+            else:
+                # the contents of a .git directory are never walked
+                git_nodes = [
+                    node for node in PreOrderIter(root, stop=lambda n: n.parent is not None and n.parent.name == GIT_DIR)
+                    if node.name == GIT_DIR
+                ]
+
+            for node in git_nodes:
+                if node.parent:
                     node.parent.is_repo_head = True
                     self.git_repos.append(node.parent)
+                    self.git_dirs.setdefault(node.parent, node)
         except Exception as e:
             raise RuntimeError(f"Failed to process git repositories: {e}")
 
 
     def get_git_repos(self) -> List[Node]:
         """Returns list of git repository nodes"""
-        return self.git_repos
\ No newline at end of file
+        return self.git_repos
+
+    def get_git_dirs(self) -> Dict[Node, Node]:
+        """Returns the .git node of each detected repository, keyed by repository node"""
+        return self.git_dirs
\ No newline at end of file
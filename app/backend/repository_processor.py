@@ -16,14 +16,16 @@ class RepositoryProcessor:
         self.user_email: str = user_email.lower() if user_email else None
         self.temp_dirs: List[str] = []
 
-    def process_repositories(self, repo_nodes: List[Node]) -> List[Dict[str, Any]]:
+    def process_repositories(self, repo_nodes: List[Node], git_dirs: Optional[Dict[Node, Node]] = None) -> List[Dict[str, Any]]:
         # Extracts raw repository data from each repository node
+        # git_dirs maps repository nodes to the .git subtrees RepoDetector already found
         raw_data_list: List[Dict[str, Any]] = []
+        git_dirs = git_dirs or {}
         
         try:
             for repo_node in repo_nodes:
                 # First need to rebuild .git folder for PyDriller to access commits
-                git_folder_path: Path = self._extract_git_folder(repo_node)
+                git_folder_path: Path = self._extract_git_folder(repo_node, git_dirs.get(repo_node))
                 
                 # Extract the raw repository data using PyDriller
                 raw_data: Dict[str, Any] = self._extract_all_repository_data(repo_node, git_folder_path)
@@ -247,17 +249,17 @@ class RepositoryProcessor:
         }
 
     # The methods below are for the building and destruction of temporary .git folders
-    def _extract_git_folder(self, repo_node: Node) -> Path:
+    def _extract_git_folder(self, repo_node: Node, git_node: Optional[Node] = None) -> Path:
         # In order for PyDriller to access the commits, this rebuilds the .git folder for each repository temporarily
         temp_dir: str = tempfile.mkdtemp()
         self.temp_dirs.append(temp_dir)
         temp_path: Path = Path(temp_dir)
 
-        git_node: Optional[Node] = None
-        for child in repo_node.children: # Check all children for git node since repo_node is attached to .git parent
-            if child.name == ".git":
-                git_node = child
-                break
+        if git_node is None:
+            for child in repo_node.children: # Check all children for git node since repo_node is attached to .git parent
+                if child.name == ".git":
+                    git_node = child
+                    break
         
         if not git_node: 
             raise ValueError("No .git folder found in the repository node.")
@@ -0,0 +1,144 @@
+"""
+Process wide read-through cache for DatabaseManager reads. Entries are kept pickled, so every hit hands out
+a fresh copy callers may mutate, and the cache is bounded by the total size of those pickles, least recently
+used entries going first. Every entry carries tags (e.g. "analysis:<id>", "resumes") and writes drop the
+entries of the tags they touch.
+Invalidation only reaches the cache of the process that made the write.
+"""
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Set, Tuple, Union
+
+# most bytes of pickled results kept per database and process, 0 turns the cache off
+RESULT_CACHE_BYTES: int = int(os.environ.get('DB_RESULT_CACHE_BYTES', 64 * 1024 * 1024))
+# results larger than this fraction of the cache are returned but never stored
+MAX_ENTRY_FRACTION: float = 0.25
+
+Tags = Union[Iterable[str], Callable[[Any], Iterable[str]]]
+
+
+class ResultCache:
+    """LRU of pickled results bounded by max_bytes, with tag based invalidation and hit/miss counters"""
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, Set[str]]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+        # bumped by every invalidation, a load that overlapped one is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key: Hashable, tags: Tags, loader: Callable[[], Any]) -> Any:
+        """
+        The cached result for key, or loader() stored under tags. tags may be a function of the loaded result
+        for entries whose tags are only known once loaded. Exceptions of loader propagate and nothing is stored.
+        """
+        if self.max_bytes <= 0:
+            return loader()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(entry[0])
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return value
+        if len(data) > self.max_bytes * MAX_ENTRY_FRACTION:
+            return value
+        entry_tags = set(tags(value) if callable(tags) else tags)
+
+        with self._lock:
+            if generation == self._generation:
+                self._drop(key)
+                self._entries[key] = (data, entry_tags)
+                self._bytes += len(data)
+                for tag in entry_tags:
+                    self._by_tag.setdefault(tag, set()).add(key)
+                while self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, *tags: str) -> None:
+        """Drops every entry carrying any of tags"""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing the cache, hit_rate is None until the first lookup"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        data, entry_tags = entry
+        self._bytes -= len(data)
+        for tag in entry_tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+_caches: Dict[Tuple[int, str], ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(database_name: str) -> ResultCache:
+    """Process wide cache for database_name, keyed by pid like the connection pools"""
+    key = (os.getpid(), database_name)
+    cache = _caches.get(key)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(key, ResultCache())
+    return cache
+
+
+def clear_result_caches() -> None:
+    """
+    Clears every cache of this process. For writes made in another process (e.g. a job running in a process
+    pool), whose invalidations never reach this one.
+    """
+    with _caches_lock:
+        caches = [cache for (pid, _), cache in _caches.items() if pid == os.getpid()]
+    for cache in caches:
+        cache.clear()
@@ -34,7 +34,7 @@ class ResumeBuilder:
             cli.print_header(f"Retrieving result {analysis_id}...")
 
             # Fetch the result data from the db
-            result_data = database_manager.get_analysis_data(analysis_id)
+            result_data = database_manager.get_analysis_sections(analysis_id, ResumeDataProcessor.SECTIONS)
 
             if not result_data:
                 cli.print_status("Result not found in database.", "error")
@@ -6,6 +6,8 @@ class ResumeDataProcessor:
     This class helps to extract and process data from all 
     analysis results for resume generation.
     """
+    # the only parts of an analysis a resume is built from, see DatabaseManager.get_analysis_sections
+    SECTIONS = ("resume_points", "metadata_insights", "project_insights")
 
     def __init__(self, result_data: Dict[str, Any]):
         """
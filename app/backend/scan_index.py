@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from anytree import Node
+from ignore_rules import IgnoreRules, GIT_DIR
+from file_classifier import classify_filename
+
+
+@dataclass
+class ScanEntry:
+    """One path seen by the directory walk. size and mtime are only set for files"""
+    path: Path
+    is_dir: bool
+    size: int = 0
+    mtime: float = 0.0
+
+
+@dataclass
+class IndexedFile:
+    """A file node registered by FileManager, along with everything later stages need to know about it"""
+    node: Node
+    filepath: str
+    size: int
+    last_modified: str
+    file_hash: str
+    extension: str
+    in_git: bool
+    classification: Optional[str]
+
+
+class ScanIndex:
+    """
+    Result of a single walk over an upload, shared by validation, FileManager, FileClassifier and RepoDetector
+    so the tree is never walked or stat'ed more than once:
+    - entries: raw walk of a directory on disk (path, size, mtime), used for the size limit and by FileManager instead of walking again
+    - files: every file node FileManager created, with its hash and text/code/git classification
+    - extension_buckets: files grouped by lower cased extension
+    - git_dirs / repo_heads: .git nodes and the directories that contain them
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root: Path = Path(root)
+        self.entries: List[ScanEntry] = []
+        self.walked: bool = False
+        self.files: List[IndexedFile] = []
+        self.extension_buckets: Dict[str, List[IndexedFile]] = {}
+        self.git_dirs: List[Node] = []
+        self.repo_heads: List[Node] = []
+        self._by_path: Dict[str, IndexedFile] = {}
+        self._git_nodes: Set[Node] = set()
+
+    @classmethod
+    def scan(cls, root: Path, ignore_rules: IgnoreRules | None = None) -> "ScanIndex":
+        """
+        Walk root once, recording size and mtime of every file that survives the ignore rules.
+        Raises OSError if the directory itself cannot be read, unreadable files are skipped.
+        """
+        index = cls(root)
+        rules: IgnoreRules = ignore_rules if ignore_rules else IgnoreRules()
+        for path, is_dir in rules.walk(index.root):
+            if is_dir:
+                index.add_entry(path, True)
+                continue
+            try:
+                stat = path.stat()
+            except (OSError, PermissionError) as e:
+                print(f"Cannot access file {path}: {e}")
+                continue
+            index.add_entry(path, False, stat.st_size, stat.st_mtime)
+        index.walked = True
+        return index
+
+    @property
+    def total_size(self) -> int:
+        return sum(entry.size for entry in self.entries if not entry.is_dir)
+
+    def add_entry(self, path: Path, is_dir: bool, size: int = 0, mtime: float = 0.0) -> ScanEntry:
+        entry = ScanEntry(path, is_dir, size, mtime)
+        self.entries.append(entry)
+        return entry
+
+    def clear_nodes(self) -> None:
+        """Drop everything registered from a tree, keeps the walk entries"""
+        self.files.clear()
+        self.extension_buckets.clear()
+        self.git_dirs.clear()
+        self.repo_heads.clear()
+        self._by_path.clear()
+        self._git_nodes.clear()
+
+    def add_directory(self, node: Node) -> None:
+        """Register a directory or zip node. Must be called after its parent has been registered"""
+        if node.name == GIT_DIR or node.parent in self._git_nodes:
+            self._git_nodes.add(node)
+        if node.name == GIT_DIR:
+            self._add_git_dir(node)
+
+    def add_file(self, node: Node) -> IndexedFile:
+        """Register a file node created by FileManager, classifying it from its name"""
+        file_data = node.file_data
+        in_git = node.parent in self._git_nodes
+        extension = file_data['extension']
+        indexed = IndexedFile(
+            node=node,
+            filepath=file_data['filepath'],
+            size=file_data['size_bytes'],
+            last_modified=file_data['last_modified'],
+            file_hash=file_data['file_hash'],
+            extension=extension,
+            in_git=in_git,
+            classification="git" if in_git else classify_filename(node.name, extension),
+        )
+        self.files.append(indexed)
+        self._by_path[indexed.filepath] = indexed
+        self.extension_buckets.setdefault(extension, []).append(indexed)
+
+        # a .git file is a submodule or worktree pointer, its parent is still a repository head
+        if node.name == GIT_DIR:
+            self._add_git_dir(node)
+        return indexed
+
+    def get(self, filepath: str) -> Optional[IndexedFile]:
+        return self._by_path.get(filepath)
+
+    def _add_git_dir(self, node: Node) -> None:
+        self.git_dirs.append(node)
+        if node.parent:
+            self.repo_heads.append(node.parent)
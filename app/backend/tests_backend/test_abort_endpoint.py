@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 from uuid import uuid4
 from unittest.mock import patch
 
@@ -9,31 +10,38 @@ from fastapi.testclient import TestClient
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from main_api import app
+from cache.session_store import SessionStore
+from jobs import JobRunner, checkpoint
 
 
 client = TestClient(app)
 
 
-def test_abort_upload_success():
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    store = SessionStore(tmp_path)
+    monkeypatch.setattr("main_api.pending_sessions", store)
+    return store
+
+
+def test_abort_upload_success(sessions):
     analysis_id = str(uuid4())
+    sessions.put(f"new_{analysis_id}", {"topic_vector_bundle": {}})
 
-    with patch("main_api.os.path.exists", return_value=True), patch("main_api.os.remove") as mock_remove:
-        response = client.delete(f"/projects/{analysis_id}/upload/abort")
+    response = client.delete(f"/projects/{analysis_id}/upload/abort")
 
     assert response.status_code == 200
     assert response.json() == {"message": "Upload aborted and cache cleared."}
-    assert mock_remove.called
+    assert f"new_{analysis_id}" not in sessions
 
 
-def test_abort_upload_not_found():
+def test_abort_upload_not_found(sessions):
     analysis_id = str(uuid4())
 
-    with patch("main_api.os.path.exists", return_value=False), patch("main_api.os.remove") as mock_remove:
-        response = client.delete(f"/projects/{analysis_id}/upload/abort")
+    response = client.delete(f"/projects/{analysis_id}/upload/abort")
 
     assert response.status_code == 404
     assert response.json() == {"message": "No pending upload found to abort."}
-    mock_remove.assert_not_called()
 
 
 def test_abort_upload_invalid_uuid():
@@ -43,13 +51,59 @@ def test_abort_upload_invalid_uuid():
     assert response.json()["detail"] == "Invalid UUID format"
 
 
-def test_abort_upload_delete_failure():
+def test_abort_upload_delete_failure(sessions):
     analysis_id = str(uuid4())
 
-    with patch("main_api.os.path.exists", return_value=True), patch(
-        "main_api.os.remove", side_effect=Exception("Mocked permission error")
-    ):
+    with patch.object(sessions, "discard", side_effect=Exception("Mocked permission error")):
         response = client.delete(f"/projects/{analysis_id}/upload/abort")
 
     assert response.status_code == 500
-    assert "Failed to delete cache file" in response.json()["detail"]
\ No newline at end of file
+    assert "Failed to delete cache file" in response.json()["detail"]
+
+
+def test_abort_upload_cancels_queued_job(sessions, monkeypatch):
+    runner = JobRunner(max_workers=1)
+    monkeypatch.setattr("main_api.job_runner", runner)
+    analysis_id = str(uuid4())
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    runner.submit("extract_update", block)
+    started.wait(5)
+    queued = runner.submit("commit_update", lambda: None, key=analysis_id)
+
+    response = client.delete(f"/projects/{analysis_id}/upload/abort")
+    release.set()
+    runner.shutdown()
+
+    assert response.status_code == 200
+    assert queued.status == "cancelled"
+
+
+def test_abort_upload_answers_202_until_the_running_job_stopped(sessions, monkeypatch):
+    runner = JobRunner(max_workers=1)
+    monkeypatch.setattr("main_api.job_runner", runner)
+    analysis_id = str(uuid4())
+    started, release = threading.Event(), threading.Event()
+
+    def stages(cancel_event=None):
+        started.set()
+        release.wait(5)
+        checkpoint(cancel_event)
+
+    job = runner.submit("commit_update", stages, key=analysis_id, cancellable=True)
+    started.wait(5)
+
+    response = client.delete(f"/projects/{analysis_id}/upload/abort")
+    assert response.status_code == 202
+    assert response.json()["job_ids"] == [job.job_id]
+    assert response.headers["location"] == f"/jobs/{job.job_id}"
+    assert job.status == "cancelling"
+
+    release.set()
+    runner.wait(job.job_id, timeout=5)
+    runner.shutdown()
+    assert job.status == "cancelled"
@@ -502,3 +502,37 @@ class TestSaveResults:
         
         # Verify return value is not None since return_id is true
         assert result is not None
+
+    def test_saves_share_one_unit_of_work(self, pipeline, mock_data_bundle, mock_results_bundle):
+        """All result writes happen inside a single unit of work"""
+        calls = []
+        db = pipeline.database_manager
+        db.unit_of_work.return_value.__enter__.side_effect = lambda: calls.append("begin")
+        db.unit_of_work.return_value.__exit__.side_effect = lambda *exc: calls.append("commit")
+        db.save_resume_points.side_effect = lambda *args: calls.append("save_resume_points")
+
+        pipeline.save_results(mock_data_bundle, mock_results_bundle, "00000000-0000-0000-0000-000000000000")
+
+        assert calls == ["begin", "save_resume_points", "commit"]
+
+
+@patch("analysis_pipeline.LocalLLMClient")
+def test_cancel_check_stops_generate_before_the_save(mock_llm_cls):
+    """A run cancelled while the summary was generated saves no results"""
+    from jobs import JobCancelled
+    checks = []
+
+    def cancel_check():
+        checks.append("check")
+        if len(checks) == 2:
+            raise JobCancelled()
+
+    config = MagicMock()
+    config.preferences = {"online_llm_consent": False}
+    pipeline = AnalysisPipeline(config, MagicMock(), cancel_check=cancel_check)
+
+    with pytest.raises(JobCancelled):
+        pipeline.run_analysis_generate("00000000-0000-0000-0000-000000000000", {}, {})
+
+    mock_llm_cls.return_value.generate_summary.assert_called_once()
+    pipeline.database_manager.unit_of_work.assert_not_called()
@@ -1,4 +1,5 @@
 import pytest
+import httpx
 from fastapi.testclient import TestClient
 from database_manager import DatabaseManager
 from db_utils import DB_connector
@@ -8,7 +9,7 @@ import uuid
 import pprint
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from main_api import app, get_db
+from main_api import app, get_db, job_runner
 
 #global client initatied later with database override
 client = None
@@ -48,13 +49,22 @@ def makelog(response): #debug helper for development
     with open('tests_backend/log.txt','w') as file:
         file.write(str(response.json()))
 
+def job_response(response):
+    """Waits for the job a 202 response queued, returns the response its endpoint answers with once it ended"""
+    assert response.status_code == 202, f"Job was not queued: {response.status_code}"
+    job_id = response.json()["job_id"]
+    job_runner.wait(job_id, timeout=600)
+    job = client.get(f"/jobs/{job_id}").json()
+    content = job["result"] if job["status"] == "succeeded" else {"detail": job.get("error")}
+    return httpx.Response(job.get("status_code", 500), json=content, headers=job.get("headers", {}))
+
 def make_new_analysis() -> str:
     """Makes new analysis using minimal test_main_dir.zip"""
      # Load our small test zip
     with open('/app/tests_backend/test_main_dir/test_zip_dir.zip', 'rb') as f:
         file = {'file': ('test_main_dir.zip', f)}
         #post the file to new analysis 
-        extract_response = client.post("/projects/upload/extract", files=file)
+        extract_response = job_response(client.post("/projects/upload/extract", files=file))
     
     extract_body = extract_response.json()
     analysis_id = extract_body["analysis_id"]
@@ -72,7 +82,7 @@ def make_new_analysis() -> str:
     }
     
     #Commit the new analysis
-    client.post(f'/projects/{analysis_id}/upload/commit',json = commit_package)
+    job_response(client.post(f'/projects/{analysis_id}/upload/commit',json = commit_package))
     return analysis_id
 
 # --- End of helpers ---
@@ -104,7 +114,7 @@ class TestAPIEndToEnd:
         with open('/app/tests_backend/test_main_dir/test_zip_dir.zip', 'rb') as f:
             file = {'file': ('test_main_dir.zip', f)}
             #post the file to new analysis 
-            extract_response = client.post("/projects/upload/extract", files=file)
+            extract_response = job_response(client.post("/projects/upload/extract", files=file))
        
         #Check for success
         assert extract_response.status_code == 200, f"Extract phase returned fail code {extract_response.status_code}"
@@ -134,7 +144,7 @@ class TestAPIEndToEnd:
             "online_llm_consent": True,
         }
         
-        commit_response = client.post(f'/projects/{analysis_id}/upload/commit',json = commit_package)
+        commit_response = job_response(client.post(f'/projects/{analysis_id}/upload/commit',json = commit_package))
         
         assert commit_response.status_code == 200, f"Commit phase returned fail code {extract_response.status_code}"
         commit_body = commit_response.json()
@@ -192,7 +202,7 @@ class TestAPIEndToEnd:
         assert resp_empty.status_code == 404
  
         #POST to Generate the resume
-        generate_response = client.post(f"/resume/generate/{analysis_id}",params={"resume_title": "Test Resume"})
+        generate_response = job_response(client.post(f"/resume/generate/{analysis_id}",params={"resume_title": "Test Resume"}))
         assert generate_response.status_code == 201, (f"Resume generation failed: {generate_response.status_code}")
         
         resume_body = generate_response.json()
@@ -2,6 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 import sys
 import os
+import threading
 from unittest.mock import ANY,patch
 
 
@@ -23,10 +24,22 @@ API Testing methodology:
 
 # path to import backend code
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from main_api import app,get_db
+from main_api import app,get_db,job_runner
+from jobs import JobRunner
+from compact_tree import CompactTree
+from tree_manager import ChangeSet
+from cache.session_store import SessionStore
 
 client = TestClient(app)
 
+def finished_job(response):
+    """Waits for the job a 202 response queued and returns its status as GET /jobs/{job_id} reports it"""
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["location"] == f"/jobs/{job_id}"
+    job_runner.wait(job_id, timeout=10)
+    return client.get(f"/jobs/{job_id}").json()
+
 @pytest.fixture
 def placeholder_UUID():
     return "00000000-0000-0000-0000-000000000000"
@@ -105,6 +118,8 @@ def mock_backend(mocker,sample_analysis,sample_resume, sample_portfolio,placehol
     
     #db_instance.db.execute_query.side_effect = simple_query_side_effect
     db_instance.get_analysis_data.side_effect = lambda rid: None if rid == "missing-id" else sample_analysis
+    #section reads answer like get_analysis_data so the tests below can keep configuring that one
+    db_instance.get_analysis_sections.side_effect = lambda rid, sections=None: db_instance.get_analysis_data(rid)
     
     db_instance.save_resume_points.return_value = True
     
@@ -114,6 +129,13 @@ def mock_backend(mocker,sample_analysis,sample_resume, sample_portfolio,placehol
         {'analysis_id':placeholder_UUID,'analysis_title': 'Title2','metadata_insights':'{"test": "data"}','project_insights':'{"test": "data"}','file_path':'some_path2'}
     ]
     
+    db_instance.get_analyses_listing.return_value = [
+        {'analysis_id':placeholder_UUID,'analysis_title': 'Title','creation_date':None,'last_modified':None,'file_path':'some_path',
+         'primary_languages':['Python'],'primary_skills':['Backend'],'repository_names':['repo'],'project_count':1,'has_thumbnail':False},
+        {'analysis_id':placeholder_UUID,'analysis_title': 'Title2','creation_date':None,'last_modified':None,'file_path':'some_path2',
+         'primary_languages':[],'primary_skills':[],'repository_names':[],'project_count':0,'has_thumbnail':True}
+    ]
+    
     # mock db_manager returns for resume functions
     db_instance.get_all_resumes.return_value = [sample_resume, sample_resume]
     db_instance.get_resumes_by_analysis_id.return_value = [sample_resume]
@@ -167,6 +189,12 @@ def test_health_check():
     assert res.status_code == 200
     assert res.json()["status"] == "active"
 
+def test_cache_stats(mock_backend):
+    mock_backend["db"].cache_stats.return_value = {"hits": 3, "misses": 1}
+    res = client.get("/cache/stats")
+    assert res.status_code == 200
+    assert res.json() == {"hits": 3, "misses": 1}
+
 # ---- Project/ Analysis end point tests ----
 def test_get_projects_success(mock_backend):
     """Test fetching project list."""
@@ -175,6 +203,75 @@ def test_get_projects_success(mock_backend):
     assert response.status_code == 200
     assert len(response.content) > 0
 
+def test_get_projects_is_summary_only(mock_backend):
+    """The listing only carries the summary fields, never the insight documents."""
+    response = client.get("/projects")
+    assert response.status_code == 200
+    rows = response.json()
+    assert rows[0]['repository_names'] == ['repo']
+    assert rows[0]['project_count'] == 1
+    assert rows[1]['has_thumbnail'] is True
+    assert 'project_insights' not in rows[0] and 'metadata_insights' not in rows[0]
+
+def test_get_project_fields(mock_backend, placeholder_UUID):
+    """?fields= is passed through as the sections to read, unknown fields are a 400."""
+    response = client.get(f"/projects/{placeholder_UUID}?fields=metadata_insights, project_insights")
+    assert response.status_code == 200
+    mock_backend["db"].get_analysis_sections.assert_called_once_with(placeholder_UUID, ["metadata_insights", "project_insights"])
+
+    response = client.get(f"/projects/{placeholder_UUID}?fields=metadata_insights,secrets")
+    assert response.status_code == 400
+
+def test_get_projects_skill_and_import_filters(mock_backend):
+    """?skill= and ?import= are handed to the listing query."""
+    response = client.get("/projects?skill=Python&import=numpy")
+    assert response.status_code == 200
+    kwargs = mock_backend["db"].get_analyses_listing.call_args.kwargs
+    assert kwargs["skill"] == "Python" and kwargs["import_name"] == "numpy"
+
+def test_get_project_result_section(mock_backend, placeholder_UUID):
+    """Only the requested sub-document is read, a missing path is a 404 and an unknown column a 400."""
+    db = mock_backend["db"]
+    db.get_result_section.return_value = {"Python": {"file_count": 3}}
+    response = client.get(f"/projects/{placeholder_UUID}/results/metadata_insights/language_stats")
+    assert response.status_code == 200
+    assert response.json() == {"Python": {"file_count": 3}}
+    db.get_result_section.assert_called_once_with(placeholder_UUID, "metadata_insights", ["language_stats"])
+
+    db.get_result_section.return_value = None
+    assert client.get(f"/projects/{placeholder_UUID}/results/metadata_insights/nope").status_code == 404
+    assert client.get(f"/projects/{placeholder_UUID}/results/secrets/x").status_code == 400
+
+def test_get_project_filetrees(mock_backend, placeholder_UUID):
+    """The version list comes from the filetree history, a version of another analysis is a 404."""
+    db = mock_backend["db"]
+    db.get_filetree_history.return_value = [
+        {"filetree_id": 1, "base_tree_id": None, "chain_depth": 0, "is_snapshot": True},
+        {"filetree_id": 2, "base_tree_id": 1, "chain_depth": 1, "is_snapshot": False},
+    ]
+    tree = CompactTree()
+    tree.add(-1, "root", "directory", filepath="/up/root")
+    db.get_filetree_version.return_value = tree
+
+    response = client.get(f"/projects/{placeholder_UUID}/filetrees")
+    assert response.status_code == 200
+    assert [row["filetree_id"] for row in response.json()] == [1, 2]
+
+    response = client.get(f"/projects/{placeholder_UUID}/filetrees/2")
+    assert response.status_code == 200
+    assert response.json()["name"] == "root"
+    db.get_filetree_version.assert_called_once_with(2)
+
+    assert client.get(f"/projects/{placeholder_UUID}/filetrees/7").status_code == 404
+    db.get_filetree_history.return_value = []
+    assert client.get(f"/projects/{placeholder_UUID}/filetrees").status_code == 404
+
+def test_get_projects_db_error(mock_backend):
+    """A failing listing query becomes a 500."""
+    mock_backend["db"].get_analyses_listing.side_effect = LookupError("boom")
+    response = client.get("/projects")
+    assert response.status_code == 500
+
 def test_get_project_success(mock_backend,sample_analysis,placeholder_UUID):
     """Test fetching valid project detail."""
     # Use a valid UUID string
@@ -261,13 +358,14 @@ def test_generate_resume_success(mock_backend, sample_analysis,sample_resume,pla
         #Exec and retrieve result
         mock_backend['db'].save_resume.return_value = resume_id
         
-        response = client.post(f"/resume/generate/{analysis_id}")
+        job = finished_job(client.post(f"/resume/generate/{analysis_id}"))
         
-        if not response.status_code == 201:
-            print(response.json()['detail'])
+        if not job["status"] == "succeeded":
+            print(job['error'])
         
-        assert response.status_code == 201
-        assert response.headers["location"] == f"/resume/{resume_id}"
+        assert job["status_code"] == 201
+        assert job["headers"]["location"] == f"/resume/{resume_id}"
+        assert job["result"]["resume_id"] == resume_id
 
 def test_edit_resume_success(mock_backend):
     """Test saving edits."""
@@ -287,6 +385,32 @@ def test_get_all_resumes_success(mock_backend, sample_resume):
     assert response.status_code == 200
     assert response.json() == [sample_resume, sample_resume]
 
+def test_get_all_resumes_pagination(mock_backend, placeholder_UUID):
+    """A full page returns the cursor of the next one, which is passed back as the keyset."""
+    mock_backend["db"].get_all_resumes.return_value = [
+        {"resume_id": 3, "analysis_id": placeholder_UUID},
+        {"resume_id": 2, "analysis_id": placeholder_UUID},
+    ]
+    response = client.get(f"/resumes?limit=1&analysis_id={placeholder_UUID}&title_prefix=Back")
+    assert response.status_code == 200
+    assert [r["resume_id"] for r in response.json()] == [3]
+    cursor = response.headers["X-Next-Cursor"]
+    mock_backend["db"].get_all_resumes.assert_called_with(
+        limit=2, after=None, analysis_id=placeholder_UUID, created_from=None, created_to=None, title_prefix="Back"
+    )
+
+    mock_backend["db"].get_all_resumes.return_value = [{"resume_id": 2, "analysis_id": placeholder_UUID}]
+    response = client.get(f"/resumes?limit=1&cursor={cursor}")
+    assert "X-Next-Cursor" not in response.headers
+    assert mock_backend["db"].get_all_resumes.call_args.kwargs["after"] == 3
+
+def test_list_endpoints_reject_bad_pages(mock_backend):
+    """Out of range limits, foreign cursors and malformed analysis ids are client errors."""
+    assert client.get("/portfolios?limit=0").status_code == 422
+    assert client.get("/projects?limit=100000").status_code == 422
+    assert client.get("/projects?cursor=garbage").status_code == 400
+    assert client.get("/resumes?analysis_id=not-a-uuid").status_code == 400
+
 def test_get_resumes_by_analysis_success(mock_backend, sample_resume,placeholder_UUID):
     """Test fetching all resumes for a given analysis."""
     response = client.get(f"/resumes/{placeholder_UUID}")
@@ -650,56 +774,45 @@ def test_get_config(mock_backend):
     assert res.status_code == 200
 
 def test_get_skills_interface_success(mock_backend):
-    """Interface test: GET /skills aggregates languages/frameworks correctly."""
-    mock_backend["db"].get_all_analyses_summary.return_value = [
-        {
-            "metadata_insights": {
-                "language_stats": {
-                    "Python": {"file_count": 3},
-                    "JavaScript": {"file_count": 1}
-                },
-                "skill_stats": {
-                    "Backend Development": {"file_count": 2}
-                }
-            },
-            "project_insights": {
-                "analyzed_insights": [{
-                    "imports_summary": {
-                        "FastAPI": {"frequency": 1}
-                    }
-                }]
-            }
-        },
-        {
-            "metadata_insights": {
-                "language_stats": {
-                    "Python": {"file_count": 2}
-                },
-                "skill_stats": {}
-            },
-            "project_insights": {
-                "analyzed_insights": [{
-                    "imports_summary": {
-                        "React": {"frequency": 1}
-                    }
-                }]
-            }
-        },
+    """Interface test: GET /skills returns the aggregated counts, highest first."""
+    mock_backend["db"].get_skill_counts.return_value = [
+        {"skill": "Python", "count": 5},
+        {"skill": "Backend Development", "count": 2},
+        {"skill": "FastAPI", "count": 1},
     ]
 
     res = client.get("/skills")
 
     assert res.status_code == 200
     skills = res.json()['skills']
+    assert list(skills) == ["Python", "Backend Development", "FastAPI"]
     assert skills["Python"] == 5
-    assert skills["JavaScript"] == 1
-    assert skills["FastAPI"] == 1
-    assert skills["React"] == 1
-    assert skills["Backend Development"] == 2
+    assert 'by_analysis' not in res.json()
+    mock_backend["db"].get_skill_counts.assert_called_once_with(None)
+
+def test_get_skills_top_and_breakdown(mock_backend, placeholder_UUID):
+    """GET /skills?top=N&by_analysis=true passes the limit through and groups the breakdown by analysis."""
+    mock_backend["db"].get_skill_counts.return_value = [{"skill": "Python", "count": 5}]
+    mock_backend["db"].get_skill_counts_by_analysis.return_value = [
+        {"analysis_id": placeholder_UUID, "skill": "Python", "count": 3},
+        {"analysis_id": placeholder_UUID, "skill": "React", "count": 1},
+    ]
+
+    res = client.get("/skills?top=1&by_analysis=true")
+
+    assert res.status_code == 200
+    assert res.json()['by_analysis'] == {placeholder_UUID: {"Python": 3, "React": 1}}
+    mock_backend["db"].get_skill_counts.assert_called_once_with(1)
+
+def test_get_skills_rejects_bad_top(mock_backend):
+    """A top below one is rejected before touching the database."""
+    res = client.get("/skills?top=0")
+    assert res.status_code == 422
+    mock_backend["db"].get_skill_counts.assert_not_called()
 
 def test_get_skills_implementation_empty_db(mock_backend):
     """Implementation test: GET /skills returns empty skills on empty database."""
-    mock_backend["db"].get_all_analyses_summary.return_value = []
+    mock_backend["db"].get_skill_counts.return_value = []
 
     res = client.get("/skills")
 
@@ -708,9 +821,14 @@ def test_get_skills_implementation_empty_db(mock_backend):
 
 TEST_UUID = "123e4567-e89b-12d3-a456-426614174000"
 
-@patch("main_api.pickle.dump")
-@patch("main_api.DictExporter")
-@patch("main_api.DictImporter")
+@pytest.fixture
+def pending_sessions(tmp_path, monkeypatch):
+    """Pending extract sessions kept in a temporary directory"""
+    store = SessionStore(tmp_path / "sessions")
+    monkeypatch.setattr("main_api.pending_sessions", store)
+    return store
+
+@patch("main_api.CompactTree")
 @patch("main_api.TreeManager")
 @patch("main_api.perform_update_merge")
 @patch("main_api.FileManager")
@@ -720,7 +838,7 @@ TEST_UUID = "123e4567-e89b-12d3-a456-426614174000"
 def test_extract_update_endpoint(
     mock_db_cls, mock_config_cls,
     mock_pipeline_cls, mock_fm_cls, mock_merge,
-    mock_tm_cls, mock_importer_cls, mock_exporter_cls, mock_pickle_dump
+    mock_tm_cls, mock_compact_tree_cls, pending_sessions
 ):
     """Test Phase 1: PUT /projects/{analysis_id}/update/extract"""
     # Mock FileManager to return a valid tree structure
@@ -746,7 +864,9 @@ def test_extract_update_endpoint(
     mock_pipeline.result_bundle.doc_topic_vectors = []
     mock_pipeline.result_bundle.topic_term_vectors = []
     mock_pipeline.result_bundle.project_analysis_data = {"analyzed_insights": []}
-    mock_exporter_cls.return_value.export.return_value = {}
+    mock_compact_tree_cls.from_node.return_value.to_bytes.return_value = b""
+    mock_fm_cls.return_value.build_manifest.return_value.to_dict.return_value = {}
+    mock_tm_cls.return_value.change_set = ChangeSet(added=["new.py"], unchanged=["old.py"])
 
     # Simulate dummy zip file and form-data credentials
     files = {"file": ("test_repo.zip", b"dummy zip content", "application/zip")}
@@ -754,36 +874,34 @@ def test_extract_update_endpoint(
         "github_username": "testuser",
         "github_email": "test@example.com",
     }
-    response = client.put(f"/projects/{TEST_UUID}/update/extract", files=files, data=data)
+    job = finished_job(client.put(f"/projects/{TEST_UUID}/update/extract", files=files, data=data))
 
-    assert response.status_code == 200
-    json_response = response.json()
+    assert job["status"] == "succeeded"
+    assert job["status_code"] == 200
+    json_response = job["result"]
     assert "topic_keywords" in json_response
     assert "detected_skills" in json_response
     assert json_response["detected_skills"] == ["Python", "React"]
+    assert json_response["changed_files"] == {"added": 1, "removed": 0, "modified": 0, "unchanged": 1}
 
     mock_pipeline.run_analysis_extract.assert_called_once()
+    # the merge reports its change set to the job's TreeManager
+    assert mock_merge.call_args.args[-1] is mock_tm_cls.return_value
 
     # Verify deep caching was successful
-    assert mock_pickle_dump.called
-    cached_payload = mock_pickle_dump.call_args[0][0]
+    cached_payload = pending_sessions.take(f"update_{TEST_UUID}")
     assert "pipeline_data_bundle" in cached_payload
+    assert cached_payload["change_set"]["added"] == ["new.py"]
     assert "pipeline_result_bundle" in cached_payload
     assert cached_payload["pipeline_data_bundle"]["metadata_results"] == {"test": "data"}
 
-    # Clean up the cache file created by the endpoint
-    cache_path = os.path.join("cache", f"pending_update_{TEST_UUID}.pkl")
-    if os.path.exists(cache_path):
-        os.remove(cache_path)
-
 @patch("main_api.AnalysisPipeline")
 @patch("main_api.ConfigManager")
 @patch("main_api.DatabaseManager")
-def test_commit_update_endpoint(mock_db_cls, mock_config_cls, mock_pipeline_cls):
+def test_commit_update_endpoint(mock_db_cls, mock_config_cls, mock_pipeline_cls, pending_sessions):
     """Test Phase 2: POST /projects/{analysis_id}/update/commit"""
-    import pickle
     cache_data = {
-        "merged_tree_dict": {},
+        "merged_tree": CompactTree().to_bytes(),
         "merged_binary_list": [],
         "topic_vector_bundle": {"topic_keywords": []},
         "text_analysis_data": {},
@@ -803,10 +921,7 @@ def test_commit_update_endpoint(mock_db_cls, mock_config_cls, mock_pipeline_cls)
             "project_analysis_data": {"analyzed_insights": []}
         }
     }
-    os.makedirs("cache", exist_ok=True)
-    cache_path = os.path.join("cache", f"pending_update_{TEST_UUID}.pkl")
-    with open(cache_path, "wb") as f:
-        pickle.dump(cache_data, f)
+    pending_sessions.put(f"update_{TEST_UUID}", cache_data)
     
     mock_pipeline = mock_pipeline_cls.return_value
     mock_pipeline.run_analysis_generate.return_value = (
@@ -820,25 +935,60 @@ def test_commit_update_endpoint(mock_db_cls, mock_config_cls, mock_pipeline_cls)
         "selected_projects": ["capstone_repo", "other_repo"],
         "online_llm_consent": True,
     }
-    try:
-        response = client.post(f"/projects/{TEST_UUID}/update/commit", json=payload)
-
-        assert response.status_code == 200
-        json_response = response.json()
-        assert json_response["status"] == "success"
-        assert json_response["summary"] == "This is a fake AI generated summary for testing."
-        mock_pipeline.run_analysis_generate.assert_called_once()
-        assert mock_pipeline.run_analysis_generate.call_args.kwargs["selected_projects"] == [
-            "capstone_repo", "other_repo"
-        ]
-        # Assert restoration
-        assert mock_pipeline.data_bundle.metadata_results == {"update_test": "data"}
-    finally:
-        if os.path.exists(cache_path):
-            os.remove(cache_path)
+    job = finished_job(client.post(f"/projects/{TEST_UUID}/update/commit", json=payload))
+
+    assert job["status"] == "succeeded"
+    json_response = job["result"]
+    assert json_response["status"] == "success"
+    assert json_response["summary"] == "This is a fake AI generated summary for testing."
+    mock_pipeline.run_analysis_generate.assert_called_once()
+    assert mock_pipeline.run_analysis_generate.call_args.kwargs["selected_projects"] == [
+        "capstone_repo", "other_repo"
+    ]
+    # Assert restoration
+    assert mock_pipeline.data_bundle.metadata_results == {"update_test": "data"}
+    # the session is used up by the commit
+    assert f"update_{TEST_UUID}" not in pending_sessions
+    mock_db_cls.return_value.save_fileset.assert_called_once()
+
+@patch("main_api.AnalysisPipeline")
+@patch("main_api.ConfigManager")
+@patch("main_api.DatabaseManager")
+def test_commit_update_without_changed_files_keeps_the_fileset(mock_db_cls, mock_config_cls, mock_pipeline_cls, pending_sessions):
+    cache_data = {
+        "merged_tree": CompactTree().to_bytes(),
+        "merged_binary_list": [],
+        "change_set": ChangeSet(unchanged=["a.py"]).to_dict(),
+        "topic_vector_bundle": {"topic_keywords": []},
+        "text_analysis_data": {},
+        "analyzed_repos": [],
+        "pipeline_data_bundle": {"metadata_results": {}, "final_bow": [], "processed_git_repos": []},
+        "pipeline_result_bundle": {
+            "metadata_analysis": {},
+            "doc_topic_vectors": [],
+            "topic_term_vectors": [],
+            "project_analysis_data": {},
+        }
+    }
+    pending_sessions.put(f"update_{TEST_UUID}", cache_data)
+    mock_pipeline_cls.return_value.run_analysis_generate.return_value = "summary"
+    payload = {"topic_keywords": [], "user_highlights": [], "selected_projects": [], "online_llm_consent": False}
+
+    job = finished_job(client.post(f"/projects/{TEST_UUID}/update/commit", json=payload))
+
+    assert job["status"] == "succeeded"
+    mock_db_cls.return_value.save_fileset.assert_not_called()
+    mock_pipeline_cls.return_value.run_analysis_generate.assert_called_once()
             
 UPLOAD_MOCK_UUID = "mock-uuid-1234"
 
+UPLOAD_COMMIT_PAYLOAD = {
+    "topic_keywords": [{"topic_id": 1, "keywords": ["ai", "python"]}],
+    "user_highlights": ["highlight1"],
+    "selected_projects": ["Repo1"],
+    "online_llm_consent": True,
+}
+
 UPLOAD_DUMMY_CACHE = {
     "topic_vector_bundle": {"topic_keywords": []},
     "text_analysis_data": {},
@@ -857,16 +1007,14 @@ UPLOAD_DUMMY_CACHE = {
 }
 
 
-@patch("main_api.os.makedirs")
-@patch("main_api.pickle.dump")
 @patch("main_api.AnalysisPipeline")
 @patch("main_api.ConfigManager")
 @patch("main_api.DatabaseManager")
 def test_extract_upload_success(
     mock_db_cls, mock_config_cls,
-    mock_pipeline_cls, mock_pickle_dump, mock_makedirs,
+    mock_pipeline_cls, pending_sessions,
 ):
-    """Test Case 1 (Success): POST /projects/upload/extract returns 200 with expected fields."""
+    """Test Case 1 (Success): POST /projects/upload/extract queues a job that succeeds with expected fields."""
     mock_pipeline = mock_pipeline_cls.return_value
     mock_pipeline.run_analysis_extract.return_value = (
         UPLOAD_MOCK_UUID,
@@ -883,55 +1031,101 @@ def test_extract_upload_success(
     mock_pipeline.result_bundle.project_analysis_data = {"analyzed_insights": []}
 
     files = {"file": ("test.zip", b"dummy zip content", "application/zip")}
-    response = client.post("/projects/upload/extract", files=files)
+    job = finished_job(client.post("/projects/upload/extract", files=files))
 
-    assert response.status_code == 200
-    json_response = response.json()
+    assert job["status"] == "succeeded"
+    assert job["status_code"] == 200
+    json_response = job["result"]
     assert json_response["analysis_id"] == UPLOAD_MOCK_UUID
     assert "topic_keywords" in json_response
     assert "detected_skills" in json_response
     assert "analyzed_projects" in json_response
     assert json_response["detected_skills"] == ["Python"]
 
-    # Intercept what was written to the .pkl cache file
-    assert mock_pickle_dump.called
-    cached_payload = mock_pickle_dump.call_args[0][0]
+    # Intercept what was kept for the commit step
+    cached_payload = pending_sessions.take(f"new_{UPLOAD_MOCK_UUID}")
     
     # Verify the pipeline's brain was successfully packed
     assert "pipeline_data_bundle" in cached_payload
     assert "pipeline_result_bundle" in cached_payload
 
 
+@patch("main_api.AnalysisPipeline")
+@patch("main_api.ConfigManager")
+@patch("main_api.DatabaseManager")
+def test_cancelled_extract_upload_deletes_its_analysis(
+    mock_db_cls, mock_config_cls, mock_pipeline_cls, pending_sessions,
+):
+    """Cancelling a running extract stops it at the next checkpoint and removes the analysis it created"""
+    mock_pipeline = mock_pipeline_cls.return_value
+
+    def extract(**kwargs):
+        mock_pipeline.created_analysis_id = UPLOAD_MOCK_UUID
+        job = next(job for job in job_runner.jobs() if job.kind == "extract_upload" and job.finished is None)
+        job_runner.cancel(job.job_id)
+        mock_pipeline_cls.call_args.kwargs["cancel_check"]()
+
+    mock_pipeline.run_analysis_extract.side_effect = extract
+
+    files = {"file": ("test.zip", b"dummy zip content", "application/zip")}
+    job = finished_job(client.post("/projects/upload/extract", files=files))
+
+    assert job["status"] == "cancelled"
+    assert "result" not in job and "error" not in job
+    mock_db_cls.return_value.delete_analysis.assert_called_once_with(UPLOAD_MOCK_UUID)
+    assert f"new_{UPLOAD_MOCK_UUID}" not in pending_sessions
+
+@patch("main_api.AnalysisPipeline")
+@patch("main_api.ConfigManager")
+@patch("main_api.DatabaseManager")
+def test_cancelled_commit_update_saves_nothing(mock_db_cls, mock_config_cls, mock_pipeline_cls, pending_sessions):
+    started, release = threading.Event(), threading.Event()
+
+    def save_prefs(prefs):
+        started.set()
+        release.wait(5)
+
+    mock_config_cls.return_value.save_prefs.side_effect = save_prefs
+    pending_sessions.put(f"update_{TEST_UUID}", {"topic_vector_bundle": {}, "merged_tree": CompactTree().to_bytes()})
+    payload = {"topic_keywords": [], "user_highlights": [], "selected_projects": [], "online_llm_consent": False}
+
+    response = client.post(f"/projects/{TEST_UUID}/update/commit", json=payload)
+    started.wait(5)
+    abort = client.delete(f"/projects/{TEST_UUID}/upload/abort")
+    release.set()
+    job = finished_job(response)
+
+    assert abort.status_code == 202
+    assert job["status"] == "cancelled"
+    mock_db_cls.return_value.save_fileset.assert_not_called()
+    mock_pipeline_cls.return_value.run_analysis_generate.assert_not_called()
+
 @patch("main_api.AnalysisPipeline")
 @patch("main_api.ConfigManager")
 @patch("main_api.DatabaseManager")
 def test_extract_upload_pipeline_failure(
     mock_db_cls, mock_config_cls, mock_pipeline_cls,
 ):
-    """Test Case 2 (Failure): POST /projects/upload/extract returns 500 when pipeline returns None."""
+    """Test Case 2 (Failure): the extract job fails with 500 when pipeline returns None."""
     mock_pipeline = mock_pipeline_cls.return_value
     mock_pipeline.run_analysis_extract.return_value = None
 
     files = {"file": ("test.zip", b"dummy zip content", "application/zip")}
-    response = client.post("/projects/upload/extract", files=files)
+    job = finished_job(client.post("/projects/upload/extract", files=files))
 
-    assert response.status_code == 500
+    assert job["status"] == "failed"
+    assert job["status_code"] == 500
+    assert job["error"] == "Extraction phase failed"
 
 
 @patch("main_api.AnalysisPipeline")
 @patch("main_api.ConfigManager")
-@patch("main_api.os.remove")
-@patch("main_api.pickle.load")
-@patch("builtins.open")
-@patch("main_api.os.path.exists")
 @patch("main_api.DatabaseManager")
 def test_commit_upload_success(
-    mock_db_cls, mock_exists, mock_open_call, mock_pickle_load,
-    mock_os_remove, mock_config_cls, mock_pipeline_cls,
+    mock_db_cls, mock_config_cls, mock_pipeline_cls, pending_sessions,
 ):
-    """Test Case 3 (Success): POST /projects/{analysis_id}/upload/commit returns 200."""
-    mock_exists.return_value = True
-    mock_pickle_load.return_value = UPLOAD_DUMMY_CACHE
+    """Test Case 3 (Success): POST /projects/{analysis_id}/upload/commit queues a job that succeeds."""
+    pending_sessions.put(f"new_{UPLOAD_MOCK_UUID}", UPLOAD_DUMMY_CACHE)
 
     mock_pipeline = mock_pipeline_cls.return_value
     mock_pipeline.run_analysis_generate.return_value = "Mocked AI Summary"
@@ -942,21 +1136,62 @@ def test_commit_upload_success(
         "selected_projects": ["Repo1"],
         "online_llm_consent": True,
     }
-    response = client.post(f"/projects/{UPLOAD_MOCK_UUID}/upload/commit", json=payload)
+    job = finished_job(client.post(f"/projects/{UPLOAD_MOCK_UUID}/upload/commit", json=payload))
 
-    assert response.status_code == 200
-    json_response = response.json()
+    assert job["status"] == "succeeded"
+    json_response = job["result"]
     assert json_response["status"] == "success"
     assert json_response["summary"] == "Mocked AI Summary"
 
     # Verify the new pipeline's empty memory was overwritten with our cache
     assert mock_pipeline.data_bundle.metadata_results == {"restored": "metadata"}
 
-@patch("main_api.os.path.exists")
+@patch("main_api.AnalysisPipeline")
+@patch("main_api.ConfigManager")
+@patch("main_api.DatabaseManager")
+def test_commit_upload_keeps_session_when_queue_is_full(
+    mock_db_cls, mock_config_cls, mock_pipeline_cls, pending_sessions, monkeypatch,
+):
+    """A commit refused with 429 leaves its pending session in place so it can be retried."""
+    runner = JobRunner(max_workers=1, max_queued=1)
+    monkeypatch.setattr("main_api.job_runner", runner)
+    started, release = threading.Event(), threading.Event()
+    runner.submit("block", lambda: started.set() or release.wait(5))
+    started.wait(5)
+    queued = runner.submit("queued", lambda: None)
+    pending_sessions.put(f"new_{UPLOAD_MOCK_UUID}", UPLOAD_DUMMY_CACHE)
+    mock_pipeline_cls.return_value.run_analysis_generate.return_value = "Mocked AI Summary"
+
+    response = client.post(f"/projects/{UPLOAD_MOCK_UUID}/upload/commit", json=UPLOAD_COMMIT_PAYLOAD)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "5"
+    assert f"new_{UPLOAD_MOCK_UUID}" in pending_sessions
+
+    release.set()
+    runner.wait(queued.job_id, timeout=5)
+    response = client.post(f"/projects/{UPLOAD_MOCK_UUID}/upload/commit", json=UPLOAD_COMMIT_PAYLOAD)
+    assert response.status_code == 202
+    runner.wait(response.json()["job_id"], timeout=10)
+    assert client.get(f"/jobs/{response.json()['job_id']}").json()["status"] == "succeeded"
+    assert f"new_{UPLOAD_MOCK_UUID}" not in pending_sessions
+    runner.shutdown()
+
+@patch("main_api.AnalysisPipeline")
+@patch("main_api.ConfigManager")
 @patch("main_api.DatabaseManager")
-def test_commit_upload_cache_expired(mock_db_cls, mock_exists):
+def test_commit_update_failure_gives_session_back(mock_db_cls, mock_config_cls, mock_pipeline_cls, pending_sessions):
+    """A commit job that fails puts its pending session back for another attempt."""
+    pending_sessions.put(f"update_{UPLOAD_MOCK_UUID}", {**UPLOAD_DUMMY_CACHE, "merged_tree": b"", "merged_binary_list": []})
+    mock_pipeline_cls.return_value.run_analysis_generate.side_effect = RuntimeError("LLM unavailable")
+
+    job = finished_job(client.post(f"/projects/{UPLOAD_MOCK_UUID}/update/commit", json=UPLOAD_COMMIT_PAYLOAD))
+
+    assert job["status"] == "failed"
+    assert f"update_{UPLOAD_MOCK_UUID}" in pending_sessions
+
+@patch("main_api.DatabaseManager")
+def test_commit_upload_cache_expired(mock_db_cls, pending_sessions):
     """Test Case 4 (Failure): POST /projects/{analysis_id}/upload/commit returns 404 when cache is missing."""
-    mock_exists.return_value = False
 
     payload = {
         "topic_keywords": [{"topic_id": 1, "keywords": ["ai", "python"]}],
@@ -967,4 +1202,8 @@ def test_commit_upload_cache_expired(mock_db_cls, mock_exists):
     response = client.post(f"/projects/{UPLOAD_MOCK_UUID}/upload/commit", json=payload)
 
     assert response.status_code == 404
-    assert "pending upload found" in response.json()["detail"]
\ No newline at end of file
+    assert "pending upload found" in response.json()["detail"]
+
+def test_get_job_not_found():
+    response = client.get("/jobs/unknown-job")
+    assert response.status_code == 404
@@ -1,4 +1,5 @@
 import pytest
+import httpx
 from fastapi.testclient import TestClient
 from database_manager import DatabaseManager
 from db_utils import DB_connector
@@ -7,7 +8,7 @@ import os
 import uuid
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from main_api import app, get_db
+from main_api import app, get_db, job_runner
 
 #global client initatied later with database override
 client = None
@@ -51,6 +52,15 @@ def makelog(response): #debug helper for development
     with open('tests_backend/log.txt','w') as file:
         file.write(str(response.json()))
 
+def job_response(response):
+    """Waits for the job a 202 response queued, returns the response its endpoint answers with once it ended"""
+    assert response.status_code == 202, f"Job was not queued: {response.status_code}"
+    job_id = response.json()["job_id"]
+    job_runner.wait(job_id, timeout=600)
+    job = client.get(f"/jobs/{job_id}").json()
+    content = job["result"] if job["status"] == "succeeded" else {"detail": job.get("error")}
+    return httpx.Response(job.get("status_code", 500), json=content, headers=job.get("headers", {}))
+
 
 # --- End of helpers ---
 
@@ -72,7 +82,7 @@ class TestAPIIntegration:
         """Loads a sample analysis via the extract and commit endpoints. Also tests both endpoints with test_main_dir.zip"""
         with open('/app/tests_backend/test_main_dir/test_zip_dir.zip', 'rb') as f:
             file = {'file': ('test_main_dir.zip', f)}
-            extract_response = client.post("/projects/upload/extract", files=file)
+            extract_response = job_response(client.post("/projects/upload/extract", files=file))
  
         extract_body = extract_response.json()
         analysis_id:str = extract_body['analysis_id']
@@ -87,7 +97,7 @@ class TestAPIIntegration:
             "online_llm_consent": True,
         }
         
-        commit_response = client.post(f'/projects/{analysis_id}/upload/commit',json = payload)
+        commit_response = job_response(client.post(f'/projects/{analysis_id}/upload/commit',json = payload))
         
         assert extract_response.status_code == 200
         assert commit_response.status_code == 200
@@ -107,7 +117,7 @@ class TestAPIIntegration:
             file = {'file': ('test_main_dir.zip', f)}
             
             global gl_analysis_id
-            extract_response = client.put(f"/projects/{gl_analysis_id}/update/extract", files=file)
+            extract_response = job_response(client.put(f"/projects/{gl_analysis_id}/update/extract", files=file))
         
         extract_body = extract_response.json()
         selected_projects = [p["repository_name"] for p in extract_body.get("analyzed_projects", [])]
@@ -121,7 +131,7 @@ class TestAPIIntegration:
             "online_llm_consent": True,
         }
         
-        commit_response = client.post(f'/projects/{gl_analysis_id}/update/commit',json = payload)
+        commit_response = job_response(client.post(f'/projects/{gl_analysis_id}/update/commit',json = payload))
         
         assert extract_response.status_code == 200
         assert commit_response.status_code == 200
@@ -155,7 +165,7 @@ class TestAPIIntegration:
     
     def test_post_generate_resume(self):
         global gl_analysis_id
-        response = client.post(f'resume/generate/{gl_analysis_id}')
+        response = job_response(client.post(f'resume/generate/{gl_analysis_id}'))
         
         assert response.status_code == 201
         assert 'location' in response.headers
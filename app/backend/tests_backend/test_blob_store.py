@@ -0,0 +1,121 @@
+import os
+import pickle
+import hashlib
+import time
+from io import BytesIO
+from cache.blob_store import BlobStore, BlobArray, DEFAULT_BLOB_DIR
+
+
+def test_put_and_get(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    content = b"blob content"
+
+    file_hash = store.put(content)
+    assert file_hash == hashlib.sha256(content).hexdigest()
+    assert store.has(file_hash)
+    assert store.get(file_hash) == content
+    assert store.size(file_hash) == len(content)
+
+def test_put_stream_matches_put(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    content = b"x" * (3 * 1024 * 1024 + 17)  # spans multiple chunks
+
+    file_hash, size = store.put_stream(BytesIO(content))
+    assert file_hash == hashlib.sha256(content).hexdigest()
+    assert size == len(content)
+    assert store.get(file_hash) == content
+
+    # no temp files should be left behind
+    assert not list(tmp_path.glob("._blob_*"))
+
+def test_identical_content_stored_once(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    hash1, _ = store.put_stream(BytesIO(b"same"))
+    hash2, _ = store.put_stream(BytesIO(b"same"))
+
+    assert hash1 == hash2
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+def test_view_is_memory_mapped(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    file_hash = store.put(b"mapped bytes")
+    empty_hash = store.put(b"")
+
+    view = store.view(file_hash)
+    assert isinstance(view, memoryview)
+    assert bytes(view) == b"mapped bytes"
+    assert bytes(store.view(empty_hash)) == b""
+    assert store.view("0" * 64) is None
+
+def test_blob_array_keeps_binary_index_contract(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    array = BlobArray.from_bytes(store, [b"first", b"second", None])
+
+    assert len(array) == 3
+    assert array[0] == b"first"
+    assert array[1] == b"second"
+    assert array[2] is None
+    assert array == [b"first", b"second", None]
+
+    array[1] = None
+    assert array[1] is None
+    assert array.hash_at(0) == hashlib.sha256(b"first").hexdigest()
+
+def test_blob_array_pickles_as_list(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    array = BlobArray.from_bytes(store, [b"a", b"b"])
+
+    restored = pickle.loads(pickle.dumps(array))
+    assert restored == [b"a", b"b"]
+    assert isinstance(restored, list)
+
+def test_blob_array_copy_is_independent(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    array = BlobArray.from_bytes(store, [b"a"])
+    copied = array.copy()
+    copied.append(b"b")
+
+    assert len(array) == 1
+    assert len(copied) == 2
+
+def _age(store, file_hash, seconds):
+    path = store._path_for(file_hash)
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+def test_prune_removes_old_blobs_only(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    old_hash, new_hash, kept_hash = store.put(b"old"), store.put(b"new"), store.put(b"kept")
+    _age(store, old_hash, 100)
+    _age(store, kept_hash, 100)
+
+    assert store.prune(max_age=50, keep=[kept_hash]) == 1
+    assert not store.has(old_hash)
+    assert store.has(new_hash) and store.has(kept_hash)
+
+def test_writing_stored_content_again_keeps_it_from_pruning(tmp_path):
+    store = BlobStore(store_dir=tmp_path)
+    file_hash = store.put(b"reused")
+    _age(store, file_hash, 100)
+
+    store.put_stream(BytesIO(b"reused"))
+
+    assert store.prune(max_age=50) == 0
+    assert store.get(file_hash) == b"reused"
+
+def test_default_blob_dir_does_not_depend_on_the_working_directory():
+    assert DEFAULT_BLOB_DIR.is_absolute() or "BLOB_STORE_DIR" in os.environ
+
+def test_put_stream_with_known_hash_skips_hashing_and_stored_content(tmp_path, mocker):
+    store = BlobStore(store_dir=tmp_path)
+    content = b"hashed by the caller"
+    file_hash = hashlib.sha256(content).hexdigest()
+    sha256 = mocker.spy(hashlib, "sha256")
+
+    assert store.put_stream(BytesIO(content), file_hash) == (file_hash, len(content))
+    stream = mocker.Mock()
+    assert store.put_stream(stream, file_hash) == (file_hash, len(content))
+
+    stream.read.assert_not_called()
+    sha256.assert_not_called()
+    assert store.get(file_hash) == content
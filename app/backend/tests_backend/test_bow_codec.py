@@ -0,0 +1,33 @@
+import struct
+import pytest
+from bow_codec import BOW_MAGIC, encode_bow, decode_bow, vocabulary_of, to_ids, to_tokens, token_ids_of
+
+
+def test_round_trip_keeps_token_order_and_empty_documents():
+    bow = [["read", "file", "read"], [], ["parse"]]
+    vocabulary = {token: i + 1 for i, token in enumerate(vocabulary_of(bow))}
+    data = encode_bow(to_ids(bow, vocabulary))
+
+    documents = decode_bow(data)
+
+    assert to_tokens(documents, {i: token for token, i in vocabulary.items()}) == bow
+    assert sorted(token_ids_of(documents)) == [1, 2, 3]
+
+
+def test_repetitive_documents_shrink():
+    bow = [["token"] * 500 for _ in range(50)]
+    data = encode_bow(to_ids(bow, {"token": 1}))
+    assert len(data) < len(str(bow)) / 50
+
+
+def test_decodes_the_uncompressed_migration_layout():
+    # what int4send() concatenation in 004_bow_encoding.sql produces for [[7, 8], [9]]
+    data = BOW_MAGIC + b"\x00" + struct.pack(">6I", 2, 2, 1, 7, 8, 9)
+    assert decode_bow(data) == [[7, 8], [9]]
+    assert encode_bow([[7, 8], [9]], compress=False) == data
+
+
+@pytest.mark.parametrize("data", [b"", b"BOW1", b"JSON[]", BOW_MAGIC + b"\x09abc", BOW_MAGIC + b"\x00" + struct.pack(">3I", 1, 5, 1)])
+def test_rejects_malformed_data(data):
+    with pytest.raises(ValueError):
+        decode_bow(data)
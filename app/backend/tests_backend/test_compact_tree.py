@@ -0,0 +1,119 @@
+import zipfile
+from pathlib import Path
+from anytree import Node
+from anytree.exporter import DictExporter
+from file_manager import FileManager
+from cache.blob_store import BlobStore
+from compact_tree import CompactTree, TreeNode
+
+
+def _load(tmp_path: Path, target: Path) -> TreeNode:
+    fm = FileManager(blob_store=BlobStore(tmp_path / "blobs"))
+    result = fm.load_from_filepath(target)
+    assert result["status"] == "success"
+    return result["tree"]
+
+
+def _project(tmp_path: Path) -> Path:
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "empty").mkdir()
+    (root / "src" / "main.py").write_text("print(1)")
+    (root / "README.md").write_text("# readme")
+    (root / "copy.md").write_text("# readme")
+    with zipfile.ZipFile(root / "bundle.zip", "w") as zf:
+        zf.writestr("docs/notes.txt", "notes")
+    return root
+
+
+def test_file_manager_builds_the_compact_tree(tmp_path):
+    tree = _load(tmp_path, _project(tmp_path))
+    assert isinstance(tree, TreeNode)
+    # the tree FileManager built is stored as is, no Nodes are created on the way
+    assert CompactTree.from_node(tree) is tree.tree
+
+
+def test_to_dict_matches_dict_exporter(tmp_path):
+    compact = _load(tmp_path, _project(tmp_path)).tree
+    assert compact.to_dict() == DictExporter().export(compact.to_node())
+
+
+def test_to_node_rebuilds_the_same_tree(tmp_path):
+    tree = _load(tmp_path, _project(tmp_path))
+    rebuilt = tree.tree.to_node()
+    assert CompactTree.from_node(rebuilt).to_dict() == tree.tree.to_dict()
+    assert [n.name for n in rebuilt.descendants] == [n.name for n in tree.descendants]
+
+
+def test_view_has_the_attributes_of_a_node(tmp_path):
+    tree = _load(tmp_path, _project(tmp_path))
+    attributes = (
+        "type", "binary_index", "file_data", "classification", "extension", "last_modified", "filepath", "is_repo_head",
+        "created_at",
+    )
+    for view, node in zip((tree,) + tree.descendants, (tree.tree.to_node(),) + tree.tree.to_node().descendants):
+        assert view.name == node.name
+        assert (view.parent.name if view.parent else None) == (node.parent.name if node.parent else None)
+        for attribute in attributes:
+            assert getattr(view, attribute, "missing") == getattr(node, attribute, "missing")
+
+
+def test_detached_nodes_are_left_out_when_stored(tmp_path):
+    tree = _load(tmp_path, _project(tmp_path))
+    main = next(n for n in tree.descendants if n.name == "main.py")
+    readme = next(n for n in tree.children if n.name == "README.md")
+    main.classification = "code"
+    main.parent = None
+    readme.parent = None
+
+    assert main.parent is None and main.file_data["filepath"].endswith("main.py")
+    assert readme not in tree.children
+    stored = CompactTree.from_bytes(CompactTree.from_node(tree).to_bytes())
+    names = {n.name for n in stored.to_node().descendants}
+    assert "main.py" not in names and "README.md" not in names
+    assert "src" in names and "copy.md" in names
+
+
+def test_binary_round_trip(tmp_path):
+    tree = _load(tmp_path, _project(tmp_path))
+    compact = CompactTree.from_node(tree)
+    restored = CompactTree.from_bytes(compact.to_bytes())
+    assert restored.to_dict() == compact.to_dict()
+    assert restored.file_hashes() == compact.file_hashes()
+
+
+def test_from_dict_reads_legacy_json_trees(tmp_path):
+    exported = DictExporter().export(_load(tmp_path, _project(tmp_path)).tree.to_node())
+    assert CompactTree.from_dict(exported).to_dict() == exported
+
+
+def test_single_file_keeps_its_filepath(tmp_path):
+    target = tmp_path / "solo.py"
+    target.write_text("x = 1")
+    tree = _load(tmp_path, target)
+    restored = CompactTree.from_bytes(CompactTree.from_node(tree).to_bytes())
+    assert restored.to_node().children[0].file_data["filepath"] == str(target)
+
+
+def test_names_and_hashes_are_interned(tmp_path):
+    compact = CompactTree.from_node(_load(tmp_path, _project(tmp_path)))
+    # README.md and copy.md share their content, so they share one hash entry
+    assert len(compact.hashes) == 3
+    assert compact.file_hashes() == {
+        compact.hash_of(i): compact.binary_index[i] for i in compact.file_indices()
+    }
+
+
+def test_classification_and_repo_head_survive(tmp_path):
+    tree = _load(tmp_path, _project(tmp_path))
+    next(n for n in tree.children if n.name == "src").is_repo_head = True
+    file_node = next(n for n in tree.descendants if n.type == "file")
+    file_node.classification = "code"
+    restored = CompactTree.from_bytes(CompactTree.from_node(tree).to_bytes()).to_node()
+    assert next(n for n in restored.children if n.name == "src").is_repo_head is True
+    assert next(n for n in restored.descendants if n.type == "file").classification == "code"
+
+
+def test_empty_tree():
+    assert CompactTree().to_node() is None
+    assert CompactTree.from_bytes(CompactTree().to_bytes()).to_dict() is None
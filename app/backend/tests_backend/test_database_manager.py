@@ -1,8 +1,16 @@
 import pytest
+import os
 import json
+import threading
 import uuid
+import hashlib
+import zlib
 from unittest.mock import Mock, patch, call, MagicMock
 from database_manager import DatabaseManager
+from compact_tree import CompactTree
+from tree_history import TreeDelta, MAX_DELTA_CHAIN, records_of
+from cache.blob_store import BlobArray, BlobStore
+from bow_codec import encode_bow, decode_bow
 
 @pytest.fixture
 def mock_db_connector():
@@ -36,6 +44,14 @@ def sample_metadata_insights():
         "date_stats": {"recent_activity_count": 10}
     }
 
+def _compact_tree(filenames):
+    """Flat CompactTree with one file per name"""
+    tree = CompactTree()
+    root = tree.add(-1, "root", "directory", filepath="/tmp/root")
+    for i, name in enumerate(filenames):
+        tree.add(root, name, "file", size=1, last_modified="T1", binary_index=i, file_hash=name)
+    return tree
+
 class TestDatabaseManagerInit:
     def test_init_creates_db_connector(self, mock_db_connector):
         db_manager = DatabaseManager()
@@ -120,6 +136,252 @@ class TestSaveFileset:
         assert 'INSERT INTO Filetrees' in calls[1][0][0]
         assert 'UPDATE Filesets' in calls[2][0][0] #Test for filetree, fileset association
 
+    def test_save_fileset_stores_delta_against_latest_tree(self, db_manager, mock_db_connector, sample_analysis_id):
+        """A CompactTree saved over an existing version is stored as a delta chained to it."""
+        old_tree = _compact_tree(["a.txt", "b.txt"])
+        new_tree = _compact_tree(["a.txt", "b.txt", "c.txt"])
+        mock_db_connector.execute_query.side_effect = [
+            [{'fileset_id': 55, 'file_data_tree_id': 7, 'chain_depth': 2}],
+            [{'filetree': None, 'filetree_data': old_tree.to_bytes(), 'tree_delta': None}],
+        ]
+        mock_db_connector.execute_update = MagicMock(side_effect=execute_update_sideeffect_func)
+
+        assert db_manager.save_fileset(sample_analysis_id, b"data", new_tree, "/tmp/dummy") is True
+
+        query, params = mock_db_connector.execute_update.call_args_list[1][0][:2]
+        assert 'tree_delta' in query
+        assert params[2:] == (7, 3)
+        assert TreeDelta.from_bytes(params[1]).upserts.keys() == {"c.txt"}
+
+    def test_save_fileset_serializes_the_tree_once(self, db_manager, mock_db_connector, sample_analysis_id):
+        """A delta that is not smaller falls back to the snapshot bytes already made for the size check."""
+        old_tree = _compact_tree(["a.txt"])
+        new_tree = _compact_tree([f"renamed_{i}.txt" for i in range(50)])
+        mock_db_connector.execute_query.side_effect = [
+            [{'fileset_id': 55, 'file_data_tree_id': 7, 'chain_depth': 2}],
+            [{'filetree': None, 'filetree_data': old_tree.to_bytes(), 'tree_delta': None}],
+        ]
+        mock_db_connector.execute_update = MagicMock(side_effect=execute_update_sideeffect_func)
+
+        with patch.object(CompactTree, "to_bytes", autospec=True, side_effect=CompactTree.to_bytes) as to_bytes:
+            db_manager.save_fileset(sample_analysis_id, b"data", new_tree, "/tmp/dummy")
+
+        query, params = mock_db_connector.execute_update.call_args_list[1][0][:2]
+        assert 'filetree_data' in query
+        assert CompactTree.from_bytes(params[1]).to_dict() == new_tree.to_dict()
+        assert to_bytes.call_count == 1
+
+    def test_save_fileset_snapshots_at_max_chain(self, db_manager, mock_db_connector, sample_analysis_id):
+        """After MAX_DELTA_CHAIN deltas the version is stored whole again, without reading the old one."""
+        mock_db_connector.execute_query.return_value = [{'fileset_id': 55, 'file_data_tree_id': 7, 'chain_depth': MAX_DELTA_CHAIN}]
+        mock_db_connector.execute_update = MagicMock(side_effect=execute_update_sideeffect_func)
+
+        db_manager.save_fileset(sample_analysis_id, b"data", _compact_tree(["a.txt"]), "/tmp/dummy")
+
+        assert mock_db_connector.execute_query.call_count == 1
+        assert 'filetree_data' in mock_db_connector.execute_update.call_args_list[1][0][0]
+
+class TestFiletreeHistory:
+    def test_get_filetree_version_replays_deltas(self, db_manager, mock_db_connector):
+        versions = [_compact_tree(["a.txt"]), _compact_tree(["a.txt", "b.txt"]), _compact_tree(["b.txt"])]
+        mock_db_connector.execute_query.return_value = [
+            {'filetree': None, 'filetree_data': versions[0].to_bytes(), 'tree_delta': None},
+            {'filetree': None, 'filetree_data': None, 'tree_delta': TreeDelta.diff(versions[0], versions[1]).to_bytes()},
+            {'filetree': None, 'filetree_data': None, 'tree_delta': TreeDelta.diff(versions[1], versions[2]).to_bytes()},
+        ]
+
+        tree = db_manager.get_filetree_version(9)
+
+        assert 'WITH RECURSIVE' in mock_db_connector.execute_query.call_args[0][0]
+        assert records_of(tree) == records_of(versions[2])
+
+    def test_get_filetree_version_failure(self, db_manager, mock_db_connector):
+        mock_db_connector.execute_query.side_effect = Exception("DB Error")
+        with pytest.raises(LookupError):
+            db_manager.get_filetree_version(9)
+
+class TestUnitOfWork:
+    def test_unit_of_work_wraps_a_transaction(self, db_manager, mock_db_connector, sample_analysis_id):
+        with db_manager.unit_of_work() as uow:
+            uow.save_resume_points(sample_analysis_id, ["point"])
+        mock_db_connector.transaction.assert_called_once_with()
+        mock_db_connector.transaction.return_value.__exit__.assert_called_once()
+
+class TestFilesetBlobs:
+    """Contents stored once in Blobs, referenced per fileset by binary_index"""
+
+    def test_only_new_contents_are_written(self, db_manager, mock_db_connector, sample_analysis_id, tmp_path):
+        store = BlobStore(tmp_path)
+        binary = BlobArray.from_bytes(store, [b"readme" * 20, None, b"new file", b"readme" * 20])
+        readme_hash, new_hash = binary.hashes[0], binary.hashes[2]
+
+        def query(sql, params=None):
+            if 'FROM Blobs' in sql:
+                return [{'hash': readme_hash}]  # stored by another analysis already
+            return [{'fileset_id': 55}]
+        mock_db_connector.execute_query.side_effect = query
+        mock_db_connector.execute_update = MagicMock(side_effect=execute_update_sideeffect_func)
+
+        assert db_manager.save_fileset(sample_analysis_id, binary, {"name": "root"}, "/tmp/dummy") is True
+
+        fileset_params = mock_db_connector.execute_update.call_args_list[0][0][1]
+        assert fileset_params[0] is None  # no pickled file_data
+        blob_call, mapping_call = mock_db_connector.execute_many.call_args_list
+        assert 'ON CONFLICT (hash) DO NOTHING' in blob_call[0][0]
+        assert [row[0] for row in blob_call[0][1]] == [new_hash]
+        assert mapping_call[0][1] == [(55, 0, readme_hash), (55, 2, new_hash), (55, 3, readme_hash)]
+        mock_db_connector.transaction.assert_called()
+
+    def test_update_prunes_contents_it_dropped(self, db_manager, mock_db_connector, sample_analysis_id, tmp_path):
+        binary = BlobArray.from_bytes(BlobStore(tmp_path), [b"kept"])
+        mock_db_connector.execute_query.side_effect = lambda sql, params=None: [{'hash': binary.hashes[0]}] if 'FROM Blobs' in sql else [{'fileset_id': 55}]
+
+        def update(sql, params=None, returning=False):
+            if 'DELETE FROM Fileset_Blobs' in sql:
+                return [{'hash': binary.hashes[0]}, {'hash': "removed"}]
+            return execute_update_sideeffect_func(sql, params, returning)
+        mock_db_connector.execute_update = MagicMock(side_effect=update)
+
+        db_manager.save_fileset(sample_analysis_id, binary, {"name": "root"}, "/tmp/dummy")
+
+        prune = [c for c in mock_db_connector.execute_update.call_args_list if 'DELETE FROM Blobs' in c[0][0]]
+        assert [c[0][1] for c in prune] == [(["removed"],)]
+
+    def test_list_of_bytes_is_hashed_and_compressed(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.side_effect = lambda sql, params=None: [] if 'FROM Blobs' in sql else [{'fileset_id': 55}]
+        mock_db_connector.execute_update = MagicMock(side_effect=execute_update_sideeffect_func)
+
+        db_manager.save_fileset(sample_analysis_id, [b"a" * 1000, b"tiny"], {"name": "root"}, "/tmp/dummy")
+
+        big, small = sorted(mock_db_connector.execute_many.call_args_list[0][0][1], key=lambda row: -row[1])
+        assert big[1:3] == (1000, 'zlib') and len(big[3]) < 1000
+        assert small[1:] == (4, 'none', b"tiny")
+
+    def test_blob_inserts_are_batched_by_bytes(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.side_effect = lambda sql, params=None: [] if 'FROM Blobs' in sql else [{'fileset_id': 55}]
+        mock_db_connector.execute_update = MagicMock(side_effect=execute_update_sideeffect_func)
+        contents = [os.urandom(40), os.urandom(40), os.urandom(500), os.urandom(30)]
+
+        with patch("database_manager.BLOB_BATCH_BYTES", 100):
+            db_manager.save_fileset(sample_analysis_id, contents, {"name": "root"}, "/tmp/dummy")
+
+        blob_calls = [c[0][1] for c in mock_db_connector.execute_many.call_args_list if 'INSERT INTO Blobs' in c[0][0]]
+        #the blob over the cap is written on its own, the others fill batches up to the cap
+        assert [[row[1] for row in rows] for rows in blob_calls] == [[40, 40], [500], [30]]
+
+    def test_list_contents_are_not_copied(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.side_effect = lambda sql, params=None: [] if 'FROM Blobs' in sql else [{'fileset_id': 55}]
+        mock_db_connector.execute_update = MagicMock(side_effect=execute_update_sideeffect_func)
+        content = b"tiny"
+
+        db_manager.save_fileset(sample_analysis_id, [content], {"name": "root"}, "/tmp/dummy")
+
+        assert mock_db_connector.execute_many.call_args_list[0][0][1][0][3] is content
+
+    def test_load_fileset_blobs_downloads_only_missing(self, db_manager, mock_db_connector, sample_analysis_id, tmp_path):
+        store = BlobStore(tmp_path)
+        local_hash = store.put(b"already here")
+        remote = b"remote content" * 10
+        remote_hash = hashlib.sha256(remote).hexdigest()
+
+        def query(sql, params=None):
+            if 'FROM Fileset_Blobs' in sql:
+                return [{'binary_index': 0, 'hash': local_hash}, {'binary_index': 2, 'hash': remote_hash}]
+            assert params == ([remote_hash],)
+            return [{'hash': remote_hash, 'compression': 'zlib', 'data': zlib.compress(remote)}]
+        mock_db_connector.execute_query.side_effect = query
+
+        binary = db_manager.load_fileset_blobs(sample_analysis_id, store)
+
+        assert binary.hashes == [local_hash, None, remote_hash]
+        assert binary[2] == remote
+        assert mock_db_connector.execute_query.call_count == 2
+
+    @pytest.mark.parametrize("compression", ['none', 'zlib'])
+    def test_iter_blob_reads_ranges(self, db_manager, mock_db_connector, compression):
+        content = bytes(range(256)) * 40
+        stored = zlib.compress(content) if compression == 'zlib' else content
+
+        def query(sql, params):
+            if 'octet_length' in sql:
+                return [{'compression': compression, 'stored': len(stored)}]
+            offset, length, _ = params
+            return [{'chunk': stored[offset - 1:offset - 1 + length]}]
+        mock_db_connector.execute_query.side_effect = query
+
+        chunks = list(db_manager.iter_blob("abc", chunk_size=1000))
+
+        assert b"".join(chunks) == content
+        assert mock_db_connector.execute_query.call_count == 1 + -(-len(stored) // 1000)
+
+    def test_lazy_load_reads_no_contents(self, db_manager, mock_db_connector, sample_analysis_id, tmp_path):
+        def query(sql, params=None):
+            if 'FROM Fileset_Blobs' in sql:
+                return [{'binary_index': 0, 'hash': "aa"}, {'binary_index': 1, 'hash': "bb"}]
+            assert 'SELECT hash, size' in sql
+            return [{'hash': "aa", 'size': 3}, {'hash': "bb", 'size': 5}]
+        mock_db_connector.execute_query.side_effect = query
+
+        binary = db_manager.load_fileset_blobs(sample_analysis_id, BlobStore(tmp_path), lazy=True)
+
+        assert binary.hashes == ["aa", "bb"]
+        assert binary.store.has("bb") and binary.store.size("bb") == 5
+        assert mock_db_connector.execute_query.call_count == 2
+
+    def test_load_fileset_blobs_of_pickled_fileset(self, db_manager, mock_db_connector, sample_analysis_id, tmp_path):
+        mock_db_connector.execute_query.return_value = []
+        assert db_manager.load_fileset_blobs(sample_analysis_id, BlobStore(tmp_path)) is None
+
+class TestResultProjections:
+    def test_get_result_section_projects_a_path(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'section': {"Python": {"file_count": 3}}}]
+
+        section = db_manager.get_result_section(sample_analysis_id, "metadata_insights", ["language_stats"])
+
+        assert section == {"Python": {"file_count": 3}}
+        query, params = mock_db_connector.execute_query.call_args[0]
+        assert "metadata_insights #> %s" in query
+        assert params[0] == ["language_stats"]
+
+    def test_get_result_section_rejects_unknown_columns(self, db_manager, sample_analysis_id):
+        with pytest.raises(ValueError):
+            db_manager.get_result_section(sample_analysis_id, "metadata_insights; DROP TABLE Results", [])
+
+    def test_get_analyses_listing_filters_by_skill_and_import(self, db_manager, mock_db_connector):
+        mock_db_connector.execute_query.return_value = []
+        db_manager.get_analyses_listing(limit=5, skill="Python", import_name="scikit-learn")
+        query, params = mock_db_connector.execute_query.call_args[0]
+        assert "r.metadata_insights -> 'skill_stats' ? %s" in query and "r.project_insights @? %s::jsonpath" in query
+        assert params == ("Python", "Python", "Python", '$.analyzed_insights[*].imports_summary."scikit-learn"', 5)
+
+    def test_get_analyses_listing_never_selects_whole_documents(self, db_manager, mock_db_connector):
+        mock_db_connector.execute_query.return_value = [
+            {'analysis_id': uuid.UUID(int=3), 'analysis_title': 'A', 'project_count': 2, 'has_thumbnail': False}
+        ]
+        rows = db_manager.get_analyses_listing()
+        query = mock_db_connector.execute_query.call_args[0][0]
+        assert "r.metadata_insights," not in query and "r.project_insights -> 'analyzed_insights'" in query
+        assert "thumbnail_image IS NOT NULL" in query
+        assert rows[0]['analysis_id'] == str(uuid.UUID(int=3))
+
+    def test_get_skill_counts_reads_the_aggregate(self, db_manager, mock_db_connector):
+        mock_db_connector.execute_query.return_value = [{'skill': 'Python', 'count': 5}]
+        assert db_manager.get_skill_counts(10) == [{'skill': 'Python', 'count': 5}]
+        query, params = mock_db_connector.execute_query.call_args[0]
+        assert "FROM Skill_Counts" in query and "Results" not in query
+        assert params == (10,)
+
+    def test_get_skill_counts_by_analysis_filters_one_analysis(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'analysis_id': uuid.UUID(sample_analysis_id), 'skill': 'Python', 'count': 2}]
+        rows = db_manager.get_skill_counts_by_analysis(sample_analysis_id)
+        assert rows[0]['analysis_id'] == sample_analysis_id
+        assert mock_db_connector.execute_query.call_args[0][1] == (uuid.UUID(sample_analysis_id),) * 2
+
+    def test_get_analyses_listing_wraps_errors(self, db_manager, mock_db_connector):
+        mock_db_connector.execute_query.side_effect = Exception("down")
+        with pytest.raises(LookupError):
+            db_manager.get_analyses_listing()
+
 class TestSaveMetadataAnalysis:
     def test_save_metadata_analysis_success(self, db_manager, mock_db_connector, sample_analysis_id, sample_metadata_insights):
         mock_db_connector.execute_update.return_value = None
@@ -146,6 +408,33 @@ class TestSaveTrackedData:
         assert 'UPDATE Tracked_Data' in call_args[0][0]
         assert 'COALESCE' in call_args[0][0]
 
+    def test_save_tracked_data_encodes_bow(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'token_id': 4, 'token': 'parse'}, {'token_id': 9, 'token': 'file'}]
+
+        db_manager.save_tracked_data(sample_analysis_id, {}, bow_cache=[["parse", "file", "parse"]])
+
+        vocab_insert = mock_db_connector.execute_update.call_args_list[0][0]
+        assert 'INSERT INTO Bow_Vocabulary' in vocab_insert[0] and vocab_insert[1] == (["parse", "file"],)
+        params = mock_db_connector.execute_update.call_args[0][1]
+        assert decode_bow(params[1]) == [[4, 9, 4]]
+        assert params[2] is True #JSON copy cleared
+
+    def _tracked_row(self, sample_analysis_id, **bow):
+        return {'analysis_id': sample_analysis_id, 'project_data': None, 'package_data': None, 'metadata_stats': None, **bow}
+
+    def test_analysis_data_decodes_bow_through_vocabulary(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.side_effect = [
+            [self._tracked_row(sample_analysis_id, bow_data=encode_bow([[4, 9], [9]]), bow_cache=None)],
+            [{'token_id': 4, 'token': 'parse'}, {'token_id': 9, 'token': 'file'}],
+        ]
+        data = db_manager.get_analysis_sections(sample_analysis_id, ["tracked_data"])
+        assert data['tracked_data']['bow_cache'] == [["parse", "file"], ["file"]]
+
+    def test_analysis_data_falls_back_to_json_bow_rows(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [self._tracked_row(sample_analysis_id, bow_data=None, bow_cache=[["old"]])]
+        data = db_manager.get_analysis_sections(sample_analysis_id, ["tracked_data"])
+        assert data['tracked_data']['bow_cache'] == [["old"]]
+
 class TestSaveResumeData:
     """Tests for new save_resume_data method."""
     
@@ -184,6 +473,27 @@ def test_portfolio_handling_successes(db_manager, mock_db_connector):
     assert db_manager.get_portfolio_by_portfolio_id(10) == [{"portfolio_id": 10}]
 
 
+def test_get_all_resumes_keyset_page_with_filters(db_manager, mock_db_connector, sample_analysis_id):
+    mock_db_connector.execute_query.return_value = [{"resume_id": 41}]
+
+    db_manager.get_all_resumes(limit=11, after=42, analysis_id=sample_analysis_id, title_prefix="50%")
+
+    query, params = mock_db_connector.execute_query.call_args[0]
+    assert "res.resume_id < %s" in query and "ORDER BY res.resume_id DESC" in query
+    assert "res.resume_title LIKE %s" in query
+    assert params == (uuid.UUID(sample_analysis_id), "50\\%%", 42, 11)
+
+
+def test_get_analyses_listing_pages_by_creation_date(db_manager, mock_db_connector):
+    mock_db_connector.execute_query.return_value = []
+
+    db_manager.get_analyses_listing(limit=5, after=("2025-01-01 00:00:00", str(uuid.UUID(int=1))))
+
+    query, params = mock_db_connector.execute_query.call_args[0]
+    assert "(a.creation_date, a.analysis_id) < (%s::timestamp, %s::uuid)" in query
+    assert params == ("2025-01-01 00:00:00", str(uuid.UUID(int=1)), 5)
+
+
 def test_resume_handling_failures(db_manager, mock_db_connector):
     mock_db_connector.execute_update.side_effect = Exception("Some DB Error")
     mock_db_connector.execute_query.side_effect = Exception("Some DB Error")
@@ -249,6 +559,114 @@ class TestGetAnalysisData:
         assert 'JOIN Results' in call_query
         assert 'JOIN Resumes' in call_query
 
+    def test_get_analysis_sections_reads_only_their_tables(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [
+            {'analysis_id': uuid.UUID(sample_analysis_id), 'metadata_insights': {"a": 1}, 'project_insights': {}}
+        ]
+
+        result = db_manager.get_analysis_sections(sample_analysis_id, ["metadata_insights", "project_insights"])
+
+        assert result == {'analysis_id': sample_analysis_id, 'metadata_insights': {"a": 1}, 'project_insights': {}}
+        query = mock_db_connector.execute_query.call_args[0][0]
+        assert 'JOIN Results' in query
+        assert 'Tracked_Data' not in query and 'Resumes' not in query and 'bow' not in query
+
+    def test_get_analysis_sections_joins_one_resume_row(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'analysis_id': uuid.UUID(sample_analysis_id), 'resume_data': {}}]
+        db_manager.get_analysis_sections(sample_analysis_id, ["resume_data"])
+        assert "SELECT max(resume_id) FROM Resumes" in mock_db_connector.execute_query.call_args[0][0]
+
+    def test_get_analysis_sections_rejects_unknown_sections(self, db_manager, mock_db_connector, sample_analysis_id):
+        with pytest.raises(ValueError):
+            db_manager.get_analysis_sections(sample_analysis_id, ["metadata_insights", "password"])
+        mock_db_connector.execute_query.assert_not_called()
+
+class TestResultCache:
+    def test_repeated_reads_hit_the_cache(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'analysis_id': uuid.UUID(sample_analysis_id), 'resume_points': ["a"]}]
+
+        first = db_manager.get_analysis_sections(sample_analysis_id, ["resume_points"])
+        first['resume_points'].append("mutated")
+        second = db_manager.get_analysis_sections(sample_analysis_id.upper(), ["resume_points"])
+
+        assert second['resume_points'] == ["a"]
+        assert mock_db_connector.execute_query.call_count == 1
+        assert db_manager.cache_stats()['hits'] == 1
+
+    def test_save_invalidates_only_its_analysis(self, db_manager, mock_db_connector, sample_analysis_id):
+        other_id = str(uuid.uuid4())
+        mock_db_connector.execute_query.return_value = [{'analysis_id': uuid.UUID(sample_analysis_id), 'resume_points': []}]
+        db_manager.get_analysis_sections(sample_analysis_id, ["resume_points"])
+        db_manager.get_analysis_sections(other_id, ["resume_points"])
+        db_manager.get_all_analyses_summary()
+
+        db_manager.save_resume_points(sample_analysis_id, ["new"])
+        db_manager.get_analysis_sections(sample_analysis_id, ["resume_points"])
+        db_manager.get_analysis_sections(other_id, ["resume_points"])
+        db_manager.get_all_analyses_summary()
+
+        assert mock_db_connector.execute_query.call_count == 4
+
+    def test_resume_writes_invalidate_its_getters(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'resume_id': 7, 'analysis_id': uuid.UUID(sample_analysis_id)}]
+        mock_db_connector.execute_update.return_value = [{'analysis_id': uuid.UUID(sample_analysis_id)}]
+        db_manager.get_resume_by_resume_id(7)
+        db_manager.get_resumes_by_analysis_id(sample_analysis_id)
+        db_manager.get_all_resumes()
+        db_manager.get_all_portfolios()
+
+        db_manager.update_resume(7, {"name": "Bob"})
+        db_manager.get_resume_by_resume_id(7)
+        db_manager.get_resumes_by_analysis_id(sample_analysis_id)
+        db_manager.get_all_resumes()
+        db_manager.get_all_portfolios()
+
+        assert mock_db_connector.execute_query.call_count == 7
+
+    def test_delete_analysis_drops_its_resumes(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'resume_id': 7, 'analysis_id': uuid.UUID(sample_analysis_id)}]
+        db_manager.get_resume_by_resume_id(7)
+
+        db_manager.delete_analysis(sample_analysis_id)
+        db_manager.get_resume_by_resume_id(7)
+
+        assert mock_db_connector.execute_query.call_count == 2
+
+    def test_unit_of_work_invalidates_again_after_commit(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'analysis_id': uuid.UUID(sample_analysis_id), 'resume_points': []}]
+        with db_manager.unit_of_work():
+            db_manager.save_resume_points(sample_analysis_id, ["new"])
+            #a read before the commit still sees the old row
+            db_manager.get_analysis_sections(sample_analysis_id, ["resume_points"])
+        db_manager.get_analysis_sections(sample_analysis_id, ["resume_points"])
+
+        assert mock_db_connector.execute_query.call_count == 2
+
+    def test_unit_of_work_of_another_thread_invalidates_on_its_own_commit(self, db_manager, mock_db_connector, sample_analysis_id):
+        mock_db_connector.execute_query.return_value = [{'analysis_id': uuid.UUID(sample_analysis_id), 'resume_points': []}]
+
+        def other_unit():
+            with db_manager.unit_of_work():
+                db_manager.save_resume_points(sample_analysis_id, ["new"])
+                db_manager.get_analysis_sections(sample_analysis_id, ["resume_points"])
+
+        with db_manager.unit_of_work():
+            worker = threading.Thread(target=other_unit)
+            worker.start()
+            worker.join()
+            #the other unit has committed, the read it cached before that is gone even though this unit is still open
+            db_manager.get_analysis_sections(sample_analysis_id, ["resume_points"])
+
+        assert mock_db_connector.execute_query.call_count == 2
+
+    def test_wipe_clears_the_cache(self, db_manager, mock_db_connector):
+        mock_db_connector.execute_query.return_value = []
+        db_manager.get_all_analyses_summary()
+        db_manager.wipe_all_data()
+        db_manager.get_all_analyses_summary()
+
+        assert mock_db_connector.execute_query.call_count == 2
+
 class TestDeleteAnalysis:
     """Tests for delete_analysis (formerly delete_result)."""
     
@@ -258,12 +676,25 @@ class TestDeleteAnalysis:
         result = db_manager.delete_analysis(sample_analysis_id)
         
         assert result is True
-        # Logic deletes Filetrees -> Child Tables (5) -> Parent Table (1)
-        # Exact count may vary depending on how you group deletes, but based on code it is 7 calls
-        assert mock_db_connector.execute_update.call_count == 1
-        
+        # Blob mapping first (its hashes are pruned afterwards), children of the parent go by cascade
         calls = mock_db_connector.execute_update.call_args_list
-        assert 'DELETE FROM Analyses' in calls[-1][0][0] # Last call should be parent
+        assert 'DELETE FROM Fileset_Blobs' in calls[0][0][0]
+        assert 'DELETE FROM Analyses' in calls[1][0][0]
+        mock_db_connector.transaction.assert_called()
+
+    def test_delete_analysis_prunes_its_unshared_blobs(self, db_manager, mock_db_connector, sample_analysis_id):
+        def update(sql, params=None, returning=False):
+            if 'DELETE FROM Fileset_Blobs' in sql:
+                return [{'hash': "own"}, {'hash': "shared"}, {'hash': "own"}]
+            return 1
+        mock_db_connector.execute_update.side_effect = update
+
+        db_manager.delete_analysis(sample_analysis_id)
+
+        prune_sql, prune_params = mock_db_connector.execute_update.call_args_list[-1][0]
+        #shared contents are kept by the NOT EXISTS check, only this analysis' hashes are looked at
+        assert 'DELETE FROM Blobs' in prune_sql and 'NOT EXISTS' in prune_sql
+        assert prune_params == (["own", "shared"],)
 
 class TestWipeAllData:
     def test_wipe_all_data_success(self, db_manager, mock_db_connector):
@@ -1,4 +1,6 @@
 import pytest
+import threading
+from contextlib import contextmanager
 from psycopg.types.json import Json
 from db_utils import *
 
@@ -144,3 +146,157 @@ def test_query(set_db_Connector):
     result = db.execute_query("SELECT * FROM Results")
     print(result)
     return None
+
+
+### Connection pool tests, run against fake connections so no database is needed
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.rolled_back = 0
+        self.info = type("Info", (), {"transaction_status": pq.TransactionStatus.IDLE})()
+
+    def execute(self, query):
+        if self.broken:
+            raise psycopg.OperationalError("server closed the connection")
+
+    def rollback(self):
+        self.rolled_back += 1
+        self.info.transaction_status = pq.TransactionStatus.IDLE
+
+    def close(self):
+        self.closed = True
+
+    def commit(self):
+        self.commits = getattr(self, "commits", 0) + 1
+
+    @contextmanager
+    def pipeline(self):
+        self.pipelined = True
+        yield
+
+    def cursor(self):
+        conn = self
+        class Cursor:
+            rowcount = 1
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                return False
+            def execute(self, query, params=None):
+                if "fail" in query:
+                    raise psycopg.errors.SyntaxError("fail")
+                conn.info.transaction_status = pq.TransactionStatus.INTRANS
+        return Cursor()
+
+
+def _fake_pool(**kwargs):
+    opened = []
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+    return ConnectionPool(connect, **kwargs), opened
+
+
+def test_pool_reuses_connections():
+    pool, opened = _fake_pool(max_size=2)
+    for _ in range(5):
+        with pool.connection():
+            pass
+    assert len(opened) == 1
+    assert pool.size == 1 and pool.idle == 1
+
+
+def test_pool_waits_then_times_out_when_full():
+    pool, _ = _fake_pool(max_size=1, timeout=0.05)
+    conn = pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+
+
+def test_pool_rolls_back_open_transactions():
+    pool, opened = _fake_pool()
+    with pool.connection() as conn:
+        conn.info.transaction_status = pq.TransactionStatus.INTRANS
+    assert opened[0].rolled_back == 1
+
+
+def test_pool_replaces_broken_connections():
+    pool, opened = _fake_pool(check_after=0)
+    with pool.connection() as conn:
+        pass
+    conn.broken = True
+    with pool.connection() as fresh:
+        assert fresh is not conn
+    assert conn.closed and len(opened) == 2 and pool.size == 1
+
+
+def test_pool_closes_idle_connections_above_min_size():
+    pool, opened = _fake_pool(min_size=1, max_idle=0)
+    first, second = pool.getconn(), pool.getconn()
+    pool.putconn(first)
+    pool.putconn(second)
+    #first aged out when second came back, min_size keeps one open
+    assert first.closed and not second.closed
+    assert pool.size == 1
+
+
+def test_failed_connect_frees_its_slot():
+    def connect():
+        raise psycopg.OperationalError("refused")
+    pool = ConnectionPool(connect, max_size=1, timeout=0.05)
+    for _ in range(2):
+        with pytest.raises(psycopg.OperationalError):
+            pool.getconn()
+    assert pool.size == 0
+
+
+def test_get_pool_is_shared_per_database():
+    assert get_pool("test") is get_pool("test")
+    assert get_pool("test") is not get_pool("test_db")
+
+
+@pytest.fixture
+def pooled_connector(monkeypatch):
+    pool, opened = _fake_pool()
+    monkeypatch.setattr("db_utils.get_pool", lambda database_name: pool)
+    monkeypatch.setattr(psycopg.Pipeline, "is_supported", classmethod(lambda cls: True))
+    return DB_connector("test"), opened
+
+
+def test_transaction_commits_once_on_one_connection(pooled_connector):
+    connector, opened = pooled_connector
+    with connector.transaction():
+        connector.execute_update("UPDATE Results SET a = 1")
+        with connector.transaction():
+            connector.execute_update("UPDATE Results SET b = 2")
+    assert len(opened) == 1
+    assert opened[0].commits == 1 and opened[0].pipelined
+
+
+def test_transaction_rolls_back_on_failure(pooled_connector):
+    connector, opened = pooled_connector
+    with pytest.raises(psycopg.errors.SyntaxError):
+        with connector.transaction():
+            connector.execute_update("UPDATE Results SET a = 1")
+            connector.execute_update("fail")
+    assert getattr(opened[0], "commits", 0) == 0
+    assert opened[0].rolled_back == 1
+    #outside a transaction every update commits on its own again
+    connector.execute_update("UPDATE Results SET a = 1")
+    assert opened[0].commits == 1
+
+
+def test_transaction_does_not_capture_other_threads(pooled_connector):
+    connector, opened = pooled_connector
+    with connector.transaction():
+        connector.execute_update("UPDATE Results SET a = 1")
+        worker = threading.Thread(target=connector.execute_update, args=("UPDATE Results SET b = 2",))
+        worker.start()
+        worker.join()
+        #the other thread committed on its own connection while the block was still open
+        assert len(opened) == 2 and opened[1].commits == 1
+        assert getattr(opened[0], "commits", 0) == 0
+    assert opened[0].commits == 1
@@ -1,6 +1,9 @@
 import pytest
 from anytree import Node
-from file_classifier import FileClassifier
+import pygments.lexers
+import pygments.util
+import file_classifier
+from file_classifier import FileClassifier, is_code_filename
 
 @pytest.fixture
 def classifier():
@@ -195,71 +198,28 @@ def test_classify_files_empty_tree(classifier):
     assert len(code_files) == 0
     assert binary_data == []
 
-def test_filter_tree_text_mode(classifier, mixed_tree, binary_data_array):
-    """Test _filter_tree in text mode"""
-    text_files, remaining_tree = classifier._filter_tree(mixed_tree, "text", binary_data_array)
+def test_classify_files_code_tree(classifier, code_tree, binary_data_array):
+    """Code files are detached from the tree, files that are neither text nor code are dropped"""
+    text_files, code_files, _ = classifier.classify_files(code_tree, binary_data_array)
 
-    assert len(text_files) == 1
-    text_names = {node.name for node in text_files}
-    assert "README.md" in text_names
-    assert "app.js" not in text_names 
-
-    # verify classifications and detachment
-    for node in text_files:
-        assert node.classification == "text"
-        assert node.parent is None
-
-    # verify invalid files are removed and code files remain
-    remaining_files = {node.name for node in remaining_tree.descendants if hasattr(node, "type") and node.type == "file"}
-    assert "app.js" in remaining_files
-    assert "config.json" in remaining_files
-    assert "image.png" not in remaining_files
-    assert ".git" not in remaining_files
-
-def test_filter_tree_code_mode(classifier, code_tree, binary_data_array):
-    """Test _filter_tree in code mode"""
-    code_files, remaining_tree = classifier._filter_tree(code_tree, "code", binary_data_array)
-
-    assert len(code_files) == 3
-    code_names = {node.name for node in code_files}
-    assert "app.js" in code_names
-    assert "main.py" in code_names
+    assert text_files == []
+    assert [node.name for node in code_files] == ["app.js", "config.json", "main.py"]
+    assert all(node.classification == "code" and node.parent is None for node in code_files)
+    # only directories are left
+    assert {node.name for node in code_tree.descendants} == {".git", "src"}
 
-    # verify classifications and detachment
-    for node in code_files:
-        assert node.classification == "code"
-        assert node.parent is None
 
-    # reamaining tree should only have files that are neither code nor text
-    assert len(remaining_tree.descendants) == 2  # image.png and .git remain
-
-
-def test_is_text(classifier):
-    """Test _is_text"""
-    txt_node = Node("test.txt", type="file", extension='.txt')
-    md_node = Node("readme.md", type="file", extension='.md')
-    pdf_node = Node("doc.pdf", type="file", extension='.pdf')
-    py_node = Node("script.py", type="file", extension='.py')
-    invalid = Node("file", type="file", extension=None)
-    
-    assert classifier._is_text(txt_node) == True
-    assert classifier._is_text(md_node) == True
-    assert classifier._is_text(pdf_node) == True
-    assert classifier._is_text(py_node) == False
-    assert classifier._is_text(invalid) == False
-
-
-def test_is_code(classifier):
-    """Test _is_code"""
-    js_node = Node("app.js", type="file", extension='.js')
-    py_node = Node("main.py", type="file", extension='.py')
-    txt_node = Node("readme.docx", type="file", extension='.docx')
-    unknown_ext = Node("file.xyz", type="file", extension='.xyz')
-    
-    assert classifier._is_code(js_node) == True
-    assert classifier._is_code(py_node) == True
-    assert classifier._is_code(txt_node) == False
-    assert classifier._is_code(unknown_ext) == False
+def test_classify_filename():
+    """Text extensions win over pygments, names pygments has no lexer for are neither"""
+    assert file_classifier.classify_filename("test.txt", ".txt") == "text"
+    assert file_classifier.classify_filename("readme.md", ".MD") == "text"
+    assert file_classifier.classify_filename("doc.pdf", ".pdf") == "text"
+    assert file_classifier.classify_filename("app.js", ".js") == "code"
+    assert file_classifier.classify_filename("main.py", ".py") == "code"
+    assert file_classifier.classify_filename("Makefile", "") == "code"
+    assert file_classifier.classify_filename("readme.docx", ".docx") == "text"
+    assert file_classifier.classify_filename("file.xyz", ".xyz") is None
+    assert file_classifier.classify_filename("file", None) is None
 
 
 def test_get_extension(classifier):
@@ -288,6 +248,39 @@ def test_detach_node(classifier):
     assert child.parent is None
     assert binary_data[1] is None
 
+def test_is_code_filename_matches_pygments():
+    """The lookup table agrees with pygments' own filename matching"""
+    names = [
+        "main.py", "MAIN.PY", "app.js", "Makefile", "makefile", "Dockerfile", "CMakeLists.txt",
+        ".bashrc", ".bash_profile", "README.md", "notes.txt", "image.png", "archive.tar.gz",
+        "page.php5", "Kconfig.debug", "man.1", "Main.hs", "AppSpec.hs", "noextension", ".py",
+    ]
+    for name in names:
+        try:
+            pygments.lexers.get_lexer_for_filename(name)
+            expected = True
+        except pygments.util.ClassNotFound:
+            expected = False
+        assert is_code_filename(name) == expected, name
+
+
+def test_git_subtrees_are_pruned(classifier, mocker):
+    """Files under .git are marked 'git' without going through per file classification"""
+    root = Node("project", type="directory")
+    git = Node(".git", type="directory", parent=root)
+    objects = Node("objects", type="directory", parent=git)
+    obj = Node("ab12", type="file", parent=objects, extension="")
+    head = Node("HEAD", type="file", parent=git, extension="")
+    main_py = Node("main.py", type="file", parent=root, extension=".py")
+
+    spy = mocker.spy(file_classifier, "classify_filename")
+    text_files, code_files, _ = classifier.classify_files(root, [])
+
+    assert classifier.git_subtrees == [git]
+    assert obj.classification == "git" and head.classification == "git"
+    assert code_files == [main_py]
+    assert [call.args[0] for call in spy.call_args_list] == ["main.py"]
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import hashlib
 from pathlib import Path
 from file_manager import FileManager
 import time
@@ -282,4 +283,125 @@ def test_cross_session_deduplication(tmp_path):
     # instead of creating a duplicate binary entry
     assert len(fm2.get_binary_array()) == 1
     assert fm2.file_objects[0]['binary_index'] == 0
-    assert fm2.file_objects[0]['file_hash'] == original_hash
\ No newline at end of file
+    assert fm2.file_objects[0]['file_hash'] == original_hash
+
+def test_zip_streamed_without_extraction(tmp_path, mocker):
+    """
+    ZIP members (including nested zips) should be loaded straight from the archive
+    into the tree without extracting anything to a temp directory.
+    """
+    import io
+    import zipfile
+
+    inner_buffer = io.BytesIO()
+    with zipfile.ZipFile(inner_buffer, "w") as inner:
+        inner.writestr("inner_dir/inner.txt", b"inner content")
+        inner.writestr("dup.txt", b"shared content")
+
+    zip_path = tmp_path / "outer.zip"
+    with zipfile.ZipFile(zip_path, "w") as outer:
+        outer.writestr("src/main.py", b"print('hi')")
+        outer.writestr("src/dup.txt", b"shared content")
+        outer.writestr("__MACOSX/._main.py", b"junk")
+        outer.writestr("nested.zip", inner_buffer.getvalue())
+
+    mkdtemp = mocker.spy(__import__("tempfile"), "mkdtemp")
+    fm = FileManager()
+    result = fm.load_from_filepath(zip_path)
+
+    assert result["status"] == "success"
+    assert mkdtemp.call_count == 0
+
+    # 4 files loaded, the duplicate content is stored once
+    assert len(fm.file_objects) == 4
+    assert len(fm.binary_data_array) == 3
+
+    nested_node = next(n for n in fm.file_tree.descendants if n.name == "nested.zip")
+    assert nested_node.type == "zip"
+    inner_node = next(n for n in nested_node.descendants if n.name == "inner.txt")
+    assert inner_node.parent.name == "inner_dir"
+    assert fm.binary_data_array[inner_node.binary_index] == b"inner content"
+
+
+def test_zip_member_and_file_share_one_dedup_path(tmp_path, mocker):
+    """A zip member and a file on disk with the same content register through _register_file and share a blob"""
+    import zipfile
+
+    (tmp_path / "a.txt").write_bytes(b"same content")
+    with zipfile.ZipFile(tmp_path / "archive.zip", "w") as archive:
+        archive.writestr("b.txt", b"same content")
+
+    register = mocker.spy(FileManager, "_register_file")
+    fm = FileManager(max_workers=1)
+    result = fm.load_from_filepath(str(tmp_path))
+
+    assert result["status"] == "success"
+    assert sorted(call.args[1].name for call in register.call_args_list) == ["a.txt", "b.txt"]
+    assert len(fm.binary_data_array) == 1
+    member = next(obj for obj in fm.file_objects if obj['filename'] == "b.txt")
+    assert member['filepath'] == str((tmp_path / "archive.zip" / "b.txt").resolve())
+    assert member['binary_index'] == 0
+
+
+def test_parallel_load_is_deterministic(tmp_path):
+    """
+    Loading with a thread pool must assign the same binary indices and dedup
+    results as a single-threaded load.
+    """
+    for i in range(30):
+        sub = tmp_path / f"dir{i % 4}"
+        sub.mkdir(exist_ok=True)
+        # every third file shares content with another file
+        (sub / f"file{i}.txt").write_bytes(f"content {i % 10 if i % 3 == 0 else i}".encode())
+
+    def snapshot(max_workers):
+        fm = FileManager(max_workers=max_workers)
+        result = fm.load_from_filepath(str(tmp_path))
+        assert result["status"] == "success"
+        return [(n.name, n.parent.name, n.binary_index) for n in fm.file_tree.descendants if n.type == "file"], dict(fm.seen_hashes)
+
+    assert snapshot(1) == snapshot(8)
+
+def test_dedup_prefilter_skips_store_writes(tmp_path, mocker):
+    """
+    Files with a unique size go straight to the blob store, likely duplicates are only hashed
+    and never written. Same-size files with different content are still stored.
+    """
+    big = os.urandom(64 * 1024)
+    (tmp_path / "a.bin").write_bytes(big)
+    (tmp_path / "b.bin").write_bytes(big)
+    (tmp_path / "c.bin").write_bytes(big[:-1] + bytes([big[-1] ^ 1]))  # same size, different tail
+    (tmp_path / "unique.txt").write_text("only file of this size")
+
+    fm = FileManager()
+    put_file = mocker.spy(fm.blob_store, "put_file")
+    result = fm.load_from_filepath(str(tmp_path))
+    assert result["status"] == "success"
+
+    stored = sorted(Path(call.args[0]).name for call in put_file.call_args_list)
+    assert stored == ["a.bin", "c.bin", "unique.txt"]
+
+    nodes = {n.name: n for n in fm.file_tree.descendants if n.type == "file"}
+    assert nodes["a.bin"].binary_index == nodes["b.bin"].binary_index
+    assert nodes["c.bin"].binary_index != nodes["a.bin"].binary_index
+    assert nodes["b.bin"].file_data["file_hash"] == nodes["a.bin"].file_data["file_hash"]
+    assert len(fm.binary_data_array) == 3
+
+def test_fingerprint_collision_with_new_content_is_hashed_once(tmp_path, mocker):
+    """A likely duplicate that turns out to be new is stored under the hash already computed, not hashed again"""
+    head, tail = os.urandom(8 * 1024), os.urandom(8 * 1024)
+    (tmp_path / "a.bin").write_bytes(head + b"A" * 1024 + tail)
+    (tmp_path / "b.bin").write_bytes(head + b"B" * 1024 + tail)  # same size, head and tail as a.bin
+
+    fm = FileManager()
+    put_file = mocker.spy(fm.blob_store, "put_file")
+    hash_only = mocker.spy(fm, "_hash_only")
+    result = fm.load_from_filepath(str(tmp_path))
+    assert result["status"] == "success"
+
+    assert [Path(call.args[0]).name for call in hash_only.call_args_list] == ["b.bin"]
+    b_hash = hashlib.sha256((tmp_path / "b.bin").read_bytes()).hexdigest()
+    b_calls = [call for call in put_file.call_args_list if Path(call.args[0]).name == "b.bin"]
+    assert [call.args[1] for call in b_calls] == [b_hash]
+    assert fm.blob_store.get(b_hash) == (tmp_path / "b.bin").read_bytes()
+    assert len(fm.binary_data_array) == 2
@@ -0,0 +1,145 @@
+import io
+import os
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock
+from ignore_rules import IgnoreRules, IgnorePattern
+from file_manager import FileManager
+
+
+def _make_tree(root: Path, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _walked(rules, root):
+    return [str(p.relative_to(root)) for p, _ in rules.walk(root)]
+
+
+def test_walk_matches_sorted_rglob_without_rules(tmp_path):
+    _make_tree(tmp_path, {"a/x.txt": "1", "a.txt": "2", "b/c/d.py": "3", "B.md": "4"})
+    rules = IgnoreRules(use_defaults=False, honour_gitignore=False)
+
+    assert [p for p, _ in rules.walk(tmp_path)] == sorted(tmp_path.rglob("*"))
+
+def test_default_patterns_prune_vendor_dirs(tmp_path):
+    _make_tree(tmp_path, {
+        "src/app.js": "code",
+        "node_modules/lib/index.js": "vendor",
+        "nested/venv/lib/site.py": "vendor",
+        "target": "a file named target is kept",
+    })
+    walked = _walked(IgnoreRules(), tmp_path)
+
+    assert "src/app.js" in walked
+    assert "target" in walked
+    assert not any(p.startswith("node_modules") for p in walked)
+    assert not any("venv" in p for p in walked)
+
+def test_build_dirs_pruned_only_next_to_their_manifest(tmp_path):
+    _make_tree(tmp_path, {
+        "web/package.json": "{}",
+        "web/dist/bundle.js": "built",
+        "crate/Cargo.toml": "[package]",
+        "crate/target/debug/app": "built",
+        "tools/build/__init__.py": "a source package named build",
+        "tools/dist/util.py": "source",
+    })
+    walked = _walked(IgnoreRules(), tmp_path)
+
+    assert not any(p.startswith(("web/dist", "crate/target")) for p in walked)
+    assert "tools/build/__init__.py" in walked
+    assert "tools/dist/util.py" in walked
+
+def test_unreadable_directories_are_skipped(tmp_path, mocker):
+    _make_tree(tmp_path, {"ok/a.py": "code", "locked/secret.py": "code", "z.py": "code"})
+    scandir = os.scandir
+
+    def guarded(path):
+        if Path(path).name == "locked":
+            raise PermissionError(13, "Permission denied", str(path))
+        return scandir(path)
+    mocker.patch("ignore_rules.os.scandir", side_effect=guarded)
+
+    walked = _walked(IgnoreRules(), tmp_path)
+
+    assert walked == ["locked", "ok", "ok/a.py", "z.py"]
+
+def test_unreadable_gitignore_is_logged(tmp_path, mocker, caplog, capsys):
+    _make_tree(tmp_path, {"repo/.git/HEAD": "ref", "repo/.gitignore": "*.log\n", "repo/debug.log": "log"})
+    mocker.patch.object(Path, "read_text", side_effect=PermissionError(13, "Permission denied"))
+
+    with caplog.at_level("WARNING", logger="ignore_rules"):
+        walked = _walked(IgnoreRules(), tmp_path)
+
+    assert "repo/debug.log" in walked
+    assert "Could not read" in caplog.text and ".gitignore" in caplog.text
+    assert capsys.readouterr().out == ""
+
+def test_git_dir_is_never_pruned(tmp_path):
+    _make_tree(tmp_path, {"repo/.git/HEAD": "ref", "repo/.git/build/x": "obj", "repo/main.py": "code"})
+    walked = _walked(IgnoreRules(patterns=[".git/", "HEAD"]), tmp_path)
+
+    assert "repo/.git/HEAD" in walked
+    assert "repo/.git/build/x" in walked
+
+def test_gitignore_honoured_only_inside_repos(tmp_path):
+    _make_tree(tmp_path, {
+        "repo/.git/HEAD": "ref",
+        "repo/.gitignore": "*.log\n/secret/\n!keep.log\n",
+        "repo/debug.log": "log",
+        "repo/keep.log": "log",
+        "repo/secret/key.txt": "key",
+        "repo/sub/secret/ok.txt": "not anchored at repo root",
+        "plain/.gitignore": "*.txt\n",
+        "plain/notes.txt": "outside any repo",
+    })
+    walked = _walked(IgnoreRules(), tmp_path)
+
+    assert "repo/debug.log" not in walked
+    assert "repo/keep.log" in walked
+    assert "repo/secret" not in walked
+    assert "repo/sub/secret/ok.txt" in walked
+    assert "plain/notes.txt" in walked
+
+def test_user_patterns_from_config():
+    config = MagicMock()
+    config.preferences = {"ignore_patterns": ["*.csv", 42], "use_default_ignore_patterns": False}
+    rules = IgnoreRules.from_config(config)
+
+    assert rules.is_ignored(("data", "big.csv"), False)
+    assert not rules.is_ignored(("node_modules",), True)
+
+    # malformed preferences fall back to the defaults
+    bad_config = MagicMock()
+    bad_config.preferences = {"ignore_patterns": "*.csv"}
+    assert IgnoreRules.from_config(bad_config).is_ignored(("node_modules",), True)
+
+def test_double_star_pattern():
+    rule = IgnorePattern.parse("docs/**/*.tmp")
+    assert rule.matches(("docs", "a.tmp"), False)
+    assert rule.matches(("docs", "x", "y", "a.tmp"), False)
+    assert not rule.matches(("other", "a.tmp"), False)
+
+def test_file_manager_prunes_directories_and_zip_members(tmp_path):
+    _make_tree(tmp_path, {"proj/main.py": "print(1)", "proj/node_modules/pkg/index.js": "vendor"})
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("repo/.git/HEAD", "ref")
+        zf.writestr("repo/.gitignore", "*.log\n")
+        zf.writestr("repo/run.log", "log")
+        zf.writestr("repo/app.py", "code")
+        zf.writestr("repo/package.json", "{}")
+        zf.writestr("repo/dist/bundle.js", "built")
+    (tmp_path / "upload.zip").write_bytes(buffer.getvalue())
+
+    fm = FileManager()
+    result = fm.load_from_filepath(tmp_path)
+    assert result["status"] == "success"
+
+    names = {n.name for n in fm.file_tree.descendants}
+    assert {"main.py", "app.py", "HEAD", ".git", ".gitignore"} <= names
+    assert not names & {"node_modules", "index.js", "run.log", "dist", "bundle.js"}
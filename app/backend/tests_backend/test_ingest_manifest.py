@@ -0,0 +1,118 @@
+import os
+import zipfile
+from pathlib import Path
+from file_manager import FileManager
+from cache.blob_store import BlobStore, BlobArray
+from ingest_manifest import IngestManifest, ManifestEntry, relative_key
+
+
+def _write(root: Path, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def _previous_session(root: Path, store: BlobStore):
+    fm = FileManager(blob_store=store)
+    result = fm.load_from_filepath(root)
+    assert result["status"] == "success"
+    return fm, IngestManifest.from_dict(result["manifest"].to_dict())
+
+
+def test_manifest_records_relative_paths(tmp_path):
+    _write(tmp_path / "project", {"a.txt": b"alpha", "src/b.py": b"print(1)"})
+    fm, manifest = _previous_session(tmp_path / "project", BlobStore(tmp_path / "blobs"))
+
+    assert set(manifest.files) == {"a.txt", "src/b.py"}
+    entry = manifest.files["src/b.py"]
+    assert entry.size_bytes == 8
+    assert entry.file_hash == fm.file_objects[1]["file_hash"]
+    assert manifest.blob_hashes == fm.binary_data_array.hashes
+
+
+def test_manifest_round_trip():
+    manifest = IngestManifest({"a.txt": ManifestEntry(3, "2025-01-01T00:00:00", "ab" * 32, 0)}, ["ab" * 32])
+    restored = IngestManifest.from_dict(manifest.to_dict())
+    assert restored.files == manifest.files
+    assert restored.blob_hashes == manifest.blob_hashes
+    assert len(IngestManifest.from_dict(None)) == 0
+
+
+def test_lookup_requires_matching_size_and_mtime():
+    manifest = IngestManifest({"a.txt": ManifestEntry(3, "2025-01-01T00:00:00", "ab" * 32, 0)})
+    assert manifest.lookup("a.txt", 3, "2025-01-01T00:00:00") is not None
+    assert manifest.lookup("a.txt", 4, "2025-01-01T00:00:00") is None
+    assert manifest.lookup("a.txt", 3, "2025-01-02T00:00:00") is None
+    assert manifest.lookup("b.txt", 3, "2025-01-01T00:00:00") is None
+
+
+def test_relative_key_of_root_file(tmp_path):
+    assert relative_key(tmp_path / "a.txt", tmp_path / "a.txt") == "a.txt"
+    assert relative_key(tmp_path, tmp_path / "dir" / "a.txt") == "dir/a.txt"
+
+
+def test_update_only_reads_changed_files(tmp_path, mocker):
+    root = tmp_path / "project"
+    _write(root, {"same.txt": b"unchanged", "edit.txt": b"old", "dir/keep.md": b"# keep"})
+    store = BlobStore(tmp_path / "blobs")
+    fm1, manifest = _previous_session(root, store)
+
+    (root / "edit.txt").write_bytes(b"new content")
+    _write(root, {"added.txt": b"brand new"})
+
+    fm2 = FileManager(blob_store=store)
+    fm2.set_previous_state(manifest.blob_array(store), dict(fm1.seen_hashes), manifest)
+    put_file = mocker.spy(store, "put_file")
+    result = fm2.load_from_filepath(root, reset_state=False)
+
+    assert result["status"] == "success"
+    assert fm2.reused_files == 2
+    read = sorted(Path(call.args[0]).name for call in put_file.call_args_list)
+    assert read == ["added.txt", "edit.txt"]
+
+    by_name = {f["filename"]: f for f in fm2.file_objects}
+    old_by_name = {f["filename"]: f for f in fm1.file_objects}
+    assert by_name["same.txt"]["binary_index"] == old_by_name["same.txt"]["binary_index"]
+    assert fm2.binary_data_array[by_name["edit.txt"]["binary_index"]] == b"new content"
+
+
+def test_missing_blob_is_read_again(tmp_path):
+    root = tmp_path / "project"
+    _write(root, {"a.txt": b"alpha"})
+    store = BlobStore(tmp_path / "blobs")
+    fm1, manifest = _previous_session(root, store)
+    store.discard(fm1.file_objects[0]["file_hash"])
+
+    assert manifest.blob_array(store) is None
+
+    fm2 = FileManager(blob_store=store)
+    fm2.set_previous_state(BlobArray(store, manifest.blob_hashes), dict(fm1.seen_hashes), manifest)
+    fm2.load_from_filepath(root, reset_state=False)
+    assert fm2.reused_files == 0
+    assert fm2.binary_data_array[0] == b"alpha"
+
+
+def test_zip_members_reused_across_uploads(tmp_path, mocker):
+    store = BlobStore(tmp_path / "blobs")
+
+    def upload(name, files):
+        path = tmp_path / name
+        with zipfile.ZipFile(path, "w") as zf:
+            for member, content in files.items():
+                zf.writestr(zipfile.ZipInfo(member, date_time=(2025, 1, 1, 0, 0, 0)), content)
+        return path
+
+    fm1 = FileManager(blob_store=store)
+    result = fm1.load_from_filepath(upload("first.zip", {"a.txt": b"alpha", "b.txt": b"beta"}))
+    manifest = result["manifest"]
+
+    fm2 = FileManager(blob_store=store)
+    fm2.set_previous_state(manifest.blob_array(store), dict(fm1.seen_hashes), manifest)
+    put_stream = mocker.spy(store, "put_stream")
+    # uploads land under a new temp name each time, keys are relative to the archive so they still match
+    fm2.load_from_filepath(upload("second.zip", {"a.txt": b"alpha", "b.txt": b"beta!"}), reset_state=False)
+
+    assert fm2.reused_files == 1
+    assert put_stream.call_count == 1
+    assert os.path.basename(fm2.file_objects[1]["filepath"]) == "b.txt"
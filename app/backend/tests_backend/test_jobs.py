@@ -0,0 +1,144 @@
+import threading
+import pytest
+from jobs import JobRunner, JobResult, JobFailed, QueueFullError, checkpoint
+
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(max_workers=1, max_queued=1)
+    yield runner
+    runner.shutdown()
+
+def blocking_job(runner):
+    """Submits a job holding the only worker until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+        return JobResult("done")
+
+    job = runner.submit("block", block)
+    started.wait(5)
+    return job, release
+
+def test_job_succeeds(runner):
+    job = runner.submit("extract", lambda a, b: JobResult({"sum": a + b}, 201, {"location": "/x"}), 1, 2)
+
+    assert runner.wait(job.job_id, timeout=5).status == "succeeded"
+    assert job.to_dict() == {
+        "job_id": job.job_id, "kind": "extract", "status": "succeeded",
+        "status_code": 201, "result": {"sum": 3}, "headers": {"location": "/x"},
+    }
+
+def test_job_failed_keeps_its_status_code(runner):
+    def fail():
+        raise JobFailed(404, "No analysis")
+
+    job = runner.submit("commit", fail)
+    runner.wait(job.job_id, timeout=5)
+
+    assert job.to_dict()["status"] == "failed"
+    assert (job.to_dict()["status_code"], job.to_dict()["error"]) == (404, "No analysis")
+
+def test_unexpected_error_fails_with_500(runner):
+    job = runner.submit("commit", lambda: 1 / 0)
+    runner.wait(job.job_id, timeout=5)
+
+    assert job.status == "failed"
+    assert job.error.status_code == 500
+
+def test_on_success_replaces_result(runner):
+    job = runner.submit("extract", lambda: (JobResult("content"), b"session"), on_success=lambda outcome: outcome[0])
+    runner.wait(job.job_id, timeout=5)
+
+    assert job.result.content == "content"
+
+def test_on_failure_gets_the_error(runner):
+    failures = []
+    job = runner.submit("commit", lambda: 1 / 0, on_failure=failures.append)
+    runner.wait(job.job_id, timeout=5)
+
+    assert [error.status_code for error in failures] == [500]
+
+def test_queue_full(runner):
+    _, release = blocking_job(runner)
+    runner.submit("commit", lambda: JobResult(None))
+
+    with pytest.raises(QueueFullError):
+        runner.submit("commit", lambda: JobResult(None))
+    release.set()
+
+def test_cancel_queued_job_never_runs(runner):
+    _, release = blocking_job(runner)
+    ran = threading.Event()
+    queued = runner.submit("commit", ran.set, key="analysis")
+
+    assert runner.cancel_key("analysis") == 1
+    release.set()
+    runner.shutdown()
+
+    assert queued.status == "cancelled"
+    assert not ran.is_set()
+
+def test_cancel_running_job_discards_its_outcome(runner):
+    job, release = blocking_job(runner)
+
+    assert runner.cancel(job.job_id) is True
+    release.set()
+    runner.shutdown()
+
+    assert job.status == "cancelled"
+    assert "result" not in job.to_dict()
+    assert runner.cancel(job.job_id) is False
+
+def test_cancelled_job_stops_at_its_checkpoint(runner):
+    started, release, passed = threading.Event(), threading.Event(), threading.Event()
+    failures = []
+
+    def stages(cancel_event=None):
+        started.set()
+        release.wait(5)
+        checkpoint(cancel_event)
+        passed.set()
+        return JobResult("done")
+
+    job = runner.submit("commit", stages, key="analysis", on_failure=failures.append, cancellable=True)
+    started.wait(5)
+
+    assert runner.cancel_key("analysis") == 1
+    assert job.status == "cancelling"
+    assert runner.stopping("analysis") == [job]
+    release.set()
+    runner.wait(job.job_id, timeout=5)
+
+    assert job.status == "cancelled"
+    assert not passed.is_set()
+    assert (job.result, job.error, failures) == (None, None, [])
+    assert runner.stopping("analysis") == []
+
+def checkpointed(value, cancel_event=None):
+    checkpoint(cancel_event)
+    return value
+
+def test_process_executor_passes_a_shared_cancel_event():
+    runner = JobRunner("process", max_workers=1)
+    try:
+        job = runner.submit("checkpointed", checkpointed, 7, cancellable=True)
+        runner.wait(job.job_id, timeout=60)
+        assert job.result == 7
+    finally:
+        runner.shutdown()
+
+def test_process_executor():
+    runner = JobRunner("process", max_workers=1)
+    try:
+        job = runner.submit("pow", pow, 2, 10)
+        runner.wait(job.job_id, timeout=60)
+        assert job.result == 1024
+    finally:
+        runner.shutdown()
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        JobRunner("fiber")
@@ -278,4 +278,63 @@ class TestManagePortfolios:
         db_manager.get_portfolios_by_analysis_id.side_effect = LookupError("none")
         cli.get_input.side_effect = ["1", "n"]
         self._run(cli, db_manager, portfolio_builder)
-        portfolio_builder.create_portfolio_from_result_id.assert_not_called()
\ No newline at end of file
+        portfolio_builder.create_portfolio_from_result_id.assert_not_called()
+
+# ── perform_update_merge ──────────────────────────────────────────────────────
+
+class TestPerformUpdateMerge:
+    def setup_method(self):
+        from main_utils import perform_update_merge
+        self.fn = perform_update_merge
+
+    def _managers(self, db_manager, load_result):
+        file_manager = MagicMock()
+        file_manager.blob_store = own_store = MagicMock(name="own_store")
+        file_manager.load_from_filepath.return_value = load_result
+        old_tree = MagicMock()
+        old_tree.file_hashes.return_value = {}
+        db_manager.get_fileset_manifest.return_value = ({}, old_tree)
+        db_manager.load_fileset_blobs.return_value.store = MagicMock(name="db_store")
+        return file_manager, own_store
+
+    def test_gives_the_file_manager_its_store_back(self, db_manager):
+        file_manager, own_store = self._managers(db_manager, {"status": "success", "tree": "tree", "binary_data": "data"})
+        stores = []
+        file_manager.load_from_filepath.side_effect = lambda *a, **k: stores.append(file_manager.blob_store) or {
+            "status": "success", "tree": "tree", "binary_data": "data",
+        }
+
+        assert self.fn("aid-1", "/new", file_manager, db_manager) == ("tree", "data")
+        # the merge itself ran against the database backed store
+        assert stores == [db_manager.load_fileset_blobs.return_value.store]
+        assert file_manager.blob_store is own_store
+
+    def test_store_is_restored_when_the_load_fails(self, db_manager):
+        file_manager, own_store = self._managers(db_manager, {"status": "error", "message": "boom"})
+
+        with pytest.raises(RuntimeError):
+            self.fn("aid-1", "/new", file_manager, db_manager)
+        assert file_manager.blob_store is own_store
+
+    def test_change_set_is_left_in_the_tree_manager(self, db_manager):
+        from compact_tree import CompactTree
+        from tree_manager import TreeManager
+
+        def tree(files):
+            compact = CompactTree()
+            root = compact.add(-1, "upload", "directory")
+            for i, (name, file_hash) in enumerate(files):
+                compact.add(root, name, "file", size=1, last_modified="T1", binary_index=i, file_hash=file_hash)
+            return compact
+
+        old_tree = tree([("a.py", "h1"), ("b.py", "h2"), ("c.py", "h3")])
+        merged_tree = tree([("a.py", "h1"), ("b.py", "h9"), ("d.py", "h4")]).node()
+        file_manager, _ = self._managers(db_manager, {"status": "success", "tree": merged_tree, "binary_data": []})
+        db_manager.get_fileset_manifest.return_value = ({}, old_tree)
+        tree_manager = TreeManager()
+
+        self.fn("aid-1", "/new", file_manager, db_manager, tree_manager)
+
+        assert tree_manager.change_set.to_dict() == {
+            'added': ["d.py"], 'removed': ["c.py"], 'modified': ["b.py"], 'unchanged': ["a.py"],
+        }
@@ -0,0 +1,26 @@
+import pytest
+from pagination import encode_cursor, decode_cursor, split_page, escape_like
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2025-01-01 10:00:00", "8f14e45f-ceea-4672-a2a7-6b1f0e5a9f01")
+    assert decode_cursor(cursor, 2) == ["2025-01-01 10:00:00", "8f14e45f-ceea-4672-a2a7-6b1f0e5a9f01"]
+
+
+def test_cursor_is_url_safe():
+    assert all(c.isalnum() or c in "-_=" for c in encode_cursor("a/b+c?", 123))
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor(1, 2), "e30="])
+def test_decode_rejects_foreign_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 1)
+
+
+def test_split_page_reports_following_page():
+    assert split_page([1, 2, 3], 2) == ([1, 2], True)
+    assert split_page([1, 2], 2) == ([1, 2], False)
+
+
+def test_escape_like_escapes_wildcards():
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
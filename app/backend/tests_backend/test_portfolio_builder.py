@@ -132,7 +132,7 @@ class TestPortfolioBuilder:
     def test_create_portfolio_from_result_id_success(self, mock_db_manager, mock_cli, sample_result_data):
         """Test successful portfolio creation from result ID"""
         builder = PortfolioBuilder()
-        mock_db_manager.get_analysis_data.return_value = sample_result_data
+        mock_db_manager.get_analysis_sections.return_value = sample_result_data
         
         portfolio = builder.create_portfolio_from_result_id(mock_db_manager, mock_cli, 'test-result-id')
         
@@ -147,7 +147,7 @@ class TestPortfolioBuilder:
     def test_create_portfolio_result_not_found(self, mock_db_manager, mock_cli):
         """Test handling when result is not found in database"""
         builder = PortfolioBuilder()
-        mock_db_manager.get_analysis_data.return_value = None
+        mock_db_manager.get_analysis_sections.return_value = None
         
         portfolio = builder.create_portfolio_from_result_id(mock_db_manager, mock_cli, 'invalid-id')
         
@@ -161,7 +161,7 @@ class TestPortfolioBuilder:
             'metadata_insights': {},
             'project_insights': {}
         }
-        mock_db_manager.get_analysis_data.return_value = empty_data
+        mock_db_manager.get_analysis_sections.return_value = empty_data
         
         portfolio = builder.create_portfolio_from_result_id(mock_db_manager, mock_cli, 'test-id')
         
@@ -173,7 +173,7 @@ class TestPortfolioBuilder:
     def test_create_portfolio_handles_exception(self, mock_db_manager, mock_cli):
         """Test error handling during portfolio creation"""
         builder = PortfolioBuilder()
-        mock_db_manager.get_analysis_data.side_effect = Exception("Database error")
+        mock_db_manager.get_analysis_sections.side_effect = Exception("Database error")
         
         portfolio = builder.create_portfolio_from_result_id(mock_db_manager, mock_cli, 'test-id')
         
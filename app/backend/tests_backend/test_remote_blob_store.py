@@ -0,0 +1,56 @@
+import hashlib
+import pytest
+from cache.blob_store import BlobArray
+from cache.remote_blob_store import RemoteBlobStore
+
+
+class FakeSource:
+    """Serves blobs in small chunks and records which ones were read"""
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.reads = []
+
+    def iter_blob(self, file_hash):
+        self.reads.append(file_hash)
+        data = self.blobs[file_hash]
+        for start in range(0, len(data), 3):
+            yield data[start:start + 3]
+
+
+def _remote(tmp_path, contents):
+    blobs = {hashlib.sha256(data).hexdigest(): data for data in contents}
+    source = FakeSource(blobs)
+    store = RemoteBlobStore(tmp_path, source, {file_hash: len(data) for file_hash, data in blobs.items()})
+    return store, source, list(blobs)
+
+
+def test_remote_blobs_count_as_stored_without_reading(tmp_path):
+    store, source, (first, second) = _remote(tmp_path, [b"first file", b"second"])
+    assert store.has(first) and store.size(second) == 6
+    assert source.reads == []
+
+
+def test_blob_is_streamed_once_on_first_read(tmp_path):
+    store, source, (first, second) = _remote(tmp_path, [b"first file", b"second"])
+    array = BlobArray(store, [first, None, second])
+
+    assert array[0] == b"first file"
+    assert bytes(array.view(0)) == b"first file"
+    assert array[1] is None
+    assert source.reads == [first]
+    assert store.fetched == 1
+
+
+def test_local_writes_still_go_to_the_directory(tmp_path):
+    store, source, _ = _remote(tmp_path, [b"remote"])
+    local_hash = store.put(b"local")
+    assert store.get(local_hash) == b"local"
+    assert source.reads == []
+
+
+def test_corrupt_remote_blob_is_rejected(tmp_path):
+    store, source, (file_hash,) = _remote(tmp_path, [b"original"])
+    source.blobs[file_hash] = b"tampered"
+    with pytest.raises(ValueError):
+        store.get(file_hash)
@@ -3,6 +3,7 @@ import uuid
 import pytest
 from unittest.mock import MagicMock, patch
 from database_manager import DatabaseManager
+from bow_codec import decode_bow, to_tokens, vocabulary_of
 from display_helpers import display_project_insights, display_project_summary, display_project_timeline
 
 
@@ -101,6 +102,8 @@ def test_save_repository_analysis_success(mock_db_manager, sample_analysis_data)
 def test_save_tracked_data_success(mock_db_manager, sample_tracked_data):
     """Test that save_tracked_data stores raw tracked project data correctly."""
     result_id = str(uuid.uuid4())
+    tokens = vocabulary_of(sample_tracked_data["bow_cache"])
+    mock_db_manager.db.execute_query.return_value = [{"token_id": i, "token": token} for i, token in enumerate(tokens)]
     success = mock_db_manager.save_tracked_data(
         result_id,
         sample_tracked_data["metadata_results"],
@@ -109,13 +112,14 @@ def test_save_tracked_data_success(mock_db_manager, sample_tracked_data):
         sample_tracked_data["package_data"]
     )
     assert success is True
-    mock_db_manager.db.execute_update.assert_called_once()
+    # vocabulary insert, then the Tracked_Data update
+    assert mock_db_manager.db.execute_update.call_count == 2
     args, _ = mock_db_manager.db.execute_update.call_args
-    # check JSON serialization for each field
+    # check JSON serialization for each field, the bag of words is stored as token ids
     assert json.loads(args[1][0]) == sample_tracked_data["metadata_results"]
-    assert json.loads(args[1][1]) == sample_tracked_data["bow_cache"]
-    assert json.loads(args[1][2]) == sample_tracked_data["project_data"]
-    assert json.loads(args[1][3]) == sample_tracked_data["package_data"]
+    assert to_tokens(decode_bow(args[1][1]), dict(enumerate(tokens))) == sample_tracked_data["bow_cache"]
+    assert json.loads(args[1][3]) == sample_tracked_data["project_data"]
+    assert json.loads(args[1][4]) == sample_tracked_data["package_data"]
 
 def test_get_result_by_id_formats_data(mock_db_manager, sample_analysis_data, sample_tracked_data):
     """Test get_result_by_id returns properly formatted data with tracked_data."""
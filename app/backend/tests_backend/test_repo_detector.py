@@ -185,6 +185,29 @@ def test_get_git_repos_returns_list(repo_detector, git_tree):
 
 
 
+def test_process_git_repos_from_git_subtrees(repo_detector, git_tree):
+    """The .git subtrees pruned by the classifier give the heads without walking the tree"""
+    git_nodes = [node for node in PreOrderIter(git_tree) if node.name == ".git"]
+    repo_detector.process_git_repos(git_tree, git_subtrees=git_nodes)
+    git_repos = repo_detector.get_git_repos()
+
+    assert git_repos == [node.parent for node in git_nodes]
+    assert all(node.is_repo_head for node in git_repos)
+    assert repo_detector.get_git_dirs() == {node.parent: node for node in git_nodes}
+
+def test_process_git_repos_does_not_walk_git_contents(repo_detector):
+    """A .git directory inside another .git directory is repository internals, not a repository"""
+    root = Node("project", type="directory", is_repo_head=False)
+    git = Node(".git", type="directory", parent=root)
+    modules = Node("modules", type="directory", parent=git, is_repo_head=False)
+    Node(".git", type="directory", parent=modules)
+
+    repo_detector.process_git_repos(root)
+
+    assert repo_detector.get_git_repos() == [root]
+    assert repo_detector.get_git_dirs() == {root: git}
+
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -43,6 +43,18 @@ class TestRepositoryProcessorBasics:
         finally:
             processor._cleanup_temp_dirs()
 
+    def test_extract_git_folder_uses_given_git_node(self) -> None:
+        # the .git node found by RepoDetector is used, repo_node.children is not searched
+        repo_node: Node = Node("test_repo", type="directory", path="/fake/path")
+        git_node: Node = Node(".git", type="directory")
+        Node("HEAD", parent=git_node, type="file", binary_index=0)
+        processor: RepositoryProcessor = RepositoryProcessor("test_user", [b"ref: refs/heads/main"])
+        try:
+            temp_path: Path = processor._extract_git_folder(repo_node, git_node)
+            assert (temp_path / ".git" / "HEAD").read_bytes() == b"ref: refs/heads/main"
+        finally:
+            processor._cleanup_temp_dirs()
+
 
 class TestRebuildGitTree:
 
@@ -0,0 +1,82 @@
+import pytest
+from result_cache import ResultCache
+
+
+def test_second_read_is_a_hit_and_a_copy():
+    cache = ResultCache(max_bytes=1024 * 1024)
+    calls = []
+    load = lambda: calls.append(1) or {"points": ["a"]}
+
+    first = cache.get_or_load("k", ["analysis:1"], load)
+    first["points"].append("mutated")
+    second = cache.get_or_load("k", ["analysis:1"], load)
+
+    assert second == {"points": ["a"]}
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_invalidate_drops_only_tagged_entries():
+    cache = ResultCache(max_bytes=1024 * 1024)
+    cache.get_or_load("a", ["analysis:1"], lambda: 1)
+    cache.get_or_load("b", ["analysis:2"], lambda: 2)
+
+    cache.invalidate("analysis:1")
+
+    assert cache.get_or_load("a", ["analysis:1"], lambda: 10) == 10
+    assert cache.get_or_load("b", ["analysis:2"], lambda: 20) == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_tags_may_depend_on_the_result():
+    cache = ResultCache(max_bytes=1024 * 1024)
+    cache.get_or_load("resume", lambda rows: [f"resumes:{rows[0]['analysis_id']}"], lambda: [{"analysis_id": "x"}])
+
+    cache.invalidate("resumes:x")
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = ResultCache(max_bytes=4000)
+    value = "x" * 900
+    for key in ("a", "b", "c"):
+        cache.get_or_load(key, [], lambda: value)
+    cache.get_or_load("a", [], lambda: None)  #touch a
+    cache.get_or_load("d", [], lambda: value)
+    cache.get_or_load("e", [], lambda: value)
+
+    assert cache.stats()["evictions"] >= 1
+    assert cache.get_or_load("a", [], lambda: "reloaded") == value
+    assert cache.get_or_load("b", [], lambda: "reloaded") == "reloaded"
+    assert cache.stats()["bytes"] <= 4000
+
+
+def test_load_overlapping_an_invalidation_is_not_stored():
+    cache = ResultCache(max_bytes=1024 * 1024)
+
+    def load():
+        cache.invalidate("analysis:1")  #a write committed while reading
+        return "old"
+
+    assert cache.get_or_load("k", ["analysis:1"], load) == "old"
+    assert cache.get_or_load("k", ["analysis:1"], lambda: "new") == "new"
+
+
+def test_failed_loads_are_not_cached():
+    cache = ResultCache(max_bytes=1024 * 1024)
+
+    def load():
+        raise LookupError("missing")
+
+    with pytest.raises(LookupError):
+        cache.get_or_load("k", [], load)
+    assert cache.get_or_load("k", [], lambda: "found") == "found"
+
+
+def test_zero_size_disables_the_cache():
+    cache = ResultCache(max_bytes=0)
+    cache.get_or_load("k", [], lambda: 1)
+
+    assert cache.get_or_load("k", [], lambda: 2) == 2
+    assert cache.stats()["entries"] == 0
@@ -1,5 +1,6 @@
 import pytest
 from resume_builder import ResumeBuilder
+from resume_data_processor import ResumeDataProcessor
 
 
 class TestResumeBuilder:
@@ -61,7 +62,7 @@ class TestResumeBuilder:
     def test_create_resume_from_analysis_id_success(self, mock_db_manager, mock_cli, sample_result_data):
         """Test successful resume creation from result ID"""
         builder = ResumeBuilder()
-        mock_db_manager.get_analysis_data.return_value = sample_result_data
+        mock_db_manager.get_analysis_sections.return_value = sample_result_data
         
         resume = builder.create_resume_from_analysis_id(mock_db_manager, mock_cli, 'test-result-id')
         
@@ -73,11 +74,12 @@ class TestResumeBuilder:
         assert 'skills' in resume
         assert 'languages' in resume
         mock_cli.print_status.assert_any_call("Resume generated successfully!", "success")
+        mock_db_manager.get_analysis_sections.assert_called_once_with('test-result-id', ResumeDataProcessor.SECTIONS)
     
     def test_create_resume_result_not_found(self, mock_db_manager, mock_cli):
         """Test handling when result is not found in database"""
         builder = ResumeBuilder()
-        mock_db_manager.get_analysis_data.return_value = None
+        mock_db_manager.get_analysis_sections.return_value = None
         
         resume = builder.create_resume_from_analysis_id(mock_db_manager, mock_cli, 'invalid-id')
         
@@ -92,7 +94,7 @@ class TestResumeBuilder:
             'metadata_insights': {},
             'project_insights': {}
         }
-        mock_db_manager.get_analysis_data.return_value = empty_data
+        mock_db_manager.get_analysis_sections.return_value = empty_data
         
         resume = builder.create_resume_from_analysis_id(mock_db_manager, mock_cli, 'test-id')
         
@@ -104,7 +106,7 @@ class TestResumeBuilder:
     def test_create_resume_handles_exception(self, mock_db_manager, mock_cli):
         """Test error handling during resume creation"""
         builder = ResumeBuilder()
-        mock_db_manager.get_analysis_data.side_effect = Exception("Database error")
+        mock_db_manager.get_analysis_sections.side_effect = Exception("Database error")
         
         resume = builder.create_resume_from_analysis_id(mock_db_manager, mock_cli, 'test-id')
         
@@ -0,0 +1,84 @@
+import copy
+from pathlib import Path
+from unittest.mock import patch
+from anytree import PreOrderIter
+from file_manager import FileManager
+from file_classifier import FileClassifier
+from repo_detector import RepoDetector
+from ignore_rules import IgnoreRules
+from input_validation import scan_analysis_path
+from scan_index import ScanIndex
+
+
+def _make_tree(root: Path, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+FILES = {
+    "notes.md": "# notes",
+    "repo/.git/HEAD": "ref",
+    "repo/.git/config": "[core]",
+    "repo/main.py": "print(1)",
+    "repo/README.txt": "readme",
+    "repo/data.bin": "???",
+    "other/script.js": "let x = 1",
+}
+
+
+def test_scan_records_sizes_once(tmp_path):
+    _make_tree(tmp_path, FILES)
+    index = ScanIndex.scan(tmp_path)
+
+    files = {str(e.path.relative_to(tmp_path)): e for e in index.entries if not e.is_dir}
+    assert set(files) == set(FILES)
+    assert index.total_size == sum(len(content) for content in FILES.values())
+    assert files["repo/main.py"].mtime == (tmp_path / "repo/main.py").stat().st_mtime
+
+def test_scan_analysis_path_returns_validated_root(tmp_path):
+    _make_tree(tmp_path, FILES)
+    index = scan_analysis_path(str(tmp_path))
+
+    assert index.root == tmp_path.resolve()
+    assert index.walked
+
+def test_file_manager_reuses_validation_walk(tmp_path):
+    _make_tree(tmp_path, FILES)
+    index = scan_analysis_path(str(tmp_path))
+
+    with patch.object(IgnoreRules, "walk", side_effect=AssertionError("walked twice")):
+        result = FileManager().load_from_filepath(tmp_path, scan_index=index)
+
+    assert result["status"] == "success"
+    assert result["scan_index"] is index
+    assert len(index.files) == len(FILES)
+    assert {f.extension for f in index.extension_buckets[".py"]} == {".py"}
+    assert index.get(str((tmp_path / "repo/main.py").resolve())).file_hash
+
+def test_index_classification_matches_tree_walk(tmp_path):
+    _make_tree(tmp_path, FILES)
+    result = FileManager().load_from_filepath(tmp_path)
+    tree, binary = result["tree"], result["binary_data"]
+    tree_copy = copy.deepcopy(tree)
+
+    text_a, code_a, _ = FileClassifier().classify_files(tree, binary, result["scan_index"])
+    text_b, code_b, _ = FileClassifier().classify_files(tree_copy, binary)
+
+    assert [n.file_data["filepath"] for n in text_a] == [n.file_data["filepath"] for n in text_b]
+    assert [n.file_data["filepath"] for n in code_a] == [n.file_data["filepath"] for n in code_b]
+    git_a = sorted(n.name for n in PreOrderIter(tree) if getattr(n, "classification", None) == "git")
+    git_b = sorted(n.name for n in PreOrderIter(tree_copy) if getattr(n, "classification", None) == "git")
+    assert git_a == git_b == ["HEAD", "config"]
+
+def test_repo_heads_from_index(tmp_path):
+    _make_tree(tmp_path, FILES)
+    result = FileManager().load_from_filepath(tmp_path)
+
+    detector = RepoDetector()
+    detector.process_git_repos(result["tree"], result["scan_index"])
+    repos = detector.get_git_repos()
+
+    assert [repo.name for repo in repos] == ["repo"]
+    assert repos[0].is_repo_head
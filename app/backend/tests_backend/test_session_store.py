@@ -0,0 +1,91 @@
+import time
+from cache.blob_store import BlobStore, BlobArray
+from cache.session_store import SessionStore
+
+
+def test_put_and_take(tmp_path):
+    store = SessionStore(tmp_path)
+    store.put("new_1", {"topic_vector_bundle": {"topic_keywords": []}})
+
+    assert "new_1" in store
+    assert store.take("new_1") == {"topic_vector_bundle": {"topic_keywords": []}}
+    assert store.take("new_1") is None
+
+def test_small_sessions_stay_in_memory(tmp_path):
+    store = SessionStore(tmp_path)
+    store.put("new_1", {"final_bow": [["a", "b"]]})
+
+    assert not list(tmp_path.glob("*.session"))
+
+def test_large_sessions_are_compressed_to_disk(tmp_path):
+    store = SessionStore(tmp_path, memory_entry_bytes=100)
+    value = {"final_bow": [["token"] * 1000]}
+    store.put("update_1", value)
+
+    files = list(tmp_path.glob("*.session"))
+    assert len(files) == 1
+    assert files[0].stat().st_size < 1000
+    assert store.take("update_1") == value
+    assert not list(tmp_path.glob("*.session"))
+
+def test_memory_tier_spills_oldest_to_disk(tmp_path):
+    store = SessionStore(tmp_path, memory_bytes=300)
+    store.put("new_1", "a" * 200)
+    store.put("new_2", "b" * 200)
+
+    assert [p.name for p in tmp_path.glob("*.session")] == ["new_1.session"]
+    assert store.take("new_1") == "a" * 200
+    assert store.take("new_2") == "b" * 200
+
+def test_size_cap_drops_oldest_sessions(tmp_path):
+    store = SessionStore(tmp_path, max_bytes=300)
+    store.put("new_1", "a" * 200)
+    store.put("new_2", "b" * 200)
+
+    assert "new_1" not in store
+    assert store.take("new_2") == "b" * 200
+
+def test_expired_sessions_are_swept(tmp_path):
+    store = SessionStore(tmp_path, ttl=0.01, memory_entry_bytes=10)
+    store.put("new_1", "x" * 100)
+    time.sleep(0.02)
+
+    assert "new_1" not in store
+    assert store.sweep() == 1
+    assert not list(tmp_path.glob("*.session"))
+
+def test_disk_sessions_survive_a_restart(tmp_path):
+    SessionStore(tmp_path, memory_entry_bytes=10).put("update_1", "x" * 100)
+
+    assert SessionStore(tmp_path).take("update_1") == "x" * 100
+
+def test_blob_arrays_are_kept_by_hash(tmp_path):
+    blob_store = BlobStore(tmp_path / "blobs")
+    content = b"file contents " * 1000
+    array = BlobArray.from_bytes(blob_store, [content, None])
+    store = SessionStore(tmp_path / "sessions", memory_entry_bytes=10)
+
+    store.put("update_1", {"merged_binary_list": array})
+    assert all(path.stat().st_size < 200 for path in (tmp_path / "sessions").glob("*.session"))
+
+    restored = store.take("update_1")["merged_binary_list"]
+    assert isinstance(restored, BlobArray)
+    assert restored.hashes == array.hashes
+    assert restored[0] == content
+
+def test_discard(tmp_path):
+    store = SessionStore(tmp_path)
+    store.put("new_1", {})
+
+    assert store.discard("new_1") is True
+    assert store.discard("new_1") is False
+
+def test_sweeper_thread(tmp_path):
+    store = SessionStore(tmp_path, ttl=0.01)
+    store.put("new_1", {})
+    store.start_sweeper(interval=0.01)
+    time.sleep(0.1)
+    store.stop_sweeper()
+
+    assert store.take("new_1") is None
+    assert not store._sessions
@@ -0,0 +1,85 @@
+import zipfile
+from pathlib import Path
+from file_manager import FileManager
+from cache.blob_store import BlobStore
+from compact_tree import CompactTree
+from tree_history import TreeDelta, records_of
+
+
+def _load(tmp_path: Path, target: Path) -> CompactTree:
+    fm = FileManager(blob_store=BlobStore(tmp_path / "blobs"))
+    result = fm.load_from_filepath(target)
+    assert result["status"] == "success"
+    return CompactTree.from_node(result["tree"])
+
+
+def _project(root: Path) -> Path:
+    (root / "src").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / "src" / "main.py").write_text("print(1)")
+    (root / "src" / "util.py").write_text("x = 1")
+    (root / "docs" / "guide.md").write_text("# guide")
+    (root / "README.md").write_text("# readme")
+    with zipfile.ZipFile(root / "bundle.zip", "w") as zf:
+        zf.writestr("notes/a.txt", "notes")
+    return root
+
+
+def _same_tree(a: CompactTree, b: CompactTree) -> bool:
+    return records_of(a) == records_of(b) and a.name_of(0) == b.name_of(0) and a.created_at == b.created_at
+
+
+def test_delta_only_holds_what_changed(tmp_path):
+    root = _project(tmp_path / "project")
+    old = _load(tmp_path, root)
+
+    (root / "src" / "util.py").write_text("x = 2")
+    (root / "docs" / "guide.md").unlink()
+    (root / "docs" / "api.md").write_text("# api")
+    new = _load(tmp_path, root)
+
+    delta = TreeDelta.diff(old, new)
+    assert delta.removed == ["docs/guide.md"]
+    assert "src/util.py" in delta.upserts and "docs/api.md" in delta.upserts
+    assert "README.md" not in delta.upserts and "bundle.zip/notes/a.txt" not in delta.upserts
+    assert _same_tree(delta.apply(old), new)
+
+
+def test_delta_round_trip_and_apply_to_node(tmp_path):
+    root = _project(tmp_path / "project")
+    old = _load(tmp_path, root)
+    (root / "extra").mkdir()
+    (root / "extra" / "new.txt").write_text("new")
+    new = _load(tmp_path, root)
+
+    restored = TreeDelta.from_bytes(TreeDelta.diff(old, new).to_bytes())
+    rebuilt = restored.apply(old)
+    assert _same_tree(rebuilt, new)
+    #rebuilt tree is in pre-order, so the Node adapter works on it
+    names = sorted(node.name for node in rebuilt.to_node().descendants)
+    assert names == sorted(node.name for node in new.to_node().descendants)
+
+
+def test_new_upload_root_only_changes_root(tmp_path):
+    old = _load(tmp_path, _project(tmp_path / "first"))
+    new = _load(tmp_path, _project(tmp_path / "second"))
+
+    delta = TreeDelta.diff(old, new)
+    #same content under another directory, only the root's filepath and the file timestamps can differ
+    assert delta.removed == []
+    assert delta.root_name == "second"
+    assert _same_tree(delta.apply(old), new)
+
+
+def test_chain_of_deltas_rebuilds_every_version(tmp_path):
+    root = _project(tmp_path / "project")
+    versions = [_load(tmp_path, root)]
+    for i in range(3):
+        (root / f"v{i}.txt").write_text(str(i))
+        versions.append(_load(tmp_path, root))
+
+    deltas = [TreeDelta.diff(a, b) for a, b in zip(versions, versions[1:])]
+    tree = versions[0]
+    for delta, expected in zip(deltas, versions[1:]):
+        tree = delta.apply(tree)
+        assert _same_tree(tree, expected)
@@ -1,6 +1,8 @@
 import pytest
 from anytree import Node
+from unittest.mock import patch
 from tree_manager import TreeManager
+from cache.blob_store import BlobStore, BlobArray
 
 #Helpers 
 
@@ -169,4 +171,106 @@ def test_nested_structure_merge(tm):
     
     assert new_file_node.name == "file.txt"
     assert new_file_node.classification == "meta"
-    assert new_file_node.binary_index == 0
\ No newline at end of file
+    assert new_file_node.binary_index == 0
+
+def test_change_set_of_mixed_merge(tm):
+    old_root, old_binary, new_root, new_binary = create_mock_test_files("mixed")
+    create_file_node("D.txt", old_root, 2, "T1")
+    old_binary.append(b"dataD")
+
+    tm.merge_trees(old_root, old_binary, new_root, new_binary)
+
+    assert tm.change_set.to_dict() == {
+        'added': ["C.txt"],
+        'removed': ["D.txt"],
+        'modified': ["B.txt"],
+        'unchanged': ["A.txt"],
+    }
+    assert tm.change_set.changed() == ["C.txt", "B.txt"]
+    assert not tm.change_set.is_empty()
+
+def test_removed_files_are_left_out_of_the_merge(tm):
+    old_root, old_binary, new_root, new_binary = create_mock_test_files("mixed")
+    create_file_node("D.txt", old_root, 2, "T1")
+    old_binary.append(b"dataD")
+
+    _, merged_binary = tm.merge_trees(old_root, old_binary, new_root, new_binary)
+
+    assert merged_binary == [b"dataA", b"dataB_new", b"dataC"]
+
+def test_blob_arrays_are_merged_by_hash(tm, tmp_path):
+    store = BlobStore(tmp_path)
+    old_root, old_binary, new_root, new_binary = create_mock_test_files("mixed")
+    old_array, new_array = BlobArray.from_bytes(store, old_binary), BlobArray.from_bytes(store, new_binary)
+
+    with patch.object(BlobStore, "get", side_effect=AssertionError("content was read")):
+        _, merged_binary = tm.merge_trees(old_root, old_array, new_root, new_array)
+
+    assert isinstance(merged_binary, BlobArray)
+    assert merged_binary.hashes == [old_array.hash_at(0), new_array.hash_at(1), new_array.hash_at(2)]
+    assert merged_binary == [b"dataA", b"dataB_new", b"dataC"]
+
+def test_list_and_blob_array_are_merged_into_a_blob_array(tm, tmp_path):
+    store = BlobStore(tmp_path)
+    old_root, old_binary, new_root, new_binary = create_mock_test_files("mixed")
+    new_array = BlobArray.from_bytes(store, new_binary)
+
+    _, merged_binary = tm.merge_trees(old_root, old_binary, new_root, new_array)
+
+    #the unchanged file came from the plain list and was stored, the others are referenced by hash
+    assert isinstance(merged_binary, BlobArray)
+    assert merged_binary.hashes[1:] == [new_array.hash_at(1), new_array.hash_at(2)]
+    assert merged_binary == [b"dataA", b"dataB_new", b"dataC"]
+    assert store.get(merged_binary.hash_at(0)) == b"dataA"
+
+def test_hash_decides_over_timestamp(tm):
+    old_root, new_root = Node("old_upload", type="directory"), Node("new_upload", type="directory")
+    touched_old = create_file_node("touched.txt", old_root, 0, "T1", classification="keep_me")
+    edited_old = create_file_node("edited.txt", old_root, 1, "T1", classification="lose_me")
+    touched_old.file_data.update(file_hash="aa", size_bytes=3)
+    edited_old.file_data.update(file_hash="bb", size_bytes=3)
+
+    touched_new = create_file_node("touched.txt", new_root, 0, "T2")
+    edited_new = create_file_node("edited.txt", new_root, 1, "T1")
+    touched_new.file_data.update(file_hash="aa", size_bytes=3)
+    edited_new.file_data.update(file_hash="cc", size_bytes=3)
+
+    _, merged_binary = tm.merge_trees(old_root, [b"old", b"bbb"], new_root, [b"new", b"ccc"])
+
+    #roots differ in name (new temp upload), files still line up by relative path
+    assert tm.change_set.unchanged == ["touched.txt"]
+    assert tm.change_set.modified == ["edited.txt"]
+    assert merged_binary == [b"old", b"ccc"]
+    assert touched_new.classification == "keep_me"
+    assert getattr(edited_new, 'classification', None) is None
+
+def test_merge_nested_and_wide(tm):
+    old_root, new_root = Node("root", type="directory"), Node("root", type="directory")
+    old_assets, new_assets = Node("assets", parent=old_root, type="directory"), Node("assets", parent=new_root, type="directory")
+    for i in range(2000):
+        create_file_node(f"{i}.png", old_assets, i, "T1")
+        create_file_node(f"{i}.png", new_assets, i, "T1" if i % 2 else "T2")
+    Node("other", parent=new_root, type="directory")
+    create_file_node("0.png", new_root.children[1], 2000, "T1")
+
+    for i, old_node in enumerate(old_assets.children):
+        old_node.classification = "keep_me"
+    old_binary, new_binary = [f"old{i}".encode() for i in range(2000)], [f"new{i}".encode() for i in range(2001)]
+
+    _, merged_binary = tm.merge_trees(old_root, old_binary, new_root, new_binary)
+
+    kept = [node.name for node in new_assets.children if getattr(node, 'classification', None) == "keep_me"]
+    assert len(kept) == 1000 and "1.png" in kept and "0.png" not in kept
+    assert merged_binary[1] == b"old1" and merged_binary[0] == b"new0"
+    assert merged_binary[-1] == b"new2000"
+    assert getattr(new_root.children[1].children[0], 'classification', None) is None
+
+def test_diff_trees_leaves_the_nodes_alone(tm):
+    old_root, old_binary, new_root, new_binary = create_mock_test_files("mixed")
+
+    change_set = tm.diff_trees(old_root, new_root)
+
+    assert change_set is tm.change_set
+    assert (change_set.added, change_set.modified, change_set.unchanged) == (["C.txt"], ["B.txt"], ["A.txt"])
+    assert [node.binary_index for node in new_root.children] == [0, 1, 2]
+    assert getattr(new_root.children[0], 'classification', None) is None
@@ -3,6 +3,7 @@ import tempfile
 import os
 from pathlib import Path
 from main import validate_analysis_path
+from ignore_rules import IgnoreRules
 from unittest.mock import patch, MagicMock, mock_open
 
 
@@ -121,10 +122,10 @@ def test_file_persmission_error(tmp_path):
     test_dir.mkdir()
     
     # simulate PermissionError
-    def mock_rglob(*args):
+    def mock_walk(*args):
         raise PermissionError("Cannot access directory")
     
-    # patch Path.rglob so that any call to rglob inside validate_path will raise the PermissionError.
-    with patch.object(Path, 'rglob', side_effect=mock_rglob):
+    # patch the directory walk so that any call inside validate_path will raise the PermissionError.
+    with patch.object(IgnoreRules, 'walk', side_effect=mock_walk):
         with pytest.raises(ValueError, match="Cannot access directory"):
             validate_analysis_path(str(test_dir))
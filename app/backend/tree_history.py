@@ -0,0 +1,139 @@
+import json
+import zlib
+from typing import Dict, List, Optional, Tuple
+from compact_tree import CompactTree, NODE_TYPES, CLASSIFICATIONS, FLAG_REPO_HEAD, NO_INDEX
+
+DELTA_MAGIC: bytes = b"TDELTA1"
+
+# after this many deltas in a row the next version is stored as a full snapshot again,
+# so rebuilding a version never replays more than MAX_DELTA_CHAIN deltas
+MAX_DELTA_CHAIN: int = 10
+
+# type, size, last_modified, binary_index, file_hash, classification, flags, filepath (only when it is not derived)
+NodeRecord = Tuple[int, int, Optional[str], int, Optional[str], int, int, Optional[str]]
+
+
+class TreeDelta:
+    """
+    Difference between two versions of an analysis' filetree, keyed by path relative to the root
+    (the root itself is ""), as stored in Filetrees for every update after the base snapshot:
+    - removed: paths of the nodes that are gone
+    - upserts: path -> full record of every node that was added or whose fields changed, in pre-order
+    Unchanged nodes are not stored at all, so a delta grows with what changed and not with the tree.
+    """
+
+    def __init__(
+        self,
+        removed: List[str] | None = None,
+        upserts: Dict[str, NodeRecord] | None = None,
+        root_name: str = "",
+        created_at: Optional[str] = None,
+    ) -> None:
+        self.removed: List[str] = list(removed) if removed else []
+        self.upserts: Dict[str, NodeRecord] = dict(upserts) if upserts else {}
+        self.root_name: str = root_name
+        self.created_at: Optional[str] = created_at
+
+    def __len__(self) -> int:
+        return len(self.removed) + len(self.upserts)
+
+    @classmethod
+    def diff(cls, old: CompactTree, new: CompactTree) -> "TreeDelta":
+        """Delta that turns old into new"""
+        old_records = records_of(old)
+        delta = cls(root_name=new.name_of(0) if len(new) else "", created_at=new.created_at)
+        for key, record in records_of(new).items():
+            if old_records.pop(key, None) != record:
+                delta.upserts[key] = record
+        #whatever is left was not in the new tree
+        delta.removed = list(old_records)
+        return delta
+
+    def apply(self, tree: CompactTree) -> CompactTree:
+        """
+        Rebuilds the newer version from the tree this delta was taken against.
+        Nodes that already existed keep their position, added ones come after their existing siblings.
+        """
+        records = records_of(tree)
+        removed = set(self.removed)
+        records = {key: record for key, record in records.items() if key not in removed}
+        records.update(self.upserts)
+        return build_tree(records, self.root_name, self.created_at)
+
+    def to_bytes(self) -> bytes:
+        payload = json.dumps({
+            'removed': self.removed,
+            'upserts': [[key, *record] for key, record in self.upserts.items()],
+            'root_name': self.root_name,
+            'created_at': self.created_at,
+        }, separators=(",", ":")).encode("utf-8")
+        return DELTA_MAGIC + zlib.compress(payload)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TreeDelta":
+        if not data.startswith(DELTA_MAGIC):
+            raise ValueError("Not a filetree delta")
+        payload = json.loads(zlib.decompress(bytes(data[len(DELTA_MAGIC):])).decode("utf-8"))
+        upserts = {entry[0]: tuple(entry[1:]) for entry in payload.get('upserts', [])}
+        return cls(payload.get('removed'), upserts, payload.get('root_name', ""), payload.get('created_at'))
+
+
+def records_of(tree: CompactTree) -> Dict[str, NodeRecord]:
+    """Every node of tree as path -> record, in pre-order"""
+    keys: List[str] = []
+    records: Dict[str, NodeRecord] = {}
+    for index, parent in enumerate(tree.parent):
+        name = tree.name_of(index)
+        if parent == NO_INDEX:
+            key = ""
+        else:
+            key = f"{keys[parent]}/{name}" if keys[parent] else name
+        keys.append(key)
+        records[key] = (
+            tree.node_type[index],
+            tree.size[index],
+            tree.last_modified_of(index),
+            tree.binary_index[index],
+            tree.hash_of(index),
+            tree.classification[index],
+            tree.flags[index],
+            tree.filepaths.get(index),
+        )
+    return records
+
+
+def build_tree(records: Dict[str, NodeRecord], root_name: str, created_at: Optional[str] = None) -> CompactTree:
+    """Builds a CompactTree from path -> record, parents are placed before their children"""
+    children: Dict[str, List[str]] = {}
+    for key in records:
+        if key:
+            parent_key = key.rpartition("/")[0]
+            children.setdefault(parent_key, []).append(key)
+
+    tree = CompactTree()
+    tree.created_at = created_at
+    if "" not in records:
+        return tree
+
+    stack: List[Tuple[str, int]] = [("", NO_INDEX)]
+    while stack:
+        key, parent = stack.pop()
+        node_type, size, last_modified, binary_index, file_hash, classification, flags, filepath = records[key]
+        index = tree._append(
+            parent,
+            key.rpartition("/")[2] if key else root_name,
+            NODE_TYPES[node_type],
+            size=size,
+            last_modified=last_modified,
+            binary_index=binary_index if binary_index != NO_INDEX else None,
+            file_hash=file_hash,
+            classification=CLASSIFICATIONS[classification],
+            is_repo_head=bool(flags & FLAG_REPO_HEAD),
+        )
+        if filepath is not None:
+            tree.filepaths[index] = filepath
+        # reversed so children come off the stack in order and indices stay in pre-order
+        for child in reversed(children.get(key, [])):
+            stack.append((child, index))
+    return tree
+
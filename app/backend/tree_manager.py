@@ -1,135 +1,200 @@
-from typing import List, Tuple, Any, Dict
+from dataclasses import dataclass, field
+from typing import List, Tuple, Any, Dict, Iterator, Optional
 from anytree import Node, Resolver
 from datetime import datetime
+from cache.blob_store import BlobArray
+
+
+@dataclass
+class ChangeSet:
+    """
+    Relative paths of the files in a merge, split by what happened to them since the old tree.
+    Later stages only need to look at added and modified, unchanged files keep their old results.
+    """
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    def changed(self) -> List[str]:
+        """Files whose content has to be processed again"""
+        return self.added + self.modified
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.modified)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {
+            'added': self.added,
+            'removed': self.removed,
+            'modified': self.modified,
+            'unchanged': self.unchanged,
+        }
+
 
 class TreeManager:
     """
     Manages tree operations including merging incremental updates.
+    Old nodes are found through a relative path index built once per merge, so wide
+    directories cost the same as deep ones.
     """
     def __init__(self):
         self.resolver = Resolver('name')
+        self.change_set: ChangeSet = ChangeSet()
 
     def merge_trees(
-        self, 
-        old_tree: Node, 
-        old_binary_data: List[bytes], 
-        new_tree: Node, 
-        new_binary_data: List[bytes]
-    ) -> Tuple[Node, List[bytes]]:
+        self,
+        old_tree: Node,
+        old_binary_data: List[bytes] | BlobArray,
+        new_tree: Node,
+        new_binary_data: List[bytes] | BlobArray
+    ) -> Tuple[Node, List[bytes] | BlobArray]:
         """
         Merges a new file tree (from a fresh input) into an old file tree.
-        
-        Preserves metadata like classifications from the old tree if the file 
-        has not been modified (based on timestamp).
-        
+
+        Preserves metadata like classifications from the old tree if the file
+        has not been modified (same size and content hash, or the same timestamp
+        when the nodes carry no hash). The files added, removed, modified and left
+        unchanged are recorded in self.change_set.
+        When either binary array is a BlobArray the merged array is one too, over the old
+        array's store when it has one. Entries of a BlobArray are taken over by hash without
+        reading their content, entries of a plain list are stored by value.
+
         Returns:
-            Tuple[Node, List[bytes]]: The updated tree and a combined binary 
+            Tuple[Node, List[bytes] | BlobArray]: The updated tree and a combined binary
             data array.
         """
-        
-        merged_binary_data: List[bytes] = []
-        
+
+        merged_binary_data: List[bytes] | BlobArray = []
+        if isinstance(old_binary_data, BlobArray):
+            # the old array's store is the one that can still reach the previous session's blobs
+            merged_binary_data = BlobArray(old_binary_data.store)
+        elif isinstance(new_binary_data, BlobArray):
+            merged_binary_data = BlobArray(new_binary_data.store)
+
         # We traverse the new tree because it represents the current context of the file system.
         #We want to carry over metadata from the old tree where applicable.
-        
-        self._process_merge_node(new_tree, old_tree, old_binary_data, new_binary_data, merged_binary_data)
-        
+        self.change_set, matches = self._match_files(old_tree, new_tree)
+        for new_node, unchanged_old_node in matches:
+            self._merge_file_node(
+                new_node,
+                unchanged_old_node,
+                old_binary_data,
+                new_binary_data,
+                merged_binary_data
+            )
+
         return new_tree, merged_binary_data
 
-    def _process_merge_node(
-        self,
-        new_node: Node,
-        old_node_context: Node,
-        old_binary_data: List[bytes],
-        new_binary_data: List[bytes],
-        merged_binary_data: List[bytes]
-    ) -> None:
+    def diff_trees(self, old_tree: Node, new_tree: Node) -> ChangeSet:
+        """Computes the change set between two trees without touching either of them"""
+        self.change_set = self._match_files(old_tree, new_tree)[0]
+        return self.change_set
+
+    def _match_files(self, old_tree: Node, new_tree: Node) -> Tuple[ChangeSet, List[Tuple[Node, Node | None]]]:
         """
-        Recursive helper to process nodes.
-        Mutates new_node in place to update binary_index and metadata.
-        Appends data to merged_binary_data.
+        Pairs every file of the new tree with its old node when it is unchanged, None otherwise,
+        looking old nodes up by relative path instead of scanning their parent's children.
         """
-        
-        # Try to find the corresponding node in the old tree context
-        # old_node_context is the generic 'root' or 'parent' in the old tree to search from.
-        # Since we are traversing recursively, we can usually just look at children of the matched parent.
-        # But for the root call, we pass the old_root.
-        
-        matched_old_node = None
-        
-        # If both are roots or we are at the start
-        if new_node.is_root and old_node_context.is_root and new_node.name == old_node_context.name:
-            matched_old_node = old_node_context
-        else:
-            # Try to find child with same name in old_node_context
-            # Note: This logic assumes we pass the corresponding match of the parent as context
-            if old_node_context:
-                matched_old_node = next(
-                    (child for child in old_node_context.children if child.name == new_node.name), 
-                    None
-                )
-
-        if new_node.type == "file":
-            self._merge_file_node(
-                new_node, 
-                matched_old_node, 
-                old_binary_data, 
-                new_binary_data, 
-                merged_binary_data
-            )
-        
-        # Process children
-        for child in new_node.children:
-            self._process_merge_node(
-                child, 
-                matched_old_node, # Pass the matched old node as the parent scope for the next step
-                old_binary_data, 
-                new_binary_data, 
-                merged_binary_data
-            )
+        old_index = self.index_tree(old_tree)
+        change_set = ChangeSet()
+        matches: List[Tuple[Node, Node | None]] = []
+
+        for rel_path, new_node in self._iter_files(new_tree):
+            old_node = old_index.pop(rel_path, None)
+            if old_node is None:
+                change_set.added.append(rel_path)
+            elif self._is_unchanged(old_node, new_node):
+                change_set.unchanged.append(rel_path)
+                matches.append((new_node, old_node))
+                continue
+            else:
+                change_set.modified.append(rel_path)
+            matches.append((new_node, None))
+
+        #whatever is left in the index was not in the new tree
+        change_set.removed.extend(old_index)
+        return change_set, matches
+
+    def index_tree(self, root: Node) -> Dict[str, Node]:
+        """Maps the path of every file relative to root to its node"""
+        return dict(self._iter_files(root))
+
+    def _iter_files(self, root: Node) -> Iterator[Tuple[str, Node]]:
+        """
+        Yields (relative path, node) for the files under root in preorder.
+        The root's own name is left out so an upload under a new temp name still lines up.
+        """
+        stack: List[Tuple[str, Node]] = [("", root)]
+        while stack:
+            prefix, node = stack.pop()
+            if getattr(node, 'type', None) == "file":
+                yield (prefix or node.name), node
+                continue
+            #reversed so children come off the stack in their original order
+            for child in reversed(node.children):
+                stack.append((f"{prefix}/{child.name}" if prefix else child.name, child))
+
+    def _is_unchanged(self, old_node: Node, new_node: Node) -> bool:
+        """
+        Same size and content hash when both nodes have them, otherwise the same last_modified.
+        A touched file with the same content is unchanged, an edit that kept the timestamp is not.
+        """
+        old_hash, old_size = self._content_key(old_node)
+        new_hash, new_size = self._content_key(new_node)
+        if old_hash is not None and new_hash is not None:
+            return old_hash == new_hash and old_size == new_size
+
+        old_modified = getattr(old_node, 'last_modified', None)
+        new_modified = getattr(new_node, 'last_modified', None)
+        return old_modified is not None and old_modified == new_modified
+
+    @staticmethod
+    def _content_key(node: Node) -> Tuple[Optional[str], Optional[int]]:
+        file_data: Dict[str, Any] = getattr(node, 'file_data', None) or {}
+        return file_data.get('file_hash'), file_data.get('size_bytes')
 
     def _merge_file_node(
         self,
         new_node: Node,
         old_node: Node | None,
-        old_binary_data: List[bytes],
-        new_binary_data: List[bytes],
-        merged_binary_data: List[bytes]
+        old_binary_data: List[bytes] | BlobArray,
+        new_binary_data: List[bytes] | BlobArray,
+        merged_binary_data: List[bytes] | BlobArray
     ) -> None:
-        
-        is_unchanged = False
-        
-        # Check if file is unchanged
-        if old_node and hasattr(old_node, 'last_modified') and hasattr(new_node, 'last_modified'):
-            if old_node.last_modified == new_node.last_modified:
-                is_unchanged = True
-
-        if is_unchanged:
+        """Appends the node's data to merged_binary_data, from the old array when old_node is an unchanged match"""
+
+        if old_node is not None:
             # CASE 1: UNCHANGED
             # Reuse data from old binary array
             original_index = old_node.binary_index
-            data = old_binary_data[original_index]
-            
+            source = old_binary_data
+
             # Preserve metadata from old node
             if hasattr(old_node, 'classification'):
                 new_node.classification = old_node.classification
-            
+
             # Check for other custom attributes to preserve here if needed
-             
+
         else:
             # CASE 2: CHANGED or NEW
             # Use data from new binary array (freshly loaded)
             original_index = new_node.binary_index
-            data = new_binary_data[original_index]
-            
+            source = new_binary_data
+
             # Classification remains None (or whatever fresh load default is)
 
         # Update the binary index to point to the new consolidated list
         new_index = len(merged_binary_data)
-        merged_binary_data.append(data)
-        
+        file_hash = source.hash_at(original_index) if isinstance(source, BlobArray) else None
+        if file_hash is not None and isinstance(merged_binary_data, BlobArray):
+            # both sides are content addressed, the blob is referenced by hash instead of being read and stored again
+            merged_binary_data.append_hash(file_hash)
+        else:
+            merged_binary_data.append(source[original_index])
+
         new_node.binary_index = new_index
-        
+
         # Also update the file_data dictionary attached to the node to keep it consistent
         if hasattr(new_node, 'file_data'):
-            new_node.file_data['binary_index'] = new_index
\ No newline at end of file
+            new_node.file_data['binary_index'] = new_index
@@ -12,6 +12,8 @@ Analyses(
     thumbnail_image bytea DEFAULT NULL
     
 );
+-- newest first listing of GET /projects, paged by (creation_date, analysis_id)
+CREATE INDEX IF NOT EXISTS analyses_creation_date_idx ON Analyses(creation_date, analysis_id);
 
 CREATE TABLE IF NOT EXISTS
 Filesets(
@@ -19,37 +21,133 @@ Filesets(
     analysis_id uuid NOT NULL UNIQUE REFERENCES Analyses(analysis_id) ON DELETE CASCADE,
     file_data bytea, 
     file_data_tree_id integer,
-    latest_file_path text  
+    latest_file_path text,
+    manifest JSON
 );
 
+-- file contents keyed by their SHA-256, shared by every analysis that has the same file
+CREATE TABLE IF NOT EXISTS
+Blobs(
+    hash text PRIMARY KEY,
+    size bigint NOT NULL,
+    compression text NOT NULL DEFAULT 'none',
+    data bytea NOT NULL
+);
+
+-- binary_index -> blob of each file in a fileset, replaces the pickled file_data
+CREATE TABLE IF NOT EXISTS
+Fileset_Blobs(
+    fileset_id integer NOT NULL REFERENCES Filesets(fileset_id) ON DELETE CASCADE,
+    binary_index integer NOT NULL,
+    hash text NOT NULL REFERENCES Blobs(hash),
+    PRIMARY KEY (fileset_id, binary_index)
+);
+
+-- contents are compressed before they are stored, keeping them uncompressed out of line lets range reads fetch only the slices asked for
+ALTER TABLE Blobs ALTER COLUMN data SET STORAGE EXTERNAL;
+
+CREATE INDEX IF NOT EXISTS fileset_blobs_hash_idx ON Fileset_Blobs(hash);
+
 CREATE TABLE IF NOT EXISTS
 Filetrees(
     filetree_id SERIAL PRIMARY KEY,
     fileset_id integer NOT NULL REFERENCES Filesets(fileset_id)ON DELETE CASCADE,
-    filetree JSON
+    filetree JSON,
+    filetree_data bytea,
+    tree_delta bytea,
+    base_tree_id integer REFERENCES Filetrees(filetree_id) ON DELETE CASCADE,
+    chain_depth integer NOT NULL DEFAULT 0
 );
 
 CREATE TABLE IF NOT EXISTS 
 Tracked_Data(
     data_id SERIAL PRIMARY KEY,
     analysis_id uuid NOT NULL REFERENCES Analyses(analysis_id)  ON DELETE CASCADE,
-    bow_cache JSON,
-    project_data JSON,
-    package_data JSON,
-    metadata_stats JSON
+    bow_cache JSONB, -- only rows saved before bow_data, see migrations/004_bow_encoding.sql
+    bow_data bytea, -- token id arrays over Bow_Vocabulary, packed by bow_codec.py
+    project_data JSONB,
+    package_data JSONB,
+    metadata_stats JSONB
 );
 
 CREATE TABLE IF NOT EXISTS 
 Results(
     result_id SERIAL PRIMARY KEY,
     analysis_id uuid  NOT NULL REFERENCES Analyses(analysis_id) ON DELETE CASCADE,
-    topic_vector JSON, 
-    resume_points JSON,
-    project_insights JSON,
-    package_insights JSON,
-    metadata_insights JSON
+    topic_vector JSONB, 
+    resume_points JSONB,
+    project_insights JSONB,
+    package_insights JSONB,
+    metadata_insights JSONB
 );
 
+-- key existence (?) lookups on the sub-documents skills are read from
+CREATE INDEX IF NOT EXISTS results_language_stats_idx ON Results USING GIN ((metadata_insights -> 'language_stats'));
+CREATE INDEX IF NOT EXISTS results_skill_stats_idx ON Results USING GIN ((metadata_insights -> 'skill_stats'));
+CREATE INDEX IF NOT EXISTS results_primary_skills_idx ON Results USING GIN ((metadata_insights -> 'primary_skills'));
+-- jsonpath (@?) lookups such as $.analyzed_insights[*].imports_summary."name"
+CREATE INDEX IF NOT EXISTS results_project_insights_idx ON Results USING GIN (project_insights jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS results_analysis_id_idx ON Results(analysis_id);
+CREATE INDEX IF NOT EXISTS tracked_data_analysis_id_idx ON Tracked_Data(analysis_id);
+
+-- every token any bag of words has used, shared by all analyses
+CREATE TABLE IF NOT EXISTS
+Bow_Vocabulary(
+    token_id SERIAL PRIMARY KEY,
+    token TEXT NOT NULL UNIQUE
+);
+
+-- per analysis skill totals for GET /skills, kept in step with Results by the trigger below
+CREATE TABLE IF NOT EXISTS
+Skill_Counts(
+    analysis_id uuid NOT NULL REFERENCES Analyses(analysis_id) ON DELETE CASCADE,
+    source TEXT NOT NULL, -- language, skill or import
+    skill TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (analysis_id, source, skill)
+);
+CREATE INDEX IF NOT EXISTS skill_counts_skill_idx ON Skill_Counts(skill) INCLUDE (count);
+
+-- what one Results row contributes: language_stats and skill_stats file counts and the import frequencies of every analyzed project
+-- a count that is missing or not a JSON number counts as 1, so a malformed document can never fail the save of its results
+CREATE OR REPLACE FUNCTION skill_counts_of(metadata JSONB, projects JSONB)
+RETURNS TABLE(source TEXT, skill TEXT, count BIGINT) AS $$
+    SELECT s.source, s.skill, SUM(s.count)::BIGINT
+    FROM (
+        SELECT 'language' AS source, l.key AS skill,
+               CASE WHEN jsonb_typeof(l.value -> 'file_count') = 'number' THEN (l.value ->> 'file_count')::numeric ELSE 1 END AS count
+        FROM jsonb_each(CASE WHEN jsonb_typeof(metadata -> 'language_stats') = 'object' THEN metadata -> 'language_stats' ELSE '{}' END) l
+        WHERE l.key NOT IN ('', 'Text only')
+        UNION ALL
+        SELECT 'skill', k.key,
+               CASE WHEN jsonb_typeof(k.value -> 'file_count') = 'number' THEN (k.value ->> 'file_count')::numeric ELSE 1 END
+        FROM jsonb_each(CASE WHEN jsonb_typeof(metadata -> 'skill_stats') = 'object' THEN metadata -> 'skill_stats' ELSE '{}' END) k
+        WHERE k.key NOT IN ('', 'Documentation')
+        UNION ALL
+        SELECT 'import', i.key,
+               CASE WHEN jsonb_typeof(i.value -> 'frequency') = 'number' THEN (i.value ->> 'frequency')::numeric ELSE 1 END
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(projects -> 'analyzed_insights') = 'array' THEN projects -> 'analyzed_insights' ELSE '[]' END) p,
+             jsonb_each(CASE WHEN jsonb_typeof(p.value -> 'imports_summary') = 'object' THEN p.value -> 'imports_summary' ELSE '{}' END) i
+        WHERE i.key <> ''
+    ) s
+    GROUP BY s.source, s.skill;
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION refresh_skill_counts() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM Skill_Counts WHERE analysis_id = NEW.analysis_id;
+    INSERT INTO Skill_Counts (analysis_id, source, skill, count)
+    SELECT NEW.analysis_id, c.source, c.skill, c.count
+    FROM skill_counts_of(NEW.metadata_insights, NEW.project_insights) c;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- runs inside the statement that saves the results, so the counts commit or roll back with them
+CREATE OR REPLACE TRIGGER results_skill_counts
+AFTER INSERT OR UPDATE OF metadata_insights, project_insights ON Results
+FOR EACH ROW EXECUTE FUNCTION refresh_skill_counts();
+
 CREATE TABLE IF NOT EXISTS
 Resumes(
  resume_id SERIAL PRIMARY KEY,
@@ -57,6 +155,7 @@ Resumes(
  analysis_id uuid NOT NULL REFERENCES Analyses(analysis_id) ON DELETE CASCADE,
  resume_data JSON
 );
+CREATE INDEX IF NOT EXISTS resumes_analysis_id_idx ON Resumes(analysis_id);
 
 CREATE TABLE IF NOT EXISTS
 Portfolios(
@@ -66,6 +165,7 @@ Portfolios(
     portfolio_data JSON
     
 );
+CREATE INDEX IF NOT EXISTS portfolios_analysis_id_idx ON Portfolios(analysis_id);
 
 ALTER TABLE Filesets
 ADD CONSTRAINT latest_filetree_tracking
@@ -0,0 +1,27 @@
+-- Converts the result columns of a database created before they were JSONB and adds their indexes.
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 001_results_jsonb.sql
+
+BEGIN;
+
+ALTER TABLE Results
+    ALTER COLUMN topic_vector TYPE JSONB USING topic_vector::jsonb,
+    ALTER COLUMN resume_points TYPE JSONB USING resume_points::jsonb,
+    ALTER COLUMN project_insights TYPE JSONB USING project_insights::jsonb,
+    ALTER COLUMN package_insights TYPE JSONB USING package_insights::jsonb,
+    ALTER COLUMN metadata_insights TYPE JSONB USING metadata_insights::jsonb;
+
+ALTER TABLE Tracked_Data
+    ALTER COLUMN bow_cache TYPE JSONB USING bow_cache::jsonb,
+    ALTER COLUMN project_data TYPE JSONB USING project_data::jsonb,
+    ALTER COLUMN package_data TYPE JSONB USING package_data::jsonb,
+    ALTER COLUMN metadata_stats TYPE JSONB USING metadata_stats::jsonb;
+
+CREATE INDEX IF NOT EXISTS results_language_stats_idx ON Results USING GIN ((metadata_insights -> 'language_stats'));
+CREATE INDEX IF NOT EXISTS results_skill_stats_idx ON Results USING GIN ((metadata_insights -> 'skill_stats'));
+CREATE INDEX IF NOT EXISTS results_primary_skills_idx ON Results USING GIN ((metadata_insights -> 'primary_skills'));
+CREATE INDEX IF NOT EXISTS results_project_insights_idx ON Results USING GIN (project_insights jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS results_analysis_id_idx ON Results(analysis_id);
+CREATE INDEX IF NOT EXISTS tracked_data_analysis_id_idx ON Tracked_Data(analysis_id);
+
+COMMIT;
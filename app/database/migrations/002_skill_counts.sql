@@ -0,0 +1,65 @@
+-- Adds the Skill_Counts aggregate behind GET /skills to a database created before it existed and fills it from the saved results.
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 002_skill_counts.sql
+
+BEGIN;
+
+-- per analysis skill totals for GET /skills, kept in step with Results by the trigger below
+CREATE TABLE IF NOT EXISTS
+Skill_Counts(
+    analysis_id uuid NOT NULL REFERENCES Analyses(analysis_id) ON DELETE CASCADE,
+    source TEXT NOT NULL, -- language, skill or import
+    skill TEXT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (analysis_id, source, skill)
+);
+CREATE INDEX IF NOT EXISTS skill_counts_skill_idx ON Skill_Counts(skill) INCLUDE (count);
+
+-- what one Results row contributes: language_stats and skill_stats file counts and the import frequencies of every analyzed project
+-- a count that is missing or not a JSON number counts as 1, so a malformed document can never fail the save of its results
+CREATE OR REPLACE FUNCTION skill_counts_of(metadata JSONB, projects JSONB)
+RETURNS TABLE(source TEXT, skill TEXT, count BIGINT) AS $$
+    SELECT s.source, s.skill, SUM(s.count)::BIGINT
+    FROM (
+        SELECT 'language' AS source, l.key AS skill,
+               CASE WHEN jsonb_typeof(l.value -> 'file_count') = 'number' THEN (l.value ->> 'file_count')::numeric ELSE 1 END AS count
+        FROM jsonb_each(CASE WHEN jsonb_typeof(metadata -> 'language_stats') = 'object' THEN metadata -> 'language_stats' ELSE '{}' END) l
+        WHERE l.key NOT IN ('', 'Text only')
+        UNION ALL
+        SELECT 'skill', k.key,
+               CASE WHEN jsonb_typeof(k.value -> 'file_count') = 'number' THEN (k.value ->> 'file_count')::numeric ELSE 1 END
+        FROM jsonb_each(CASE WHEN jsonb_typeof(metadata -> 'skill_stats') = 'object' THEN metadata -> 'skill_stats' ELSE '{}' END) k
+        WHERE k.key NOT IN ('', 'Documentation')
+        UNION ALL
+        SELECT 'import', i.key,
+               CASE WHEN jsonb_typeof(i.value -> 'frequency') = 'number' THEN (i.value ->> 'frequency')::numeric ELSE 1 END
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(projects -> 'analyzed_insights') = 'array' THEN projects -> 'analyzed_insights' ELSE '[]' END) p,
+             jsonb_each(CASE WHEN jsonb_typeof(p.value -> 'imports_summary') = 'object' THEN p.value -> 'imports_summary' ELSE '{}' END) i
+        WHERE i.key <> ''
+    ) s
+    GROUP BY s.source, s.skill;
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION refresh_skill_counts() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM Skill_Counts WHERE analysis_id = NEW.analysis_id;
+    INSERT INTO Skill_Counts (analysis_id, source, skill, count)
+    SELECT NEW.analysis_id, c.source, c.skill, c.count
+    FROM skill_counts_of(NEW.metadata_insights, NEW.project_insights) c;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- runs inside the statement that saves the results, so the counts commit or roll back with them
+CREATE OR REPLACE TRIGGER results_skill_counts
+AFTER INSERT OR UPDATE OF metadata_insights, project_insights ON Results
+FOR EACH ROW EXECUTE FUNCTION refresh_skill_counts();
+
+-- backfill from the results saved so far
+DELETE FROM Skill_Counts;
+INSERT INTO Skill_Counts (analysis_id, source, skill, count)
+SELECT r.analysis_id, c.source, c.skill, SUM(c.count)
+FROM Results r, skill_counts_of(r.metadata_insights, r.project_insights) c
+GROUP BY r.analysis_id, c.source, c.skill;
+
+COMMIT;
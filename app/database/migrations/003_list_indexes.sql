@@ -0,0 +1,11 @@
+-- Adds the indexes behind the paged and filtered list endpoints (/projects, /resumes, /portfolios).
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 003_list_indexes.sql
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS analyses_creation_date_idx ON Analyses(creation_date, analysis_id);
+CREATE INDEX IF NOT EXISTS resumes_analysis_id_idx ON Resumes(analysis_id);
+CREATE INDEX IF NOT EXISTS portfolios_analysis_id_idx ON Portfolios(analysis_id);
+
+COMMIT;
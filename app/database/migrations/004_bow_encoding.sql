@@ -0,0 +1,53 @@
+-- Moves Tracked_Data.bow_cache from JSON token arrays to vocabulary encoded bow_data.
+-- The payload is built here uncompressed (flag 0, see backend/bow_codec.py), later saves write it zlib compressed.
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 004_bow_encoding.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS
+Bow_Vocabulary(
+    token_id SERIAL PRIMARY KEY,
+    token TEXT NOT NULL UNIQUE
+);
+
+ALTER TABLE Tracked_Data ADD COLUMN IF NOT EXISTS bow_data bytea;
+
+CREATE TEMPORARY TABLE bow_docs ON COMMIT DROP AS
+SELECT t.data_id, doc.ord,
+       CASE WHEN jsonb_typeof(doc.value) = 'array' THEN doc.value ELSE '[]'::jsonb END AS tokens
+FROM Tracked_Data t
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE WHEN jsonb_typeof(t.bow_cache) = 'array' THEN t.bow_cache ELSE '[]'::jsonb END
+) WITH ORDINALITY AS doc(value, ord);
+
+INSERT INTO Bow_Vocabulary (token)
+SELECT DISTINCT tok.token
+FROM bow_docs d
+CROSS JOIN LATERAL jsonb_array_elements_text(d.tokens) AS tok(token)
+ON CONFLICT (token) DO NOTHING;
+
+-- magic "BOW1", flag 0, document count, every document's length, then every document's token ids
+UPDATE Tracked_Data t
+SET bow_data = '\x424f573100'::bytea
+               || int4send(COALESCE(l.doc_count, 0))
+               || COALESCE(l.lengths, ''::bytea)
+               || COALESCE(i.ids, ''::bytea),
+    bow_cache = NULL
+FROM Tracked_Data src
+LEFT JOIN (
+    SELECT data_id, count(*)::int AS doc_count,
+           string_agg(int4send(jsonb_array_length(tokens)), ''::bytea ORDER BY ord) AS lengths
+    FROM bow_docs
+    GROUP BY data_id
+) l ON l.data_id = src.data_id
+LEFT JOIN (
+    SELECT d.data_id, string_agg(int4send(v.token_id), ''::bytea ORDER BY d.ord, tok.pos) AS ids
+    FROM bow_docs d
+    CROSS JOIN LATERAL jsonb_array_elements_text(d.tokens) WITH ORDINALITY AS tok(token, pos)
+    JOIN Bow_Vocabulary v ON v.token = tok.token
+    GROUP BY d.data_id
+) i ON i.data_id = src.data_id
+WHERE t.data_id = src.data_id AND jsonb_typeof(src.bow_cache) = 'array';
+
+COMMIT;
@@ -0,0 +1,10 @@
+-- Adds the ingest manifest of each fileset, which lets an update skip files that did not change.
+-- Filesets saved before it have no manifest and their next update reads every file, as it did before.
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 005_fileset_manifest.sql
+
+BEGIN;
+
+ALTER TABLE Filesets ADD COLUMN IF NOT EXISTS manifest JSON;
+
+COMMIT;
@@ -0,0 +1,10 @@
+-- Adds Filetrees.filetree_data, the compact packed form file trees are saved in.
+-- Rows saved before it keep their JSON filetree, which is still read when filetree_data is empty.
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 006_filetree_data.sql
+
+BEGIN;
+
+ALTER TABLE Filetrees ADD COLUMN IF NOT EXISTS filetree_data bytea;
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- Adds the delta columns of the filetree history: an update is stored as a delta against base_tree_id,
+-- chain_depth counts the deltas back to the last full snapshot.
+-- Rows saved before it are full snapshots with chain_depth 0.
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 007_filetree_deltas.sql
+
+BEGIN;
+
+ALTER TABLE Filetrees
+    ADD COLUMN IF NOT EXISTS tree_delta bytea,
+    ADD COLUMN IF NOT EXISTS base_tree_id integer REFERENCES Filetrees(filetree_id) ON DELETE CASCADE,
+    ADD COLUMN IF NOT EXISTS chain_depth integer NOT NULL DEFAULT 0;
+
+COMMIT;
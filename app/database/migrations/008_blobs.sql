@@ -0,0 +1,28 @@
+-- Adds the content-addressed Blobs table and the Fileset_Blobs index of each fileset.
+-- Filesets saved before it keep their pickled file_data, which is still read when they have no Fileset_Blobs rows.
+-- Safe to run more than once, new databases get the same schema from initdb.sql.
+-- psql -h $HOST -U $USER -d $DBNAME -f 008_blobs.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS
+Blobs(
+    hash text PRIMARY KEY,
+    size bigint NOT NULL,
+    compression text NOT NULL DEFAULT 'none',
+    data bytea NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS
+Fileset_Blobs(
+    fileset_id integer NOT NULL REFERENCES Filesets(fileset_id) ON DELETE CASCADE,
+    binary_index integer NOT NULL,
+    hash text NOT NULL REFERENCES Blobs(hash),
+    PRIMARY KEY (fileset_id, binary_index)
+);
+
+ALTER TABLE Blobs ALTER COLUMN data SET STORAGE EXTERNAL;
+
+CREATE INDEX IF NOT EXISTS fileset_blobs_hash_idx ON Fileset_Blobs(hash);
+
+COMMIT;
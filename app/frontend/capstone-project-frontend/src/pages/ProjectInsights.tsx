@@ -125,12 +125,10 @@ export default function ProjectInsights({
   useEffect(() => {
     if (resolvedAnalysisId == null) return;
     setLoading(true);
-    fetch(`${API_BASE}/projects`)
-      .then(r => { if (!r.ok) throw new Error(`${r.status}`); return r.json(); })
-      .then((data: any[]) => {
-        const match = data.find(d => d.analysis_id === resolvedAnalysisId);
-        if (!match) throw new Error('Analysis not found');
-        const mapped = mapToProjects(match);
+    fetch(`${API_BASE}/projects/${resolvedAnalysisId}?fields=project_insights`)
+      .then(r => { if (!r.ok) throw new Error(r.status === 404 ? 'Analysis not found' : `${r.status}`); return r.json(); })
+      .then((data: any) => {
+        const mapped = mapToProjects(data);
         setProjects(mapped);
         setSelectedProject(mapped[0] ?? null);  // set initial selection here
         setLoading(false);
@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { useNavigate } from 'react-router-dom';
 import type { Analysis, EmptyStateProps,  ToastProps, RawProject, RawResume, RawPortfolio } from "../types/dashboardTypes";
 import { AnalysisCard } from "../components/analysisCard";
+import { fetchAllPages } from "../utils/pagination";
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || "http://localhost:8080";
 
@@ -13,37 +14,8 @@ function mapProject(
   resumes: RawResume[],
   portfolios: RawPortfolio[]
 ): Analysis {
-  // Extract repo names from project_insights if available
-  let repos: string[] = [];
-  try {
-    
-    let insights = p.project_insights;
-
-    // 1. If it's a string, parse it
-    if (typeof insights === "string") {
-      try {
-        insights = JSON.parse(insights);
-      } catch (parseError) {
-        console.warn(`[DASHBOARD] Could not parse project_insights for ${p.analysis_id}`);
-        insights = {};
-      }
-    }
-
-    // 2. Ensure it's an object before attempting extraction
-    if (insights && typeof insights === "object") {
-      // It might be nested under 'analyzed_insights'
-      const insightList = Array.isArray(insights) 
-        ? insights 
-        : (insights.analyzed_insights || []);
-
-      // Extract repo names robustly
-      repos = insightList.map((r: any) => 
-        r.repository_name || r.name || r.repoName || "Unknown Project"
-      );
-    }
-  } catch (err) {
-    console.error(`[DASHBOARD] Unexpected error mapping repos for ${p.analysis_id}:`, err);
-  }
+  // Repo names are projected server side by GET /projects
+  let repos: string[] = (p.repository_names ?? []).filter(Boolean);
 
   // Deduplicate repo names just in case
   repos = Array.from(new Set(repos));
@@ -57,7 +29,7 @@ function mapProject(
     portfolioIds: portfolios.map(r => r.portfolio_id),
     hasResume: resumes.length > 0,
     hasPortfolio: portfolios.length > 0,
-    hasInsights: repos.length > 0, // If we found repos, we have insights
+    hasInsights: p.project_count > 0,
     status: "complete", 
   };
 }
@@ -78,24 +50,14 @@ export default function Dashboard() {
   useEffect(() => {
     async function loadDashboard() {
       try {
-        const [projectsRes, resumesRes, portfoliosRes] = await Promise.all([
-          fetch(`${API_BASE}/projects`),
-          fetch(`${API_BASE}/resumes`),
-          fetch(`${API_BASE}/portfolios`),
-        ]);
-
-        if (!projectsRes.ok) throw new Error("Failed to load projects");
-        if (!resumesRes.ok)  throw new Error("Failed to load resumes");
-        if (!portfoliosRes.ok) throw new Error("Failed to load portfolios");
-
         const [projects, allResumes, allPortfolios]: [
           RawProject[],
           RawResume[],
           RawPortfolio[]
         ] = await Promise.all([
-          projectsRes.json(),
-          resumesRes.json(),
-          portfoliosRes.json(),
+          fetchAllPages<RawProject>(`${API_BASE}/projects`, "Failed to load projects"),
+          fetchAllPages<RawResume>(`${API_BASE}/resumes`, "Failed to load resumes"),
+          fetchAllPages<RawPortfolio>(`${API_BASE}/portfolios`, "Failed to load portfolios"),
         ]);
 
         // Group resumes and portfolios by analysis id (doing this manually to reduce the number of api calls
@@ -1,5 +1,6 @@
 import React, { useState, useRef, useCallback, useEffect } from "react";
 import JSZip from "jszip";
+import { fetchJobResult } from "../utils/jobs";
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || "http://localhost:8080";
 
@@ -176,7 +177,8 @@ const FileImport: React.FC<FileImportProps> = ({ activeAnalysisId, onComplete, m
       const url = activeAnalysisId ? `${API_BASE}/projects/${activeAnalysisId}/update/extract` : `${API_BASE}/projects/upload/extract`;
 
 
-      const response = await fetch(url, {
+      // extraction runs as a background job, fetchJobResult waits for it to end
+      const response = await fetchJobResult(url, {
         method: activeAnalysisId ? 'PUT' : 'POST',
         body: formData,
       });
@@ -1,5 +1,6 @@
 import { useState, useRef, useEffect } from "react";
 import { useAnalysisPipeline } from '../context/AnalysisPipelineContext';
+import { fetchJobResult } from '../utils/jobs';
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL || "http://localhost:8080";
 
@@ -213,7 +214,7 @@ export default function FinetunePage({ extractedData, initialState, activeAnalys
           ? `${API_BASE}/projects/${analysisId}/update/commit`
           : `${API_BASE}/projects/${analysisId}/upload/commit`;
 
-      const commitRes = await fetch(commitUrl, {
+      const commitRes = await fetchJobResult(commitUrl, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(commitPayload)
@@ -228,7 +229,7 @@ export default function FinetunePage({ extractedData, initialState, activeAnalys
 
       // 2. Generate Resume
       console.log(`\n[FINETUNE] 2. Calling Resume Generation Endpoint...`);
-      const resumeResp = await fetch(`${API_BASE}/resume/generate/${analysisId}`, { method: 'POST' });
+      const resumeResp = await fetchJobResult(`${API_BASE}/resume/generate/${analysisId}`, { method: 'POST' });
       const resumeLocation = resumeResp.headers.get('location');
       
       // Standardize extracting the ID from either the header or the JSON
@@ -68,9 +68,13 @@ export interface RawProject {
   analysis_id: string;
   analysis_title: string | null;
   creation_date: string;
-  metadata_insights: any;
-  project_insights: any;
-  file_path: string;
+  last_modified: string | null;
+  file_path: string | null;
+  primary_languages: string[];
+  primary_skills: string[];
+  repository_names: string[];
+  project_count: number;
+  has_thumbnail: boolean;
 }
 
 export interface RawResume {
@@ -0,0 +1,40 @@
+// Extract, commit and resume generation run as background jobs: the endpoint answers 202 with a job_id
+// and GET /jobs/{job_id} reports the job until it ends.
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_END_STATES = ["succeeded", "failed", "cancelled"];
+
+interface JobStatus {
+  job_id: string;
+  status: string;
+  status_code?: number;
+  result?: unknown;
+  headers?: Record<string, string>;
+  error?: string;
+}
+
+// fetch for job endpoints: waits for the queued job and resolves to the response its endpoint answers with
+// once it ended (the job's status code, result and headers). Responses other than 202 are returned as they are.
+export async function fetchJobResult(url: string, init?: RequestInit): Promise<Response> {
+  const queued = await fetch(url, init);
+  if (queued.status !== 202) return queued;
+  const { job_id } = await queued.json();
+  const jobUrl = new URL(`/jobs/${job_id}`, url).toString();
+
+  let job: JobStatus;
+  for (;;) {
+    const res = await fetch(jobUrl);
+    if (!res.ok) return res;
+    job = await res.json();
+    if (JOB_END_STATES.includes(job.status)) break;
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+
+  if (job.status === "cancelled") {
+    return new Response(JSON.stringify({ detail: "Job was cancelled" }), { status: 409 });
+  }
+  const body = job.status === "succeeded" ? job.result : { detail: job.error };
+  return new Response(JSON.stringify(body), {
+    status: job.status_code ?? 500,
+    headers: { "Content-Type": "application/json", ...(job.headers ?? {}) },
+  });
+}
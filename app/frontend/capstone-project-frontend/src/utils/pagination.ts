@@ -0,0 +1,16 @@
+// The list endpoints (/projects, /resumes, /portfolios) are paged, the cursor of the next page
+// comes back in this header and is absent on the last page.
+export const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+
+export async function fetchAllPages<T>(url: string, errorMessage: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const separator = url.includes("?") ? "&" : "?";
+    const res: Response = await fetch(cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url);
+    if (!res.ok) throw new Error(errorMessage);
+    items.push(...(await res.json()));
+    cursor = res.headers?.get(NEXT_CURSOR_HEADER) ?? null;
+  } while (cursor);
+  return items;
+}
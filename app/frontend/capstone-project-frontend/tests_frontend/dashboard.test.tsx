@@ -14,25 +14,37 @@ const mockProjects = [
     analysis_id: "a1b2c3",
     analysis_title: "Spring 2025 Analyses",
     creation_date: "2025-03-01T00:00:00Z",
-    metadata_insights: null,
-    project_insights: JSON.stringify({ analyzed_insights: [{ repository_name: "repo-a" }] }),
+    last_modified: null,
     file_path: "",
+    primary_languages: [],
+    primary_skills: [],
+    repository_names: ["repo-a"],
+    project_count: 1,
+    has_thumbnail: false,
   },
   {
     analysis_id: "d4e5f6",
     analysis_title: "Winter 2025 Analyses",
     creation_date: "2025-01-15T00:00:00Z",
-    metadata_insights: null,
-    project_insights: JSON.stringify({ analyzed_insights: [{ repository_name: "repo-b" }] }),
+    last_modified: null,
     file_path: "",
+    primary_languages: [],
+    primary_skills: [],
+    repository_names: ["repo-b"],
+    project_count: 1,
+    has_thumbnail: false,
   },
   {
     analysis_id: "g7h8i9",
     analysis_title: "Fall 2024 Analyses",
     creation_date: "2024-10-12T00:00:00Z",
-    metadata_insights: null,
-    project_insights: JSON.stringify({ analyzed_insights: [{ repository_name: "repo-c" }] }),
+    last_modified: null,
     file_path: "",
+    primary_languages: [],
+    primary_skills: [],
+    repository_names: ["repo-c"],
+    project_count: 1,
+    has_thumbnail: false,
   },
 ];
 
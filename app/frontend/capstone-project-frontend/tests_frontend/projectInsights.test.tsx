@@ -11,52 +11,50 @@ vi.mock("../src/components/DeploymentTab", () => ({ default: ({ p }: any) => <di
 vi.mock("../src/components/PacingTab",     () => ({ default: ({ p }: any) => <div data-testid="pacing-tab">{p.repoName}</div> }));
 
 // ─── Mock API response ────────────────────────────────────────────────────────
-// Mirrors the shape mapToProjects() expects from GET /projects
-const mockApiProjects = [
-  {
-    analysis_id: "test-123",
-    metadata_insights: null,
-    project_insights: {
-      analyzed_insights: [
-        {
-          repository_name: "COSC 360 Project",
-          contribution_analysis: { contribution_level: "Top Contributor", rank_by_commits: 1, percentile: 100 },
-          repository_context: { all_authors_stats: { user1: {}, user2: {} } },
-          collaboration_insights: { is_collaborative: true, user_contribution_share_percentage: 72 },
-          testing_insights: { test_files_modified: 2, code_files_modified: 10, testing_percentage_files: 20, test_lines_added: 100, code_lines_added: 500, testing_percentage_lines: 20, has_tests: true },
-          success_indicators: {
-            deployment: { has_cicd: true, has_containerization: false, cicd_tools: ["GitHub Actions"], containerization_tools: [], hosting_platforms: [] },
-            version_control: { avg_lines_per_commit: 25, commit_consistency: "40% end-heavy" },
-          },
-          statistics: { user_commits: 30 },
-          user_role: { role: "Lead Developer", blurb: "Primary contributor." },
-          dates: { start_date: "2025-01-01", end_date: "2025-04-01" },
+// Mirrors the shape mapToProjects() expects from GET /projects/{analysis_id}
+const mockApiAnalysis = {
+  analysis_id: "test-123",
+  metadata_insights: null,
+  project_insights: {
+    analyzed_insights: [
+      {
+        repository_name: "COSC 360 Project",
+        contribution_analysis: { contribution_level: "Top Contributor", rank_by_commits: 1, percentile: 100 },
+        repository_context: { all_authors_stats: { user1: {}, user2: {} } },
+        collaboration_insights: { is_collaborative: true, user_contribution_share_percentage: 72 },
+        testing_insights: { test_files_modified: 2, code_files_modified: 10, testing_percentage_files: 20, test_lines_added: 100, code_lines_added: 500, testing_percentage_lines: 20, has_tests: true },
+        success_indicators: {
+          deployment: { has_cicd: true, has_containerization: false, cicd_tools: ["GitHub Actions"], containerization_tools: [], hosting_platforms: [] },
+          version_control: { avg_lines_per_commit: 25, commit_consistency: "40% end-heavy" },
         },
-        {
-          repository_name: "Personal Portfolio",
-          contribution_analysis: { contribution_level: "Sole Contributor", rank_by_commits: 1, percentile: 100 },
-          repository_context: { all_authors_stats: { user1: {} } },
-          collaboration_insights: { is_collaborative: false, user_contribution_share_percentage: 100 },
-          testing_insights: { test_files_modified: 0, code_files_modified: 5, testing_percentage_files: 0, test_lines_added: 0, code_lines_added: 200, testing_percentage_lines: 0, has_tests: false },
-          success_indicators: {
-            deployment: { has_cicd: false, has_containerization: false, cicd_tools: [], containerization_tools: [], hosting_platforms: [] },
-            version_control: { avg_lines_per_commit: 15, commit_consistency: "10% end-heavy" },
-          },
-          statistics: { user_commits: 12 },
-          user_role: { role: "Sole Developer", blurb: "Built solo." },
-          dates: { start_date: "2025-02-01", end_date: "2025-03-01" },
+        statistics: { user_commits: 30 },
+        user_role: { role: "Lead Developer", blurb: "Primary contributor." },
+        dates: { start_date: "2025-01-01", end_date: "2025-04-01" },
+      },
+      {
+        repository_name: "Personal Portfolio",
+        contribution_analysis: { contribution_level: "Sole Contributor", rank_by_commits: 1, percentile: 100 },
+        repository_context: { all_authors_stats: { user1: {} } },
+        collaboration_insights: { is_collaborative: false, user_contribution_share_percentage: 100 },
+        testing_insights: { test_files_modified: 0, code_files_modified: 5, testing_percentage_files: 0, test_lines_added: 0, code_lines_added: 200, testing_percentage_lines: 0, has_tests: false },
+        success_indicators: {
+          deployment: { has_cicd: false, has_containerization: false, cicd_tools: [], containerization_tools: [], hosting_platforms: [] },
+          version_control: { avg_lines_per_commit: 15, commit_consistency: "10% end-heavy" },
         },
-      ],
-    },
+        statistics: { user_commits: 12 },
+        user_role: { role: "Sole Developer", blurb: "Built solo." },
+        dates: { start_date: "2025-02-01", end_date: "2025-03-01" },
+      },
+    ],
   },
-];
+};
 
 // ─── Setup ────────────────────────────────────────────────────────────────────
 
 beforeEach(() => {
   vi.spyOn(globalThis, "fetch").mockResolvedValue({
     ok: true,
-    json: async () => mockApiProjects,
+    json: async () => mockApiAnalysis,
   } as Response);
 });
 